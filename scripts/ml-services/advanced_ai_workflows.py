@@ -4,7 +4,10 @@ Combines multiple models for sophisticated analysis and business intelligence
 """
 
 import asyncio
+import hashlib
+import heapq
 import logging
+import os
 from typing import Dict, List, Any, Optional, Tuple, Set
 from datetime import datetime, timedelta
 import numpy as np
@@ -12,7 +15,8 @@ import pandas as pd
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from pathlib import Path
 import statistics
 
 from local_inference_service import get_inference_service
@@ -20,6 +24,17 @@ from job_enrichment_local import ai_job_enrichment_processor
 from cache_manager import get_cache_manager
 from monitoring_system import get_performance_monitor
 from model_manager import get_model_manager
+from matching_engine import VectorizedMatchingEngine
+from dataset_streaming import (
+    END_OF_STREAM,
+    EnrichedJobSpool,
+    MatchSample,
+    StageStats,
+    StreamingCheckpoint,
+    iter_record_chunks,
+    resolve_dataset_paths,
+    run_stages
+)
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +86,10 @@ class AdvancedAIWorkflows:
         # Thread pool for concurrent processing
         self.executor = ThreadPoolExecutor(max_workers=10)
         
+        # Vectorized candidate x job scoring
+        self.matching_engine = VectorizedMatchingEngine()
+        self.top_k_per_candidate = 25
+        
         # Analytics data storage
         self.analytics_data = defaultdict(list)
         self.processed_matches = 0
@@ -108,26 +127,31 @@ class AdvancedAIWorkflows:
         # Step 2: Enrich all jobs with AI insights
         enriched_jobs = await self._enrich_jobs_batch(jobs)
         
-        # Step 3: Perform multi-dimensional matching
-        matching_tasks = []
-        for candidate_profile in candidate_profiles:
-            for enriched_job in enriched_jobs:
-                task = self.executor.submit(
-                    self._perform_comprehensive_match,
-                    candidate_profile,
-                    enriched_job,
-                    matching_criteria
-                )
-                matching_tasks.append((candidate_profile.id, enriched_job.job_id, task))
+        # Step 3: Score the full candidate x job grid in matrix form
+        weights = matching_criteria.get('weights', self.matching_weights) if matching_criteria else self.matching_weights
+        top_k = (matching_criteria or {}).get('top_k_per_candidate', self.top_k_per_candidate)
+        min_score = (matching_criteria or {}).get('min_overall_score', 0)
+        survivors = self.matching_engine.top_k_matches(
+            candidate_profiles,
+            enriched_jobs,
+            weights,
+            top_k=top_k,
+            min_score=min_score
+        )
         
-        # Step 4: Collect and rank results
-        for candidate_id, job_id, task in matching_tasks:
+        # Step 4: Build detailed explanations only for the top-k survivors
+        for candidate_index, job_index, overall_score, match_components in survivors:
+            candidate_profile = candidate_profiles[candidate_index]
+            enriched_job = enriched_jobs[job_index]
             try:
-                match_result = task.result()
-                if match_result:
-                    all_matches.append(match_result)
+                all_matches.append(self._build_match_result(
+                    candidate_profile,
+                    enriched_job,
+                    match_components,
+                    overall_score
+                ))
             except Exception as e:
-                logger.error(f"Error matching {candidate_id} to {job_id}: {str(e)}")
+                logger.error(f"Error matching {candidate_profile.id} to {enriched_job.job_id}: {str(e)}")
         
         # Step 5: Apply advanced ranking and filtering
         ranked_matches = self._apply_advanced_ranking(all_matches, matching_criteria)
@@ -162,7 +186,7 @@ class AdvancedAIWorkflows:
                 self._analyze_candidate_comprehensive,
                 candidate
             )
-            profile_tasks.append((candidate.get('id', str(hash(candidate))), task))
+            profile_tasks.append((candidate.get('id'), task))
         
         # Collect results
         for candidate_id, task in profile_tasks:
@@ -202,7 +226,7 @@ class AdvancedAIWorkflows:
         
         # Build comprehensive profile
         profile = CandidateProfile(
-            id=candidate.get('id', str(hash(candidate))),
+            id=candidate.get('id') or hashlib.sha256(cv_text.encode('utf-8')).hexdigest(),
             raw_cv=cv_text,
             extracted_skills=skills_analysis,
             personality_profile=personality_profile,
@@ -368,7 +392,9 @@ class AdvancedAIWorkflows:
         """Convert dictionary to job object for enrichment"""
         class Job:
             def __init__(self, data):
-                self.id = data.get('id', str(hash(str(data))))
+                self.id = data.get('id') or hashlib.sha256(
+                    json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+                ).hexdigest()
                 self.title = data.get('title', '')
                 self.description = data.get('description', '')
                 self.company = data.get('company', '')
@@ -440,6 +466,26 @@ class AdvancedAIWorkflows:
             for component in weights.keys()
         )
         
+        return self._build_match_result(
+            candidate, job, match_components, overall_score, skill_match
+        )
+    
+    def _build_match_result(
+        self,
+        candidate: CandidateProfile,
+        job: Any,
+        match_components: Dict[str, float],
+        overall_score: float,
+        skill_match: Optional[Dict[str, Any]] = None
+    ) -> JobMatchResult:
+        """Build strengths, gaps, recommendations and explanation for a scored pair"""
+        
+        if skill_match is None:
+            skill_match = self._calculate_skill_match(
+                candidate.extracted_skills,
+                job.enriched_fields.get('extracted_skills', {})
+            )
+        
         # Identify strengths and gaps
         strengths = self._identify_strengths(match_components, skill_match)
         gaps = self._identify_gaps(match_components, skill_match)
@@ -1155,77 +1201,264 @@ class AdvancedAIWorkflows:
         self,
         dataset_path: str,
         output_format: str = "detailed",
-        batch_size: int = 100
+        batch_size: int = 100,
+        jobs_path: Optional[str] = None,
+        output_path: Optional[str] = None,
+        matching_criteria: Optional[Dict[str, Any]] = None,
+        resume: bool = True,
+        queue_size: int = 4
     ) -> Dict[str, Any]:
         """
         Process large datasets efficiently with advanced analytics
-        Handles CSV, JSON, or database inputs
+        Streams CSV, JSONL or Parquet candidate and job files in chunks
+        
+        Jobs are read, enriched and spooled to disk first; candidate chunks then
+        flow through profile building, scoring against every spooled job chunk
+        and an incremental JSONL writer, connected by bounded queues so memory
+        depends on batch_size and queue_size rather than on the input size.
+        Progress is checkpointed after every written chunk and resumed on the
+        next run with the same inputs.
         """
-        logger.info(f"Processing large dataset from {dataset_path}")
+        candidates_path, jobs_path = resolve_dataset_paths(dataset_path, jobs_path)
+        if output_path is None:
+            output_path = str(Path(candidates_path).with_name('matches.jsonl'))
+        logger.info(f"Streaming dataset: candidates={candidates_path} jobs={jobs_path} -> {output_path}")
         
         start_time = datetime.now()
-        total_processed = 0
-        batch_results = []
-        
-        # Load data in batches (simplified for example)
-        # In production, this would handle various data sources
-        
-        # Process batches concurrently
-        processing_tasks = []
-        
-        # Mock batch processing for demonstration
-        for batch_num in range(3):  # Process 3 batches as example
-            # Create sample batch data
-            sample_candidates = [
-                {
-                    'id': f'candidate_{i}',
-                    'cv_text': f'Experienced software engineer with {i+3} years in Python and ML'
-                }
-                for i in range(batch_num * 10, (batch_num + 1) * 10)
-            ]
-            
-            sample_jobs = [
-                {
-                    'id': f'job_{i}',
-                    'title': f'Senior Python Developer',
-                    'description': 'Looking for Python expert with ML experience'
-                }
-                for i in range(batch_num * 5, (batch_num + 1) * 5)
-            ]
-            
-            # Process batch
-            batch_task = self.sophisticated_job_matching_pipeline(
-                sample_candidates,
-                sample_jobs
+        weights = matching_criteria.get('weights', self.matching_weights) if matching_criteria else self.matching_weights
+        top_k = (matching_criteria or {}).get('top_k_per_candidate', self.top_k_per_candidate)
+        min_score = (matching_criteria or {}).get('min_overall_score', 0)
+        
+        checkpoint = StreamingCheckpoint(f"{output_path}.checkpoint.json")
+        spool = EnrichedJobSpool(f"{output_path}.jobs.pkl")
+        run_key = {
+            'candidates_path': os.path.abspath(candidates_path),
+            'jobs_path': os.path.abspath(jobs_path),
+            'batch_size': batch_size
+        }
+        if not (resume and checkpoint.load(run_key)):
+            checkpoint.clear()
+            checkpoint.save(**run_key, jobs_spooled=False, chunks_done=0, output_bytes=0,
+                            candidates_processed=0, matches_written=0)
+        
+        stats = {
+            name: StageStats(name)
+            for name in ('read_jobs', 'enrich_jobs', 'read_candidates', 'build_profiles', 'score', 'write')
+        }
+        
+        # Phase 1: enrich every job once and spool the results to disk
+        if checkpoint.state['jobs_spooled'] and os.path.exists(spool.path):
+            logger.info(f"Resuming with {checkpoint.state['job_count']} spooled enriched jobs")
+        else:
+            job_count = await self._spool_enriched_jobs(
+                jobs_path, batch_size, queue_size, spool, stats
             )
-            processing_tasks.append(batch_task)
-            total_processed += len(sample_candidates) * len(sample_jobs)
+            checkpoint.save(jobs_spooled=True, job_count=job_count)
         
-        # Collect all batch results
-        for task in processing_tasks:
-            batch_result = await task
-            batch_results.extend(batch_result)
+        # Phase 2: stream candidate chunks through profiling, scoring and writing
+        sample = MatchSample()
+        await self._stream_candidate_matches(
+            candidates_path, output_path, batch_size, queue_size, spool, checkpoint,
+            weights, top_k, min_score, sample, stats
+        )
         
-        # Generate comprehensive report
         processing_time = (datetime.now() - start_time).total_seconds()
+        total_comparisons = checkpoint.state['candidates_processed'] * checkpoint.state['job_count']
         
         report = {
             'summary': {
-                'total_comparisons': total_processed,
-                'total_matches': len(batch_results),
+                'total_candidates': checkpoint.state['candidates_processed'],
+                'total_jobs': checkpoint.state['job_count'],
+                'total_comparisons': total_comparisons,
+                'total_matches': checkpoint.state['matches_written'],
                 'processing_time_seconds': processing_time,
-                'throughput_per_second': total_processed / processing_time if processing_time > 0 else 0
+                'throughput_per_second': total_comparisons / processing_time if processing_time > 0 else 0,
+                'output_path': output_path
             },
-            'quality_metrics': self._calculate_dataset_quality_metrics(batch_results),
-            'insights': self._generate_dataset_insights(batch_results),
-            'recommendations': self._generate_dataset_recommendations(batch_results)
+            'stages': {name: stage.to_dict() for name, stage in stats.items()},
+            'quality_metrics': self._calculate_dataset_quality_metrics(sample.matches),
+            'insights': self._generate_dataset_insights(sample.matches),
+            'recommendations': self._generate_dataset_recommendations(sample.matches)
         }
         
         if output_format == "detailed":
-            report['detailed_matches'] = batch_results[:100]  # First 100 matches
+            report['detailed_matches'] = sample.first_matches
+        
+        # Completed runs start from scratch next time
+        checkpoint.clear()
+        if os.path.exists(spool.path):
+            os.remove(spool.path)
         
         return report
     
+    async def _spool_enriched_jobs(
+        self,
+        jobs_path: str,
+        batch_size: int,
+        queue_size: int,
+        spool: EnrichedJobSpool,
+        stats: Dict[str, StageStats]
+    ) -> int:
+        """Read and enrich job chunks concurrently, appending each to the spool"""
+        loop = asyncio.get_running_loop()
+        raw_chunks = asyncio.Queue(maxsize=queue_size)
+        job_count = 0
+        
+        async def read_jobs():
+            chunks = iter_record_chunks(jobs_path, batch_size)
+            while True:
+                with stats['read_jobs']:
+                    chunk = await loop.run_in_executor(self.executor, next, chunks, END_OF_STREAM)
+                if chunk is END_OF_STREAM:
+                    break
+                stats['read_jobs'].record(len(chunk))
+                await raw_chunks.put(chunk)
+            await raw_chunks.put(END_OF_STREAM)
+        
+        async def enrich_jobs():
+            nonlocal job_count
+            spool.open_for_write()
+            try:
+                while (chunk := await raw_chunks.get()) is not END_OF_STREAM:
+                    with stats['enrich_jobs']:
+                        enriched = await self._enrich_jobs_batch(chunk)
+                        await loop.run_in_executor(self.executor, spool.append, enriched)
+                    stats['enrich_jobs'].record(len(enriched))
+                    job_count += len(enriched)
+            finally:
+                spool.close()
+        
+        await run_stages(read_jobs(), enrich_jobs())
+        logger.info(f"Spooled {job_count} enriched jobs to {spool.path}")
+        return job_count
+    
+    async def _stream_candidate_matches(
+        self,
+        candidates_path: str,
+        output_path: str,
+        batch_size: int,
+        queue_size: int,
+        spool: EnrichedJobSpool,
+        checkpoint: StreamingCheckpoint,
+        weights: Dict[str, float],
+        top_k: int,
+        min_score: float,
+        sample: MatchSample,
+        stats: Dict[str, StageStats]
+    ):
+        """Candidate reader -> profile builder -> scorer -> writer"""
+        loop = asyncio.get_running_loop()
+        raw_chunks = asyncio.Queue(maxsize=queue_size)
+        profile_chunks = asyncio.Queue(maxsize=queue_size)
+        match_chunks = asyncio.Queue(maxsize=queue_size)
+        skip_chunks = checkpoint.state['chunks_done']
+        if skip_chunks:
+            logger.info(f"Resuming after {skip_chunks} completed candidate chunks")
+        
+        async def read_candidates():
+            chunks = iter_record_chunks(candidates_path, batch_size)
+            index = 0
+            while True:
+                with stats['read_candidates']:
+                    chunk = await loop.run_in_executor(self.executor, next, chunks, END_OF_STREAM)
+                if chunk is END_OF_STREAM:
+                    break
+                if index >= skip_chunks:
+                    stats['read_candidates'].record(len(chunk))
+                    await raw_chunks.put(chunk)
+                index += 1
+            await raw_chunks.put(END_OF_STREAM)
+        
+        async def build_profiles():
+            while (chunk := await raw_chunks.get()) is not END_OF_STREAM:
+                with stats['build_profiles']:
+                    results = await asyncio.gather(
+                        *(loop.run_in_executor(self.executor, self._analyze_candidate_comprehensive, c)
+                          for c in chunk),
+                        return_exceptions=True
+                    )
+                profiles = []
+                for candidate, result in zip(chunk, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error building profile for candidate {candidate.get('id')}: {result}")
+                    else:
+                        profiles.append(result)
+                stats['build_profiles'].record(len(chunk))
+                await profile_chunks.put((len(chunk), profiles))
+            await profile_chunks.put(END_OF_STREAM)
+        
+        async def score():
+            while (item := await profile_chunks.get()) is not END_OF_STREAM:
+                chunk_size, profiles = item
+                with stats['score']:
+                    matches = await loop.run_in_executor(
+                        self.executor, self._score_against_spool,
+                        profiles, spool, weights, top_k, min_score
+                    )
+                stats['score'].record(len(profiles))
+                await match_chunks.put((chunk_size, matches))
+            await match_chunks.put(END_OF_STREAM)
+        
+        async def write():
+            # Drop anything written after the last checkpoint by an interrupted run
+            with open(output_path, 'ab') as f:
+                f.truncate(checkpoint.state['output_bytes'])
+            with open(output_path, 'a', encoding='utf-8') as f:
+                while (item := await match_chunks.get()) is not END_OF_STREAM:
+                    chunk_size, matches = item
+                    with stats['write']:
+                        for match in matches:
+                            f.write(json.dumps(asdict(match), default=str) + '\n')
+                            sample.add(match)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        checkpoint.save(
+                            chunks_done=checkpoint.state['chunks_done'] + 1,
+                            output_bytes=f.tell(),
+                            candidates_processed=checkpoint.state['candidates_processed'] + chunk_size,
+                            matches_written=checkpoint.state['matches_written'] + len(matches)
+                        )
+                    stats['write'].record(len(matches))
+        
+        await run_stages(read_candidates(), build_profiles(), score(), write())
+    
+    def _score_against_spool(
+        self,
+        profiles: List[CandidateProfile],
+        spool: EnrichedJobSpool,
+        weights: Dict[str, float],
+        top_k: int,
+        min_score: float
+    ) -> List[JobMatchResult]:
+        """Keep the top_k jobs per candidate across all spooled job chunks"""
+        if not profiles:
+            return []
+        
+        # Min-heap per candidate of (score, sequence, job, components)
+        heaps = [[] for _ in profiles]
+        sequence = 0
+        for job_chunk in spool:
+            survivors = self.matching_engine.top_k_matches(
+                profiles, job_chunk, weights, top_k=top_k, min_score=min_score
+            )
+            for candidate_index, job_index, overall_score, components in survivors:
+                entry = (overall_score, sequence, job_chunk[job_index], components)
+                sequence += 1
+                heap = heaps[candidate_index]
+                if not top_k or len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif overall_score > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+        
+        matches = []
+        for profile, heap in zip(profiles, heaps):
+            for overall_score, _, job, components in sorted(heap, key=lambda e: (-e[0], e[1])):
+                try:
+                    matches.append(self._build_match_result(profile, job, components, overall_score))
+                except Exception as e:
+                    logger.error(f"Error matching {profile.id} to {job.job_id}: {str(e)}")
+        return matches
+    
     def _calculate_dataset_quality_metrics(
         self, matches: List[JobMatchResult]
     ) -> Dict[str, Any]:
@@ -1564,11 +1797,13 @@ async def match_candidates_to_jobs(
 
 async def process_recruitment_dataset(
     dataset_path: str,
-    output_format: str = "summary"
+    output_format: str = "summary",
+    jobs_path: Optional[str] = None,
+    output_path: Optional[str] = None
 ) -> Dict[str, Any]:
     """Convenience function for large dataset processing"""
     return await advanced_workflows.process_large_dataset(
-        dataset_path, output_format
+        dataset_path, output_format, jobs_path=jobs_path, output_path=output_path
     )
 
 
@@ -0,0 +1,213 @@
+"""
+Streaming building blocks for large dataset processing
+Chunked CSV/JSONL/Parquet readers, an on-disk spool for enriched jobs,
+resumable checkpoints, per-stage throughput accounting and a bounded
+match sample for dataset analytics
+"""
+
+import asyncio
+import json
+import logging
+import os
+import pickle
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = ('.csv', '.jsonl', '.ndjson', '.parquet')
+
+# Marks the end of a stage queue
+END_OF_STREAM = object()
+
+
+def iter_record_chunks(path: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most chunk_size records from a CSV, JSONL or Parquet file"""
+    suffix = Path(path).suffix.lower()
+
+    if suffix == '.csv':
+        for frame in pd.read_csv(path, chunksize=chunk_size):
+            yield frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+    elif suffix in ('.jsonl', '.ndjson'):
+        chunk = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk.append(json.loads(line))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    elif suffix == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to stream Parquet datasets") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+
+    else:
+        raise ValueError(
+            f"Unsupported dataset format '{suffix}', expected one of {', '.join(SUPPORTED_SUFFIXES)}"
+        )
+
+
+def resolve_dataset_paths(dataset_path: str, jobs_path: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Resolve candidate and job files
+
+    dataset_path is either a candidates file (with jobs_path given) or a
+    directory containing candidates.<ext> and jobs.<ext>.
+    """
+    root = Path(dataset_path)
+    if not root.is_dir():
+        if not jobs_path:
+            raise ValueError("jobs_path is required when dataset_path is a candidates file")
+        return str(root), jobs_path
+
+    def find(stem: str) -> str:
+        for suffix in SUPPORTED_SUFFIXES:
+            candidate = root / f"{stem}{suffix}"
+            if candidate.exists():
+                return str(candidate)
+        raise FileNotFoundError(f"No {stem} file ({', '.join(SUPPORTED_SUFFIXES)}) in {dataset_path}")
+
+    return find('candidates'), jobs_path or find('jobs')
+
+
+class StageStats:
+    """Item counts and busy time for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.busy_seconds += time.perf_counter() - self._started
+        return False
+
+    def record(self, items: int):
+        self.items += items
+        self.chunks += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'chunks': self.chunks,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'items_per_second': self.items / self.busy_seconds if self.busy_seconds > 0 else 0
+        }
+
+
+class StreamingCheckpoint:
+    """Atomically persisted progress marker for a streaming run"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, Any] = {}
+
+    def load(self, expected: Dict[str, Any]) -> bool:
+        """Load saved state if it was written by a run with the same parameters"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return False
+        if any(state.get(key) != value for key, value in expected.items()):
+            logger.warning(f"Checkpoint {self.path} was written with different parameters, starting over")
+            return False
+        self.state = state
+        return True
+
+    def save(self, **updates):
+        self.state.update(updates)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.state = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class EnrichedJobSpool:
+    """Append-only on-disk store of enriched job chunks, re-read once per candidate chunk"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def open_for_write(self):
+        self._file = open(self.path, 'wb')
+
+    def append(self, jobs: List[Any]):
+        pickle.dump(jobs, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+
+class MatchSample:
+    """Bounded reservoir of streamed matches for dataset-level analytics"""
+
+    def __init__(self, capacity: int = 5000, keep_first: int = 100, seed: int = 0):
+        self.capacity = capacity
+        self.keep_first = keep_first
+        self.matches: List[Any] = []
+        self.first_matches: List[Any] = []
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, match: Any):
+        self.seen += 1
+        if len(self.first_matches) < self.keep_first:
+            self.first_matches.append(match)
+        if len(self.matches) < self.capacity:
+            self.matches.append(match)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.capacity:
+                self.matches[slot] = match
+
+
+async def run_stages(*stages):
+    """Run pipeline stage coroutines together, cancelling the rest if one fails"""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,270 @@
+"""
+Dynamic micro-batching for model inference
+Coalesces concurrent small requests for the same model into one batch, runs
+it on a worker thread and scatters the rows back to the waiting callers
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class _PendingRequest:
+    __slots__ = ('inputs', 'future', 'batch_size', 'enqueued_at')
+
+    def __init__(self, inputs: List[Any], future: asyncio.Future, batch_size: Optional[int]):
+        self.inputs = inputs
+        self.future = future
+        self.batch_size = batch_size
+        self.enqueued_at = time.perf_counter()
+
+
+class DynamicBatcher:
+    """
+    Per-model request queues drained by collector tasks
+
+    A collector waits for the first request, then keeps taking requests until
+    the batch holds max_batch_size inputs or max_wait_ms has passed since the
+    first one arrived. The merged batch runs on the inference executor and each
+    caller receives the slice of the output that belongs to its inputs. Requests
+    larger than max_batch_size bypass coalescing and run on their own. The merged
+    batch is still run in chunks no larger than the smallest batch_size any of
+    its callers asked for.
+    """
+
+    def __init__(
+        self,
+        model_manager: Any,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        inference_workers: int = 4,
+        latency_window: int = 2048
+    ):
+        self.model_manager = model_manager
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(
+            max_workers=inference_workers, thread_name_prefix="batch-inference"
+        )
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[Tuple, asyncio.Queue] = {}
+        self._collectors: Dict[Tuple, asyncio.Task] = {}
+
+        # Metrics
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_histogram['overflow'] = 0
+        self.batches_run = 0
+        self.requests_served = 0
+        self.items_served = 0
+        self.items_batched = 0
+        self.bypassed_requests = 0
+        self.failed_batches = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    def start(self):
+        """Bind to the running event loop"""
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        """Cancel collectors and release the inference threads"""
+        for task in self._collectors.values():
+            task.cancel()
+        await asyncio.gather(*self._collectors.values(), return_exceptions=True)
+        self._collectors.clear()
+        self._queues.clear()
+        self.executor.shutdown(wait=False)
+        self.loop = None
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and self.loop.is_running()
+
+    async def submit(
+        self,
+        model_name: str,
+        inputs: List[Any],
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Any:
+        """Queue inputs for model_name and wait for their share of the batch output"""
+        started = time.perf_counter()
+
+        if len(inputs) > self.max_batch_size:
+            self.bypassed_requests += 1
+            result = await self.loop.run_in_executor(
+                self.executor,
+                lambda: self.model_manager.get_inference(
+                    model_name, inputs, batch_size=batch_size, use_cache=use_cache
+                )
+            )
+            self._record_request(started, len(inputs))
+            return result
+
+        key = (model_name, use_cache)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._collectors[key] = asyncio.create_task(self._collect(key, queue))
+
+        future = self.loop.create_future()
+        await queue.put(_PendingRequest(inputs, future, batch_size))
+        result = await future
+        self._record_request(started, len(inputs))
+        return result
+
+    def submit_threadsafe(self, model_name: str, inputs: List[Any], **kwargs) -> Any:
+        """Blocking submit for code running on a worker thread"""
+        return asyncio.run_coroutine_threadsafe(
+            self.submit(model_name, inputs, **kwargs), self.loop
+        ).result()
+
+    async def _collect(self, key: Tuple, queue: asyncio.Queue):
+        model_name, use_cache = key
+        carry: Optional[_PendingRequest] = None
+
+        while True:
+            first = carry or await queue.get()
+            carry = None
+            batch = [first]
+            size = len(first.inputs)
+            deadline = first.enqueued_at + self.max_wait
+
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 and queue.empty():
+                    break
+                try:
+                    if queue.empty():
+                        pending = await asyncio.wait_for(queue.get(), remaining)
+                    else:
+                        pending = queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if size + len(pending.inputs) > self.max_batch_size:
+                    carry = pending
+                    break
+                batch.append(pending)
+                size += len(pending.inputs)
+
+            await self._run_batch(model_name, use_cache, batch, size)
+
+    async def _run_batch(
+        self, model_name: str, use_cache: bool, batch: List[_PendingRequest], size: int
+    ):
+        merged = [item for request in batch for item in request.inputs]
+        # Coalescing must not raise the per-forward-pass cap a caller asked for
+        requested = [request.batch_size for request in batch if request.batch_size]
+        batch_size = min([size] + requested)
+        try:
+            result = await self.loop.run_in_executor(
+                self.executor,
+                lambda: self.model_manager.get_inference(
+                    model_name, merged, batch_size=batch_size, use_cache=use_cache
+                )
+            )
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Batched inference failed for {model_name}: {str(e)}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        self._record_batch(size)
+        offset = 0
+        for request in batch:
+            count = len(request.inputs)
+            if not request.future.done():
+                request.future.set_result(result[offset:offset + count])
+            offset += count
+
+    def _record_batch(self, size: int):
+        self.batches_run += 1
+        self.items_batched += size
+        index = bisect.bisect_left(BATCH_SIZE_BUCKETS, size)
+        if index < len(BATCH_SIZE_BUCKETS):
+            self.batch_size_histogram[BATCH_SIZE_BUCKETS[index]] += 1
+        else:
+            self.batch_size_histogram['overflow'] += 1
+
+    def _record_request(self, started: float, items: int):
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        self.requests_served += 1
+        self.items_served += items
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, batch-size histogram and request latency percentiles"""
+        latencies = np.fromiter(self._latencies, dtype=float) if self._latencies else None
+        queue_depth: Dict[str, int] = {}
+        for (model_name, _), queue in self._queues.items():
+            queue_depth[model_name] = queue_depth.get(model_name, 0) + queue.qsize()
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": queue_depth,
+            "batches_run": self.batches_run,
+            "requests_served": self.requests_served,
+            "items_served": self.items_served,
+            "avg_batch_size": self.items_batched / self.batches_run if self.batches_run else 0,
+            "bypassed_requests": self.bypassed_requests,
+            "failed_batches": self.failed_batches,
+            "batch_size_histogram": {
+                (f"le_{bucket}" if bucket != 'overflow' else bucket): count
+                for bucket, count in self.batch_size_histogram.items()
+            },
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if latencies is not None else 0,
+                "p99": float(np.percentile(latencies, 99)) if latencies is not None else 0,
+                "samples": len(self._latencies)
+            }
+        }
+
+
+class BatchingModelManager:
+    """
+    Drop-in ModelManager wrapper that routes get_inference through a batcher
+
+    Calls made from worker threads while the batcher's loop is running are
+    coalesced; calls from the event loop thread itself, or while the batcher
+    is stopped, go straight to the wrapped manager.
+    """
+
+    def __init__(self, model_manager: Any, batcher: DynamicBatcher):
+        self._model_manager = model_manager
+        self._batcher = batcher
+
+    def get_inference(
+        self,
+        model_name: str,
+        inputs: Any,
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Any:
+        if not self._batcher.running or not isinstance(inputs, list) or self._on_loop_thread():
+            return self._model_manager.get_inference(
+                model_name, inputs, batch_size=batch_size, use_cache=use_cache
+            )
+        return self._batcher.submit_threadsafe(
+            model_name, inputs, batch_size=batch_size, use_cache=use_cache
+        )
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._batcher.loop
+        except RuntimeError:
+            return False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model_manager, name)
@@ -13,6 +13,7 @@ import time
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 import uvicorn
 
@@ -24,6 +25,7 @@ if current_dir not in sys.path:
 try:
     from local_inference_service import get_inference_service
     from local_model_config import MODEL_CONFIG, PERFORMANCE_SETTINGS
+    from dynamic_batcher import DynamicBatcher, BatchingModelManager
 except ImportError as e:
     logging.error(f"Failed to import local inference modules: {e}")
     logging.error("Make sure all required Python packages are installed")
@@ -57,6 +59,9 @@ app.add_middleware(
 # Global inference service instance
 inference_service = None
 
+# Coalesces concurrent requests for the same model into micro-batches
+batcher = None
+
 # Pydantic models for API requests/responses
 class TextAnalysisRequest(BaseModel):
     texts: Union[str, List[str]] = Field(..., description="Text(s) to analyze")
@@ -70,6 +75,8 @@ class JobSimilarityRequest(BaseModel):
     candidate_texts: Union[str, List[str]] = Field(..., description="Candidate CV/profile text(s)")
     batch_size: Optional[int] = Field(None, description="Batch size for processing")
     return_detailed_scores: bool = Field(True, description="Return detailed similarity scores")
+    job_embeddings: Optional[List[Optional[List[float]]]] = Field(None, description="Stored job vectors, one per job (null where missing)")
+    job_embedding_models: Optional[List[Optional[str]]] = Field(None, description="embedding_model of each stored job vector")
 
 class PersonalityAnalysisRequest(BaseModel):
     texts: Union[str, List[str]] = Field(..., description="Text(s) to analyze for personality")
@@ -110,12 +117,29 @@ class HealthResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize the inference service on startup"""
-    global inference_service
+    global inference_service, batcher
     logger.info("Starting AI Inference Service...")
     
     try:
         # Initialize the inference service
         inference_service = get_inference_service()
+        
+        # Route model calls from request threads through the micro-batcher
+        if PERFORMANCE_SETTINGS.get("dynamic_batching", True):
+            batcher = DynamicBatcher(
+                inference_service.model_manager,
+                max_batch_size=PERFORMANCE_SETTINGS.get("max_batch_size", 64),
+                max_wait_ms=PERFORMANCE_SETTINGS.get("max_batch_wait_ms", 5),
+                inference_workers=PERFORMANCE_SETTINGS.get("max_concurrent_requests", 4)
+            )
+            batcher.start()
+            inference_service.model_manager = BatchingModelManager(
+                inference_service.model_manager, batcher
+            )
+            logger.info(
+                f" Dynamic batching enabled (max {batcher.max_batch_size} inputs, "
+                f"{batcher.max_wait * 1000:.0f}ms max wait)"
+            )
         logger.info(" AI Inference Service started successfully")
         logger.info(" Service running in high-performance mode")
         
@@ -156,7 +180,10 @@ async def get_metrics():
     try:
         if inference_service is None:
             raise HTTPException(status_code=503, detail="Inference service not initialized")
-        return inference_service.get_performance_metrics()
+        metrics = inference_service.get_performance_metrics()
+        if batcher is not None:
+            metrics["batching"] = batcher.get_metrics()
+        return metrics
     except Exception as e:
         logger.error(f"Metrics retrieval failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Metrics retrieval failed: {str(e)}")
@@ -174,11 +201,14 @@ async def analyze_job_similarity(request: JobSimilarityRequest):
         logger.info(f"Processing job similarity request with {len(request.job_descriptions) if isinstance(request.job_descriptions, list) else 1} jobs and {len(request.candidate_texts) if isinstance(request.candidate_texts, list) else 1} candidates")
         
         # Process similarity analysis
-        result = inference_service.analyze_job_similarity(
+        result = await run_in_threadpool(
+            inference_service.analyze_job_similarity,
             job_descriptions=request.job_descriptions,
             candidate_texts=request.candidate_texts,
             batch_size=request.batch_size,
-            return_detailed_scores=request.return_detailed_scores
+            return_detailed_scores=request.return_detailed_scores,
+            job_embeddings=request.job_embeddings,
+            job_embedding_models=request.job_embedding_models
         )
         
         processing_time = (time.time() - start_time) * 1000
@@ -218,7 +248,8 @@ async def analyze_advanced_job_similarity(request: AdvancedJobSimilarityRequest)
         if request.priority == "youth" and (batch_size is None or batch_size > 8):
             batch_size = 8
 
-        result = inference_service.analyze_job_similarity_with_industry(
+        result = await run_in_threadpool(
+            inference_service.analyze_job_similarity_with_industry,
             job_descriptions=request.job_descriptions,
             candidate_texts=request.candidate_texts,
             industry=request.industry,
@@ -256,7 +287,8 @@ async def analyze_personality(request: PersonalityAnalysisRequest):
         logger.info(f"Processing personality analysis for {len(request.texts) if isinstance(request.texts, list) else 1} texts")
         
         # Process personality analysis
-        result = inference_service.analyze_personality(
+        result = await run_in_threadpool(
+            inference_service.analyze_personality,
             texts=request.texts,
             batch_size=request.batch_size,
             top_k=request.top_k
@@ -296,7 +328,8 @@ async def analyze_text_features(request: TextAnalysisRequest):
         logger.info(f"Processing text feature analysis for {len(request.texts) if isinstance(request.texts, list) else 1} texts")
         
         # Process text features analysis
-        result = inference_service.analyze_text_features(
+        result = await run_in_threadpool(
+            inference_service.analyze_text_features,
             texts=request.texts,
             batch_size=request.batch_size,
             extract_keywords=request.extract_keywords,
@@ -338,7 +371,8 @@ async def advanced_analysis_pipeline(request: AdvancedAnalysisRequest):
         logger.info(f"Processing advanced analysis pipeline with depth: {request.analysis_depth}")
         
         # Process advanced analysis
-        result = inference_service.advanced_analysis_pipeline(
+        result = await run_in_threadpool(
+            inference_service.advanced_analysis_pipeline,
             job_description=request.job_description,
             candidate_cv=request.candidate_cv,
             analysis_depth=request.analysis_depth
@@ -375,7 +409,8 @@ async def batch_analysis(request: BatchAnalysisRequest):
         logger.info(f"Processing batch analysis with {len(request.requests)} requests")
         
         # Process batch analysis
-        result = inference_service.batch_process_multiple(
+        result = await run_in_threadpool(
+            inference_service.batch_process_multiple,
             requests=request.requests,
             max_concurrent=request.max_concurrent if request.max_concurrent is not None else None
         )
@@ -427,9 +462,15 @@ async def root():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global inference_service
+    global inference_service, batcher
     logger.info("Shutting down AI Inference Service...")
     
+    if batcher is not None:
+        await batcher.stop()
+        if isinstance(inference_service.model_manager, BatchingModelManager):
+            inference_service.model_manager = batcher.model_manager
+        batcher = None
+    
     if inference_service:
         inference_service.shutdown()
     
@@ -60,6 +60,11 @@ class LocalInferenceService:
         # Preload models if requested
         if preload_models:
             self._preload_all_models()
+            
+            # Fork serving processes once the weights are loaded and warm
+            serving_workers = PERFORMANCE_SETTINGS.get("serving_workers", 0)
+            if serving_workers > 0:
+                self.model_manager.start_worker_pool(serving_workers)
         
         logger.info("LocalInferenceService initialized successfully")
     
@@ -73,6 +78,7 @@ class LocalInferenceService:
             model_configs.append({
                 "model_name": config["model_name"],
                 "model_type": config["model_type"],
+                "backend": PERFORMANCE_SETTINGS.get("inference_backend", "pytorch"),
                 **config
             })
         
@@ -118,11 +124,16 @@ class LocalInferenceService:
         job_descriptions: Union[str, List[str]],
         candidate_texts: Union[str, List[str]],
         batch_size: Optional[int] = None,
-        return_detailed_scores: bool = True
+        return_detailed_scores: bool = True,
+        job_embeddings: Optional[List[Optional[List[float]]]] = None,
+        job_embedding_models: Optional[List[Optional[str]]] = None
     ) -> Union[float, List[Dict[str, Any]]]:
         """
         Analyze similarity between job descriptions and candidate texts
-        Uses pre-loaded all-MiniLM-L6-v2 model for instant inference
+        Uses pre-loaded all-MiniLM-L6-v2 model for instant inference.
+        job_embeddings and job_embedding_models are the stored pgvector
+        vectors and their embedding_model, one per job (None where missing);
+        only jobs without a current stored vector are encoded.
         """
         start_time = time.time()
         
@@ -142,10 +153,12 @@ class LocalInferenceService:
         try:
             # Get embeddings for job descriptions
             job_config = get_model_config("job_similarity")
-            job_embeddings = self.model_manager.get_inference(
+            job_embeddings = self._job_embeddings(
                 job_config["model_name"],
                 job_descriptions,
-                batch_size=batch_size
+                job_embeddings,
+                job_embedding_models,
+                batch_size
             )
             
             # Get embeddings for candidate texts
@@ -268,6 +281,68 @@ class LocalInferenceService:
             logger.error(f"Error in industry-specific similarity analysis: {str(e)}")
             raise
     
+    def analyze_paired_similarity(
+        self,
+        job_descriptions: List[str],
+        candidate_texts: List[str],
+        batch_size: Optional[int] = None,
+        job_embeddings: Optional[np.ndarray] = None,
+        candidate_embeddings: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Similarity of each job description with the candidate text at the
+        same index. Only the N row-wise dot products are computed, not the
+        full N x N matrix.
+        """
+        start_time = time.time()
+        
+        if len(job_descriptions) != len(candidate_texts):
+            raise ValueError("job_descriptions and candidate_texts must have the same length")
+        if not job_descriptions:
+            return []
+        
+        if batch_size is None:
+            batch_size = get_optimal_batch_size("job_similarity", 2 * len(job_descriptions))
+        
+        try:
+            job_config = get_model_config("job_similarity")
+            if job_embeddings is None:
+                job_embeddings = self.model_manager.get_inference(
+                    job_config["model_name"],
+                    job_descriptions,
+                    batch_size=batch_size
+                )
+            if candidate_embeddings is None:
+                candidate_embeddings = self.model_manager.get_inference(
+                    job_config["model_name"],
+                    candidate_texts,
+                    batch_size=batch_size
+                )
+            
+            similarities = self._calculate_paired_similarities(
+                np.asarray(job_embeddings, dtype=np.float32),
+                np.asarray(candidate_embeddings, dtype=np.float32)
+            ).tolist()
+            
+            self._update_metrics(time.time() - start_time)
+            processing_time_ms = (time.time() - start_time) * 1000
+            
+            return [
+                {
+                    "job_index": i,
+                    "candidate_index": i,
+                    "similarity_score": score,
+                    "confidence": self._calculate_confidence(score),
+                    "match_level": self._get_match_level(score),
+                    "processing_time_ms": processing_time_ms
+                }
+                for i, score in enumerate(similarities)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in paired similarity analysis: {str(e)}")
+            raise
+    
     def analyze_personality(
         self,
         texts: Union[str, List[str]],
@@ -428,13 +503,13 @@ class LocalInferenceService:
         # Group requests by type for optimal batching
         grouped_requests = self._group_requests_by_type(requests)
         
-        # Process groups concurrently
+        # Process groups concurrently; results are stored by original position
         futures = []
-        results = {}
+        ordered_results: List[Dict[str, Any]] = [{"error": "Not processed"} for _ in requests]
         
         with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
             # Submit all grouped requests
-            for request_type, request_group in grouped_requests.items():
+            for request_type, (positions, request_group) in grouped_requests.items():
                 if request_type == "job_similarity":
                     future = executor.submit(
                         self._batch_process_similarity,
@@ -453,21 +528,20 @@ class LocalInferenceService:
                 else:
                     continue
                 
-                futures.append((request_type, request_group, future))
+                futures.append((request_type, positions, future))
             
             # Collect results as they complete
-            for request_type, request_group, future in futures:
+            for request_type, positions, future in futures:
                 try:
                     group_results = future.result()
-                    # Map results back to original request IDs
-                    for i, req in enumerate(request_group):
-                        if i < len(group_results):
-                            results[req.get("id", str(i))] = group_results[i]
+                    # Map results back to original request positions
+                    for position, result in zip(positions, group_results):
+                        ordered_results[position] = result
                 except Exception as e:
                     logger.error(f"Error processing {request_type} batch: {str(e)}")
                     # Add error results for failed requests
-                    for req in request_group:
-                        results[req.get("id", str(i))] = {
+                    for position in positions:
+                        ordered_results[position] = {
                             "error": str(e),
                             "request_type": request_type
                         }
@@ -475,12 +549,6 @@ class LocalInferenceService:
         # Update metrics
         self._update_metrics(time.time() - start_time)
         
-        # Return results in original request order
-        ordered_results = []
-        for request in requests:
-            req_id = request.get("id", str(requests.index(request)))
-            ordered_results.append(results.get(req_id, {"error": "Not processed"}))
-        
         return ordered_results
     
     def advanced_analysis_pipeline(
@@ -573,6 +641,43 @@ class LocalInferenceService:
     
     # Helper methods
     
+    def _job_embeddings(
+        self,
+        model_name: str,
+        job_descriptions: List[str],
+        stored_embeddings: Optional[List[Optional[List[float]]]],
+        stored_models: Optional[List[Optional[str]]],
+        batch_size: int
+    ) -> np.ndarray:
+        """Job embeddings, reusing stored vectors of model_name and encoding the rest"""
+        if stored_embeddings is None:
+            return self.model_manager.get_inference(model_name, job_descriptions, batch_size=batch_size)
+        
+        count = len(job_descriptions)
+        stored_models = stored_models if stored_models is not None else [None] * count
+        if len(stored_embeddings) != count or len(stored_models) != count:
+            raise ValueError("job_embeddings and job_embedding_models need one entry per job description")
+        
+        # The job store records versions as "<model_name>@<revision>"
+        embeddings = {
+            i: np.asarray(vector, dtype=np.float32)
+            for i, (vector, version) in enumerate(zip(stored_embeddings, stored_models))
+            if vector is not None and version and version.split("@", 1)[0] == model_name
+        }
+        stale = [i for i in range(count) if i not in embeddings]
+        self.performance_metrics["stored_job_embeddings"] = (
+            self.performance_metrics.get("stored_job_embeddings", 0) + len(embeddings)
+        )
+        if stale:
+            encoded = np.asarray(self.model_manager.get_inference(
+                model_name,
+                [job_descriptions[i] for i in stale],
+                batch_size=batch_size
+            ), dtype=np.float32).reshape(len(stale), -1)
+            embeddings.update(zip(stale, encoded))
+        
+        return np.stack([embeddings[i] for i in range(count)])
+    
     def _calculate_similarities(self, embeddings1: np.ndarray, 
                               embeddings2: np.ndarray) -> np.ndarray:
         """Calculate cosine similarities between embedding sets"""
@@ -591,6 +696,18 @@ class LocalInferenceService:
         
         return similarities
     
+    def _calculate_paired_similarities(self, embeddings1: np.ndarray,
+                                       embeddings2: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each row of embeddings1 with the same row of embeddings2"""
+        if len(embeddings1.shape) == 1:
+            embeddings1 = embeddings1.reshape(1, -1)
+        if len(embeddings2.shape) == 1:
+            embeddings2 = embeddings2.reshape(1, -1)
+        
+        dots = np.einsum('ij,ij->i', embeddings1, embeddings2)
+        norms = np.linalg.norm(embeddings1, axis=1) * np.linalg.norm(embeddings2, axis=1)
+        return dots / np.maximum(norms, 1e-12)
+    
     def _calculate_confidence(self, similarity_score: float) -> float:
         """Calculate confidence score based on similarity"""
         # High confidence for very high or very low similarities
@@ -678,46 +795,25 @@ class LocalInferenceService:
         
         return entities[:10]  # Limit to 10 entities
     
-    def _group_requests_by_type(self, requests: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group requests by type for batch processing"""
+    def _group_requests_by_type(self, requests: List[Dict]) -> Dict[str, Tuple[List[int], List[Dict]]]:
+        """Group requests by type for batch processing, keeping original positions"""
         grouped = {}
         
-        for request in requests:
+        for position, request in enumerate(requests):
             req_type = request.get("type", "unknown")
             if req_type not in grouped:
-                grouped[req_type] = []
-            grouped[req_type].append(request)
+                grouped[req_type] = ([], [])
+            grouped[req_type][0].append(position)
+            grouped[req_type][1].append(request)
         
         return grouped
     
     def _batch_process_similarity(self, requests: List[Dict]) -> List[Dict]:
         """Batch process similarity requests"""
-        all_job_descs = []
-        all_candidates = []
-        request_indices = []
-        
-        for i, req in enumerate(requests):
-            all_job_descs.append(req.get("job_description", ""))
-            all_candidates.append(req.get("candidate_text", ""))
-            request_indices.append(i)
-        
-        # Process all at once
-        results = self.analyze_job_similarity(
-            all_job_descs,
-            all_candidates,
-            return_detailed_scores=True
+        return self.analyze_paired_similarity(
+            [req.get("job_description", "") for req in requests],
+            [req.get("candidate_text", "") for req in requests]
         )
-        
-        # Map results back to requests
-        processed_results = []
-        for i in range(len(requests)):
-            matching_results = [r for r in results if r["job_index"] == i and r["candidate_index"] == i]
-            if matching_results:
-                processed_results.append(matching_results[0])
-            else:
-                processed_results.append({"error": "No matching result found"})
-        
-        return processed_results
     
     def _batch_process_personality(self, requests: List[Dict]) -> List[Dict]:
         """Batch process personality requests"""
@@ -0,0 +1,382 @@
+"""
+Vectorized candidate x job scoring engine
+Computes all match components for a full candidate x job grid with NumPy and
+selects the top-k jobs per candidate, so rich explanations are only built for
+the survivors
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+MATCH_COMPONENTS = [
+    'skill_match',
+    'personality_fit',
+    'experience_match',
+    'cultural_fit',
+    'growth_potential',
+    'salary_alignment'
+]
+
+# Culture types with a personality-trait mapping; other culture types never
+# contribute to personality fit
+TRAIT_CULTURE_MAPPING = {
+    'collaborative': ['team', 'cooperative', 'social'],
+    'innovative': ['creative', 'open', 'flexible'],
+    'fast_paced': ['energetic', 'dynamic', 'ambitious'],
+    'structured': ['organized', 'methodical', 'detail-oriented']
+}
+CULTURE_TYPES = list(TRAIT_CULTURE_MAPPING.keys())
+
+GROWTH_NEEDS = {
+    'early_career': 0.9,
+    'developing': 0.8,
+    'growing': 0.7,
+    'established': 0.5,
+    'experienced': 0.4,
+    'expert': 0.3
+}
+
+
+def flatten_skills(skills: Dict[str, Any]) -> set:
+    """Lowercased union of every list-valued entry of a skills dict"""
+    flattened = set()
+    for values in skills.values():
+        if isinstance(values, list):
+            flattened.update(skill.lower() for skill in values)
+    return flattened
+
+
+def parse_required_years(experience_requirements: List[str]) -> int:
+    """First year count found in requirement strings such as '5+ years'"""
+    for req in experience_requirements or []:
+        if 'years' in req:
+            digits = ''.join(filter(str.isdigit, req.split('+')[0].split('-')[0].strip()))
+            if digits:
+                return int(digits)
+    return 0
+
+
+@dataclass
+class CandidateBatch:
+    """Dense encoding of candidate profiles"""
+    ids: List[str]
+    skill_matrix: np.ndarray          # (C, V) 0/1 over the job skill vocabulary
+    skill_counts: np.ndarray          # (C,) distinct candidate skills
+    trait_affinity: np.ndarray        # (C, T) mean trait score per culture type
+    trait_present: np.ndarray         # (C, T) 1 if any trait maps to the type
+    preference_matrix: np.ndarray     # (C, K) 0/1 cultural preferences
+    years: np.ndarray                 # (C,)
+    complexity_bonus: np.ndarray      # (C,) bool, skill complexity > 70
+    growth_need: np.ndarray           # (C,)
+    expected_salary: np.ndarray       # (C,)
+
+
+@dataclass
+class JobBatch:
+    """Dense encoding of enriched jobs"""
+    ids: List[str]
+    skill_matrix: np.ndarray          # (J, V) 0/1
+    skill_counts: np.ndarray          # (J,)
+    culture_weights: np.ndarray       # (J, T) culture score / 100 for mapped types
+    culture_present: np.ndarray       # (J, T)
+    preference_values: np.ndarray     # (J, K) culture score / 100 per preference
+    preference_present: np.ndarray    # (J, K)
+    has_culture: np.ndarray           # (J,) bool
+    required_years: np.ndarray        # (J,)
+    growth_potential: np.ndarray      # (J,)
+    salary_min: np.ndarray            # (J,) 0 when unknown
+    salary_max: np.ndarray            # (J,)
+
+
+class VectorizedMatchingEngine:
+    """
+    Scores every candidate against every job in matrix form
+
+    Skill overlap is a single matrix product of 0/1 indicator matrices over
+    the job skill vocabulary; the remaining components are broadcast
+    element-wise. Candidates are processed in row chunks so memory stays at
+    O(chunk_size x jobs) regardless of the candidate count.
+    """
+
+    def __init__(self, chunk_size: int = 128, dtype: Any = np.float32):
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def encode(self, candidates: List[Any], jobs: List[Any]) -> Tuple[CandidateBatch, JobBatch]:
+        """Encode CandidateProfile objects and EnrichedJobData objects"""
+        job_skill_sets = [
+            flatten_skills(job.enriched_fields.get('extracted_skills', {}))
+            for job in jobs
+        ]
+        vocabulary: Dict[str, int] = {}
+        for skills in job_skill_sets:
+            for skill in skills:
+                vocabulary.setdefault(skill, len(vocabulary))
+
+        preference_vocabulary: Dict[str, int] = {}
+        for candidate in candidates:
+            for pref in candidate.cultural_preferences:
+                preference_vocabulary.setdefault(pref, len(preference_vocabulary))
+
+        return (
+            self._encode_candidates(candidates, vocabulary, preference_vocabulary),
+            self._encode_jobs(jobs, job_skill_sets, vocabulary, preference_vocabulary)
+        )
+
+    def _encode_candidates(
+        self,
+        candidates: List[Any],
+        vocabulary: Dict[str, int],
+        preference_vocabulary: Dict[str, int]
+    ) -> CandidateBatch:
+        count = len(candidates)
+        skill_matrix = np.zeros((count, len(vocabulary)), dtype=self.dtype)
+        skill_counts = np.zeros(count, dtype=self.dtype)
+        trait_affinity = np.zeros((count, len(CULTURE_TYPES)), dtype=self.dtype)
+        trait_present = np.zeros((count, len(CULTURE_TYPES)), dtype=self.dtype)
+        preference_matrix = np.zeros((count, len(preference_vocabulary)), dtype=self.dtype)
+        years = np.zeros(count, dtype=self.dtype)
+        complexity_bonus = np.zeros(count, dtype=bool)
+        growth_need = np.zeros(count, dtype=self.dtype)
+        expected_salary = np.zeros(count, dtype=self.dtype)
+
+        for row, candidate in enumerate(candidates):
+            skills = flatten_skills(candidate.extracted_skills)
+            skill_counts[row] = len(skills)
+            columns = [vocabulary[s] for s in skills if s in vocabulary]
+            skill_matrix[row, columns] = 1
+
+            for col, culture_type in enumerate(CULTURE_TYPES):
+                relevant = TRAIT_CULTURE_MAPPING[culture_type]
+                scores = [
+                    score for trait, score in candidate.personality_profile.items()
+                    if any(r in trait.lower() for r in relevant)
+                ]
+                if scores:
+                    trait_affinity[row, col] = sum(scores) / len(scores)
+                    trait_present[row, col] = 1
+
+            for pref in candidate.cultural_preferences:
+                preference_matrix[row, preference_vocabulary[pref]] = 1
+
+            trajectory = candidate.career_trajectory
+            years[row] = trajectory.get('years', 0)
+            complexity_bonus[row] = trajectory.get('skill_progression', {}).get('complexity', 0) > 70
+            growth_need[row] = GROWTH_NEEDS.get(trajectory.get('career_stage', 'unknown'), 0.5)
+            expected_salary[row] = candidate.ai_insights.get('expected_salary', 0) or 0
+
+        return CandidateBatch(
+            ids=[c.id for c in candidates],
+            skill_matrix=skill_matrix,
+            skill_counts=skill_counts,
+            trait_affinity=trait_affinity,
+            trait_present=trait_present,
+            preference_matrix=preference_matrix,
+            years=years,
+            complexity_bonus=complexity_bonus,
+            growth_need=growth_need,
+            expected_salary=expected_salary
+        )
+
+    def _encode_jobs(
+        self,
+        jobs: List[Any],
+        job_skill_sets: List[set],
+        vocabulary: Dict[str, int],
+        preference_vocabulary: Dict[str, int]
+    ) -> JobBatch:
+        count = len(jobs)
+        skill_matrix = np.zeros((count, len(vocabulary)), dtype=self.dtype)
+        skill_counts = np.zeros(count, dtype=self.dtype)
+        culture_weights = np.zeros((count, len(CULTURE_TYPES)), dtype=self.dtype)
+        culture_present = np.zeros((count, len(CULTURE_TYPES)), dtype=self.dtype)
+        preference_values = np.zeros((count, len(preference_vocabulary)), dtype=self.dtype)
+        preference_present = np.zeros((count, len(preference_vocabulary)), dtype=self.dtype)
+        has_culture = np.zeros(count, dtype=bool)
+        required_years = np.zeros(count, dtype=self.dtype)
+        growth_potential = np.zeros(count, dtype=self.dtype)
+        salary_min = np.zeros(count, dtype=self.dtype)
+        salary_max = np.zeros(count, dtype=self.dtype)
+
+        for row, (job, skills) in enumerate(zip(jobs, job_skill_sets)):
+            skill_counts[row] = len(skills)
+            skill_matrix[row, [vocabulary[s] for s in skills]] = 1
+
+            culture = job.ai_insights.get('company_culture_analysis', {}) or {}
+            has_culture[row] = bool(culture)
+            for col, culture_type in enumerate(CULTURE_TYPES):
+                value = culture.get(culture_type)
+                if isinstance(value, (int, float)) and value > 0:
+                    culture_weights[row, col] = value / 100
+                    culture_present[row, col] = 1
+            for pref, col in preference_vocabulary.items():
+                value = culture.get(pref)
+                if pref in culture and isinstance(value, (int, float)):
+                    preference_values[row, col] = value / 100
+                    preference_present[row, col] = 1
+
+            required_years[row] = parse_required_years(
+                job.enriched_fields.get('extracted_skills', {}).get('experience_requirements', [])
+            )
+            growth_potential[row] = job.ai_insights.get('growth_opportunities', {}).get(
+                'overall_growth_potential', 50
+            ) / 100
+
+            minimum = getattr(job, 'salary_min', None) or 0
+            salary_min[row] = minimum
+            maximum = getattr(job, 'salary_max', None)
+            salary_max[row] = maximum if maximum is not None else minimum * 1.2
+
+        return JobBatch(
+            ids=[j.job_id for j in jobs],
+            skill_matrix=skill_matrix,
+            skill_counts=skill_counts,
+            culture_weights=culture_weights,
+            culture_present=culture_present,
+            preference_values=preference_values,
+            preference_present=preference_present,
+            has_culture=has_culture,
+            required_years=required_years,
+            growth_potential=growth_potential,
+            salary_min=salary_min,
+            salary_max=salary_max
+        )
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def score_components(
+        self, candidates: CandidateBatch, jobs: JobBatch, rows: slice
+    ) -> Dict[str, np.ndarray]:
+        """All component scores for a chunk of candidates against all jobs"""
+        return {
+            'skill_match': self._skill_scores(candidates, jobs, rows),
+            'personality_fit': self._personality_scores(candidates, jobs, rows),
+            'experience_match': self._experience_scores(candidates, jobs, rows),
+            'cultural_fit': self._cultural_scores(candidates, jobs, rows),
+            'growth_potential': self._growth_scores(candidates, jobs, rows),
+            'salary_alignment': self._salary_scores(candidates, jobs, rows)
+        }
+
+    def _skill_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        matched = c.skill_matrix[rows] @ j.skill_matrix.T
+        job_counts = j.skill_counts[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(job_counts > 0, matched / job_counts, 0.5)
+        extra = c.skill_counts[rows, None] - matched
+        boost = np.minimum(extra * 0.02, 0.1)
+        return np.where(extra > 0, np.minimum(score + boost, 1.0), score).astype(self.dtype)
+
+    def _personality_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        totals = c.trait_affinity[rows] @ j.culture_weights.T
+        counts = c.trait_present[rows] @ j.culture_present.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, totals / counts, 0.5).astype(self.dtype)
+
+    def _experience_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        required = j.required_years[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = c.years[rows, None] / required
+        score = np.where(
+            ratio >= 1.0,
+            np.minimum(1.0, 0.8 + (ratio - 1.0) * 0.1),
+            np.maximum(0.2, ratio * 0.8)
+        )
+        score = np.where(c.complexity_bonus[rows, None], np.minimum(1.0, score + 0.1), score)
+        return np.where(required == 0, 0.8, score).astype(self.dtype)
+
+    def _cultural_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        totals = c.preference_matrix[rows] @ j.preference_values.T
+        counts = c.preference_matrix[rows] @ j.preference_present.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(counts > 0, totals / counts, 0.5)
+        # Jobs without culture data score neutral even when preferences overlap
+        return np.where(j.has_culture[None, :], score, 0.5).astype(self.dtype)
+
+    def _growth_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        need = c.growth_need[rows, None]
+        potential = j.growth_potential[None, :]
+        mismatch = np.maximum(0.3, 1.0 - np.abs(need - potential))
+        score = np.where((need < 0.5) & (potential < 0.5), 0.85, mismatch)
+        return np.where((need > 0.7) & (potential > 0.7), 0.95, score).astype(self.dtype)
+
+    def _salary_scores(self, c: CandidateBatch, j: JobBatch, rows: slice) -> np.ndarray:
+        expected = c.expected_salary[rows, None]
+        minimum = j.salary_min[None, :]
+        maximum = j.salary_max[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = np.maximum(0.7, expected / minimum)
+            above = np.maximum(0.3, minimum / expected)
+        score = np.where(expected < minimum, below, above)
+        score = np.where((minimum <= expected) & (expected <= maximum), 1.0, score)
+        score = np.where(expected == 0, 0.7, score)
+        return np.where(minimum == 0, 0.5, score).astype(self.dtype)
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def top_k_matches(
+        self,
+        candidates: List[Any],
+        jobs: List[Any],
+        weights: Dict[str, float],
+        top_k: Optional[int] = 25,
+        min_score: float = 0.0
+    ) -> List[Tuple[int, int, float, Dict[str, float]]]:
+        """
+        Score the full grid and keep the best jobs per candidate
+
+        Returns (candidate_index, job_index, overall_score, components) tuples,
+        ordered by candidate then descending score.
+        """
+        if not candidates or not jobs:
+            return []
+
+        candidate_batch, job_batch = self.encode(candidates, jobs)
+        job_count = len(jobs)
+        k = job_count if not top_k else min(top_k, job_count)
+
+        survivors = []
+        for start in range(0, len(candidates), self.chunk_size):
+            rows = slice(start, min(start + self.chunk_size, len(candidates)))
+            components = self.score_components(candidate_batch, job_batch, rows)
+
+            overall = np.zeros_like(components['skill_match'])
+            for name, weight in weights.items():
+                if name in components and weight:
+                    overall += components[name] * weight
+
+            if k < job_count:
+                top = np.argpartition(-overall, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(job_count), overall.shape)
+            top_scores = np.take_along_axis(overall, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+
+            for offset in range(top.shape[0]):
+                candidate_index = start + offset
+                for job_index in top[offset]:
+                    score = float(overall[offset, job_index])
+                    if score < min_score:
+                        break
+                    survivors.append((
+                        candidate_index,
+                        int(job_index),
+                        score,
+                        {name: float(values[offset, job_index]) for name, values in components.items()}
+                    ))
+
+        return survivors
@@ -19,6 +19,8 @@ import json
 import heapq
 from contextlib import contextmanager
 
+from model_residency import get_residency_manager, measure_model_bytes
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -56,6 +58,9 @@ class ModelCacheManager:
                  max_cache_size_mb: float = 8192,
                  min_free_memory_mb: float = 2048,
                  eviction_policy: str = "lru"):
+        # Size limits and eviction order now come from the process-wide
+        # ModelResidencyManager; these arguments are kept for compatibility
+        # and are reported by get_cache_stats only.
         self.cache: Dict[str, ModelEntry] = {}
         self.cache_lock = threading.RLock()
         self.max_cache_size_mb = max_cache_size_mb
@@ -70,6 +75,9 @@ class ModelCacheManager:
         # Model pools for reuse
         self.model_pools: Dict[str, List[ModelEntry]] = {}
         
+        # Process-wide memory budget shared with every other model cache
+        self.residency = get_residency_manager()
+        
         # Start background memory monitoring
         self._monitoring_task: Optional[asyncio.Task] = None
         self._shutdown_event = asyncio.Event()
@@ -82,12 +90,14 @@ class ModelCacheManager:
             
             return {
                 "cache_size_mb": total_size,
-                "max_cache_size_mb": self.max_cache_size_mb,
+                "max_cache_size_mb": self.residency.budget_bytes / (1024 * 1024),
+                "configured_max_cache_size_mb": self.max_cache_size_mb,
                 "num_models": len(self.cache),
                 "cache_hits": self.cache_hits,
                 "cache_misses": self.cache_misses,
                 "hit_rate": hit_rate,
                 "total_evictions": self.total_evictions,
+                "residency": self.residency.get_stats(),
                 "models": {
                     name: {
                         "size_mb": entry.size_mb,
@@ -101,18 +111,8 @@ class ModelCacheManager:
             }
             
     def _estimate_model_size(self, model: Any) -> float:
-        """Estimate model size in MB"""
-        try:
-            # For PyTorch models
-            if hasattr(model, 'parameters'):
-                total_params = sum(p.numel() * p.element_size() for p in model.parameters())
-                return total_params / (1024 * 1024)
-            
-            # For other objects, use a rough estimate based on object size
-            import sys
-            return sys.getsizeof(model) / (1024 * 1024)
-        except:
-            return 500.0  # Default estimate
+        """Model size in MB (parameters and buffers)"""
+        return measure_model_bytes(model) / (1024 * 1024)
             
     def _get_available_memory(self) -> float:
         """Get available system memory in MB"""
@@ -155,6 +155,7 @@ class ModelCacheManager:
                 entry.access_count += 1
                 entry.shared_count += 1
                 self.cache_hits += 1
+                self.residency.retain(cache_key)
                 logger.info(f"Cache hit for model: {model_name} (device: {device})")
                 return entry.model, entry.tokenizer
                 
@@ -170,6 +171,7 @@ class ModelCacheManager:
                     entry.last_accessed = datetime.now()
                     entry.access_count += 1
                     entry.shared_count += 1
+                    self.residency.retain(cache_key)
                     return entry.model, entry.tokenizer
                     
             # Load the model
@@ -187,9 +189,6 @@ class ModelCacheManager:
                 # Estimate model size
                 size_mb = self._estimate_model_size(model)
                 
-                # Check if we need to evict models
-                await self._ensure_cache_space(size_mb)
-                
                 # Create cache entry
                 entry = ModelEntry(
                     model_name=model_name,
@@ -207,6 +206,16 @@ class ModelCacheManager:
                 # Add to cache
                 with self.cache_lock:
                     self.cache[cache_key] = entry
+                
+                # Account for it in the shared budget; may evict other models
+                self.residency.admit(
+                    cache_key,
+                    size_bytes=int(size_mb * 1024 * 1024),
+                    load_seconds=entry.load_time_seconds,
+                    owner="ml-services.ModelCacheManager",
+                    on_evict=self._drop_entry
+                )
+                self.residency.retain(cache_key)
                     
                 logger.info(
                     f"Model {model_name} loaded successfully in {entry.load_time_seconds:.2f}s "
@@ -262,87 +271,30 @@ class ModelCacheManager:
                 
         return await loop.run_in_executor(None, _load_sync)
         
-    @contextmanager
-    async def _get_model_lock(self, cache_key: str):
+    def _get_model_lock(self, cache_key: str) -> asyncio.Lock:
         """Get or create a lock for a specific model"""
         if cache_key not in self.model_locks:
-            self.model_locks[cache_key] = threading.Lock()
-            
-        lock = self.model_locks[cache_key]
-        lock.acquire()
-        try:
-            yield
-        finally:
-            lock.release()
+            self.model_locks[cache_key] = asyncio.Lock()
+        return self.model_locks[cache_key]
             
     async def _ensure_cache_space(self, required_mb: float):
-        """Ensure there's enough space in cache for new model"""
-        with self.cache_lock:
-            current_size = sum(entry.size_mb for entry in self.cache.values())
-            available_memory = self._get_available_memory()
-            
-            # Check if we need to evict
-            need_to_free = 0.0
-            
-            # Check cache size limit
-            if current_size + required_mb > self.max_cache_size_mb:
-                need_to_free = max(need_to_free, (current_size + required_mb) - self.max_cache_size_mb)
-                
-            # Check system memory
-            if available_memory - required_mb < self.min_free_memory_mb:
-                need_to_free = max(need_to_free, self.min_free_memory_mb - (available_memory - required_mb))
-                
-            if need_to_free > 0:
-                await self._evict_models(need_to_free)
+        """Ensure there's enough space in the shared budget for a new model"""
+        self.residency.make_room(int(required_mb * 1024 * 1024))
                 
     async def _evict_models(self, target_mb: float):
-        """Evict models based on policy"""
+        """Evict models through the shared residency manager"""
         logger.info(f"Evicting models to free {target_mb:.1f}MB")
+        self.residency.make_room(int(target_mb * 1024 * 1024))
         
+    def _drop_entry(self, cache_key: str):
+        """Release a model the residency manager evicted"""
         with self.cache_lock:
-            if self.eviction_policy == "lru":
-                # Sort by last accessed time (oldest first) and shared count
-                candidates = sorted(
-                    self.cache.items(),
-                    key=lambda x: (x[1].shared_count, x[1].last_accessed)
-                )
-            elif self.eviction_policy == "lfu":
-                # Sort by access count (least frequently used first)
-                candidates = sorted(
-                    self.cache.items(),
-                    key=lambda x: (x[1].shared_count, x[1].access_count)
-                )
-            else:
-                raise ValueError(f"Unknown eviction policy: {self.eviction_policy}")
-                
-            freed_mb = 0.0
-            evicted = []
-            
-            for cache_key, entry in candidates:
-                if entry.shared_count > 0:
-                    continue  # Skip models currently in use
-                    
-                if freed_mb >= target_mb:
-                    break
-                    
-                # Evict the model
-                del self.cache[cache_key]
-                evicted.append(entry.model_name)
-                freed_mb += entry.size_mb
-                self.total_evictions += 1
-                
-                # Clean up GPU memory if applicable
-                if entry.device == "cuda" and hasattr(entry.model, 'to'):
-                    entry.model.cpu()
-                    del entry.model
-                    if entry.tokenizer:
-                        del entry.tokenizer
-                    torch.cuda.empty_cache()
-                    
-            # Force garbage collection
-            gc.collect()
-            
-            logger.info(f"Evicted {len(evicted)} models, freed {freed_mb:.1f}MB: {evicted}")
+            entry = self.cache.pop(cache_key, None)
+        if entry is None:
+            return
+        self.total_evictions += 1
+        if entry.device == "cuda" and hasattr(entry.model, 'to'):
+            entry.model.cpu()
             
     def release_model(self, model_name: str, device: str = None):
         """Release a model reference (decrement shared count)"""
@@ -355,7 +307,18 @@ class ModelCacheManager:
             if cache_key in self.cache:
                 entry = self.cache[cache_key]
                 entry.shared_count = max(0, entry.shared_count - 1)
+        self.residency.release(cache_key)
                 
+    def pin_model(self, model_name: str, device: str = None):
+        """Keep a cached model resident regardless of memory pressure"""
+        self.residency.pin(self.model_key(model_name, device))
+        
+    def model_key(self, model_name: str, device: str = None) -> str:
+        """Cache key (also the residency key) for a model"""
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        return f"{model_name}:{device}"
+        
     async def preload_models(self, model_configs: List[Dict[str, Any]]):
         """Preload multiple models"""
         tasks = []
@@ -388,16 +351,16 @@ class ModelCacheManager:
                 await asyncio.sleep(10)  # Check every 10 seconds
                 
                 available_memory = self._get_available_memory()
+                min_free_mb = self.residency.min_free_bytes / (1024 * 1024)
                 
-                if available_memory < self.min_free_memory_mb:
+                if available_memory < min_free_mb:
                     logger.warning(
                         f"Low memory detected: {available_memory:.1f}MB available "
-                        f"(minimum: {self.min_free_memory_mb}MB)"
+                        f"(minimum: {min_free_mb:.0f}MB)"
                     )
                     
-                    # Calculate how much to free
-                    to_free = self.min_free_memory_mb - available_memory + 512  # Extra buffer
-                    await self._evict_models(to_free)
+                    # The residency manager evicts until min-free memory is restored
+                    self.residency.enforce()
                     
                 # Check GPU memory if available
                 gpu_info = self._get_gpu_memory()
@@ -414,9 +377,10 @@ class ModelCacheManager:
     async def clear_cache(self):
         """Clear all cached models"""
         with self.cache_lock:
-            for entry in self.cache.values():
+            for cache_key, entry in self.cache.items():
                 if entry.device == "cuda" and hasattr(entry.model, 'to'):
                     entry.model.cpu()
+                self.residency.forget(cache_key)
                     
             self.cache.clear()
             self.cache_hits = 0
@@ -4,7 +4,6 @@ Leverages full capabilities of downloaded models with concurrent processing
 """
 
 import os
-import json
 import logging
 import threading
 from typing import Dict, Any, Optional, List, Tuple
@@ -22,8 +21,42 @@ import numpy as np
 from collections import OrderedDict
 import hashlib
 
+from onnx_backend import OnnxSentenceEncoder, check_embedding_parity
+
 logger = logging.getLogger(__name__)
 
+# Texts used to verify a converted backend against the PyTorch model
+PARITY_SAMPLES = [
+    "Senior Python developer with 5 years of Django and PostgreSQL experience",
+    "Registered nurse seeking a position in a busy emergency department",
+    "Entry-level accountant, BCom graduate, familiar with Pastel and Excel",
+    "Marketing manager: brand strategy, social media campaigns, team leadership",
+    "Ons soek 'n ervare elektrisiën vir kommersiële projekte in Kaapstad",
+    "ML"
+]
+
+
+def plan_token_batches(lengths: List[int], token_budget: int, max_items: int) -> List[List[int]]:
+    """
+    Group item indices into batches of similar token length
+    
+    Items are sorted by length; each batch grows while its padded size
+    (longest item x item count) stays within token_budget and it holds at
+    most max_items items. An item longer than the budget gets its own batch.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        length = max(1, lengths[index])
+        if current and (length * (len(current) + 1) > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
 
 class ModelManager:
     """
@@ -42,15 +75,32 @@ class ModelManager:
         # Model loading futures for concurrent loading
         self.loading_futures: Dict[str, Future] = {}
         
-        # Cache for model outputs
+        # Per-item cache for model outputs: key -> (row, approximate bytes).
+        # Shared by the inference executor threads, so every access holds
+        # _cache_lock.
         self.inference_cache = OrderedDict()
-        self.max_cache_size = 10000  # Large cache for frequent requests
+        self._cache_lock = threading.Lock()
+        self.max_cache_bytes = 256 * 1024 * 1024
+        self.cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_namespaces: Dict[str, bytes] = {}
+        
+        # Optional pool of forked serving processes (see start_worker_pool)
+        self._worker_pool = None
         
         # Performance optimization settings
         self.enable_concurrent_loading = True
         self.enable_aggressive_caching = True
         self.enable_batch_optimization = True
         
+        # Length-aware batching: padded tokens per batch, items per batch,
+        # and how texts longer than the model's max length are handled
+        self.token_budget = 8192
+        self.max_batch_items = 128
+        self.long_text_strategy = "chunk"  # "chunk" (mean-pooled windows) or "truncate"
+        self.chunk_overlap = 32
+        
         # CPU optimization for i3 processor
         self.cpu_threads = min(4, psutil.cpu_count(logical=True))
         torch.set_num_threads(self.cpu_threads)
@@ -113,7 +163,9 @@ class ModelManager:
                 return self.loaded_models[model_name]
             
             start_time = time.time()
-            logger.info(f"Loading model: {model_name} (type: {model_type})")
+            backend = (config or {}).get("backend", "pytorch")
+            backend_info = {"backend": "pytorch"}
+            logger.info(f"Loading model: {model_name} (type: {model_type}, backend: {backend})")
             
             try:
                 if model_type == "sentence_transformer":
@@ -121,6 +173,9 @@ class ModelManager:
                     # Optimize for CPU
                     model.max_seq_length = 512  # Optimize for performance
                     
+                    if backend == "onnx":
+                        model, backend_info = self._load_onnx_backend(model_name, model, config)
+                    
                 elif model_type == "transformer":
                     model = AutoModel.from_pretrained(
                         model_name, 
@@ -157,7 +212,8 @@ class ModelManager:
                     "loaded_at": datetime.now().isoformat(),
                     "model_type": model_type,
                     "inference_count": 0,
-                    "avg_inference_time": 0
+                    "avg_inference_time": 0,
+                    **backend_info
                 }
                 
                 logger.info(f"Model {model_name} loaded successfully in {load_time:.2f}s")
@@ -178,21 +234,67 @@ class ModelManager:
     def get_inference(self, model_name: str, inputs: Any, 
                      batch_size: Optional[int] = None,
                      use_cache: bool = True) -> Any:
-        """Get inference from model with caching and batch optimization"""
-        # Generate cache key if caching is enabled
-        cache_key = None
-        if use_cache and self.enable_aggressive_caching:
-            cache_key = self._generate_cache_key(model_name, inputs)
-            if cache_key in self.inference_cache:
-                logger.debug(f"Cache hit for model {model_name}")
-                # Move to end (LRU behavior)
-                self.inference_cache.move_to_end(cache_key)
-                return self.inference_cache[cache_key]
+        """
+        Get inference from model with caching and batch optimization
         
+        Text inputs are cached per item: only texts without a cached row are
+        sent to the model, and cached and fresh rows are merged back into the
+        output in input order.
+        """
         # Get model
         if model_name not in self.loaded_models:
             raise ValueError(f"Model {model_name} not loaded. Call load_model first.")
         
+        # A single text still gets a one-row result, as it did before caching
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        cacheable = (
+            use_cache and self.enable_aggressive_caching
+            and isinstance(texts, list) and texts
+            and all(isinstance(text, str) for text in texts)
+        )
+        if not cacheable:
+            return self._run_inference(model_name, inputs, batch_size)
+        
+        keys = [self._item_cache_key(model_name, text) for text in texts]
+        rows: List[Any] = [None] * len(texts)
+        missing: Dict[bytes, str] = {}
+        with self._cache_lock:
+            for position, key in enumerate(keys):
+                entry = self.inference_cache.get(key)
+                if entry is not None:
+                    # Move to end (LRU behavior)
+                    self.inference_cache.move_to_end(key)
+                    rows[position] = entry[0]
+                elif key not in missing:
+                    missing[key] = texts[position]
+            
+            self.cache_hits += len(texts) - len(missing)
+            self.cache_misses += len(missing)
+        
+        if missing:
+            fresh = self._run_inference(model_name, list(missing.values()), batch_size)
+            
+            # Nothing cached and no duplicates: the model output is the answer
+            if len(missing) == len(texts):
+                for key, row in zip(missing, fresh):
+                    self._add_to_cache(key, row)
+                return fresh
+            
+            fresh_rows = dict(zip(missing, fresh))
+            for key, row in fresh_rows.items():
+                self._add_to_cache(key, row)
+            for position, key in enumerate(keys):
+                if rows[position] is None:
+                    rows[position] = fresh_rows[key]
+        else:
+            logger.debug(f"Cache hit for model {model_name}")
+        
+        if isinstance(rows[0], np.ndarray):
+            return np.stack(rows)
+        return rows
+    
+    def _run_inference(self, model_name: str, inputs: Any, batch_size: Optional[int]) -> Any:
+        """Run the model on inputs and record timing"""
         model = self.loaded_models[model_name]
         
         # Perform inference with timing
@@ -200,7 +302,9 @@ class ModelManager:
         
         try:
             # Determine model type and perform appropriate inference
-            if isinstance(model, SentenceTransformer):
+            if self._worker_pool is not None:
+                result = self._worker_pool.get_inference(model_name, inputs, batch_size)
+            elif isinstance(model, (SentenceTransformer, OnnxSentenceEncoder)):
                 result = self._inference_sentence_transformer(model, inputs, batch_size)
             elif isinstance(model, Pipeline):
                 result = self._inference_pipeline(model, inputs, batch_size)
@@ -211,36 +315,156 @@ class ModelManager:
             inference_time = time.time() - start_time
             self._update_performance_stats(model_name, inference_time)
             
-            # Cache result if enabled
-            if cache_key and self.enable_aggressive_caching:
-                self._add_to_cache(cache_key, result)
-            
             return result
             
         except Exception as e:
             logger.error(f"Error during inference with model {model_name}: {str(e)}")
             raise
     
+    def _load_onnx_backend(
+        self, model_name: str, model: SentenceTransformer, config: Optional[Dict]
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Swap a loaded SentenceTransformer for an ONNX Runtime encoder
+        
+        The converted graph (int8 dynamically quantized unless the config sets
+        quantize=False) is cached under the model cache directory. The encoder
+        is only used if its embeddings stay within the configured cosine
+        tolerance of the PyTorch model; otherwise the PyTorch model is kept.
+        """
+        config = config or {}
+        try:
+            encoder = OnnxSentenceEncoder.from_sentence_transformer(
+                model,
+                model_name,
+                cache_dir=self.model_cache_dir,
+                quantize=config.get("quantize", True),
+                num_threads=self.cpu_threads
+            )
+            parity = check_embedding_parity(
+                model,
+                encoder,
+                config.get("parity_samples", PARITY_SAMPLES),
+                min_cosine=config.get("parity_min_cosine", 0.99)
+            )
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for {model_name}, using PyTorch: {str(e)}")
+            return model, {"backend": "pytorch", "backend_error": str(e)}
+        
+        if not parity["passed"]:
+            logger.warning(
+                f"ONNX parity check failed for {model_name} "
+                f"(min cosine {parity['min_cosine']:.4f} < {parity['threshold']}), using PyTorch"
+            )
+            return model, {"backend": "pytorch", "onnx_parity": parity}
+        
+        logger.info(
+            f"Serving {model_name} with ONNX Runtime "
+            f"({'int8' if encoder.quantized else 'fp32'}, min cosine {parity['min_cosine']:.4f})"
+        )
+        return encoder, {"backend": "onnx", "quantized": encoder.quantized, "onnx_parity": parity}
+    
     def _inference_sentence_transformer(self, model: SentenceTransformer, 
                                       inputs: Any, batch_size: Optional[int]) -> np.ndarray:
-        """Optimized inference for sentence transformers"""
+        """
+        Optimized inference for sentence transformers
+        
+        Inputs are split into segments (long texts chunked or truncated per
+        long_text_strategy), sorted by token length and packed into batches
+        whose padded size stays within token_budget. Chunk embeddings are
+        mean-pooled back to one row per input, in the original order.
+        """
         if isinstance(inputs, str):
             inputs = [inputs]
         
-        # Use optimal batch size for performance
-        if batch_size is None:
-            batch_size = 32 if len(inputs) > 32 else len(inputs)
-        
-        # Encode with show_progress_bar for large batches
-        embeddings = model.encode(
-            inputs,
-            batch_size=batch_size,
-            show_progress_bar=len(inputs) > 100,
-            convert_to_numpy=True,
-            normalize_embeddings=True
+        tokenizer = getattr(model, 'tokenizer', None)
+        if not self.enable_batch_optimization or tokenizer is None or not inputs:
+            # Use optimal batch size for performance
+            if batch_size is None:
+                batch_size = 32 if len(inputs) > 32 else len(inputs)
+            
+            # Encode with show_progress_bar for large batches
+            return model.encode(
+                inputs,
+                batch_size=max(1, batch_size),
+                show_progress_bar=len(inputs) > 100,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        
+        segments, owners, lengths = self._segment_texts(tokenizer, inputs, model.max_seq_length)
+        batches = plan_token_batches(
+            lengths, self.token_budget, batch_size or self.max_batch_items
+        )
+        
+        segment_embeddings = None
+        for batch in batches:
+            embeddings = model.encode(
+                [segments[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            if segment_embeddings is None:
+                segment_embeddings = np.empty((len(segments), embeddings.shape[1]), dtype=embeddings.dtype)
+            segment_embeddings[batch] = embeddings
+        
+        if len(segments) == len(inputs):
+            return segment_embeddings
+        
+        # Token-weighted mean of chunk embeddings, re-normalized
+        weights = np.asarray(lengths, dtype=segment_embeddings.dtype)
+        pooled = np.zeros((len(inputs), segment_embeddings.shape[1]), dtype=segment_embeddings.dtype)
+        np.add.at(pooled, owners, segment_embeddings * weights[:, None])
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+    
+    def _segment_texts(
+        self, tokenizer: Any, texts: List[str], max_seq_length: int
+    ) -> Tuple[List[str], List[int], List[int]]:
+        """
+        Split texts into model-sized segments
+        
+        Returns the segment texts, the index of the input each segment came
+        from and each segment's token length (including special tokens).
+        With the "chunk" strategy, texts longer than max_seq_length are cut at
+        token boundaries into overlapping windows; otherwise the model's own
+        truncation applies and the length is capped.
+        """
+        chunking = self.long_text_strategy == "chunk" and getattr(tokenizer, 'is_fast', False)
+        encoded = tokenizer(
+            texts,
+            add_special_tokens=False,
+            truncation=False,
+            return_attention_mask=False,
+            return_offsets_mapping=chunking,
+            verbose=False
         )
         
-        return embeddings
+        special_tokens = 2
+        window = max(1, max_seq_length - special_tokens)
+        step = max(1, window - self.chunk_overlap)
+        
+        segments, owners, lengths = [], [], []
+        for index, (text, ids) in enumerate(zip(texts, encoded['input_ids'])):
+            token_count = len(ids)
+            if token_count <= window or not chunking:
+                segments.append(text)
+                owners.append(index)
+                lengths.append(min(token_count, window) + special_tokens)
+                continue
+            
+            offsets = encoded['offset_mapping'][index]
+            for start in range(0, token_count, step):
+                end = min(start + window, token_count)
+                segments.append(text[offsets[start][0]:offsets[end - 1][1]])
+                owners.append(index)
+                lengths.append(end - start + special_tokens)
+                if end == token_count:
+                    break
+        
+        return segments, owners, lengths
     
     def _inference_pipeline(self, model: Pipeline, inputs: Any, 
                           batch_size: Optional[int]) -> List[Dict]:
@@ -248,16 +472,32 @@ class ModelManager:
         if isinstance(inputs, str):
             inputs = [inputs]
         
-        # Use optimal batch size
-        if batch_size is None:
-            batch_size = 16 if len(inputs) > 16 else len(inputs)
-        
-        # Process in batches
-        results = []
-        for i in range(0, len(inputs), batch_size):
-            batch = inputs[i:i + batch_size]
-            batch_results = model(batch)
-            results.extend(batch_results)
+        tokenizer = getattr(model, 'tokenizer', None)
+        if not self.enable_batch_optimization or tokenizer is None or not inputs:
+            # Use optimal batch size
+            if batch_size is None:
+                batch_size = 16 if len(inputs) > 16 else len(inputs)
+            
+            # Process in batches
+            results = []
+            for i in range(0, len(inputs), max(1, batch_size)):
+                batch = inputs[i:i + batch_size]
+                batch_results = model(batch)
+                results.extend(batch_results)
+            
+            return results
+        
+        # Batch by token budget over length-sorted inputs, then restore order
+        max_length = min(getattr(tokenizer, 'model_max_length', 512), 512)
+        lengths = [
+            min(len(ids), max_length)
+            for ids in tokenizer(inputs, truncation=False, return_attention_mask=False, verbose=False)['input_ids']
+        ]
+        results: List[Any] = [None] * len(inputs)
+        for batch in plan_token_batches(lengths, self.token_budget, batch_size or self.max_batch_items):
+            batch_results = model([inputs[i] for i in batch])
+            for i, result in zip(batch, batch_results):
+                results[i] = result
         
         return results
     
@@ -305,6 +545,41 @@ class ModelManager:
         
         return results
     
+    def start_worker_pool(self, num_workers: int, slot_bytes: int = 16 * 1024 * 1024) -> bool:
+        """
+        Serve inference from forked worker processes
+        
+        Call after the models are loaded: workers inherit the weights through
+        fork and share them copy-on-write. get_inference keeps its signature
+        and caching; only the model execution moves to the workers.
+        """
+        if self._worker_pool is not None:
+            return True
+        if not self.loaded_models:
+            logger.warning("No models loaded; load models before starting the worker pool")
+            return False
+        
+        try:
+            from model_worker_pool import ModelWorkerPool
+            pool = ModelWorkerPool(self, num_workers=num_workers, slot_bytes=slot_bytes)
+            pool.start()
+        except Exception as e:
+            logger.warning(f"Multi-process serving unavailable, using in-process inference: {str(e)}")
+            return False
+        
+        self._worker_pool = pool
+        return True
+    
+    def stop_worker_pool(self):
+        """Stop worker processes and return to in-process inference"""
+        if self._worker_pool is not None:
+            pool, self._worker_pool = self._worker_pool, None
+            pool.shutdown()
+    
+    def get_worker_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Worker pool status, or None when serving in-process"""
+        return self._worker_pool.get_stats() if self._worker_pool is not None else None
+    
     def optimize_for_performance(self):
         """Optimize models and settings for maximum performance"""
         logger.info("Optimizing ModelManager for maximum performance...")
@@ -315,7 +590,7 @@ class ModelManager:
         self.enable_batch_optimization = True
         
         # Increase cache size for better hit rates
-        self.max_cache_size = 50000
+        self.max_cache_bytes = 512 * 1024 * 1024
         
         # Optimize each loaded model
         for model_name, model in self.loaded_models.items():
@@ -330,39 +605,83 @@ class ModelManager:
         
         logger.info("Performance optimization complete")
     
-    def _generate_cache_key(self, model_name: str, inputs: Any) -> str:
-        """Generate unique cache key for inputs"""
-        # Convert inputs to string representation
-        if isinstance(inputs, list):
-            inputs_str = json.dumps(inputs, sort_keys=True)
-        else:
-            inputs_str = str(inputs)
-        
-        # Create hash
-        key_data = f"{model_name}:{inputs_str}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+    def _item_cache_key(self, model_name: str, text: str) -> bytes:
+        """Compact per-text cache key"""
+        return hashlib.blake2b(
+            text.encode('utf-8', 'surrogatepass'),
+            digest_size=16,
+            person=self._cache_namespace(model_name)
+        ).digest()
+    
+    def _cache_namespace(self, model_name: str) -> bytes:
+        """16-byte blake2b personalization that separates models in the cache"""
+        namespace = self._cache_namespaces.get(model_name)
+        if namespace is None:
+            namespace = hashlib.blake2b(model_name.encode('utf-8'), digest_size=16).digest()
+            self._cache_namespaces[model_name] = namespace
+        return namespace
     
-    def _add_to_cache(self, key: str, value: Any):
-        """Add result to cache with LRU eviction"""
-        self.inference_cache[key] = value
-        
-        # Evict oldest entries if cache is too large
-        if len(self.inference_cache) > self.max_cache_size:
-            # Remove oldest 10% of entries
-            num_to_remove = int(self.max_cache_size * 0.1)
-            for _ in range(num_to_remove):
-                self.inference_cache.popitem(last=False)
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Approximate memory held by a cached row"""
+        if isinstance(value, np.ndarray):
+            return value.nbytes + 112
+        if isinstance(value, dict):
+            return 232 + sum(
+                ModelManager._estimate_size(k) + ModelManager._estimate_size(v)
+                for k, v in value.items()
+            )
+        if isinstance(value, (list, tuple)):
+            return 56 + 8 * len(value) + sum(ModelManager._estimate_size(v) for v in value)
+        if isinstance(value, str):
+            return 49 + len(value)
+        return 32
+    
+    def _add_to_cache(self, key: bytes, value: Any):
+        """Add a row to the cache with byte-bounded LRU eviction"""
+        if isinstance(value, np.ndarray) and value.base is not None:
+            # Own the row so the cache does not pin the whole batch output
+            value = value.copy()
+        size = self._estimate_size(value) + 120  # key bytes and OrderedDict slot
+        
+        with self._cache_lock:
+            previous = self.inference_cache.pop(key, None)
+            if previous is not None:
+                self.cache_bytes -= previous[1]
+            self.inference_cache[key] = (value, size)
+            self.cache_bytes += size
+            
+            # Evict least recently used rows until back under budget
+            while self.cache_bytes > self.max_cache_bytes and self.inference_cache:
+                _, (_, evicted_size) = self.inference_cache.popitem(last=False)
+                self.cache_bytes -= evicted_size
     
     def _cleanup_cache(self):
         """Clean up cache to maintain performance"""
-        current_size = len(self.inference_cache)
-        if current_size > self.max_cache_size * 0.9:
-            # Remove 20% of oldest entries
-            num_to_remove = int(current_size * 0.2)
-            for _ in range(num_to_remove):
-                if self.inference_cache:
-                    self.inference_cache.popitem(last=False)
-            logger.info(f"Cleaned up {num_to_remove} cache entries")
+        with self._cache_lock:
+            if self.cache_bytes <= self.max_cache_bytes * 0.9:
+                return
+            # Evict oldest rows down to 70% of the budget
+            target = self.max_cache_bytes * 0.7
+            removed = 0
+            while self.cache_bytes > target and self.inference_cache:
+                _, (_, evicted_size) = self.inference_cache.popitem(last=False)
+                self.cache_bytes -= evicted_size
+                removed += 1
+        logger.info(f"Cleaned up {removed} cache entries")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Per-item inference cache usage"""
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "entries": len(self.inference_cache),
+                "bytes": self.cache_bytes,
+                "max_bytes": self.max_cache_bytes,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / lookups if lookups else 0
+            }
     
     def _update_performance_stats(self, model_name: str, inference_time: float):
         """Update performance statistics for model"""
@@ -391,12 +710,17 @@ class ModelManager:
         for future in self.loading_futures.values():
             future.cancel()
         
+        # Stop serving processes
+        self.stop_worker_pool()
+        
         # Shutdown executor
         self.executor.shutdown(wait=True)
         
         # Clear models and cache
         self.loaded_models.clear()
-        self.inference_cache.clear()
+        with self._cache_lock:
+            self.inference_cache.clear()
+            self.cache_bytes = 0
         
         logger.info("ModelManager shutdown complete")
 
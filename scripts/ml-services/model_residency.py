@@ -0,0 +1,364 @@
+"""
+Model Residency Manager - one memory budget for every model held in a process
+Model caches register what they load here; eviction is GreedyDual-Size
+(LRU weighted by reload cost per byte) and never touches pinned or in-use models
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+@dataclass
+class ResidentModel:
+    """A model counted against the budget"""
+    key: str
+    size_bytes: int
+    load_seconds: float
+    owner: str
+    on_evict: Optional[Callable[[str], None]]
+    priority: float = 0.0
+    hits: int = 0
+    refs: int = 0
+    pinned: bool = False
+    admitted_at: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+
+
+def measure_model_bytes(model: Any) -> int:
+    """
+    Bytes held by a model's tensors
+
+    Parameters and buffers are counted once per underlying storage, so tied
+    weights are not double counted. Pipelines and wrappers are unwrapped via
+    their .model attribute; ONNX encoders are sized from their session file.
+    """
+    seen = set()
+
+    def tensor_bytes(tensors) -> int:
+        total = 0
+        for tensor in tensors:
+            try:
+                storage = tensor.untyped_storage()
+                key = storage.data_ptr()
+                nbytes = storage.nbytes()
+            except AttributeError:
+                key = (tensor.data_ptr(), tensor.numel())
+                nbytes = tensor.numel() * tensor.element_size()
+            if key in seen:
+                continue
+            seen.add(key)
+            total += nbytes
+        return total
+
+    try:
+        if hasattr(model, 'parameters') and hasattr(model, 'buffers'):
+            return tensor_bytes(model.parameters()) + tensor_bytes(model.buffers())
+        if hasattr(model, 'model') and model.model is not model:
+            return measure_model_bytes(model.model)
+        if hasattr(model, 'nbytes'):
+            return int(model.nbytes)
+        model_path = getattr(model, 'model_path', None)
+        if model_path and os.path.exists(model_path):
+            return os.path.getsize(model_path)
+        return sys.getsizeof(model)
+    except Exception as e:
+        logger.warning(f"Could not measure model size: {e}")
+        return 0
+
+
+class ModelResidencyManager:
+    """
+    Process-wide budget for resident models
+
+    Each resident carries a GreedyDual-Size priority of
+    inflation + reload_seconds / size_mb, refreshed on access. Eviction
+    removes the lowest priority resident and raises the inflation floor to
+    its priority, so cold models age out while models that are slow to
+    reload for their size are kept longer than plain LRU would keep them.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, min_free_bytes: Optional[int] = None):
+        total_memory = psutil.virtual_memory().total
+        env_budget = os.getenv("MODEL_MEMORY_BUDGET_MB")
+        env_min_free = os.getenv("MODEL_MIN_FREE_MEMORY_MB")
+
+        self.budget_bytes = budget_bytes or (
+            int(float(env_budget) * MB) if env_budget else int(total_memory * 0.6)
+        )
+        self.min_free_bytes = min_free_bytes or (
+            int(float(env_min_free) * MB) if env_min_free else 1024 * MB
+        )
+
+        self._residents: Dict[str, ResidentModel] = {}
+        self._lock = threading.RLock()
+        self._inflation = 0.0
+        self._prefetching: Dict[str, asyncio.Task] = {}
+
+        self.evictions = 0
+        self.over_budget_admissions = 0
+        self.prefetches = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(resident.size_bytes for resident in self._residents.values())
+
+    def _priority(self, resident: ResidentModel) -> float:
+        cost = max(resident.load_seconds, 0.01)
+        return self._inflation + cost / max(resident.size_bytes / MB, 1.0)
+
+    def is_resident(self, key: str) -> bool:
+        with self._lock:
+            return key in self._residents
+
+    def admit(
+        self,
+        key: str,
+        model: Any = None,
+        size_bytes: Optional[int] = None,
+        load_seconds: float = 0.0,
+        owner: str = "",
+        on_evict: Optional[Callable[[str], None]] = None,
+        pinned: bool = False
+    ) -> ResidentModel:
+        """Register a loaded model, evicting others first if needed"""
+        if size_bytes is None:
+            size_bytes = measure_model_bytes(model)
+
+        with self._lock:
+            existing = self._residents.pop(key, None)
+            if existing is not None:
+                pinned = pinned or existing.pinned
+
+            # The model is already loaded, so its memory is no longer "available"
+            victims, fits = self._select_victims_locked(size_bytes, loaded=True)
+            if not fits:
+                self.over_budget_admissions += 1
+                logger.warning(
+                    f"Admitting {key} ({size_bytes / MB:.1f}MB) over the model memory budget: "
+                    f"remaining models are pinned or in use"
+                )
+
+            resident = ResidentModel(
+                key=key,
+                size_bytes=size_bytes,
+                load_seconds=load_seconds,
+                owner=owner,
+                on_evict=on_evict,
+                pinned=pinned,
+                refs=existing.refs if existing else 0,
+                hits=existing.hits if existing else 0
+            )
+            resident.priority = self._priority(resident)
+            self._residents[key] = resident
+
+        self._release_victims(victims)
+        logger.info(
+            f"Resident model {key} ({owner or 'unowned'}): {size_bytes / MB:.1f}MB, "
+            f"{self.resident_bytes / MB:.1f}/{self.budget_bytes / MB:.0f}MB in use"
+        )
+        return resident
+
+    def touch(self, key: str):
+        """Record an access, refreshing the model's priority"""
+        with self._lock:
+            resident = self._residents.get(key)
+            if resident is None:
+                return
+            resident.hits += 1
+            resident.last_access = time.time()
+            resident.priority = self._priority(resident)
+
+    def retain(self, key: str):
+        """Mark a model as in use so it cannot be evicted"""
+        with self._lock:
+            resident = self._residents.get(key)
+            if resident is not None:
+                resident.refs += 1
+                resident.hits += 1
+                resident.last_access = time.time()
+                resident.priority = self._priority(resident)
+
+    def release(self, key: str):
+        with self._lock:
+            resident = self._residents.get(key)
+            if resident is not None:
+                resident.refs = max(0, resident.refs - 1)
+
+    @contextmanager
+    def in_use(self, key: str):
+        """Hold a model resident for the duration of the block"""
+        self.retain(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    def pin(self, key: str):
+        with self._lock:
+            if key in self._residents:
+                self._residents[key].pinned = True
+
+    def unpin(self, key: str):
+        with self._lock:
+            if key in self._residents:
+                self._residents[key].pinned = False
+
+    def forget(self, key: str):
+        """Drop accounting for a model its owner has already released"""
+        with self._lock:
+            self._residents.pop(key, None)
+
+    def _fits(self, required_bytes: int) -> bool:
+        within_budget = self.resident_bytes + required_bytes <= self.budget_bytes
+        available = psutil.virtual_memory().available
+        return within_budget and available - required_bytes >= self.min_free_bytes
+
+    def make_room(self, required_bytes: int) -> bool:
+        """Evict lowest-priority models until required_bytes fits; False if it cannot"""
+        with self._lock:
+            victims, fits = self._select_victims_locked(required_bytes)
+        self._release_victims(victims)
+        return fits
+
+    def evict(self, key: str) -> bool:
+        with self._lock:
+            resident = self._residents.get(key)
+            if resident is None or resident.pinned or resident.refs > 0:
+                return False
+            del self._residents[key]
+        self._release_victims([resident])
+        return True
+
+    def _select_victims_locked(self, required_bytes: int, loaded: bool = False):
+        """Remove residents from accounting until required_bytes fits; caller holds the lock"""
+        victims = []
+        resident_bytes = self.resident_bytes
+        available = psutil.virtual_memory().available - (0 if loaded else required_bytes)
+        freed = 0
+        while (
+            resident_bytes - freed + required_bytes > self.budget_bytes
+            or available + freed < self.min_free_bytes
+        ):
+            candidates = [r for r in self._residents.values() if not r.pinned and r.refs == 0]
+            if not candidates:
+                return victims, False
+            victim = min(candidates, key=lambda r: r.priority)
+            self._inflation = victim.priority
+            del self._residents[victim.key]
+            victims.append(victim)
+            freed += victim.size_bytes
+        return victims, True
+
+    def _release_victims(self, victims: List[ResidentModel]):
+        """Tell owners to drop evicted models; runs without the lock held"""
+        if not victims:
+            return
+        for victim in victims:
+            self.evictions += 1
+            logger.info(
+                f"Evicting model {victim.key} ({victim.owner or 'unowned'}, "
+                f"{victim.size_bytes / MB:.1f}MB, {victim.hits} hits)"
+            )
+            if victim.on_evict is not None:
+                try:
+                    victim.on_evict(victim.key)
+                except Exception as e:
+                    logger.error(f"Error releasing evicted model {victim.key}: {e}")
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def enforce(self) -> bool:
+        """Bring residency back within budget (e.g. after memory pressure)"""
+        return self.make_room(0)
+
+    async def prefetch(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        expected_bytes: int = 0
+    ) -> bool:
+        """
+        Load a model ahead of demand when it fits without evicting anything
+
+        loader runs in the default executor and must admit the model itself
+        (normally by going through the owning cache).
+        """
+        with self._lock:
+            if key in self._residents or key in self._prefetching:
+                return False
+            if not self._fits(expected_bytes):
+                logger.debug(f"Skipping prefetch of {key}: does not fit the model memory budget")
+                return False
+
+        async def _run():
+            try:
+                if asyncio.iscoroutinefunction(loader):
+                    await loader()
+                else:
+                    await asyncio.get_running_loop().run_in_executor(None, loader)
+                self.prefetches += 1
+            except Exception as e:
+                logger.warning(f"Prefetch of {key} failed: {e}")
+            finally:
+                self._prefetching.pop(key, None)
+
+        self._prefetching[key] = asyncio.ensure_future(_run())
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            residents: List[ResidentModel] = sorted(
+                self._residents.values(), key=lambda r: r.priority, reverse=True
+            )
+            return {
+                "budget_mb": self.budget_bytes / MB,
+                "resident_mb": sum(r.size_bytes for r in residents) / MB,
+                "min_free_mb": self.min_free_bytes / MB,
+                "available_mb": psutil.virtual_memory().available / MB,
+                "evictions": self.evictions,
+                "over_budget_admissions": self.over_budget_admissions,
+                "prefetches": self.prefetches,
+                "models": [
+                    {
+                        "key": r.key,
+                        "owner": r.owner,
+                        "size_mb": r.size_bytes / MB,
+                        "load_seconds": r.load_seconds,
+                        "hits": r.hits,
+                        "in_use": r.refs,
+                        "pinned": r.pinned,
+                        "priority": r.priority
+                    }
+                    for r in residents
+                ]
+            }
+
+
+_residency_manager: Optional[ModelResidencyManager] = None
+_residency_lock = threading.Lock()
+
+
+def get_residency_manager() -> ModelResidencyManager:
+    """Get or create the process-wide ModelResidencyManager"""
+    global _residency_manager
+    with _residency_lock:
+        if _residency_manager is None:
+            _residency_manager = ModelResidencyManager()
+        return _residency_manager
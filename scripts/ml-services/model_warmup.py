@@ -16,6 +16,7 @@ import json
 import psutil
 
 from model_cache_manager import get_model_cache_manager, ModelType
+from model_residency import MB
 from production_model_config import get_production_model_config
 
 # Configure logging
@@ -417,6 +418,8 @@ class ModelWarmup:
             pattern["avg_load_time"] = pattern["total_load_time"] / pattern["load_count"]
             pattern["avg_inference_time"] = result.avg_inference_time
             pattern["last_loaded"] = datetime.now().isoformat()
+            if result.success:
+                pattern["memory_usage_mb"] = result.memory_usage_mb
             
     def get_warmup_report(self) -> str:
         """Generate warmup report"""
@@ -490,6 +493,38 @@ class ModelWarmup:
         scored_models.sort(key=lambda x: x[1], reverse=True)
         return [model for model, _ in scored_models[:max_models]]
 
+    async def prefetch_recommended_models(self, max_models: int = 5, pin_top: int = 1) -> List[str]:
+        """
+        Load the models usage patterns recommend into the model cache in the
+        background, and pin the hottest ones so they are never evicted
+        """
+        scheduled = []
+        residency = self.cache_manager.residency
+        
+        for rank, model_name in enumerate(self.get_recommended_models(max_models)):
+            if model_name not in self.production_config.configs:
+                continue
+            
+            cache_key = self.cache_manager.model_key(model_name)
+            expected_bytes = int(self.usage_patterns.get(model_name, {}).get("memory_usage_mb", 0) * MB)
+            loader = self.production_config.get_optimized_model_loader(model_name)
+            
+            async def _load(model_name=model_name, loader=loader, pin=rank < pin_top):
+                await self.cache_manager.get_model(model_name, ModelType.CUSTOM, load_func=loader)
+                self.cache_manager.release_model(model_name)
+                if pin:
+                    self.cache_manager.pin_model(model_name)
+            
+            if residency.is_resident(cache_key):
+                if rank < pin_top:
+                    residency.pin(cache_key)
+            elif await residency.prefetch(cache_key, _load, expected_bytes):
+                scheduled.append(model_name)
+                
+        if scheduled:
+            logger.info(f"Prefetching models from usage patterns: {scheduled}")
+        return scheduled
+
 
 # Global instance
 _model_warmup: Optional[ModelWarmup] = None
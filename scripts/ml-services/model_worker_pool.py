@@ -0,0 +1,245 @@
+"""
+Multi-process model serving for ModelManager
+Forks worker processes after the models are loaded so they share the weights
+copy-on-write, returns embeddings through per-worker shared-memory slots and
+restarts workers that die
+"""
+
+import logging
+import multiprocessing as mp
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(worker_id: int, manager: Any, conn: Any, shm: Any, torch_threads: int):
+    """Serve inference requests from the parent until told to stop"""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    # The forked manager must run inference locally rather than re-dispatch
+    manager._worker_pool = None
+    manager.enable_aggressive_caching = False
+
+    # The slot mapping is inherited through fork, so no re-attach is needed
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+
+            request_id, model_name, inputs, batch_size = message
+            try:
+                result = manager.get_inference(model_name, inputs, batch_size=batch_size, use_cache=False)
+                if isinstance(result, np.ndarray) and result.nbytes <= shm.size:
+                    view = np.ndarray(result.shape, dtype=result.dtype, buffer=shm.buf)
+                    view[...] = result
+                    del view
+                    conn.send((request_id, 'shm', result.dtype.str, result.shape))
+                else:
+                    conn.send((request_id, 'object', result))
+            except Exception as e:
+                conn.send((request_id, 'error', f"{type(e).__name__}: {e}"))
+    finally:
+        shm.close()
+        conn.close()
+
+
+class _Worker:
+    """Parent-side handle for one serving process"""
+
+    def __init__(self, worker_id: int, shm: shared_memory.SharedMemory):
+        self.worker_id = worker_id
+        self.shm = shm
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.restarts = 0
+
+
+class ModelWorkerPool:
+    """
+    Pool of forked inference processes sharing the parent's loaded models
+
+    Requests go to an idle worker over a pipe. ndarray results are written by
+    the worker into its shared-memory slot and read back without pickling;
+    other results, or arrays larger than the slot, come back over the pipe.
+    A supervisor thread restarts workers that exit, and a request whose worker
+    dies mid-flight fails with RuntimeError after the worker is replaced.
+    """
+
+    def __init__(
+        self,
+        manager: Any,
+        num_workers: int = 2,
+        slot_bytes: int = 16 * 1024 * 1024,
+        torch_threads: Optional[int] = None,
+        supervise_interval: float = 1.0,
+        request_timeout: float = 300.0
+    ):
+        if 'fork' not in mp.get_all_start_methods():
+            raise RuntimeError("Multi-process model serving requires the 'fork' start method")
+
+        self.manager = manager
+        self.num_workers = num_workers
+        self.slot_bytes = slot_bytes
+        self.torch_threads = torch_threads or max(1, getattr(manager, 'cpu_threads', 1) // num_workers)
+        self.supervise_interval = supervise_interval
+        self.request_timeout = request_timeout
+
+        self._context = mp.get_context('fork')
+        self._workers: List[_Worker] = []
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._request_counter = 0
+        self._counter_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+
+    def start(self):
+        """Fork the workers and start supervision"""
+        for worker_id in range(self.num_workers):
+            shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+            worker = _Worker(worker_id, shm)
+            self._spawn(worker)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        self._supervisor = threading.Thread(
+            target=self._supervise, name="model-worker-supervisor", daemon=True
+        )
+        self._supervisor.start()
+        logger.info(
+            f"Model worker pool started: {self.num_workers} processes, "
+            f"{self.torch_threads} torch threads each"
+        )
+
+    def _spawn(self, worker: _Worker):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker.worker_id, self.manager, child_conn, worker.shm, self.torch_threads),
+            name=f"model-worker-{worker.worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+
+    def _restart(self, worker: _Worker):
+        """Replace a dead worker process; caller holds worker.lock"""
+        if worker.process is not None:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join(timeout=1)
+        if worker.conn is not None:
+            worker.conn.close()
+        if self._stopping.is_set():
+            return
+        worker.restarts += 1
+        logger.warning(f"Restarting model worker {worker.worker_id} (restart #{worker.restarts})")
+        self._spawn(worker)
+
+    def _supervise(self):
+        while not self._stopping.wait(self.supervise_interval):
+            for worker in self._workers:
+                if worker.process.is_alive() or not worker.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if not worker.process.is_alive() and not self._stopping.is_set():
+                        self._restart(worker)
+                finally:
+                    worker.lock.release()
+
+    def get_inference(self, model_name: str, inputs: Any, batch_size: Optional[int] = None) -> Any:
+        """Run inference on an idle worker process"""
+        if self._stopping.is_set():
+            raise RuntimeError("Model worker pool is shut down")
+
+        with self._counter_lock:
+            self._request_counter += 1
+            request_id = self._request_counter
+
+        try:
+            worker = self._idle.get(timeout=self.request_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No model worker became available within {self.request_timeout}s")
+        try:
+            with worker.lock:
+                try:
+                    worker.conn.send((request_id, model_name, inputs, batch_size))
+                    if not worker.conn.poll(self.request_timeout):
+                        raise TimeoutError(f"Model worker {worker.worker_id} timed out")
+                    response_id, kind, *payload = worker.conn.recv()
+                except (EOFError, OSError, TimeoutError) as e:
+                    self._restart(worker)
+                    raise RuntimeError(f"Model worker {worker.worker_id} failed: {type(e).__name__} {e}".rstrip()) from e
+
+                worker.requests += 1
+                if response_id != request_id:
+                    self._restart(worker)
+                    raise RuntimeError(f"Model worker {worker.worker_id} returned a stale response")
+                if kind == 'error':
+                    raise RuntimeError(payload[0])
+                if kind == 'shm':
+                    dtype, shape = payload
+                    # Copy out before the slot is reused by the next request
+                    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=worker.shm.buf).copy()
+                return payload[0]
+        finally:
+            self._idle.put(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-worker liveness, request counts and restarts"""
+        return {
+            "num_workers": self.num_workers,
+            "idle_workers": self._idle.qsize(),
+            "slot_bytes": self.slot_bytes,
+            "torch_threads_per_worker": self.torch_threads,
+            "workers": [
+                {
+                    "worker_id": worker.worker_id,
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": bool(worker.process and worker.process.is_alive()),
+                    "requests": worker.requests,
+                    "restarts": worker.restarts
+                }
+                for worker in self._workers
+            ]
+        }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop workers and release shared memory"""
+        self._stopping.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=timeout)
+
+        for worker in self._workers:
+            with worker.lock:
+                try:
+                    worker.conn.send(None)
+                except (OSError, BrokenPipeError):
+                    pass
+                worker.process.join(timeout=timeout)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join(timeout=1)
+                worker.conn.close()
+                worker.shm.close()
+                worker.shm.unlink()
+
+        self._workers.clear()
+        logger.info("Model worker pool shut down")
@@ -0,0 +1,218 @@
+"""
+ONNX Runtime CPU backend for sentence-transformer models
+Exports the transformer once, applies dynamic int8 quantization, caches the
+converted graphs on disk and serves embeddings with the same encode()
+interface as SentenceTransformer
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET = 14
+
+
+def _safe_dirname(model_name: str) -> str:
+    return model_name.replace('/', '__').replace(':', '_')
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime replacement for a loaded SentenceTransformer
+
+    Tokenization is delegated to the original tokenizer and pooling follows
+    the model's pooling configuration (mean or CLS), so outputs match the
+    PyTorch model up to quantization error.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        tokenizer: Any,
+        max_seq_length: int,
+        pooling_mode: str = "mean",
+        model_name: str = "",
+        quantized: bool = True
+    ):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.pooling_mode = pooling_mode
+        self.model_name = model_name
+        self.quantized = quantized
+        self._input_names = {i.name for i in session.get_inputs()}
+
+    @classmethod
+    def from_sentence_transformer(
+        cls,
+        model: Any,
+        model_name: str,
+        cache_dir: str,
+        quantize: bool = True,
+        num_threads: int = 4
+    ) -> "OnnxSentenceEncoder":
+        """Convert (or reuse a cached conversion of) a loaded SentenceTransformer"""
+        import onnxruntime as ort
+
+        transformer = model[0]
+        pooling_mode = "mean"
+        if len(model) > 1 and getattr(model[1], 'pooling_mode_cls_token', False):
+            pooling_mode = "cls"
+
+        model_path = cls._converted_model_path(
+            transformer, model_name, cache_dir, quantize
+        )
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = num_threads
+        sess_options.inter_op_num_threads = 1
+        # Persist the optimized graph next to the converted model
+        sess_options.optimized_model_filepath = str(model_path.with_suffix('.opt.onnx'))
+
+        session = ort.InferenceSession(
+            str(model_path), sess_options, providers=['CPUExecutionProvider']
+        )
+        return cls(
+            session,
+            transformer.tokenizer,
+            model.max_seq_length,
+            pooling_mode=pooling_mode,
+            model_name=model_name,
+            quantized=quantize
+        )
+
+    @staticmethod
+    def _converted_model_path(
+        transformer: Any, model_name: str, cache_dir: str, quantize: bool
+    ) -> Path:
+        """Return the cached ONNX graph, exporting and quantizing it if needed"""
+        import onnxruntime as ort
+        import torch
+
+        fingerprint = hashlib.blake2b(
+            json.dumps({
+                'model': model_name,
+                'opset': ONNX_OPSET,
+                'torch': torch.__version__,
+                'onnxruntime': ort.__version__,
+                'quantize': quantize
+            }, sort_keys=True).encode(),
+            digest_size=8
+        ).hexdigest()
+
+        target_dir = Path(cache_dir) / "onnx" / _safe_dirname(model_name) / fingerprint
+        fp32_path = target_dir / "model.onnx"
+        final_path = target_dir / ("model.int8.onnx" if quantize else "model.onnx")
+        if final_path.exists():
+            logger.info(f"Using cached ONNX conversion: {final_path}")
+            return final_path
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+        start_time = time.time()
+
+        if not fp32_path.exists():
+            auto_model = transformer.auto_model.eval()
+            sample = transformer.tokenizer(
+                ["ONNX export sample"], padding=True, truncation=True, return_tensors="pt"
+            )
+            input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+            dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+            dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+            tmp_path = fp32_path.with_suffix('.tmp')
+            with torch.no_grad():
+                torch.onnx.export(
+                    auto_model,
+                    tuple(sample[name] for name in input_names),
+                    str(tmp_path),
+                    input_names=input_names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=ONNX_OPSET,
+                    do_constant_folding=True
+                )
+            os.replace(tmp_path, fp32_path)
+
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            tmp_path = final_path.with_suffix('.tmp')
+            quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+            os.replace(tmp_path, final_path)
+
+        logger.info(f"Converted {model_name} to ONNX in {time.time() - start_time:.1f}s: {final_path}")
+        return final_path
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """Embed sentences; mirrors SentenceTransformer.encode for numpy output"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in self._input_names if name in encoded
+            }
+            hidden = self.session.run(None, feeds)[0]
+            batches.append(self._pool(hidden, encoded["attention_mask"]))
+
+        embeddings = np.concatenate(batches, axis=0)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling_mode == "cls":
+            return hidden[:, 0].astype(np.float32)
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (hidden * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return (summed / counts).astype(np.float32)
+
+
+def check_embedding_parity(
+    reference: Any,
+    candidate: Any,
+    samples: List[str],
+    min_cosine: float = 0.99
+) -> Dict[str, Any]:
+    """Compare candidate embeddings against the reference model's on samples"""
+    expected = reference.encode(samples, convert_to_numpy=True, normalize_embeddings=True)
+    actual = candidate.encode(samples, convert_to_numpy=True, normalize_embeddings=True)
+    cosine = np.sum(expected * actual, axis=1)
+    return {
+        "samples": len(samples),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "threshold": min_cosine,
+        "passed": bool(cosine.min() >= min_cosine)
+    }
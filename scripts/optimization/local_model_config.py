@@ -92,7 +92,16 @@ PERFORMANCE_SETTINGS = {
     'max_concurrent_requests': 4,
     'batch_size': 16,
     'enable_caching': True,
-    'cache_ttl_seconds': 3600
+    'cache_ttl_seconds': 3600,
+    # Dynamic micro-batching in the inference API server
+    'dynamic_batching': True,
+    'max_batch_size': 64,
+    'max_batch_wait_ms': 5,
+    # Forked model-serving processes sharing loaded weights (0 = in-process, Linux only)
+    'serving_workers': 0,
+    # Sentence-transformer backend: 'pytorch' or 'onnx' (int8 ONNX Runtime, parity-checked);
+    # a model config may override it with its own 'backend' key
+    'inference_backend': 'pytorch'
 }
 
 PRELOAD_CONFIG = {
@@ -19,6 +19,7 @@ from concurrent.futures import ThreadPoolExecutor
 from startup_optimizer import get_startup_optimizer, ServiceConfig
 from model_preloader import get_model_preloader
 from model_cache_manager import get_model_cache_manager, ModelType
+from model_warmup import get_model_warmup
 
 # Configure logging
 logging.basicConfig(
@@ -106,8 +107,13 @@ class FastStartup:
             }
         ]
         
-        # Preload priority models
+        # Preload priority models and keep them resident
         await self.cache_manager.preload_models(priority_models)
+        for model in priority_models:
+            self.cache_manager.pin_model(model["name"])
+        
+        # Prefetch models that usage patterns say will be needed, within the memory budget
+        asyncio.create_task(get_model_warmup().prefetch_recommended_models())
         
         # Set background models for lazy loading
         self.model_preloader.set_priority_models([
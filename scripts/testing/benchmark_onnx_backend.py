@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+AI Job Chommie - ONNX Backend Benchmark
+Compares embeddings/sec and output parity of the PyTorch MiniLM similarity
+model against the ONNX Runtime fp32 and int8 backends
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml-services'))
+
+import torch  # noqa: E402
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+from model_manager import PARITY_SAMPLES  # noqa: E402
+from onnx_backend import OnnxSentenceEncoder, check_embedding_parity  # noqa: E402
+
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+VOCABULARY = (
+    "python java developer engineer data scientist nurse accountant manager sales "
+    "experience years team leadership cloud aws azure sql react node marketing "
+    "finance healthcare customer service remote johannesburg cape town durban"
+).split()
+
+
+def make_texts(count: int, rng: random.Random) -> list:
+    """Mix of short CV snippets and longer job descriptions"""
+    texts = []
+    for _ in range(count):
+        length = rng.choice([8, 16, 32, 64, 160])
+        texts.append(' '.join(rng.choice(VOCABULARY) for _ in range(length)))
+    return texts
+
+
+def measure(encoder, texts, batch_size: int, repeats: int) -> float:
+    """Best-of-N embeddings per second"""
+    encoder.encode(texts[:batch_size], batch_size=batch_size, normalize_embeddings=True)
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        best = max(best, len(texts) / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ONNX Runtime embedding backend")
+    parser.add_argument('--texts', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--cache-dir', default='./models')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    texts = make_texts(args.texts, random.Random(7))
+
+    model = SentenceTransformer(MODEL_NAME, cache_folder=args.cache_dir)
+    model.max_seq_length = 512
+
+    backends = [('pytorch', model)]
+    for quantize in (False, True):
+        encoder = OnnxSentenceEncoder.from_sentence_transformer(
+            model, MODEL_NAME, cache_dir=args.cache_dir, quantize=quantize, num_threads=args.threads
+        )
+        backends.append(('onnx-int8' if quantize else 'onnx-fp32', encoder))
+
+    print(f"Model: {MODEL_NAME}  texts={args.texts}  batch={args.batch_size}  threads={args.threads}")
+    print(f"{'backend':<12}{'emb/s':>10}{'speedup':>10}{'min cos':>10}{'mean cos':>10}")
+    baseline = None
+    for name, encoder in backends:
+        rate = measure(encoder, texts, args.batch_size, args.repeats)
+        baseline = baseline or rate
+        if encoder is model:
+            min_cos, mean_cos = 1.0, 1.0
+        else:
+            parity = check_embedding_parity(model, encoder, PARITY_SAMPLES + texts[:64])
+            min_cos, mean_cos = parity['min_cosine'], parity['mean_cosine']
+        print(f"{name:<12}{rate:>10.1f}{rate / baseline:>9.2f}x{min_cos:>10.4f}{mean_cos:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+AI Job Chommie - Paired Similarity Benchmark
+Compares the legacy full-matrix + diagonal-scan batch similarity assembly
+with the row-wise paired path used by batch_process_multiple
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml-services'))
+
+from local_inference_service import LocalInferenceService  # noqa: E402
+
+
+def legacy_assembly(service: LocalInferenceService, job_emb: np.ndarray, cand_emb: np.ndarray) -> list:
+    """Previous behaviour: N x N matrix, N^2 result dicts, linear scan per request"""
+    similarities = service._calculate_similarities(job_emb, cand_emb)
+    n = len(job_emb)
+    results = []
+    for i in range(n):
+        for j in range(n):
+            results.append({
+                "job_index": i,
+                "candidate_index": j,
+                "similarity_score": float(similarities[i, j]),
+                "confidence": service._calculate_confidence(similarities[i, j]),
+                "match_level": service._get_match_level(similarities[i, j]),
+            })
+    return [
+        [r for r in results if r["job_index"] == i and r["candidate_index"] == i][0]
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paired similarity assembly")
+    parser.add_argument('--pairs', type=int, default=10000)
+    parser.add_argument('--legacy-pairs', type=int, default=300,
+                        help="Legacy path is cubic; measured on a smaller batch and extrapolated")
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--encode', action='store_true',
+                        help="Also time end-to-end requests through the loaded embedding model")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    job_emb = rng.standard_normal((args.pairs, args.dim)).astype(np.float32)
+    cand_emb = rng.standard_normal((args.pairs, args.dim)).astype(np.float32)
+
+    service = LocalInferenceService(preload_models=args.encode)
+
+    start = time.perf_counter()
+    paired = service.analyze_paired_similarity(
+        [""] * args.pairs, [""] * args.pairs,
+        job_embeddings=job_emb, candidate_embeddings=cand_emb
+    )
+    paired_seconds = time.perf_counter() - start
+
+    n = args.legacy_pairs
+    start = time.perf_counter()
+    legacy = legacy_assembly(service, job_emb[:n], cand_emb[:n])
+    legacy_seconds = time.perf_counter() - start
+    legacy_extrapolated = legacy_seconds * (args.pairs / n) ** 3
+
+    drift = max(abs(a["similarity_score"] - b["similarity_score"]) for a, b in zip(legacy, paired))
+
+    print(f"Pairs: {args.pairs}  dim={args.dim}")
+    print(f"paired : {paired_seconds * 1000:10.1f} ms  ({args.pairs / paired_seconds:,.0f} pairs/s)")
+    print(f"legacy : {legacy_seconds * 1000:10.1f} ms at {n} pairs "
+          f"(~{legacy_extrapolated:,.0f} s extrapolated to {args.pairs})")
+    print(f"max score difference on first {n} pairs: {drift:.2e}")
+
+    if args.encode:
+        requests = [
+            {"type": "job_similarity", "id": str(i),
+             "job_description": f"Senior python developer role {i % 500}",
+             "candidate_text": f"Engineer with {i % 15} years of python and cloud experience"}
+            for i in range(args.pairs)
+        ]
+        start = time.perf_counter()
+        service.batch_process_multiple(requests)
+        seconds = time.perf_counter() - start
+        print(f"end-to-end batch_process_multiple: {seconds:.2f} s ({args.pairs / seconds:,.0f} pairs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Query cost limits for the GraphQL endpoint.
+
+Every selected field costs 1, plus an extra cost for resolvers that query
+the database. Paginated fields multiply the cost of their selection by the
+page size the query asks for, read from literals or variables. Operations
+over settings.graphql_max_query_cost are rejected before any resolver runs.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValueNode,
+    get_named_type,
+    value_from_ast_untyped,
+)
+from strawberry.extensions import SchemaExtension
+
+from src.config.settings import settings
+
+# Extra cost of resolvers that reach the database, keyed by "Type.field"
+FIELD_COSTS: Dict[str, int] = {
+    "Query.searchJobs": 10,
+    "Query.getJob": 5,
+    "Query.searchCompanies": 10,
+    "Query.getCompany": 5,
+    "Query.networkingEvents": 10,
+    "Query.salaryBenchmark": 20,
+    "Query.marketIntelligence": 50,
+    "Query.careerTrajectory": 50,
+    "Query.personalBrandAudit": 50,
+    "Query.recommendedJobs": 50,
+    "JobListing.company": 1,
+    "JobListing.salaryInsights": 2,
+    "JobListing.marketData": 2,
+}
+
+# Paginated fields: the argument holding the page size, and its default
+PAGE_SIZES: Dict[str, Tuple[Tuple[str, ...], int]] = {
+    "Query.searchJobs": (("input", "perPage"), 20),
+    "Query.searchCompanies": (("input", "perPage"), 20),
+    "Query.networkingEvents": (("input", "perPage"), 20),
+    "Query.recommendedJobs": (("limit",), 10),
+}
+MAX_PAGE_SIZE = 100
+
+
+class QueryCostCalculator:
+    """Static cost of one operation in a parsed document."""
+
+    def __init__(self, schema: GraphQLSchema, document, variables: Optional[Dict[str, Any]] = None):
+        self.schema = schema
+        self.variables = variables or {}
+        self.fragments: Dict[str, FragmentDefinitionNode] = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    def operation_cost(self, operation: OperationDefinitionNode) -> int:
+        root = self.schema.get_root_type(operation.operation)
+        return self._selection_cost(operation.selection_set, root, set())
+
+    def _fields(self, selection_set: SelectionSetNode, visited: set) -> Iterator[FieldNode]:
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self._fields(selection.selection_set, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None and fragment.name.value not in visited:
+                    yield from self._fields(fragment.selection_set, visited | {fragment.name.value})
+
+    def _selection_cost(self, selection_set: Optional[SelectionSetNode], parent, visited: set) -> int:
+        if selection_set is None:
+            return 0
+
+        cost = 0
+        for field in self._fields(selection_set, visited):
+            name = field.name.value
+            coordinate = f"{getattr(parent, 'name', '')}.{name}"
+            field_def = parent.fields.get(name) if isinstance(parent, GraphQLObjectType) else None
+            child_type = get_named_type(field_def.type) if field_def is not None else None
+
+            child_cost = self._selection_cost(field.selection_set, child_type, visited)
+            cost += 1 + FIELD_COSTS.get(coordinate, 0) + child_cost * self._page_size(coordinate, field)
+        return cost
+
+    def _page_size(self, coordinate: str, field: FieldNode) -> int:
+        if coordinate not in PAGE_SIZES:
+            return 1
+        path, default = PAGE_SIZES[coordinate]
+        value: Any = {
+            argument.name.value: self._value(argument.value) for argument in field.arguments or []
+        }
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if not isinstance(value, int):
+            return default
+        return max(1, min(value, MAX_PAGE_SIZE))
+
+    def _value(self, node: ValueNode) -> Any:
+        try:
+            return value_from_ast_untyped(node, self.variables)
+        except Exception:
+            return None
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Reject operations whose static cost exceeds the configured maximum.
+
+    Register the class rather than an instance, so each operation gets its own
+    execution context.
+    """
+
+    def __init__(self, *, execution_context=None, max_cost: Optional[int] = None):
+        if execution_context is not None:
+            self.execution_context = execution_context
+        self.max_cost = max_cost or settings.graphql_max_query_cost
+
+    def on_validate(self):
+        context = self.execution_context
+        document = context.graphql_document
+        if document is not None:
+            calculator = QueryCostCalculator(context.schema._schema, document, context.variables)
+            for definition in document.definitions:
+                if not isinstance(definition, OperationDefinitionNode):
+                    continue
+                if context.operation_name and getattr(definition.name, "value", None) != context.operation_name:
+                    continue
+                cost = calculator.operation_cost(definition)
+                if cost > self.max_cost:
+                    # Setting errors before validation runs makes Strawberry return them without executing
+                    context.errors = [GraphQLError(
+                        f"Query cost {cost} exceeds the maximum of {self.max_cost}",
+                        nodes=[definition],
+                        extensions={"code": "QUERY_TOO_COSTLY", "cost": cost, "max_cost": self.max_cost}
+                    )]
+                    break
+        yield
@@ -0,0 +1,93 @@
+"""
+Request-scoped DataLoaders for the GraphQL schema.
+
+Field resolvers such as JobListing.company and JobListing.salary_insights run
+once per object. Loaders collect the keys requested in the same tick and
+resolve them with one batched query; each loader's cache memoizes results
+for the rest of the request. Salary and market loaders also share results
+across requests and workers through the Redis cache.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from strawberry.dataloader import DataLoader
+from starlette.requests import HTTPConnection
+
+from src.config.settings import settings
+from src.utils.cache import CacheManager, cache_key_generator
+from src.utils.database import Database
+
+SalaryKey = Tuple[str, str, Optional[str]]
+
+# Cached in place of "no data" so empty results are not re-queried every request
+_EMPTY: Dict[str, Any] = {}
+
+
+def salary_key(title: Optional[str], location: Optional[str], level: Optional[str]) -> SalaryKey:
+    """Normalized salary benchmark loader key, so equivalent jobs share one lookup."""
+    return (
+        " ".join((title or "").lower().split()),
+        " ".join((location or "").split()),
+        level or None
+    )
+
+
+class GraphQLLoaders:
+    """DataLoaders for a single GraphQL request."""
+
+    def __init__(self, db: Database, cache: CacheManager):
+        self.db = db
+        self.cache = cache
+        self.company = DataLoader(load_fn=self._load_companies)
+        self.salary_benchmark = DataLoader(load_fn=self._load_salary_benchmarks)
+        self.market_data = DataLoader(load_fn=self._load_market_data)
+
+    async def _load_companies(self, company_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        rows = await self.db.get_companies_by_ids(company_ids)
+        by_id = {str(row["id"]): row for row in rows}
+        return [by_id.get(company_id) for company_id in company_ids]
+
+    async def _load_salary_benchmarks(self, keys: List[SalaryKey]) -> List[Optional[Dict[str, Any]]]:
+        return await self._load_shared("salary_benchmark", keys, self.db.get_salary_benchmarks_batch)
+
+    async def _load_market_data(self, locations: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return await self._load_shared("location_demand", locations, self.db.get_location_demand)
+
+    async def _load_shared(
+        self,
+        namespace: str,
+        keys: List[Any],
+        fetch: Callable[[List[Any]], Awaitable[List[Optional[Dict[str, Any]]]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Serve keys from the shared cache, fetching all misses with one batched call."""
+        cache_keys = [f"graphql:{namespace}:{cache_key_generator(key)}" for key in keys]
+        cached = await self.cache.get_multiple(cache_keys)
+
+        missing = [i for i, cache_key in enumerate(cache_keys) if cached.get(cache_key) is None]
+        if missing:
+            fetched = await fetch([keys[i] for i in missing])
+            fresh = {cache_keys[i]: value or _EMPTY for i, value in zip(missing, fetched)}
+            await self.cache.set_multiple(fresh, ttl=settings.graphql_cache_ttl)
+            cached.update(fresh)
+
+        return [cached[cache_key] or None for cache_key in cache_keys]
+
+
+async def get_graphql_context(connection: HTTPConnection) -> Dict[str, Any]:
+    """
+    Build the GraphQL context for a request or subscription connection.
+
+    Used as the GraphQLRouter context_getter; a fresh GraphQLLoaders per
+    request keeps memoized results from leaking between users.
+    """
+    state = connection.app.state
+    user = getattr(connection.state, "user", None)
+    return {
+        "db": state.db,
+        "cache": state.cache,
+        "kafka": state.kafka,
+        "ws_manager": state.ws_manager,
+        "user_id": user.user_id if user else None,
+        "user_tier": user.tier if user else "basic",
+        "loaders": GraphQLLoaders(state.db, state.cache),
+    }
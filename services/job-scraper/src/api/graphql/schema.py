@@ -3,17 +3,24 @@ GraphQL schema for job scraping service.
 Provides flexible querying capabilities for all features.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Mapping
+from dataclasses import asdict
 from datetime import datetime
 import strawberry
+from strawberry.extensions import QueryDepthLimiter
 from strawberry.types import Info
 from strawberry.scalars import JSON
 
-from src.models.job_models import JobLevel, JobType
+from src.config.settings import settings
+from src.models.job_models import JobFilter, JobLevel, JobType
 from src.utils.database import Database
-from src.utils.cache import CacheManager
+from src.utils.cache import CacheManager, cache_key_generator
+from src.utils.job_cache import get_job_detail_cache
 from src.processors.job_matcher import JobMatcher
 from src.processors.analytics import AnalyticsProcessor
+from src.api.graphql.loaders import GraphQLLoaders, salary_key
+from src.api.graphql.limits import QueryCostLimiter
+from src.api.websocket import SubscriptionFilter
 
 
 # GraphQL Types
@@ -30,6 +37,31 @@ class Company:
     culture_score: Optional[float]
     review_count: int
     logo_url: Optional[str]
+    _culture_insights: strawberry.Private[Optional[Dict[str, Any]]] = None
+    _leadership_team: strawberry.Private[Optional[Any]] = None
+    _recent_news: strawberry.Private[Optional[Any]] = None
+    
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "Company":
+        """Build from a companies table row."""
+        culture_fields = [
+            "culture_score", "benefits_score", "career_growth_score",
+            "work_life_balance_score", "diversity_score"
+        ]
+        culture = {field: float(row[field]) for field in culture_fields if row.get(field) is not None}
+        return cls(
+            id=str(row["id"]),
+            name=row["name"],
+            industry=row.get("industry"),
+            size=row.get("size_range"),
+            headquarters=row.get("headquarters"),
+            website=row.get("website"),
+            culture_score=culture.get("culture_score"),
+            review_count=row.get("review_count") or 0,
+            logo_url=row.get("logo_url"),
+            _culture_insights=culture or None,
+            _leadership_team=row.get("leadership_info"),
+        )
     
     @strawberry.field
     async def culture_insights(self) -> Optional[JSON]:
@@ -53,7 +85,6 @@ class JobListing:
     """Job listing GraphQL type."""
     id: str
     title: str
-    company: Company
     location: str
     remote_type: str
     description: str
@@ -72,6 +103,57 @@ class JobListing:
     view_count: int
     competition_level: Optional[float]
     match_score: Optional[float]
+    company_id: strawberry.Private[Optional[str]] = None
+    company_name: strawberry.Private[str] = ""
+    
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "JobListing":
+        """Build from a jobs table row (or a job dict with the same keys)."""
+        row = dict(row)
+        salary_min, salary_max = row.get("salary_min"), row.get("salary_max")
+        posted_date = row.get("posted_date") or row.get("created_at")
+        if isinstance(posted_date, str):
+            # Search results come back from the shared cache as JSON
+            posted_date = datetime.fromisoformat(posted_date)
+        return cls(
+            id=str(row["id"]),
+            title=row["title"],
+            location=row.get("location") or "",
+            remote_type=row.get("remote_type") or ("remote" if row.get("remote_friendly") else "onsite"),
+            description=row.get("description") or "",
+            requirements=row.get("requirements"),
+            responsibilities=row.get("responsibilities"),
+            skills=list(row.get("skills") or row.get("skills_required") or []),
+            salary_min=float(salary_min) if salary_min is not None else None,
+            salary_max=float(salary_max) if salary_max is not None else None,
+            salary_currency=row.get("salary_currency") or "ZAR",
+            benefits=list(row.get("benefits") or []),
+            job_level=row.get("job_level") or row.get("experience_level") or "",
+            job_type=row.get("job_type") or "",
+            posted_date=posted_date,
+            is_active=row.get("is_active", True),
+            application_count=row.get("application_count"),
+            view_count=row.get("view_count") or 0,
+            competition_level=row.get("competition_level"),
+            match_score=row.get("match_score"),
+            company_id=str(row["company_id"]) if row.get("company_id") else None,
+            company_name=row["company"] if isinstance(row.get("company"), str) else "",
+        )
+    
+    @strawberry.field
+    async def company(self, info: Info) -> Optional[Company]:
+        """Hiring company, batched across all jobs in the response."""
+        if self.company_id:
+            loaders: GraphQLLoaders = info.context["loaders"]
+            row = await loaders.company.load(self.company_id)
+            if row:
+                return Company.from_row(row)
+        if not self.company_name:
+            return None
+        return Company(
+            id=self.company_id or "", name=self.company_name, industry=None, size=None, headquarters=None,
+            website=None, culture_score=None, review_count=0, logo_url=None
+        )
     
     @strawberry.field
     async def is_executive(self) -> bool:
@@ -80,13 +162,44 @@ class JobListing:
     
     @strawberry.field
     async def salary_insights(self, info: Info) -> Optional[JSON]:
-        """Get salary insights (Professional tier+)."""
-        # Would implement salary benchmarking
+        """Get salary insights (Professional tier+), from the batched salary benchmark loader."""
+        loaders: GraphQLLoaders = info.context["loaders"]
+        benchmark = await loaders.salary_benchmark.load(salary_key(self.title, self.location, self.job_level))
+        if not benchmark:
+            return None
+        
+        percentiles = benchmark["percentiles"]
+        percentile = None
+        if self.salary_max is not None:
+            percentile = next(
+                (p for p in (90, 75, 50, 25) if self.salary_max >= percentiles[f"p{p}"]),
+                0
+            )
         return {
-            "market_average": self.salary_min * 1.1 if self.salary_min else None,
-            "percentile": 75,
-            "trend": "increasing"
+            "market_average": benchmark["average"],
+            "market_median": percentiles["p50"],
+            "percentile": percentile,
+            "sample_size": benchmark["sample_size"]
         }
+    
+    @strawberry.field
+    async def market_data(self, info: Info) -> Optional[JSON]:
+        """Posting volume and trend for the job's location, batched across jobs."""
+        if not self.location:
+            return None
+        loaders: GraphQLLoaders = info.context["loaders"]
+        demand = await loaders.market_data.load(" ".join(self.location.split()))
+        if not demand:
+            return None
+        
+        recent, previous = demand["recent_jobs"], demand["previous_jobs"]
+        if previous and recent > previous * 1.1:
+            trend = "increasing"
+        elif previous and recent < previous * 0.9:
+            trend = "decreasing"
+        else:
+            trend = "stable"
+        return {**demand, "trend": trend}
 
 
 @strawberry.type
@@ -226,6 +339,26 @@ class EventSearchInput:
     per_page: int = 20
 
 
+def _job_filter(search: JobSearchInput) -> JobFilter:
+    """
+    Map search input onto the filters Database.search_jobs applies.
+
+    Industries and the hidden-market / executive flags have no column in
+    the jobs table and are not applied; paging and sorting are passed
+    separately.
+    """
+    return JobFilter(
+        query=search.query,
+        location=search.location,
+        job_types=search.job_types or None,
+        experience_levels=search.job_levels or None,
+        salary_range=(search.salary_min, None),
+        remote_only=search.remote_type == "remote",
+        skills=search.skills or None,
+        posted_since=search.posted_after,
+    )
+
+
 # Queries
 
 @strawberry.type
@@ -242,26 +375,35 @@ class Query:
         db: Database = info.context["db"]
         cache: CacheManager = info.context["cache"]
         
-        # Check cache first
-        cache_key = f"job_search:{hash(str(input))}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return JobSearchResult(**cached)
-        
-        # Perform search
-        results = await db.search_jobs(input)
-        
-        # Cache results
-        await cache.set(cache_key, results, expire=300)
+        # Stable across processes, unlike hash(), so every worker shares entries
+        cache_key = f"graphql:job_search:{cache_key_generator(asdict(input))}"
+        results = await cache.get(cache_key)
+        if results is None:
+            jobs, total = await db.search_jobs(
+                _job_filter(input),
+                limit=input.per_page,
+                offset=(input.page - 1) * input.per_page,
+                sort_by=input.sort_by
+            )
+            results = {"jobs": [dict(job) for job in jobs], "total": total}
+            await cache.set(cache_key, results, ttl=settings.graphql_cache_ttl)
         
-        return JobSearchResult(**results)
+        total = results["total"]
+        return JobSearchResult(
+            jobs=[JobListing.from_row(job) for job in results["jobs"]],
+            total=total,
+            page=input.page,
+            per_page=input.per_page,
+            has_next=input.page * input.per_page < total,
+            has_prev=input.page > 1
+        )
     
     @strawberry.field
     async def get_job(self, info: Info, id: str) -> Optional[JobListing]:
         """Get job by ID."""
-        db: Database = info.context["db"]
-        job = await db.get_job_by_id(id)
-        return JobListing(**job) if job else None
+        job_cache = await get_job_detail_cache()
+        job = await job_cache.get(id)
+        return JobListing.from_row(job) if job else None
     
     @strawberry.field
     async def search_companies(
@@ -272,14 +414,14 @@ class Query:
         """Search for companies."""
         db: Database = info.context["db"]
         companies = await db.search_companies(input)
-        return [Company(**c) for c in companies]
+        return [Company.from_row(c) for c in companies]
     
     @strawberry.field
     async def get_company(self, info: Info, id: str) -> Optional[Company]:
         """Get company by ID."""
-        db: Database = info.context["db"]
-        company = await db.get_company_by_id(id)
-        return Company(**company) if company else None
+        loaders: GraphQLLoaders = info.context["loaders"]
+        company = await loaders.company.load(id)
+        return Company.from_row(company) if company else None
     
     @strawberry.field
     async def networking_events(
@@ -383,7 +525,7 @@ class Query:
         recommendations = await matcher.get_recommendations(
             user_profile, limit
         )
-        return [JobListing(**job) for job in recommendations]
+        return [JobListing.from_row(job) for job in recommendations]
 
 
 # Mutations
@@ -478,6 +620,20 @@ class Mutation:
 
 # Subscriptions
 
+def _subscription_filter(filters: Optional[JobSearchInput]) -> SubscriptionFilter:
+    """Map search input onto the filter the job stream evaluates server-side."""
+    if filters is None:
+        return SubscriptionFilter()
+    return SubscriptionFilter(
+        keywords=[filters.query] if filters.query else None,
+        location=filters.location,
+        salary_min=filters.salary_min,
+        remote_only=True if filters.remote_type == "remote" else None,
+        job_types=filters.job_types or None,
+        experience_levels=filters.job_levels or None,
+    )
+
+
 @strawberry.type
 class Subscription:
     """Root subscription type for real-time updates."""
@@ -490,8 +646,8 @@ class Subscription:
     ) -> JobListing:
         """Subscribe to real-time job updates."""
         ws_manager = info.context["ws_manager"]
-        async for job in ws_manager.job_update_stream(filters):
-            yield JobListing(**job)
+        async for job in ws_manager.job_update_stream(_subscription_filter(filters)):
+            yield JobListing.from_row(job)
     
     @strawberry.subscription
     async def application_status(
@@ -509,5 +665,9 @@ class Subscription:
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
-    subscription=Subscription
+    subscription=Subscription,
+    extensions=[
+        QueryDepthLimiter(max_depth=settings.graphql_max_depth),
+        QueryCostLimiter,
+    ]
 )
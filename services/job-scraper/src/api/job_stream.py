@@ -0,0 +1,230 @@
+"""
+Live job stream for GraphQL subscriptions.
+
+Each API process reads the enriched-jobs Kafka topic once (without a
+consumer group, so every process sees every job) and fans each job out to
+its subscribers. Filters are evaluated server-side with SubscriptionFilter,
+once per distinct filter rather than once per subscriber. Every subscriber
+has a bounded queue. When it is full the oldest job is dropped, so a slow
+client never blocks the stream or other subscribers. A subscriber whose
+queue stays full for job_stream_slow_consumer_seconds is disconnected.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from aiokafka import AIOKafkaConsumer
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_api_error
+from src.api.websocket import SubscriptionFilter
+
+
+class SlowConsumerError(Exception):
+    """Raised in a subscription that fell too far behind the job stream."""
+
+
+class _JobView:
+    """Attribute access over a job dict, as SubscriptionFilter.matches_job expects."""
+
+    __slots__ = ("_job",)
+
+    def __init__(self, job: Dict[str, Any]):
+        self._job = job
+
+    def __getattr__(self, name: str) -> Any:
+        return self._job.get(name)
+
+
+class JobStreamSubscriber:
+    """One subscription's bounded queue."""
+
+    __slots__ = ("queue", "dropped", "delivered", "full_since", "evicted")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.delivered = 0
+        self.full_since: Optional[float] = None
+        self.evicted = False
+
+    def offer(self, job: Dict[str, Any], now: float, slow_after: float) -> bool:
+        """Queue a job without blocking; returns False once the subscriber should be evicted."""
+        if self.queue.full():
+            if self.full_since is None:
+                self.full_since = now
+            elif now - self.full_since > slow_after:
+                return False
+            self.queue.get_nowait()
+            self.dropped += 1
+        else:
+            self.full_since = None
+        self.queue.put_nowait(job)
+        return True
+
+    def evict(self):
+        """Wake the subscription so it can end with SlowConsumerError."""
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class JobStream:
+    """Fans jobs from the enriched-jobs topic out to filtered, bounded subscriptions."""
+
+    def __init__(
+        self,
+        topic: Optional[str] = None,
+        queue_size: Optional[int] = None,
+        slow_consumer_seconds: Optional[float] = None
+    ):
+        self.topic = topic or settings.kafka_topic_enriched_jobs
+        self.queue_size = queue_size or settings.job_stream_queue_size
+        self.slow_consumer_seconds = slow_consumer_seconds or settings.job_stream_slow_consumer_seconds
+
+        # Subscribers grouped by filter, so each distinct filter is evaluated once per job
+        self._groups: Dict[str, SubscriptionFilter] = {}
+        self._subscribers: Dict[str, Set[JobStreamSubscriber]] = {}
+
+        self._consumer: Optional[AIOKafkaConsumer] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            "jobs_received": 0,
+            "jobs_delivered": 0,
+            "jobs_dropped": 0,
+            "subscribers_evicted": 0,
+            "consumer_errors": 0,
+        }
+
+    @staticmethod
+    def _filter_key(filters: SubscriptionFilter) -> str:
+        return json.dumps(asdict(filters), sort_keys=True, default=str)
+
+    async def subscribe(self, filters: SubscriptionFilter) -> AsyncIterator[Dict[str, Any]]:
+        """Yield jobs matching filters until the caller stops iterating."""
+        key = self._filter_key(filters)
+        subscriber = JobStreamSubscriber(self.queue_size)
+        self._groups.setdefault(key, filters)
+        self._subscribers.setdefault(key, set()).add(subscriber)
+        self._ensure_started()
+
+        try:
+            while True:
+                job = await subscriber.queue.get()
+                if job is None and subscriber.evicted:
+                    raise SlowConsumerError(
+                        f"Subscription fell behind the job stream for over {self.slow_consumer_seconds}s"
+                    )
+                subscriber.delivered += 1
+                yield job
+        finally:
+            self._remove(key, subscriber)
+
+    def _remove(self, key: str, subscriber: JobStreamSubscriber):
+        group = self._subscribers.get(key)
+        if group is None:
+            return
+        group.discard(subscriber)
+        if not group:
+            del self._subscribers[key]
+            del self._groups[key]
+
+    def publish(self, job: Dict[str, Any]) -> int:
+        """Deliver a job to every matching subscriber's queue; returns how many received it."""
+        self.stats["jobs_received"] += 1
+        now = time.monotonic()
+        view = _JobView(job)
+        delivered = 0
+        evicted: List[Tuple[str, JobStreamSubscriber]] = []
+
+        for key, filters in self._groups.items():
+            try:
+                if not filters.matches_job(view):
+                    continue
+            except Exception as e:
+                # A malformed job must not break the stream for everyone else
+                capture_api_error(e, endpoint="job_stream_filter", method="STREAM")
+                continue
+
+            for subscriber in self._subscribers[key]:
+                dropped = subscriber.dropped
+                if subscriber.offer(job, now, self.slow_consumer_seconds):
+                    delivered += 1
+                    self.stats["jobs_dropped"] += subscriber.dropped - dropped
+                else:
+                    evicted.append((key, subscriber))
+
+        for key, subscriber in evicted:
+            self._remove(key, subscriber)
+            subscriber.evict()
+            self.stats["subscribers_evicted"] += 1
+        self.stats["jobs_delivered"] += delivered
+        return delivered
+
+    def _ensure_started(self):
+        """Start reading the topic when the first subscription arrives."""
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        """Stop reading the topic."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_forever(self):
+        backoff = 1
+        while self._running:
+            try:
+                self._consumer = AIOKafkaConsumer(
+                    self.topic,
+                    bootstrap_servers=settings.kafka_servers_list,
+                    group_id=None,
+                    auto_offset_reset="latest",
+                    enable_auto_commit=False,
+                    value_deserializer=lambda m: json.loads(m.decode("utf-8"))
+                )
+                await self._consumer.start()
+                logger.info(f"Job stream consuming {self.topic}")
+                backoff = 1
+
+                async for msg in self._consumer:
+                    if isinstance(msg.value, dict):
+                        self.publish(msg.value)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["consumer_errors"] += 1
+                logger.error(f"Job stream consumer failed, retrying in {backoff}s: {e}")
+                capture_api_error(e, endpoint="job_stream_consumer", method="STREAM")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                if self._consumer is not None:
+                    try:
+                        await self._consumer.stop()
+                    except Exception:
+                        pass
+                    self._consumer = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        subscribers = [s for group in self._subscribers.values() for s in group]
+        return {
+            **self.stats,
+            "subscribers": len(subscribers),
+            "distinct_filters": len(self._groups),
+            "queued": sum(s.queue.qsize() for s in subscribers),
+        }
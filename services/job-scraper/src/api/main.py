@@ -9,7 +9,6 @@ from typing import List, Optional, Dict, Any
 
 from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -28,13 +27,24 @@ from src.config.sentry import (
 )
 from src.api.routes import jobs, companies, search, analytics, admin, auth, applications, auto_applications, cv_builder, skills_assessment, executive_features, job_alerts, professional_tools
 from src.api.graphql.schema import schema as graphql_schema
+from src.api.graphql.loaders import get_graphql_context
 from src.api.websocket import ConnectionManager
+from src.api.job_stream import JobStream
+from src.api.responses import ORJSONResponse
 from src.middleware.auth import AuthMiddleware
+from src.middleware.compression import CompressionMiddleware
 from src.middleware.rate_limit import RateLimitMiddleware
 from src.utils.database import Database
 from src.utils.cache import CacheManager
 from src.utils.kafka_producer import KafkaProducer
 from src.processors.job_enricher import JobEnricher
+from src.processors.job_embedding_indexer import JobEmbeddingIndexer
+from src.processors.auto_apply_matcher import get_auto_apply_matcher
+from src.processors.alert_percolator import get_alert_percolator
+from src.processors.digest_worker import get_digest_worker
+from src.processors.market_rollups import get_market_rollups
+from src.processors.cv_export import get_cv_export_service
+from src.processors.ats_scorer import get_ats_scorer
 
 
 # Initialize Sentry first before anything else
@@ -63,8 +73,36 @@ async def lifespan(app: FastAPI):
     # Initialize job enricher
     app.state.enricher = JobEnricher()
     
-    # Initialize WebSocket manager
-    app.state.ws_manager = ConnectionManager()
+    # Initialize WebSocket manager; GraphQL job subscriptions read the enriched-jobs stream
+    app.state.job_stream = JobStream()
+    app.state.ws_manager = ConnectionManager(job_stream=app.state.job_stream)
+    
+    # Keep stored job embeddings populated for the current model version
+    app.state.embedding_indexer = JobEmbeddingIndexer(app.state.db)
+    if settings.embedding_backfill_enabled:
+        await app.state.embedding_indexer.start()
+    
+    # Load the auto-application match index before serving /matches
+    app.state.auto_apply_matcher = await get_auto_apply_matcher()
+    app.state.alert_percolator = await get_alert_percolator()
+    
+    # Keep market-intelligence rollups current for trend and salary endpoints
+    app.state.market_rollups = await get_market_rollups()
+    if settings.market_rollup_enabled:
+        await app.state.market_rollups.start()
+    
+    # Weekly digests normally run in their own process (python -m src.processors.digest_worker)
+    app.state.digest_worker = await get_digest_worker()
+    if settings.digest_worker_enabled:
+        await app.state.digest_worker.start()
+    
+    # CV PDFs are rendered in worker processes, started on the first export
+    app.state.cv_exporter = await get_cv_export_service()
+    
+    # Term statistics for CV keyword scoring, loaded from the jobs table in the background
+    app.state.ats_scorer = await get_ats_scorer()
+    if settings.ats_scoring_enabled:
+        await app.state.ats_scorer.start()
     
     logger.info("Job scraping service started successfully")
     
@@ -73,6 +111,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down job scraping service...")
     
+    await app.state.embedding_indexer.stop()
+    await app.state.digest_worker.stop()
+    await app.state.market_rollups.stop()
+    await app.state.job_stream.stop()
+    await app.state.cv_exporter.stop()
+    await app.state.ats_scorer.stop()
     await app.state.db.disconnect()
     await app.state.cache.disconnect()
     await app.state.kafka.stop()
@@ -86,6 +130,7 @@ app = FastAPI(
     description="Enterprise-grade job scraping microservice with AI features",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
@@ -98,7 +143,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_size)
 app.add_middleware(AuthMiddleware)
 app.add_middleware(RateLimitMiddleware)
 
@@ -126,7 +171,7 @@ app.include_router(analytics.router, prefix=f"{settings.api_prefix}/analytics",
 app.include_router(admin.router, prefix=f"{settings.api_prefix}/admin", tags=["admin"])
 
 # Add GraphQL endpoint
-graphql_app = GraphQLRouter(graphql_schema)
+graphql_app = GraphQLRouter(graphql_schema, context_getter=get_graphql_context)
 app.include_router(graphql_app, prefix=settings.graphql_path)
 
 
@@ -0,0 +1,137 @@
+"""
+JSON response rendering for the API.
+
+Responses are encoded with orjson, which serializes datetimes, UUIDs, enums
+and numpy arrays natively and is several times faster than the stdlib
+encoder. Routes that serve rows straight from the database return
+ORJSONResponse themselves, which skips FastAPI's response model validation
+and jsonable_encoder pass. Large result sets are streamed as a JSON array or
+as NDJSON (one object per line) instead of being rendered in one piece.
+"""
+
+import csv
+import io
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Streamed bodies are sent in chunks of about this size rather than per row
+STREAM_CHUNK_SIZE = 64 * 1024
+
+Rows = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # Same fallback as json.dumps(default=str)
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as JSON bytes."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _iterate(rows: Rows) -> AsyncIterator[Any]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def iter_ndjson(rows: Rows) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for row in _iterate(rows):
+        buffer += dumps(row)
+        buffer += b"\n"
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_json_array(
+    rows: Rows,
+    envelope: Optional[Dict[str, Any]] = None,
+    key: str = "results"
+) -> AsyncIterator[bytes]:
+    """Rows as a JSON array, or as envelope[key] when an envelope is given."""
+    buffer = bytearray(b"[")
+    if envelope is not None:
+        fields = dumps(envelope)[1:-1]
+        buffer[:0] = b"{" + fields + (b"," if fields else b"") + dumps(key) + b":"
+    first = True
+    async for row in _iterate(rows):
+        if not first:
+            buffer += b","
+        buffer += dumps(row)
+        first = False
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]}" if envelope is not None else b"]"
+    yield bytes(buffer)
+
+
+async def iter_csv(rows: Rows, columns: List[str]) -> AsyncIterator[bytes]:
+    """Rows as CSV with a header line; list and dict values are JSON-encoded."""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    async for row in _iterate(rows):
+        writer.writerow([
+            dumps(value).decode() if isinstance(value, (list, dict)) else value
+            for value in (row.get(column) for column in columns)
+        ])
+        if text.tell() >= STREAM_CHUNK_SIZE:
+            yield text.getvalue().encode()
+            text.seek(0)
+            text.truncate()
+    yield text.getvalue().encode()
+
+
+def stream_json(
+    rows: Rows,
+    envelope: Optional[Dict[str, Any]] = None,
+    key: str = "results",
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """
+    Stream rows as a JSON array (see iter_json_array). The status is sent
+    before the first row, so an error while iterating truncates the body.
+    """
+    return StreamingResponse(iter_json_array(rows, envelope, key), media_type="application/json", headers=headers)
+
+
+def stream_ndjson(rows: Rows, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def stream_csv(rows: Rows, columns: List[str], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(iter_csv(rows, columns), media_type="text/csv", headers=headers)
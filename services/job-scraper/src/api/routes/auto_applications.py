@@ -17,6 +17,7 @@ from src.api.routes.auth import get_current_user
 from src.utils.database import get_database
 from src.utils.cache import get_cache_manager
 from src.lib.planFeatures import getQuotaLimit, hasFeature
+from src.processors.auto_apply_matcher import get_auto_apply_matcher
 
 router = APIRouter()
 
@@ -86,6 +87,7 @@ class AutoApplicationStatus(BaseModel):
 @router.post("/preferences", tags=["Auto Applications"])
 async def update_application_preferences(
     preferences_data: ApplicationPreferences,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
@@ -109,6 +111,9 @@ async def update_application_preferences(
             WHERE id = ?
         """, (preferences_json, current_user['id']))
         
+        # Recompile the user's match plan and rebuild their matches
+        background_tasks.add_task(_run_matching_for_user, current_user['id'], preferences_data)
+        
         # If auto apply is enabled, schedule next matching job
         if preferences_data.auto_apply_enabled:
             await _schedule_next_application_check(current_user['id'], preferences_data)
@@ -143,12 +148,8 @@ async def get_auto_application_status(
         preferences = ApplicationPreferences(**preferences_data) if preferences_data else None
         
         # Get pending matches count
-        pending_matches = await db.execute("""
-            SELECT COUNT(*) as count FROM job_matches 
-            WHERE user_id = ? AND status = 'pending' AND match_score >= 70
-        """, (current_user['id'],))
-        
-        matches_count = pending_matches[0]['count'] if pending_matches else 0
+        matcher = await get_auto_apply_matcher()
+        matches_count = await matcher.count_matches(current_user['id'], 70)
         
         # Get applications this month
         month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -207,6 +208,9 @@ async def get_job_matches(
 ):
     """
     Get AI-powered job matches for the user.
+    
+    Reads the user's precomputed top matches; scores below the index's
+    minimum (settings.auto_apply_min_score) are not stored.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -219,10 +223,15 @@ async def get_job_matches(
         
         preferences = ApplicationPreferences(**preferences_data)
         
-        # Run AI matching algorithm
-        matches = await _find_job_matches(current_user, preferences, limit, min_score, db)
+        # Matches are kept current at ingest time; build them once for users not yet indexed
+        matcher = await get_auto_apply_matcher()
+        if not matcher.has_user(current_user['id']):
+            await matcher.update_user(current_user['id'], preferences.dict())
+            await matcher.backfill_user(current_user['id'])
         
-        return matches
+        matches = await matcher.get_matches(current_user['id'], limit, min_score)
+        
+        return [JobMatch(**match) for match in matches]
         
     except Exception as e:
         capture_api_error(e, endpoint="/auto-applications/matches", method="GET")
@@ -319,265 +328,6 @@ async def run_matching_engine(
 
 # Internal helper functions
 
-async def _find_job_matches(
-    user: dict, 
-    preferences: ApplicationPreferences, 
-    limit: int, 
-    min_score: float,
-    db
-) -> List[JobMatch]:
-    """Find and score job matches using AI algorithm."""
-    
-    # Get recent jobs that match basic criteria
-    location_filter = " OR ".join([f"location LIKE '%{loc}%'" for loc in preferences.preferred_locations])
-    
-    query = f"""
-        SELECT * FROM jobs 
-        WHERE 
-            created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-            AND ({location_filter})
-            AND is_active = 1
-        ORDER BY created_at DESC
-        LIMIT {limit * 3}
-    """
-    
-    jobs = await db.execute(query)
-    
-    matches = []
-    
-    for job in jobs:
-        # Calculate AI match score
-        match_score, reasons = _calculate_match_score(job, preferences)
-        
-        if match_score >= min_score:
-            # Determine match level based on user plan
-            match_level = _get_match_level(user['plan'])
-            
-            # Create detailed match analysis
-            job_match = JobMatch(
-                job_id=job['id'],
-                job_title=job['title'],
-                company=job['company_name'] if 'company_name' in job else job.get('company', {}).get('name', 'Unknown'),
-                location=job['location'],
-                match_score=match_score,
-                match_reasons=reasons,
-                salary_match=_check_salary_match(job, preferences),
-                location_match=_check_location_match(job, preferences),
-                skills_match_score=_calculate_skills_match(job, preferences),
-                title_match_score=_calculate_title_match(job, preferences),
-                experience_match=_check_experience_match(job, preferences),
-                recommended_action=_get_recommendation(match_score),
-                confidence_level=_get_confidence_level(match_score),
-                custom_cover_letter_suggested=match_score > 85
-            )
-            
-            matches.append(job_match)
-    
-    # Sort by match score
-    matches.sort(key=lambda x: x.match_score, reverse=True)
-    
-    return matches[:limit]
-
-
-def _calculate_match_score(job: dict, preferences: ApplicationPreferences) -> tuple:
-    """Calculate AI match score and reasons."""
-    score = 0
-    reasons = []
-    max_score = 100
-    
-    # Title matching (30 points)
-    title_score = _calculate_title_match(job, preferences)
-    score += title_score * 0.3
-    if title_score > 70:
-        reasons.append(f"Strong title match ({title_score:.0f}%)")
-    
-    # Skills matching (25 points)
-    skills_score = _calculate_skills_match(job, preferences)
-    score += skills_score * 0.25
-    if skills_score > 60:
-        reasons.append(f"Good skills alignment ({skills_score:.0f}%)")
-    
-    # Location matching (15 points)
-    location_score = 100 if _check_location_match(job, preferences) else 20
-    score += location_score * 0.15
-    if location_score == 100:
-        reasons.append("Perfect location match")
-    
-    # Experience level matching (15 points)
-    exp_score = 100 if _check_experience_match(job, preferences) else 30
-    score += exp_score * 0.15
-    if exp_score == 100:
-        reasons.append("Experience level matches")
-    
-    # Salary matching (10 points)
-    salary_match = _check_salary_match(job, preferences)
-    if salary_match is True:
-        score += 10
-        reasons.append("Salary within range")
-    elif salary_match is False:
-        score += 3
-    else:
-        score += 7  # Unknown salary
-    
-    # Company size preference (5 points)
-    if preferences.company_sizes:
-        company_size = _infer_company_size(job)
-        if company_size in preferences.company_sizes:
-            score += 5
-            reasons.append(f"Preferred company size ({company_size})")
-    else:
-        score += 5  # No preference = full points
-    
-    return min(score, max_score), reasons
-
-
-def _calculate_title_match(job: dict, preferences: ApplicationPreferences) -> float:
-    """Calculate title matching score."""
-    job_title = job.get('title', '').lower()
-    
-    if not preferences.job_titles:
-        return 50  # Neutral score if no preferences
-    
-    max_match = 0
-    for preferred_title in preferences.job_titles:
-        preferred_title = preferred_title.lower()
-        
-        # Exact match
-        if preferred_title in job_title or job_title in preferred_title:
-            max_match = max(max_match, 100)
-        
-        # Keyword overlap
-        job_words = set(job_title.split())
-        pref_words = set(preferred_title.split())
-        overlap = len(job_words.intersection(pref_words))
-        total_words = len(job_words.union(pref_words))
-        
-        if total_words > 0:
-            similarity = (overlap / total_words) * 100
-            max_match = max(max_match, similarity)
-    
-    return max_match
-
-
-def _calculate_skills_match(job: dict, preferences: ApplicationPreferences) -> float:
-    """Calculate skills matching score."""
-    job_desc = (job.get('description', '') + ' ' + job.get('requirements', '')).lower()
-    
-    required_skills = [skill.lower() for skill in preferences.skills_required]
-    nice_skills = [skill.lower() for skill in preferences.skills_nice_to_have]
-    
-    if not required_skills and not nice_skills:
-        return 60  # Neutral score
-    
-    required_matches = sum(1 for skill in required_skills if skill in job_desc)
-    nice_matches = sum(1 for skill in nice_skills if skill in job_desc)
-    
-    total_required = len(required_skills) if required_skills else 1
-    total_nice = len(nice_skills) if nice_skills else 1
-    
-    # Weight required skills more heavily
-    required_score = (required_matches / total_required) * 70
-    nice_score = (nice_matches / total_nice) * 30
-    
-    return required_score + nice_score
-
-
-def _check_location_match(job: dict, preferences: ApplicationPreferences) -> bool:
-    """Check if job location matches preferences."""
-    job_location = job.get('location', '').lower()
-    
-    for pref_location in preferences.preferred_locations:
-        if pref_location.lower() in job_location:
-            return True
-    
-    # Check remote preferences
-    if preferences.remote_preference in ['remote', 'any']:
-        if 'remote' in job_location or 'work from home' in job.get('description', '').lower():
-            return True
-    
-    return False
-
-
-def _check_experience_match(job: dict, preferences: ApplicationPreferences) -> bool:
-    """Check if experience level matches."""
-    job_level = job.get('job_level', 'mid').lower()
-    return job_level in [level.lower() for level in preferences.job_levels]
-
-
-def _check_salary_match(job: dict, preferences: ApplicationPreferences) -> Optional[bool]:
-    """Check salary match. Returns None if salary unknown."""
-    job_salary_min = job.get('salary_min')
-    job_salary_max = job.get('salary_max')
-    
-    if not job_salary_min and not job_salary_max:
-        return None  # Salary unknown
-    
-    pref_min = preferences.salary_min
-    pref_max = preferences.salary_max
-    
-    if not pref_min and not pref_max:
-        return True  # No preference
-    
-    # Check if there's overlap between ranges
-    job_min = job_salary_min or 0
-    job_max = job_salary_max or float('inf')
-    user_min = pref_min or 0
-    user_max = pref_max or float('inf')
-    
-    return not (job_max < user_min or job_min > user_max)
-
-
-def _get_match_level(plan: str) -> JobMatchLevel:
-    """Get match level based on user plan."""
-    if plan == "executive":
-        return JobMatchLevel.EXECUTIVE
-    elif plan == "pro":
-        return JobMatchLevel.ADVANCED
-    else:
-        return JobMatchLevel.BASIC
-
-
-def _get_recommendation(score: float) -> str:
-    """Get recommendation based on match score."""
-    if score >= 85:
-        return "apply"
-    elif score >= 70:
-        return "consider"
-    else:
-        return "skip"
-
-
-def _get_confidence_level(score: float) -> str:
-    """Get confidence level based on match score."""
-    if score >= 85:
-        return "high"
-    elif score >= 70:
-        return "medium"
-    else:
-        return "low"
-
-
-def _infer_company_size(job: dict) -> str:
-    """Infer company size from job posting."""
-    company_name = job.get('company', {}).get('name', '').lower() if isinstance(job.get('company'), dict) else job.get('company_name', '').lower()
-    description = job.get('description', '').lower()
-    
-    # Known large companies
-    large_companies = ['google', 'microsoft', 'amazon', 'facebook', 'apple', 'shoprite', 'pick n pay', 'vodacom', 'mtn']
-    if any(company in company_name for company in large_companies):
-        return 'large'
-    
-    # Check for size indicators in description
-    if any(term in description for term in ['multinational', 'fortune', 'global leader', '1000+ employees']):
-        return 'large'
-    elif any(term in description for term in ['startup', 'young company', 'growing team', 'small team']):
-        return 'startup'
-    elif any(term in description for term in ['established company', 'medium-sized', '50-200 employees']):
-        return 'medium'
-    
-    return 'medium'  # Default
-
-
 async def _queue_job_application(user: dict, job: dict, background_tasks: BackgroundTasks, db) -> str:
     """Queue job application for processing."""
     
@@ -652,13 +402,15 @@ async def _schedule_next_application_check(user_id: str, preferences: Applicatio
 
 
 async def _run_matching_for_user(user_id: str, preferences: ApplicationPreferences):
-    """Background task to run matching for a user."""
+    """Background task to recompile a user's match plan and rebuild their matches."""
     try:
-        # This would run the full matching algorithm
-        # and potentially auto-apply to top matches
+        matcher = await get_auto_apply_matcher()
+        await matcher.update_user(user_id, preferences.dict())
+        matches = await matcher.backfill_user(user_id)
         
         add_scraping_breadcrumb("Background matching completed", data={
-            "user_id": user_id
+            "user_id": user_id,
+            "matches": matches
         })
         
     except Exception as e:
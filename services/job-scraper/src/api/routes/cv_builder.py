@@ -5,23 +5,19 @@ Supports CV creation, editing, ATS scoring, keyword recommendations, and PDF exp
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, validator
 from datetime import datetime
 from enum import Enum
 import secrets
 import json
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
 
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 from src.api.routes.auth import get_current_user
 from src.utils.database import get_database
 from src.utils.cache import get_cache_manager
+from src.processors.cv_export import get_cv_export_service
+from src.processors.ats_scorer import get_ats_scorer
 from src.lib.planFeatures import hasFeature
 
 router = APIRouter()
@@ -327,11 +323,16 @@ async def update_cv(
 @router.get("/{cv_id}/ats-score", response_model=ATSScore, tags=["CV Builder"])
 async def get_ats_score(
     cv_id: str,
+    job_title: Optional[str] = None,
+    industry: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
     """
     Get detailed ATS optimization score for a CV.
+    
+    Keywords are scored against postings for job_title and industry when
+    given, otherwise for the most recent role on the CV.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -346,23 +347,24 @@ async def get_ats_score(
             raise HTTPException(status_code=404, detail="CV not found")
         
         cv_data = cv[0]
+        targeted = bool(job_title or industry)
         
-        # Return cached score or recalculate
-        if cv_data['ats_score']:
+        # Return cached score or recalculate; scores for a specific target are not stored
+        if cv_data['ats_score'] and not targeted:
             return ATSScore(**json.loads(cv_data['ats_score']))
         
-        # Recalculate if not cached
         sections = json.loads(cv_data['sections']) if cv_data['sections'] else []
         template = CVTemplate(cv_data['template'])
         sections_obj = [CVSection(**s) for s in sections]
         
-        ats_score = await _calculate_ats_score(sections_obj, template)
+        ats_score = await _calculate_ats_score(sections_obj, template, job_title, industry)
         
         # Cache the score
-        await db.execute(
-            "UPDATE cvs SET ats_score = ? WHERE id = ?",
-            (json.dumps(ats_score.dict()), cv_id)
-        )
+        if not targeted:
+            await db.execute(
+                "UPDATE cvs SET ats_score = ? WHERE id = ?",
+                (json.dumps(ats_score.dict()), cv_id)
+            )
         
         return ats_score
         
@@ -405,7 +407,7 @@ async def get_keyword_suggestions(
         sections_obj = [CVSection(**s) for s in sections]
         
         # Generate keyword suggestions based on job title and industry
-        suggestions = await _generate_keyword_suggestions(sections_obj, job_title, industry, db)
+        suggestions = await _generate_keyword_suggestions(sections_obj, job_title, industry)
         
         return suggestions
         
@@ -424,6 +426,9 @@ async def export_cv_pdf(
 ):
     """
     Export CV as PDF.
+    
+    Returns the PDF directly, or for large CVs that are not already rendered,
+    202 with an export job whose download_url serves the PDF once it is ready.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -438,20 +443,24 @@ async def export_cv_pdf(
             raise HTTPException(status_code=404, detail="CV not found")
         
         cv_data = cv[0]
-        sections = json.loads(cv_data['sections']) if cv_data['sections'] else []
-        
-        # Generate PDF
-        pdf_buffer = await _generate_pdf(
-            title=cv_data['title'],
-            template=CVTemplate(cv_data['template']),
-            sections=[CVSection(**s) for s in sections]
-        )
-        
-        # Return PDF as streaming response
-        return StreamingResponse(
-            io.BytesIO(pdf_buffer),
+        title = cv_data['title']
+        template = CVTemplate(cv_data['template']).value
+        sections = [CVSection(**s).dict() for s in (json.loads(cv_data['sections']) if cv_data['sections'] else [])]
+        
+        exporter = await get_cv_export_service()
+        content_hash = exporter.content_hash(title, template, sections)
+        pdf = await exporter.get_cached(content_hash)
+        
+        if pdf is None:
+            if exporter.is_large(sections):
+                job = await exporter.submit(current_user['id'], content_hash, title, template, sections)
+                return JSONResponse(status_code=202, content=job, headers={"Location": job['download_url']})
+            pdf = await exporter.render(content_hash, title, template, sections)
+        
+        return Response(
+            content=pdf,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={cv_data['title']}.pdf"}
+            headers={"Content-Disposition": f"attachment; filename={title}.pdf"}
         )
         
     except HTTPException:
@@ -461,6 +470,47 @@ async def export_cv_pdf(
         raise HTTPException(status_code=500, detail="Failed to export PDF")
 
 
+@router.get("/exports/{job_id}", tags=["CV Builder"])
+async def download_cv_export(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Download a background CV export, or get its status while it is rendering.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        exporter = await get_cv_export_service()
+        job = await exporter.get_job(job_id, current_user['id'])
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Export not found")
+        
+        if job['status'] == "failed":
+            raise HTTPException(status_code=500, detail="Failed to export PDF")
+        
+        if job['status'] != "completed":
+            return JSONResponse(status_code=202, content=exporter.public_job(job))
+        
+        pdf = await exporter.get_cached(job['content_hash'])
+        if pdf is None:
+            raise HTTPException(status_code=410, detail="Export has expired")
+        
+        return Response(
+            content=pdf,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename={job['filename']}"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        capture_api_error(e, endpoint=f"/cv-builder/exports/{job_id}", method="GET")
+        raise HTTPException(status_code=500, detail="Failed to download export")
+
+
 @router.get("/templates/", tags=["CV Builder"])
 async def get_available_templates(
     current_user: dict = Depends(get_current_user)
@@ -553,7 +603,40 @@ async def delete_cv(
 
 # Helper functions
 
-async def _calculate_ats_score(sections: List[CVSection], template: CVTemplate) -> ATSScore:
+def _cv_text(sections: List[CVSection]) -> str:
+    """All text content of a CV's sections."""
+    parts = []
+    for section in sections:
+        if isinstance(section.content, dict):
+            for value in section.content.values():
+                if isinstance(value, str):
+                    parts.append(value)
+                elif isinstance(value, list):
+                    parts.extend(str(item) for item in value)
+    return "\n".join(parts)
+
+
+def _target_role(sections: List[CVSection]) -> Optional[str]:
+    """Most recent job title on the CV, used as the target role when none is given."""
+    for section in sorted(sections, key=lambda s: s.order):
+        if section.section_type == 'experience' and isinstance(section.content, dict):
+            for key in ('job_title', 'title', 'position', 'role'):
+                value = section.content.get(key)
+                if isinstance(value, str) and value.strip():
+                    return value
+    return None
+
+
+def _postings_description(postings: int, target: str) -> str:
+    return f"{postings} {target} postings" if target else f"{postings} job postings"
+
+
+async def _calculate_ats_score(
+    sections: List[CVSection],
+    template: CVTemplate,
+    job_title: Optional[str] = None,
+    industry: Optional[str] = None
+) -> ATSScore:
     """Calculate ATS optimization score."""
     
     # Initialize scores
@@ -598,22 +681,29 @@ async def _calculate_ats_score(sections: List[CVSection], template: CVTemplate)
         format_points += 5
     format_score = format_points
     
-    # Keyword score (0-30 points) - simplified analysis
-    total_content = ""
-    for section in sections:
-        if isinstance(section.content, dict):
-            for key, value in section.content.items():
-                if isinstance(value, str):
-                    total_content += value + " "
-    
-    word_count = len(total_content.split())
-    if word_count > 200:
-        keyword_score = 25
-    elif word_count > 100:
-        keyword_score = 15
+    # Keyword score (0-30 points) - coverage of the target role's posting keywords
+    cv_text = _cv_text(sections)
+    scorer = await get_ats_scorer()
+    report = scorer.score(cv_text, job_title or _target_role(sections), industry)
+    
+    if report is not None:
+        keyword_score = round(report.coverage * 30, 1)
+        missing_keywords = [keyword for keyword, _, _ in report.missing[:10]]
+        if report.coverage < 0.5 and missing_keywords:
+            recommendations.append(
+                f"Add keywords common in {_postings_description(report.postings, report.target)}, "
+                f"such as {', '.join(missing_keywords[:5])}"
+            )
     else:
-        keyword_score = 5
-        recommendations.append("Add more detailed content to improve keyword relevance")
+        # No postings loaded yet; fall back to content length
+        word_count = len(cv_text.split())
+        if word_count > 200:
+            keyword_score = 25
+        elif word_count > 100:
+            keyword_score = 15
+        else:
+            keyword_score = 5
+            recommendations.append("Add more detailed content to improve keyword relevance")
     
     # Readability score (0-20 points)
     readability_score = 18  # Base good score
@@ -644,116 +734,34 @@ async def _calculate_ats_score(sections: List[CVSection], template: CVTemplate)
 async def _generate_keyword_suggestions(
     sections: List[CVSection], 
     job_title: Optional[str], 
-    industry: Optional[str],
-    db
+    industry: Optional[str]
 ) -> List[KeywordSuggestion]:
-    """Generate keyword suggestions based on job title and industry."""
+    """Suggest the keywords most common in postings for the target role that the CV lacks."""
     
-    suggestions = []
+    scorer = await get_ats_scorer()
+    report = scorer.score(_cv_text(sections), job_title or _target_role(sections), industry)
+    if report is None or not report.missing:
+        return []
     
-    # Common professional keywords
-    professional_keywords = [
-        "leadership", "management", "strategic planning", "team collaboration",
-        "project management", "problem solving", "communication", "analytical"
-    ]
-    
-    # Industry-specific keywords
-    industry_keywords = {
-        "technology": ["agile", "scrum", "DevOps", "cloud computing", "API", "database"],
-        "finance": ["financial analysis", "budgeting", "risk management", "compliance"],
-        "marketing": ["digital marketing", "SEO", "content strategy", "brand management"],
-        "retail": ["customer service", "sales", "inventory management", "merchandising"]
-    }
-    
-    # Add professional keywords
-    for keyword in professional_keywords[:5]:  # Limit to top 5
+    suggestions = []
+    top_weight = report.missing[0][1]
+    title_words = set(report.target.split())
+    postings = _postings_description(report.postings, report.target)
+    
+    for rank, (keyword, weight, share) in enumerate(report.missing[:15]):
+        if title_words.intersection(keyword.split()):
+            section = "summary"
+        elif share >= 0.3:
+            section = "skills"
+        else:
+            section = "experience"
+        
         suggestions.append(KeywordSuggestion(
             keyword=keyword,
-            relevance_score=0.8,
-            section_suggested="summary",
-            context=f"Include '{keyword}' in your professional summary",
-            priority="medium"
+            relevance_score=round(weight / top_weight, 2),
+            section_suggested=section,
+            context=f"'{keyword}' appears in {share:.0%} of {postings}",
+            priority="high" if rank < 5 else "medium" if rank < 10 else "low"
         ))
     
-    # Add industry-specific keywords
-    if industry and industry.lower() in industry_keywords:
-        for keyword in industry_keywords[industry.lower()][:3]:  # Limit to top 3
-            suggestions.append(KeywordSuggestion(
-                keyword=keyword,
-                relevance_score=0.9,
-                section_suggested="skills",
-                context=f"Add '{keyword}' to your skills section",
-                priority="high"
-            ))
-    
-    # Job title specific suggestions
-    if job_title:
-        title_words = job_title.lower().split()
-        for word in title_words:
-            if len(word) > 3:  # Skip short words
-                suggestions.append(KeywordSuggestion(
-                    keyword=word,
-                    relevance_score=1.0,
-                    section_suggested="summary",
-                    context=f"Ensure '{word}' appears in your summary to match the job title",
-                    priority="high"
-                ))
-    
     return suggestions
-
-
-async def _generate_pdf(title: str, template: CVTemplate, sections: List[CVSection]) -> bytes:
-    """Generate PDF from CV data."""
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Sort sections by order
-    sorted_sections = sorted(sections, key=lambda x: x.order)
-    
-    for section in sorted_sections:
-        if not section.is_visible:
-            continue
-            
-        # Section title
-        section_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            textColor='navy'
-        )
-        story.append(Paragraph(section.title, section_style))
-        
-        # Section content
-        if isinstance(section.content, dict):
-            content_text = ""
-            for key, value in section.content.items():
-                if isinstance(value, str):
-                    content_text += f"{value}\n"
-                elif isinstance(value, list):
-                    content_text += "\n".join(str(item) for item in value) + "\n"
-            
-            if content_text.strip():
-                story.append(Paragraph(content_text, styles['Normal']))
-                story.append(Spacer(1, 0.1*inch))
-    
-    # Build PDF
-    doc.build(story)
-    pdf_data = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_data
@@ -21,6 +21,8 @@ from src.api.models.user import User
 from src.utils.database import get_database
 from src.utils.cache import get_cache
 from src.config.settings import settings
+from src.processors.alert_percolator import get_alert_percolator
+from src.processors.digest_worker import get_digest_worker
 
 router = APIRouter()
 
@@ -173,6 +175,12 @@ async def create_job_alert(
             alert_data.status
         )
         
+        # Start routing newly ingested jobs to this alert, and fill its
+        # buffer with matching jobs already in the alert window
+        percolator = await get_alert_percolator()
+        if await percolator.add_alert(result):
+            await percolator.backfill_alert(result["alert_id"])
+        
         return JobAlert(**result)
         
     except HTTPException:
@@ -262,6 +270,12 @@ async def update_job_alert(
             alert_data.status
         )
         
+        # Re-index the alert's criteria (removes it if no longer active) and
+        # rebuild its buffer when they changed
+        percolator = await get_alert_percolator()
+        if await percolator.add_alert(result):
+            await percolator.backfill_alert(alert_id)
+        
         return JobAlert(**result)
         
     except HTTPException:
@@ -297,6 +311,9 @@ async def delete_job_alert(
                 detail="Alert not found"
             )
         
+        percolator = await get_alert_percolator()
+        await percolator.remove_alert(alert_id)
+        
         return {"message": "Alert deleted successfully", "alert_id": alert_id}
         
     except HTTPException:
@@ -389,7 +406,7 @@ async def generate_digest(
         digest = await _generate_weekly_digest(current_user, db)
         
         # Send email in background
-        background_tasks.add_task(_send_digest_email, current_user.email, digest)
+        background_tasks.add_task(_send_digest_email, current_user, digest)
         
         return digest
         
@@ -724,7 +741,11 @@ async def subscribe_to_weekly_digest(
 # ==========================================
 
 async def _find_matching_jobs(alert: Dict[str, Any], db, limit: int = 50) -> List[Dict[str, Any]]:
-    """Find jobs matching alert criteria."""
+    """
+    Find jobs matching alert criteria with a direct query.
+    
+    Only used to preview an alert; digests read the percolator's buffers.
+    """
     # Build job search query based on alert criteria
     conditions = ["1=1"]
     params = []
@@ -787,7 +808,7 @@ async def _find_matching_jobs(alert: Dict[str, Any], db, limit: int = 50) -> Lis
 async def _generate_weekly_digest(user: User, db) -> JobAlertDigest:
     """Generate weekly job alert digest for user."""
     # Get user's active alerts
-    alerts_query = "SELECT * FROM job_alerts WHERE user_id = $1 AND status = 'active'"
+    alerts_query = "SELECT alert_id FROM job_alerts WHERE user_id = $1 AND status = 'active'"
     alerts = await db.fetch_all(alerts_query, user.id)
     
     if not alerts:
@@ -796,56 +817,17 @@ async def _generate_weekly_digest(user: User, db) -> JobAlertDigest:
             detail="No active alerts found"
         )
     
-    all_matches = []
-    alert_ids = []
-    
-    # Find matches for each alert
-    for alert in alerts:
-        matches = await _find_matching_jobs(alert, db, limit=20)
-        all_matches.extend(matches)
-        alert_ids.append(alert["alert_id"])
-    
-    # Remove duplicates and get top matches
-    unique_matches = {job["job_id"]: job for job in all_matches}.values()
-    top_matches = sorted(unique_matches, key=lambda x: x.get("salary_max", 0), reverse=True)[:10]
+    # Same path as the scheduled digest run, for a shard of one user
+    worker = await get_digest_worker()
+    digest = await worker.build_user_digest({
+        "user_id": user.id,
+        "email": user.email,
+        "first_name": getattr(user, "first_name", None),
+        "alert_ids": [str(alert["alert_id"]) for alert in alerts]
+    })
+    await worker.db.bulk_insert_digests([digest])
     
-    # Generate insights
-    new_companies = await _find_new_companies(user.id, db)
-    salary_insights = await _calculate_salary_insights(all_matches)
-    market_trends = await _analyze_market_trends(all_matches)
-    
-    digest = JobAlertDigest(
-        user_id=user.id,
-        alert_ids=alert_ids,
-        jobs_count=len(unique_matches),
-        top_matches=list(top_matches),
-        new_companies=new_companies,
-        salary_insights=salary_insights,
-        market_trends=market_trends
-    )
-    
-    # Store digest in database
-    query = """
-    INSERT INTO job_alert_digests
-    (digest_id, user_id, alert_ids, jobs_count, top_matches,
-     new_companies, salary_insights, market_trends)
-    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-    RETURNING *
-    """
-    
-    result = await db.fetch_one(
-        query,
-        digest.digest_id,
-        digest.user_id,
-        digest.alert_ids,
-        digest.jobs_count,
-        digest.top_matches,
-        digest.new_companies,
-        digest.salary_insights,
-        digest.market_trends
-    )
-    
-    return JobAlertDigest(**result)
+    return JobAlertDigest(**digest)
 
 async def _generate_company_research(company: Dict[str, Any], db) -> CompanyResearch:
     """Generate comprehensive company research."""
@@ -1025,85 +1007,13 @@ async def _generate_market_intelligence(
         "confidence_score": 85.7
     }
 
-async def _find_new_companies(user_id: str, db) -> List[Dict[str, Any]]:
-    """Find companies that are new to the platform or newly hiring."""
-    query = """
-    SELECT c.company_id, c.company_name, c.industry, c.size,
-           COUNT(j.job_id) as new_openings
-    FROM companies c
-    LEFT JOIN jobs j ON c.company_id = j.company_id
-    WHERE j.created_at >= NOW() - INTERVAL '7 days'
-    AND c.company_id NOT IN (
-        SELECT DISTINCT company_id FROM jobs j2
-        WHERE j2.created_at < NOW() - INTERVAL '30 days'
-        AND j2.created_at >= NOW() - INTERVAL '90 days'
-    )
-    GROUP BY c.company_id, c.company_name, c.industry, c.size
-    HAVING COUNT(j.job_id) > 0
-    ORDER BY new_openings DESC
-    LIMIT 5
-    """
-    
-    results = await db.fetch_all(query)
-    return [dict(result) for result in results]
-
-async def _calculate_salary_insights(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate salary insights from job matches."""
-    if not jobs:
-        return {"message": "No salary data available"}
-    
-    salaries = [job.get("salary_max", 0) for job in jobs if job.get("salary_max")]
-    
-    if not salaries:
-        return {"message": "No salary data available"}
-    
-    return {
-        "average_salary": sum(salaries) / len(salaries),
-        "median_salary": sorted(salaries)[len(salaries) // 2],
-        "salary_range": {"min": min(salaries), "max": max(salaries)},
-        "total_jobs_with_salary": len(salaries)
-    }
-
-async def _analyze_market_trends(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Analyze market trends from job data."""
-    if not jobs:
-        return {"message": "Insufficient data for trend analysis"}
-    
-    # Analyze job levels
-    levels = [job.get("job_level", "unknown") for job in jobs]
-    level_distribution = {level: levels.count(level) for level in set(levels)}
-    
-    # Analyze industries
-    industries = [job.get("industry", "unknown") for job in jobs]
-    industry_distribution = {industry: industries.count(industry) for industry in set(industries)}
-    
-    return {
-        "job_level_distribution": level_distribution,
-        "industry_distribution": industry_distribution,
-        "remote_percentage": len([j for j in jobs if j.get("is_remote")]) / len(jobs) * 100,
-        "trending_keywords": ["Python", "AWS", "React", "Leadership", "Innovation"]
-    }
-
 async def _calculate_industry_trends(location: str, time_period: str, db) -> Dict[str, Any]:
     """Calculate industry trends for location and time period."""
     # Convert time period to days
     period_days = {"7d": 7, "30d": 30, "90d": 90, "6m": 180, "1y": 365}
     days = period_days.get(time_period, 30)
     
-    query = """
-    SELECT c.industry, COUNT(j.job_id) as job_count,
-           AVG(j.salary_max) as avg_salary,
-           COUNT(DISTINCT j.company_id) as company_count
-    FROM jobs j
-    LEFT JOIN companies c ON j.company_id = c.company_id
-    WHERE j.location ILIKE $1 
-    AND j.created_at >= NOW() - INTERVAL '$2 days'
-    GROUP BY c.industry
-    ORDER BY job_count DESC
-    LIMIT 10
-    """
-    
-    results = await db.fetch_all(query, f"%{location}%", days)
+    results = await db.get_industry_trends(location, since=datetime.utcnow() - timedelta(days=days))
     
     return {
         "industry_rankings": [dict(result) for result in results],
@@ -1114,82 +1024,17 @@ async def _calculate_industry_trends(location: str, time_period: str, db) -> Dic
 
 async def _calculate_salary_benchmarks(role: str, location: str, experience_level: Optional[str], db) -> Dict[str, Any]:
     """Calculate salary benchmarks for specific role."""
-    conditions = ["title ILIKE $1", "location ILIKE $2"]
-    params = [f"%{role}%", f"%{location}%"]
-    param_count = 2
-    
-    if experience_level:
-        param_count += 1
-        conditions.append(f"job_level = ${param_count}")
-        params.append(experience_level)
-    
-    query = f"""
-    SELECT salary_min, salary_max, job_level, company_size,
-           EXTRACT(EPOCH FROM (NOW() - created_at))/86400 as days_old
-    FROM jobs j
-    LEFT JOIN companies c ON j.company_id = c.company_id
-    WHERE {' AND '.join(conditions)}
-    AND salary_max IS NOT NULL
-    AND created_at >= NOW() - INTERVAL '90 days'
-    ORDER BY created_at DESC
-    """
-    
-    results = await db.fetch_all(query, *params)
+    benchmarks = await db.get_salary_benchmarks(
+        role,
+        location,
+        experience_level=experience_level,
+        since=datetime.utcnow() - timedelta(days=90)
+    )
     
-    if not results:
+    if not benchmarks:
         return {"message": "Insufficient salary data for benchmarking"}
     
-    salaries = [r["salary_max"] for r in results if r["salary_max"]]
-    
-    return {
-        "role": role,
-        "sample_size": len(results),
-        "percentiles": {
-            "p25": sorted(salaries)[len(salaries) // 4],
-            "p50": sorted(salaries)[len(salaries) // 2],
-            "p75": sorted(salaries)[3 * len(salaries) // 4],
-            "p90": sorted(salaries)[9 * len(salaries) // 10]
-        },
-        "average": sum(salaries) / len(salaries),
-        "by_experience": _group_by_experience(results),
-        "by_company_size": _group_by_company_size(results)
-    }
-
-def _group_by_experience(results: List[Dict]) -> Dict[str, Dict]:
-    """Group salary data by experience level."""
-    grouped = {}
-    for result in results:
-        level = result.get("job_level", "unknown")
-        if level not in grouped:
-            grouped[level] = []
-        if result.get("salary_max"):
-            grouped[level].append(result["salary_max"])
-    
-    return {
-        level: {
-            "average": sum(salaries) / len(salaries),
-            "count": len(salaries)
-        }
-        for level, salaries in grouped.items() if salaries
-    }
-
-def _group_by_company_size(results: List[Dict]) -> Dict[str, Dict]:
-    """Group salary data by company size."""
-    grouped = {}
-    for result in results:
-        size = result.get("company_size", "unknown")
-        if size not in grouped:
-            grouped[size] = []
-        if result.get("salary_max"):
-            grouped[size].append(result["salary_max"])
-    
-    return {
-        size: {
-            "average": sum(salaries) / len(salaries),
-            "count": len(salaries)
-        }
-        for size, salaries in grouped.items() if salaries
-    }
+    return {"role": role, **benchmarks}
 
 async def _perform_culture_analysis(company: Dict[str, Any], db) -> Dict[str, Any]:
     """Perform enhanced company culture analysis."""
@@ -1220,8 +1065,10 @@ async def _perform_culture_analysis(company: Dict[str, Any], db) -> Dict[str, An
         }
     }
 
-async def _send_digest_email(email: str, digest: JobAlertDigest):
+async def _send_digest_email(user: User, digest: JobAlertDigest):
     """Send job alert digest via email (background task)."""
-    # Implementation would integrate with email service
-    # For now, just log the action
-    print(f"Sending digest to {email} with {digest.jobs_count} jobs")
+    worker = await get_digest_worker()
+    await worker.send_digest(
+        {"email": user.email, "first_name": getattr(user, "first_name", None)},
+        digest.dict()
+    )
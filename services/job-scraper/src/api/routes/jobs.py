@@ -3,15 +3,17 @@ Jobs API routes for comprehensive job management and retrieval.
 """
 
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, BackgroundTasks, Request, Response
 from pydantic import BaseModel, validator
 from datetime import datetime, timedelta
 import asyncio
 
+from src.api.responses import ORJSONResponse, dumps, stream_ndjson, wants_ndjson
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 from src.models.job_models import Job, JobFilter, JobSearchResponse
 from src.utils.database import get_database
-from src.utils.cache import get_cache_manager
+from src.utils.cache import get_cache_manager, cache_key_generator
+from src.utils.job_cache import get_job_detail_cache
 from src.processors.job_enricher import JobEnricher
 
 router = APIRouter()
@@ -73,6 +75,7 @@ class JobSearchRequest(BaseModel):
 
 @router.get("/", response_model=JobSearchResponse, tags=["Jobs"])
 async def search_jobs(
+    http_request: Request,
     request: JobSearchRequest = Depends(),
     db=Depends(get_database),
     cache=Depends(get_cache_manager)
@@ -80,17 +83,21 @@ async def search_jobs(
     """
     Search for jobs with advanced filtering and ranking.
     Supports semantic search, location-based filtering, and salary ranges.
+    With Accept: application/x-ndjson the matching jobs are streamed one per
+    line, with the total in the X-Total-Count header.
     """
     try:
         add_scraping_breadcrumb("Job search initiated", data=request.dict())
+        ndjson = wants_ndjson(http_request)
         
-        # Check cache first
-        cache_key = f"job_search:{hash(str(request.dict()))}"
-        cached_result = await cache.get(cache_key)
-        
-        if cached_result:
-            add_scraping_breadcrumb("Job search result served from cache")
-            return cached_result
+        # Check cache first; the rendered JSON body is cached. The key is stable
+        # across processes, unlike hash(), so every worker shares entries
+        cache_key = f"job_search:json:{cache_key_generator(request.dict())}"
+        if not ndjson:
+            cached_body = await cache.get(cache_key)
+            if cached_body:
+                add_scraping_breadcrumb("Job search result served from cache")
+                return Response(cached_body, media_type="application/json")
         
         # Build search filters
         filters = JobFilter(
@@ -105,6 +112,13 @@ async def search_jobs(
             posted_since=datetime.utcnow() - timedelta(days=request.posted_days_ago)
         )
         
+        if ndjson:
+            total_count = await db.count_jobs(filters)
+            return stream_ndjson(
+                db.iter_search_jobs(filters, limit=request.limit, offset=request.offset, sort_by=request.sort_by),
+                headers={"X-Total-Count": str(total_count)}
+            )
+        
         # Execute search
         jobs, total_count = await db.search_jobs(
             filters=filters,
@@ -113,20 +127,21 @@ async def search_jobs(
             sort_by=request.sort_by
         )
         
-        # Prepare response
-        response = JobSearchResponse(
-            jobs=jobs,
-            total=total_count,
-            limit=request.limit,
-            offset=request.offset,
-            filters=filters
-        )
+        # Rows come straight from the database, so they are rendered without
+        # re-validating them against JobSearchResponse
+        body = dumps({
+            "jobs": jobs,
+            "total": total_count,
+            "limit": request.limit,
+            "offset": request.offset,
+            "filters": filters
+        })
         
         # Cache result for 5 minutes
-        await cache.set(cache_key, response, ttl=300)
+        await cache.set(cache_key, body, ttl=300)
         
         add_scraping_breadcrumb("Job search completed", data={"total_found": total_count})
-        return response
+        return Response(body, media_type="application/json")
         
     except Exception as e:
         capture_api_error(e, endpoint="/jobs", method="GET")
@@ -137,8 +152,10 @@ async def search_jobs(
 async def get_job_by_id(
     job_id: str = Path(..., description="Job ID"),
     enrich: bool = Query(False, description="Whether to enrich job data with AI insights"),
+    include_raw_data: bool = Query(False, description="Include the scraped source payload"),
     db=Depends(get_database),
     cache=Depends(get_cache_manager),
+    job_cache=Depends(get_job_detail_cache),
     enricher: JobEnricher = Depends()
 ):
     """
@@ -146,22 +163,27 @@ async def get_job_by_id(
     Optionally enrich with AI-powered insights for Professional+ tiers.
     """
     try:
-        # Check cache first
-        cache_key = f"job:{job_id}:enriched:{enrich}"
-        cached_job = await cache.get(cache_key)
-        
-        if cached_job:
-            return cached_job
+        # Enriched jobs are cached separately from the plain detail rows
+        cache_key = f"job:{job_id}:enriched"
+        if enrich:
+            cached_job = await cache.get(cache_key)
+            if cached_job:
+                return cached_job
         
-        # Get job from database
-        job = await db.get_job_by_id(job_id)
+        # raw_data is not part of the cached detail row
+        if include_raw_data:
+            job = await db.get_job_by_id(job_id, include_raw_data=True)
+        else:
+            job = await job_cache.get(job_id)
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
+        if not enrich:
+            return ORJSONResponse(job)
+        
         # Enrich job data if requested (Professional+ feature)
-        if enrich:
-            job = await enricher.enrich_job(job)
+        job = await enricher.enrich_job(job if isinstance(job, Job) else Job(**job))
         
         # Cache for 10 minutes
         await cache.set(cache_key, job, ttl=600)
@@ -208,20 +230,21 @@ async def update_job(
     job_id: str,
     job_data: JobUpdateRequest,
     db=Depends(get_database),
-    cache=Depends(get_cache_manager)
+    cache=Depends(get_cache_manager),
+    job_cache=Depends(get_job_detail_cache)
 ):
     """Update existing job information."""
     try:
         # Check if job exists
-        existing_job = await db.get_job_by_id(job_id)
+        existing_job = await job_cache.get(job_id)
         if not existing_job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Update job
         updated_job = await db.update_job(job_id, job_data.dict(exclude_unset=True))
         
-        # Invalidate cache
-        await cache.delete_pattern(f"job:{job_id}:*")
+        # The job detail cache is invalidated by the database write
+        await cache.delete(f"job:{job_id}:enriched")
         
         return updated_job
         
@@ -236,20 +259,21 @@ async def update_job(
 async def delete_job(
     job_id: str,
     db=Depends(get_database),
-    cache=Depends(get_cache_manager)
+    cache=Depends(get_cache_manager),
+    job_cache=Depends(get_job_detail_cache)
 ):
     """Delete a job posting."""
     try:
         # Check if job exists
-        existing_job = await db.get_job_by_id(job_id)
+        existing_job = await job_cache.get(job_id)
         if not existing_job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Delete job
         await db.delete_job(job_id)
         
-        # Invalidate cache
-        await cache.delete_pattern(f"job:{job_id}:*")
+        # The job detail cache is invalidated by the database write
+        await cache.delete(f"job:{job_id}:enriched")
         
         return {"message": "Job deleted successfully"}
         
@@ -265,35 +289,32 @@ async def get_similar_jobs(
     job_id: str,
     limit: int = Query(10, le=50),
     db=Depends(get_database),
-    cache=Depends(get_cache_manager)
+    cache=Depends(get_cache_manager),
+    job_cache=Depends(get_job_detail_cache)
 ):
     """
     Get jobs similar to the specified job using AI-powered similarity matching.
     Professional+ feature.
     """
     try:
-        cache_key = f"similar_jobs:{job_id}:{limit}"
-        cached_result = await cache.get(cache_key)
+        # The rendered JSON body is cached, so hits and misses encode alike
+        cache_key = f"similar_jobs:json:{job_id}:{limit}"
+        cached_body = await cache.get(cache_key)
         
-        if cached_result:
-            return cached_result
+        if cached_body:
+            return Response(cached_body, media_type="application/json")
         
-        # Get base job
-        base_job = await db.get_job_by_id(job_id)
-        if not base_job:
+        # Find similar jobs using the stored embedding of the base job, then
+        # read their details through the job cache in one batch
+        similar_ids = await db.find_similar_job_ids(job_id, limit=limit)
+        if not similar_ids and not await job_cache.get(job_id):
             raise HTTPException(status_code=404, detail="Job not found")
-        
-        # Find similar jobs using vector similarity
-        similar_jobs = await db.find_similar_jobs(
-            job_embedding=base_job.embedding,
-            limit=limit,
-            exclude_job_id=job_id
-        )
+        body = dumps([row for row in await job_cache.get_many(similar_ids) if row])
         
         # Cache for 30 minutes
-        await cache.set(cache_key, similar_jobs, ttl=1800)
+        await cache.set(cache_key, body, ttl=1800)
         
-        return similar_jobs
+        return Response(body, media_type="application/json")
         
     except HTTPException:
         raise
@@ -3,10 +3,12 @@ Advanced search API routes with AI-powered semantic search.
 """
 
 from typing import List, Optional, Dict, Any, Union
+import uuid
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, validator
 from datetime import datetime, timedelta
 
+from src.api.responses import ORJSONResponse, stream_csv, stream_json, stream_ndjson
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 from src.utils.database import get_database
 from src.utils.cache import get_cache_manager
@@ -137,7 +139,7 @@ async def semantic_search(
         
         if cached_result:
             add_scraping_breadcrumb("Semantic search result served from cache")
-            return cached_result
+            return ORJSONResponse(cached_result)
         
         # Perform semantic search
         results = await db.semantic_search(
@@ -150,7 +152,9 @@ async def semantic_search(
             include_embeddings=request.include_embeddings
         )
         
+        search_id = uuid.uuid4().hex
         response = {
+            "search_id": search_id,
             "query": request.query,
             "search_type": request.search_type,
             "total_results": len(results),
@@ -162,11 +166,12 @@ async def semantic_search(
             }
         }
         
-        # Cache for 15 minutes
+        # Cache for 15 minutes, also by search_id for /search/export
         await cache.set(cache_key, response, ttl=900)
+        await cache.set(f"search_results:{search_id}", response, ttl=900)
         
         add_scraping_breadcrumb("Semantic search completed", data={"results_count": len(results)})
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         capture_api_error(e, endpoint="/search/semantic", method="POST")
@@ -358,7 +363,7 @@ async def get_search_market_insights(
 @router.get("/export", tags=["Search"])
 async def export_search_results(
     search_id: str = Query(..., description="Search result ID to export"),
-    export_format: str = Query("json", description="Export format: json, csv, pdf"),
+    export_format: str = Query("json", description="Export format: json, ndjson, csv, pdf"),
     include_metadata: bool = Query(True, description="Include search metadata"),
     db=Depends(get_database),
     cache=Depends(get_cache_manager)
@@ -366,17 +371,48 @@ async def export_search_results(
     """
     Export search results in various formats.
     Professional+ feature for data portability.
+    Results of a semantic search stay exportable by its search_id for 15
+    minutes; json, ndjson and csv exports are streamed.
     """
     try:
-        if export_format not in ["json", "csv", "pdf"]:
+        if export_format not in ["json", "ndjson", "csv", "pdf"]:
             raise HTTPException(status_code=400, detail="Invalid export format")
         
         # Get search results
-        search_results = await db.get_search_results_by_id(search_id)
+        search_results = await cache.get(f"search_results:{search_id}")
         
         if not search_results:
             raise HTTPException(status_code=404, detail="Search results not found")
         
+        results = search_results.get("results", [])
+        exported_at = datetime.utcnow()
+        filename = f"search-{search_id}-{exported_at:%Y%m%d%H%M%S}"
+        
+        if export_format == "json":
+            envelope = {
+                "format": export_format,
+                "search_id": search_id,
+                "exported_at": exported_at,
+                "record_count": len(results)
+            }
+            if include_metadata:
+                envelope["search_metadata"] = search_results.get("search_metadata")
+            return stream_json(results, envelope=envelope, key="export_data", headers={
+                "Content-Disposition": f'attachment; filename="{filename}.json"'
+            })
+        
+        if export_format == "ndjson":
+            return stream_ndjson(results, headers={
+                "Content-Disposition": f'attachment; filename="{filename}.ndjson"',
+                "X-Total-Count": str(len(results))
+            })
+        
+        if export_format == "csv":
+            columns = list(dict.fromkeys(column for result in results for column in result))
+            return stream_csv(results, columns, headers={
+                "Content-Disposition": f'attachment; filename="{filename}.csv"'
+            })
+        
         # Format results for export
         exported_data = await db.format_search_results_for_export(
             search_results=search_results,
@@ -388,8 +424,8 @@ async def export_search_results(
             "export_data": exported_data,
             "format": export_format,
             "search_id": search_id,
-            "exported_at": datetime.utcnow(),
-            "record_count": len(search_results.get("results", []))
+            "exported_at": exported_at,
+            "record_count": len(results)
         }
         
     except HTTPException:
@@ -4,7 +4,7 @@ WebSocket connection manager for real-time job updates and notifications.
 
 import json
 import asyncio
-from typing import Dict, List, Set, Any, Optional, Callable
+from typing import Dict, List, Set, Any, Optional, Callable, AsyncIterator, Union, TYPE_CHECKING
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from dataclasses import dataclass, asdict
@@ -13,6 +13,9 @@ import uuid
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 from src.models.job_models import Job
 
+if TYPE_CHECKING:
+    from src.api.job_stream import JobStream
+
 
 @dataclass
 class WebSocketMessage:
@@ -44,6 +47,8 @@ class SubscriptionFilter:
     salary_max: Optional[float] = None
     company: Optional[str] = None
     remote_only: Optional[bool] = None
+    job_types: Optional[List[str]] = None
+    experience_levels: Optional[List[str]] = None
     
     def matches_job(self, job: Job) -> bool:
         """Check if job matches subscription filter."""
@@ -67,6 +72,13 @@ class SubscriptionFilter:
         if self.experience_level and job.experience_level != self.experience_level:
             return False
         
+        # Any-of job type and experience level matching
+        if self.job_types and job.job_type not in self.job_types:
+            return False
+        
+        if self.experience_levels and job.experience_level not in self.experience_levels:
+            return False
+        
         # Salary matching
         if self.salary_min and job.salary_max and job.salary_max < self.salary_min:
             return False
@@ -190,8 +202,9 @@ class WebSocketClient:
 class ConnectionManager:
     """WebSocket connection manager for real-time job updates."""
     
-    def __init__(self):
+    def __init__(self, job_stream: Optional["JobStream"] = None):
         self.active_connections: Dict[str, WebSocketClient] = {}
+        self.job_stream = job_stream
         self.subscription_index: Dict[str, Set[str]] = {}  # subscription_type -> client_ids
         
         # Background tasks
@@ -393,6 +406,19 @@ class ConnectionManager:
             }
         )
     
+    async def job_update_stream(
+        self,
+        filters: Optional[Union[SubscriptionFilter, Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield newly processed jobs matching filters, for GraphQL subscriptions."""
+        if self.job_stream is None:
+            raise RuntimeError("Job stream is not configured for this connection manager")
+        
+        if isinstance(filters, dict):
+            filters = SubscriptionFilter(**filters)
+        async for job in self.job_stream.subscribe(filters or SubscriptionFilter()):
+            yield job
+    
     async def send_system_message(
         self,
         message_type: str,
@@ -24,13 +24,30 @@ class Settings(BaseSettings):
     api_port: int = Field(default=8000)
     api_prefix: str = Field(default="/api/v1")
     graphql_path: str = Field(default="/graphql")
+    graphql_max_depth: int = Field(default=8)
+    graphql_max_query_cost: int = Field(default=5000)  # See src/api/graphql/limits.py
+    graphql_cache_ttl: int = Field(default=300)  # Shared cache for search and loader results
+    job_detail_cache_ttl: int = Field(default=3600)  # Job detail rows; refreshed on ingest, dropped on update/delete
+    response_compression_min_size: int = Field(default=1000)  # Smaller bodies are sent uncompressed
+    response_gzip_level: int = Field(default=6)
+    response_brotli_quality: int = Field(default=4)  # 0-11; above ~5 costs more CPU than it saves on the wire
     ws_path: str = Field(default="/ws")
     
     # Database Configuration
     database_url: str = Field(default="postgresql://localhost:5432/jobscraper")
     database_pool_size: int = Field(default=20)
     database_max_overflow: int = Field(default=40)
-    vector_dimension: int = Field(default=768)
+    vector_dimension: int = Field(default=384)  # Changing it needs job_embedding_indexer --resize-column
+    
+    # Job embedding store (must produce vector_dimension-sized vectors). The
+    # same model as the ML services' job matching, so stored and query
+    # vectors are comparable.
+    embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2")
+    embedding_model_revision: str = Field(default="1")  # Bump to force a full re-embed
+    embedding_batch_size: int = Field(default=64)
+    embedding_backfill_enabled: bool = Field(default=True)
+    embedding_backfill_interval: int = Field(default=30)  # Seconds between idle polls
+    embedding_claim_lease: int = Field(default=300)  # Seconds a claimed batch stays reserved
     
     # Redis Configuration
     redis_url: str = Field(default="redis://localhost:6379/0")
@@ -43,11 +60,70 @@ class Settings(BaseSettings):
     kafka_topic_jobs: str = Field(default="job-updates")
     kafka_topic_analytics: str = Field(default="job-analytics")
     kafka_consumer_group: str = Field(default="job-processor")
+    kafka_topic_enriched_jobs: str = Field(default="enriched-jobs")
+    
+    # Live job stream for GraphQL subscriptions (fed from the enriched-jobs topic)
+    job_stream_queue_size: int = Field(default=100)  # Jobs buffered per subscriber
+    job_stream_slow_consumer_seconds: int = Field(default=30)  # Evict subscribers whose queue stays full this long
     
+    # Stream Deduplication
+    dedup_window_hours: int = Field(default=168)  # Match Kafka retention
+    dedup_bucket_hours: int = Field(default=6)
+    dedup_bucket_capacity: int = Field(default=100000)
+    dedup_error_rate: float = Field(default=0.001)
+    dedup_lru_size: int = Field(default=10000)
+
+    # Auto-application match index
+    auto_apply_top_n: int = Field(default=200)  # Matches kept per user
+    auto_apply_min_score: float = Field(default=70.0)  # Lowest score stored in a user's top-N
+    auto_apply_match_window_days: int = Field(default=30)  # Jobs older than this are not matched
+    auto_apply_sync_interval: int = Field(default=10)  # Seconds between preference-version checks
+
+    # Job alert percolator
+    job_alert_buffer_size: int = Field(default=100)  # Newest hits kept per alert
+    job_alert_window_days: int = Field(default=7)  # Hits older than this are dropped from digests
+    job_alert_sync_interval: int = Field(default=10)  # Seconds between alert-version checks
+
+    # Weekly digest worker
+    digest_worker_enabled: bool = Field(default=False)  # Run the worker inside the API process
+    digest_interval_hours: int = Field(default=168)
+    digest_shard_size: int = Field(default=500)  # Users per shard
+    digest_concurrent_shards: int = Field(default=2)
+    digest_worker_index: int = Field(default=0)  # Users are split between worker processes
+    digest_worker_count: int = Field(default=1)  # by a hash of the user id
+    digest_top_matches: int = Field(default=10)  # Jobs listed per digest
+    digest_lock_ttl: int = Field(default=14400)  # Seconds a cycle lock outlives a crashed holder
+    digest_smtp_host: str = Field(default="localhost")
+    digest_smtp_port: int = Field(default=1025)
+    digest_sender: str = Field(default="AI Job Chommie <noreply@aijobchommie.co.za>")
+    digest_email_batch_size: int = Field(default=100)  # Emails per SMTP connection
+
+    # Market intelligence rollups
+    market_rollup_enabled: bool = Field(default=True)
+    market_rollup_refresh_interval: int = Field(default=300)  # Seconds between dirty-day refreshes
+    market_rollup_backfill_days: int = Field(default=365)  # Days rolled up on first start
+    market_rollup_compression: float = Field(default=100.0)  # t-digest accuracy vs. size
+    market_rollup_lock_ttl: int = Field(default=1800)  # Seconds before a crashed holder's lock expires
+
+    # CV PDF export
+    cv_export_workers: int = Field(default=2)  # Rendering processes
+    cv_export_cache_ttl: int = Field(default=86400)  # Rendered PDFs and export job records
+    cv_export_inline_max_chars: int = Field(default=20000)  # Larger CVs are exported in the background
+
+    # ATS keyword scoring
+    ats_scoring_enabled: bool = Field(default=True)
+    ats_corpus_days: int = Field(default=180)  # Postings the term statistics are built from
+    ats_terms_per_job: int = Field(default=40)  # Top TF-IDF terms counted per posting
+    ats_refresh_interval: int = Field(default=600)  # Seconds between loads of new postings
+    ats_rebuild_hours: int = Field(default=24)  # Full rebuild, so old postings leave the window
+    ats_min_role_postings: int = Field(default=5)  # Smaller roles fall back to industry statistics
+
     # Authentication Configuration
     jwt_secret_key: str = Field(default="your-secret-key-change-in-production")
     jwt_algorithm: str = Field(default="HS256")
     jwt_expiration_hours: int = Field(default=168)  # 7 days
+    auth_token_cache_size: int = Field(default=10000)  # 0 disables the verified-token cache
+    auth_token_cache_ttl: int = Field(default=300)  # Upper bound on cached token lifetime
     password_salt: str = Field(default="your-password-salt-change-in-production")
     
     # External API Configuration
@@ -115,6 +191,8 @@ class Settings(BaseSettings):
     rate_limit_per_domain: int = Field(default=10)
     rate_limit_window: int = Field(default=60)
     adaptive_rate_limiting: bool = Field(default=True)
+    rate_limit_shared_state: bool = Field(default=False)  # Share per-domain budgets via Redis
+    api_rate_limit_algorithm: str = Field(default="gcra")  # gcra or sliding_window
     
     # Monitoring
     prometheus_port: int = Field(default=9090)
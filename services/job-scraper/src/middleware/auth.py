@@ -3,7 +3,9 @@ Authentication middleware for API security and user tier management.
 """
 
 import jwt
-from typing import Optional, Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -83,12 +85,40 @@ class TierFeatures:
         }
     }
 
+    # Precomputed by _build_feature_masks(): one bit per feature, one mask per tier
+    FEATURE_BITS: Dict[str, int] = {}
+    TIER_MASKS: Dict[str, int] = {}
+    ALL_FEATURES_MASK = -1  # Every bit set, including features added later
+
+    @classmethod
+    def _build_feature_masks(cls):
+        """Assign a bit to every known feature and build per-tier bitsets."""
+        cls.FEATURE_BITS = {}
+        for tier_config in cls.TIER_FEATURES.values():
+            for feature in tier_config.get("features", []):
+                if feature != "all" and feature not in cls.FEATURE_BITS:
+                    cls.FEATURE_BITS[feature] = 1 << len(cls.FEATURE_BITS)
+
+        cls.TIER_MASKS = {}
+        for tier, tier_config in cls.TIER_FEATURES.items():
+            features = tier_config.get("features", [])
+            if "all" in features:
+                cls.TIER_MASKS[tier] = cls.ALL_FEATURES_MASK
+            else:
+                mask = 0
+                for feature in features:
+                    mask |= cls.FEATURE_BITS[feature]
+                cls.TIER_MASKS[tier] = mask
+
     @classmethod
     def has_feature(cls, tier: str, feature: str) -> bool:
         """Check if a tier has access to a specific feature."""
-        tier_config = cls.TIER_FEATURES.get(tier, {})
-        features = tier_config.get("features", [])
-        return "all" in features or feature in features
+        mask = cls.TIER_MASKS.get(tier, 0)
+        bit = cls.FEATURE_BITS.get(feature)
+        if bit is None:
+            # Unknown features are only granted to "all" tiers
+            return mask == cls.ALL_FEATURES_MASK
+        return bool(mask & bit)
 
     @classmethod
     def get_rate_limit(cls, tier: str) -> Optional[int]:
@@ -96,6 +126,9 @@ class TierFeatures:
         return cls.TIER_FEATURES.get(tier, {}).get("api_rate_limit")
 
 
+TierFeatures._build_feature_masks()
+
+
 class JWTAuth:
     """JWT authentication handler."""
     
@@ -143,11 +176,49 @@ class JWTAuth:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
+    
+    @staticmethod
+    def authenticate(token: str) -> "AuthenticatedUser":
+        """
+        Verify a token and build its user, using the verified-token cache.
+        
+        Raises HTTPException (401) for invalid, expired or incomplete tokens.
+        """
+        user = verified_token_cache.get(token)
+        if user is not None:
+            return user
+        
+        if verified_token_cache.is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
+        payload = JWTAuth.decode_token(token)
+        user = AuthenticatedUser.from_payload(payload)
+        if not user.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload"
+            )
+        
+        verified_token_cache.set(token, user, payload.get("exp"))
+        return user
+
+
+    @staticmethod
+    def revoke_token(token: str):
+        """Stop accepting a token in this process, e.g. on logout or key rotation."""
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], options={"verify_exp": False})
+        except jwt.InvalidTokenError:
+            return
+        verified_token_cache.revoke(token, payload.get("exp"))
 
 
 class AuthenticatedUser:
@@ -159,14 +230,28 @@ class AuthenticatedUser:
         self.token_type = token_type
         self.features = TierFeatures.TIER_FEATURES.get(tier, {}).get("features", [])
         self.rate_limit = TierFeatures.get_rate_limit(tier)
+        self._feature_mask = TierFeatures.TIER_MASKS.get(tier, 0)
         
         # Additional user data
         for key, value in kwargs.items():
             setattr(self, key, value)
     
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "AuthenticatedUser":
+        """Build a user from a decoded token payload."""
+        return cls(
+            user_id=payload.get("user_id"),
+            tier=payload.get("tier", UserTier.BASIC),
+            token_type=payload.get("type", "access"),
+            **{k: v for k, v in payload.items() if k not in ["user_id", "tier", "type", "exp", "iat"]}
+        )
+    
     def has_feature(self, feature: str) -> bool:
         """Check if user has access to a feature."""
-        return TierFeatures.has_feature(self.tier, feature)
+        bit = TierFeatures.FEATURE_BITS.get(feature)
+        if bit is None:
+            return self._feature_mask == TierFeatures.ALL_FEATURES_MASK
+        return bool(self._feature_mask & bit)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -179,38 +264,130 @@ class AuthenticatedUser:
         }
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified tokens to their AuthenticatedUser.
+    
+    Keyed by a digest of the token so raw tokens are not held in memory.
+    Entries expire at the token's exp claim (capped at max_ttl seconds), so
+    a cache hit never outlives the token's validity. Revoked tokens are
+    evicted and remembered (in this process) until they expire.
+    """
+    
+    def __init__(self, max_size: int = 10000, max_ttl: int = 300):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[AuthenticatedUser, float]]" = OrderedDict()
+        self._revoked: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        """Return the cached user for a token, or None if absent or expired."""
+        if self.max_size <= 0:
+            return None
+        
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        user, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+    
+    def set(self, token: str, user: AuthenticatedUser, exp: Optional[float]):
+        """Cache a verified user until the token's expiry."""
+        if self.max_size <= 0:
+            return
+        
+        now = time.time()
+        expires_at = now + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        
+        key = self._digest(token)
+        if key in self._revoked:
+            return
+        self._entries[key] = (user, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def revoke(self, token: str, exp: Optional[float] = None):
+        """Evict a token and refuse it until its expiry (or for max_ttl if it has none)."""
+        key = self._digest(token)
+        self._entries.pop(key, None)
+        
+        now = time.time()
+        self._revoked[key] = float(exp) if exp is not None else now + self.max_ttl
+        self._revoked.move_to_end(key)
+        while self._revoked:
+            oldest_key, expires_at = next(iter(self._revoked.items()))
+            if expires_at > now and len(self._revoked) <= self.max_size:
+                break
+            del self._revoked[oldest_key]
+    
+    def is_revoked(self, token: str) -> bool:
+        """Whether a token was revoked and has not expired since."""
+        key = self._digest(token)
+        expires_at = self._revoked.get(key)
+        if expires_at is None:
+            return False
+        if time.time() >= expires_at:
+            del self._revoked[key]
+            return False
+        return True
+    
+    def clear(self):
+        """Drop all cached tokens."""
+        self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+verified_token_cache = VerifiedTokenCache(
+    max_size=settings.auth_token_cache_size,
+    max_ttl=settings.auth_token_cache_ttl
+)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = security
 ) -> AuthenticatedUser:
     """Get current authenticated user from JWT token."""
     try:
-        # Decode token
-        payload = JWTAuth.decode_token(credentials.credentials)
-        
-        # Extract user information
-        user_id = payload.get("user_id")
-        tier = payload.get("tier", UserTier.BASIC)
-        token_type = payload.get("type", "access")
-        
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload"
-            )
-        
-        # Create authenticated user
-        user = AuthenticatedUser(
-            user_id=user_id,
-            tier=tier,
-            token_type=token_type,
-            **{k: v for k, v in payload.items() if k not in ["user_id", "tier", "type", "exp", "iat"]}
-        )
+        # Verify token (cached) and build user
+        user = JWTAuth.authenticate(credentials.credentials)
         
         # Set user context for Sentry
         set_scraping_user_context(
-            user_id=user_id,
+            user_id=user.user_id,
             user_type="authenticated",
-            additional_data={"tier": tier, "token_type": token_type}
+            additional_data={"tier": user.tier, "token_type": user.token_type}
         )
         
         return user
@@ -233,21 +410,7 @@ async def get_optional_user(request: Request) -> Optional[AuthenticatedUser]:
             return None
         
         token = auth_header.split(" ")[1]
-        payload = JWTAuth.decode_token(token)
-        
-        user_id = payload.get("user_id")
-        tier = payload.get("tier", UserTier.BASIC)
-        token_type = payload.get("type", "access")
-        
-        if not user_id:
-            return None
-        
-        return AuthenticatedUser(
-            user_id=user_id,
-            tier=tier,
-            token_type=token_type,
-            **{k: v for k, v in payload.items() if k not in ["user_id", "tier", "type", "exp", "iat"]}
-        )
+        return JWTAuth.authenticate(token)
         
     except Exception:
         return None
@@ -393,29 +556,15 @@ async def get_api_key_user(
 ) -> AuthenticatedUser:
     """Get user from API key token."""
     try:
-        payload = JWTAuth.decode_token(credentials.credentials)
+        user = JWTAuth.authenticate(credentials.credentials)
         
-        if payload.get("type") != "api_key":
+        if user.token_type != "api_key":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token type for API access"
             )
         
-        user_id = payload.get("user_id")
-        tier = payload.get("tier", UserTier.BASIC)
-        
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key"
-            )
-        
-        return AuthenticatedUser(
-            user_id=user_id,
-            tier=tier,
-            token_type="api_key",
-            **{k: v for k, v in payload.items() if k not in ["user_id", "tier", "type", "exp", "iat"]}
-        )
+        return user
         
     except HTTPException:
         raise
@@ -0,0 +1,139 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Replaces Starlette's GZipMiddleware: brotli is used when the client accepts
+it and the brotli package is installed, gzip otherwise. Streamed responses
+are compressed chunk by chunk and flushed after each chunk, so JSON/NDJSON
+streams stay streamed and clients can start parsing before the end.
+"""
+
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.settings import settings
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Already compressed, or must not be buffered by an encoder
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/pdf",
+                            "application/zip", "application/gzip")
+
+# Responses that never carry a body, so must not gain a Content-Encoding
+NO_BODY_STATUS_CODES = (204, 304)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred encoding we support from an Accept-Encoding header, if any."""
+    offered: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            offered[coding.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in (("br",) if HAS_BROTLI else ()) + ("gzip",):
+        quality = offered.get(coding, offered.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=settings.response_brotli_quality)
+            self._process, self._flush, self._finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(settings.response_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def encode(self, data: bytes, more_body: bool) -> bytes:
+        return self._process(data) + (self._flush() if more_body else self._finish())
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, whichever the client prefers."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "")
+                passthrough = (message["status"] in NO_BODY_STATUS_CODES or "content-encoding" in headers
+                               or media_type.startswith(UNCOMPRESSED_MEDIA_TYPES))
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held until the first body chunk shows whether it is worth compressing
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                if not more_body and (not body or len(body) < self.minimum_size):
+                    await send(start)
+                    await send(message)
+                    start = None
+                    passthrough = True
+                    return
+
+                encoder = _Encoder(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = encoder.encode(body, more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            await send({"type": "http.response.body", "body": encoder.encode(body, more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
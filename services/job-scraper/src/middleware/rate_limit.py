@@ -4,6 +4,9 @@ Advanced rate limiting middleware with tier-based limits and intelligent throttl
 
 import time
 import asyncio
+import itertools
+import math
+import uuid
 from typing import Dict, Optional, Tuple, Any
 from fastapi import HTTPException, status, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -28,12 +31,115 @@ class RateLimitExceeded(HTTPException):
         )
 
 
+# GCRA: one GET + one SET per request, executed atomically in a single round
+# trip. The stored value is the theoretical arrival time (TAT) on the Redis
+# clock; a request is allowed while TAT stays within one window of now.
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local emission_interval = window / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission_interval
+local allow_at = new_tat - window
+if allow_at > now then
+    return {0, 0, tostring(allow_at - now), tostring(tat - now)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+local remaining = math.floor((window - (new_tat - now)) / emission_interval)
+return {1, remaining, '0', tostring(new_tat - now)}
+"""
+
+# Sliding window log in one round trip. Members carry a unique suffix so
+# concurrent requests with the same timestamp don't collapse into one entry.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = window - (now - tonumber(oldest[2]))
+    end
+    return {0, count, tostring(retry_after)}
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(window))
+return {1, count + 1, '0'}
+"""
+
+
+class TokenBucket:
+    """In-process token bucket used when Redis is unavailable."""
+    
+    __slots__ = ("capacity", "refill_rate", "tokens", "updated_at")
+    
+    def __init__(self, capacity: int, window: int, now: float):
+        self.capacity = capacity
+        self.refill_rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated_at = now
+    
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated_at = now
+    
+    def consume(self, now: float) -> bool:
+        """Take one token if available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def retry_after(self) -> float:
+        """Seconds until the next token is available."""
+        return (1 - self.tokens) / self.refill_rate if self.tokens < 1 else 0.0
+    
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
 class RateLimiter:
-    """Redis-based rate limiter with sliding window."""
+    """
+    Redis-based rate limiter.
     
-    def __init__(self):
+    Supports GCRA (default, single atomic round trip per request) and a
+    sliding-window log, both as Lua scripts. Falls back to in-process token
+    buckets when Redis is unavailable.
+    """
+    
+    ALGORITHMS = ("gcra", "sliding_window")
+    # GCRA stores a string TAT and the log a ZSET, so each gets its own keys
+    KEY_PREFIXES = {"gcra": "gcra", "sliding_window": "swl"}
+    
+    def __init__(self, algorithm: Optional[str] = None):
         self.redis_client: Optional[redis.Redis] = None
-        self.fallback_storage: Dict[str, Dict] = {}  # In-memory fallback
+        self.fallback_storage: Dict[str, TokenBucket] = {}  # In-memory fallback
+        self.algorithm = algorithm or settings.api_rate_limit_algorithm
+        if self.algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {self.algorithm}")
+        
+        self._gcra_script = None
+        self._sliding_window_script = None
+        self._request_counter = itertools.count()
+        self._member_prefix = uuid.uuid4().hex[:8]
+        self._last_cleanup = time.time()
         
     async def initialize(self):
         """Initialize Redis connection."""
@@ -44,11 +150,17 @@ class RateLimiter:
                 decode_responses=True
             )
             await self.redis_client.ping()
-            add_scraping_breadcrumb("Rate limiter initialized with Redis")
+            self._gcra_script = self.redis_client.register_script(GCRA_SCRIPT)
+            self._sliding_window_script = self.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+            add_scraping_breadcrumb(f"Rate limiter initialized with Redis ({self.algorithm})")
         except Exception as e:
             add_scraping_breadcrumb(f"Redis connection failed, using in-memory storage: {str(e)}")
             self.redis_client = None
     
+    def _redis_key(self, key: str) -> str:
+        """Namespace a limit key by algorithm."""
+        return f"{self.KEY_PREFIXES[self.algorithm]}:{key}"
+    
     async def is_allowed(
         self,
         key: str,
@@ -83,58 +195,49 @@ class RateLimiter:
         current_time: float,
         identifier: str = None
     ) -> Tuple[bool, Dict[str, Any]]:
-        """Check rate limit using Redis sliding window."""
+        """Check rate limit with a single scripted Redis round trip."""
         try:
-            pipe = self.redis_client.pipeline()
-            
-            # Remove expired entries
-            pipe.zremrangebyscore(key, 0, current_time - window)
-            
-            # Count current requests
-            pipe.zcard(key)
-            
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-            
-            # Set expiration
-            pipe.expire(key, window)
-            
-            results = await pipe.execute()
-            current_count = results[1]
-            
-            # Check if limit exceeded
-            if current_count >= limit:
-                # Remove the request we just added since it's not allowed
-                await self.redis_client.zrem(key, str(current_time))
-                
-                # Calculate retry after
-                oldest_request = await self.redis_client.zrange(key, 0, 0, withscores=True)
-                retry_after = window
-                if oldest_request:
-                    retry_after = int(window - (current_time - oldest_request[0][1]))
-                
-                return False, {
-                    "current_count": current_count,
-                    "limit": limit,
-                    "window": window,
-                    "retry_after": max(1, retry_after),
-                    "identifier": identifier
-                }
-            
-            return True, {
-                "current_count": current_count + 1,
-                "limit": limit,
-                "window": window,
-                "remaining": limit - current_count - 1,
-                "identifier": identifier
-            }
+            if self.algorithm == "gcra":
+                return await self._check_gcra_limit(key, limit, window, identifier)
+            return await self._check_sliding_window_limit(key, limit, window, current_time, identifier)
             
         except Exception as e:
             add_scraping_breadcrumb(f"Redis rate limit check failed: {str(e)}")
             # Fall back to memory-based limiting
             return await self._check_memory_limit(key, limit, window, current_time, identifier)
     
-    async def _check_memory_limit(
+    async def _check_gcra_limit(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        identifier: str = None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """Check rate limit using the GCRA script."""
+        allowed, remaining, retry_after, reset_after = await self._gcra_script(
+            keys=[self._redis_key(key)], args=[limit, window]
+        )
+        remaining = int(remaining)
+        
+        if not allowed:
+            return False, {
+                "current_count": limit,
+                "limit": limit,
+                "window": window,
+                "retry_after": max(1, math.ceil(float(retry_after))),
+                "identifier": identifier
+            }
+        
+        return True, {
+            "current_count": limit - remaining,
+            "limit": limit,
+            "window": window,
+            "remaining": remaining,
+            "reset_after": float(reset_after),
+            "identifier": identifier
+        }
+    
+    async def _check_sliding_window_limit(
         self,
         key: str,
         limit: int,
@@ -142,63 +245,92 @@ class RateLimiter:
         current_time: float,
         identifier: str = None
     ) -> Tuple[bool, Dict[str, Any]]:
-        """Check rate limit using in-memory storage."""
-        if key not in self.fallback_storage:
-            self.fallback_storage[key] = {"requests": [], "last_cleanup": current_time}
-        
-        storage = self.fallback_storage[key]
-        
-        # Clean up old requests periodically
-        if current_time - storage["last_cleanup"] > 60:  # Cleanup every minute
-            storage["requests"] = [
-                req_time for req_time in storage["requests"]
-                if current_time - req_time < window
-            ]
-            storage["last_cleanup"] = current_time
-        
-        # Remove expired requests
-        storage["requests"] = [
-            req_time for req_time in storage["requests"]
-            if current_time - req_time < window
-        ]
-        
-        current_count = len(storage["requests"])
-        
-        if current_count >= limit:
-            oldest_request = min(storage["requests"]) if storage["requests"] else current_time
-            retry_after = int(window - (current_time - oldest_request))
-            
+        """Check rate limit using the sliding-window log script."""
+        member = f"{current_time}:{self._member_prefix}:{next(self._request_counter)}"
+        allowed, current_count, retry_after = await self._sliding_window_script(
+            keys=[self._redis_key(key)], args=[current_time, window, limit, member]
+        )
+        current_count = int(current_count)
+        
+        if not allowed:
             return False, {
                 "current_count": current_count,
                 "limit": limit,
                 "window": window,
-                "retry_after": max(1, retry_after),
+                "retry_after": max(1, int(float(retry_after))),
                 "identifier": identifier
             }
         
-        # Add current request
-        storage["requests"].append(current_time)
+        return True, {
+            "current_count": current_count,
+            "limit": limit,
+            "window": window,
+            "remaining": limit - current_count,
+            "identifier": identifier
+        }
+    
+    async def _check_memory_limit(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        current_time: float,
+        identifier: str = None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """Check rate limit using an in-memory token bucket."""
+        # Drop idle (full) buckets periodically so storage stays bounded
+        if current_time - self._last_cleanup > 60:
+            self.fallback_storage = {
+                k: bucket for k, bucket in self.fallback_storage.items()
+                if not bucket.is_full(current_time)
+            }
+            self._last_cleanup = current_time
+        
+        bucket = self.fallback_storage.get(key)
+        if bucket is None or bucket.capacity != limit:
+            bucket = TokenBucket(limit, window, current_time)
+            self.fallback_storage[key] = bucket
         
+        if not bucket.consume(current_time):
+            return False, {
+                "current_count": limit,
+                "limit": limit,
+                "window": window,
+                "retry_after": max(1, math.ceil(bucket.retry_after())),
+                "identifier": identifier
+            }
+        
+        remaining = int(bucket.tokens)
         return True, {
-            "current_count": current_count + 1,
+            "current_count": limit - remaining,
             "limit": limit,
             "window": window,
-            "remaining": limit - current_count - 1,
+            "remaining": remaining,
             "identifier": identifier
         }
     
-    async def get_usage_stats(self, key: str, window: int) -> Dict[str, Any]:
-        """Get current usage statistics for a key."""
+    async def get_usage_stats(self, key: str, window: int, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get current usage statistics for a key.
+        
+        GCRA and token-bucket usage is derived from the stored state, so
+        the limit is needed to report a request count.
+        """
         current_time = time.time()
         
         if self.redis_client:
             try:
-                # Count requests in current window
-                count = await self.redis_client.zcount(
-                    key,
-                    current_time - window,
-                    current_time
-                )
+                if self.algorithm == "sliding_window":
+                    # Count requests in current window
+                    count = await self.redis_client.zcount(
+                        self._redis_key(key),
+                        current_time - window,
+                        current_time
+                    )
+                else:
+                    tat = await self.redis_client.get(self._redis_key(key))
+                    backlog = max(0.0, float(tat) - current_time) if tat else 0.0
+                    count = math.ceil(backlog / (window / limit)) if limit else None
                 
                 return {
                     "current_count": count,
@@ -209,15 +341,11 @@ class RateLimiter:
                 pass
         
         # Fallback to memory storage
-        if key in self.fallback_storage:
-            storage = self.fallback_storage[key]
-            valid_requests = [
-                req_time for req_time in storage["requests"]
-                if current_time - req_time < window
-            ]
-            
+        bucket = self.fallback_storage.get(key)
+        if bucket is not None:
+            bucket._refill(current_time)
             return {
-                "current_count": len(valid_requests),
+                "current_count": bucket.capacity - int(bucket.tokens),
                 "window": window,
                 "timestamp": current_time
             }
@@ -371,7 +499,8 @@ class TierBasedRateLimiter:
         overall_config = self.tier_limits.get(user.tier, self.tier_limits[UserTier.BASIC])
         overall_stats = await self.rate_limiter.get_usage_stats(
             base_key,
-            overall_config["window"]
+            overall_config["window"],
+            overall_config["limit"]
         )
         stats["overall"] = {**overall_stats, "config": overall_config}
         
@@ -381,7 +510,8 @@ class TierBasedRateLimiter:
             endpoint_config = self._get_rate_limit_config(user, endpoint)
             endpoint_stats = await self.rate_limiter.get_usage_stats(
                 endpoint_key,
-                endpoint_config["window"]
+                endpoint_config["window"],
+                endpoint_config["limit"]
             )
             stats["endpoint"] = {**endpoint_stats, "config": endpoint_config}
         
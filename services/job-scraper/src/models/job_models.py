@@ -4,7 +4,7 @@ Supports all pricing tiers and features.
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 from pydantic import BaseModel, Field, HttpUrl, validator
 from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text, Boolean, ForeignKey
@@ -12,6 +12,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 
+from src.config.settings import settings
+
 Base = declarative_base()
 
 
@@ -93,7 +95,7 @@ class JobListing(Base):
     match_scores = Column(JSON)  # User-specific match scores
     
     # Vector Embedding for semantic search
-    embedding = Column(Vector(768))
+    embedding = Column(Vector(settings.vector_dimension))
     
     # Executive Features
     is_executive = Column(Boolean, default=False)
@@ -346,6 +348,21 @@ class JobSearchQuery(BaseModel):
         return v
 
 
+class JobFilter(BaseModel):
+    """Filters applied by Database.search_jobs."""
+    query: Optional[str] = None
+    location: Optional[str] = None
+    company: Optional[str] = None
+    job_type: Optional[str] = None
+    job_types: Optional[List[str]] = None
+    experience_level: Optional[str] = None
+    experience_levels: Optional[List[str]] = None
+    salary_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+    remote_only: bool = False
+    skills: Optional[List[str]] = None
+    posted_since: Optional[datetime] = None
+
+
 class JobMatchResult(BaseModel):
     """Job match result with scoring."""
     job: JobListingResponse
@@ -359,4 +376,3 @@ class JobMatchResult(BaseModel):
 
 # Alias for backward compatibility with existing imports
 Job = JobListingResponse
-JobFilter = JobSearchQuery
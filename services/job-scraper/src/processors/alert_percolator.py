@@ -0,0 +1,449 @@
+"""
+Reverse search for job alerts.
+
+Instead of running one SQL scan per alert per digest, alert criteria are
+compiled once and indexed by their keyword and location terms (combined
+when an alert has both). Each ingested job is looked up against that index,
+the few candidate alerts are checked in full, and hits are appended to a
+bounded per-alert buffer. Digests read the buffers.
+"""
+
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error
+from src.processors.auto_apply_matcher import (
+    MAX_PHRASE_TOKENS,
+    REMOTE_TERM,
+    JobFeatures,
+    MatchStore,
+    contains_phrase,
+    normalize_phrase,
+)
+from src.utils.cache import get_cache_manager
+from src.utils.database import Database, get_database
+
+
+@dataclass(frozen=True)
+class AlertQuery:
+    """A job alert's criteria compiled into normalized phrases and filters."""
+    alert_id: str
+    user_id: str
+    keywords: Tuple[str, ...]
+    location: Optional[str]
+    remote_ok: bool
+    salary_min: Optional[float]
+    salary_max: Optional[float]
+    job_level: Optional[str]
+    exclude_companies: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, alert: Dict[str, Any]) -> "AlertQuery":
+        job_level = (alert.get("job_level") or "").lower() or None
+        if job_level and job_level.endswith("_level"):
+            job_level = job_level[:-len("_level")]
+
+        return cls(
+            alert_id=str(alert["alert_id"]),
+            user_id=str(alert.get("user_id")),
+            keywords=tuple(p for p in map(normalize_phrase, alert.get("keywords") or []) if p),
+            location=normalize_phrase(alert.get("location") or "") or None,
+            remote_ok=bool(alert.get("remote_ok")),
+            # NUMERIC columns arrive as Decimal, and as strings after a Redis round trip
+            salary_min=float(alert["salary_min"]) if alert.get("salary_min") else None,
+            salary_max=float(alert["salary_max"]) if alert.get("salary_max") else None,
+            job_level=job_level,
+            exclude_companies=frozenset(c.lower() for c in alert.get("exclude_companies") or []),
+        )
+
+    def anchor_terms(self) -> Set[str]:
+        """
+        Index terms: every job this alert matches produces at least one.
+
+        Keywords are OR-ed, so each keyword is a keyword term (its first
+        token when it is longer than the job n-grams); the location (or
+        remote, when accepted) gives the location terms.
+        When an alert has both, it is indexed under their combinations so
+        that a common keyword alone does not make it a candidate for jobs
+        everywhere. An alert with no criteria matches every job.
+        """
+        keyword_terms = {
+            f"k:{keyword}" if keyword.count(" ") < MAX_PHRASE_TOKENS else f"k:{keyword.split(' ', 1)[0]}"
+            for keyword in self.keywords
+        }
+        location_terms = set()
+        if self.location:
+            location_terms.add(f"l:{self.location.split(' ', 1)[0]}")
+        if self.remote_ok:
+            location_terms.add(REMOTE_TERM)
+
+        if keyword_terms and location_terms:
+            return {f"{k}|{l}" for k in keyword_terms for l in location_terms}
+        return keyword_terms or location_terms
+
+    def matches(self, features: JobFeatures) -> bool:
+        if self.keywords and not any(
+            contains_phrase(keyword, features.title_phrases, features.title_text)
+            or contains_phrase(keyword, features.text_phrases, features.text)
+            for keyword in self.keywords
+        ):
+            return False
+
+        if self.location:
+            located = contains_phrase(self.location, features.location_phrases, features.location_text)
+            if not located and not (self.remote_ok and features.remote):
+                return False
+        elif self.remote_ok and not features.remote:
+            return False
+
+        job = features.job
+        if self.salary_min and not (job.get("salary_min") and float(job["salary_min"]) >= self.salary_min):
+            return False
+        if self.salary_max and not (job.get("salary_max") and float(job["salary_max"]) <= self.salary_max):
+            return False
+        if self.job_level and features.level != self.job_level:
+            return False
+        if self.exclude_companies and features.company.lower() in self.exclude_companies:
+            return False
+        return True
+
+
+class AlertIndex:
+    """Inverted index from anchor terms to compiled alert queries."""
+
+    def __init__(self):
+        self.queries: Dict[str, AlertQuery] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._match_all: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def add(self, query: AlertQuery):
+        self.remove(query.alert_id)
+        self.queries[query.alert_id] = query
+        terms = query.anchor_terms()
+        if not terms:
+            self._match_all.add(query.alert_id)
+        for term in terms:
+            self._postings[term].add(query.alert_id)
+
+    def remove(self, alert_id: str):
+        query = self.queries.pop(alert_id, None)
+        if query is None:
+            return
+        for term in query.anchor_terms():
+            alert_ids = self._postings.get(term)
+            if alert_ids is not None:
+                alert_ids.discard(alert_id)
+                if not alert_ids:
+                    del self._postings[term]
+        self._match_all.discard(alert_id)
+
+    def candidates(self, features: JobFeatures) -> Set[str]:
+        found = set(self._match_all)
+        postings = self._postings
+
+        location_terms = [f"l:{token}" for token in features.location_tokens]
+        if features.remote:
+            location_terms.append(REMOTE_TERM)
+
+        for term in location_terms:
+            alert_ids = postings.get(term)
+            if alert_ids:
+                found.update(alert_ids)
+
+        for phrase in features.title_phrases | features.text_phrases:
+            keyword_term = f"k:{phrase}"
+            alert_ids = postings.get(keyword_term)
+            if alert_ids:
+                found.update(alert_ids)
+            for location_term in location_terms:
+                alert_ids = postings.get(f"{keyword_term}|{location_term}")
+                if alert_ids:
+                    found.update(alert_ids)
+        return found
+
+    def percolate(self, features: JobFeatures) -> List[str]:
+        """Alert ids whose full criteria match the job."""
+        return [
+            alert_id for alert_id in self.candidates(features)
+            if self.queries[alert_id].matches(features)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "alerts": len(self.queries),
+            "match_all_alerts": len(self._match_all),
+            "terms": len(self._postings),
+        }
+
+
+def build_alert_hit(features: JobFeatures) -> Dict[str, Any]:
+    """Compact job summary stored in alert buffers and shown in digests."""
+    job = features.job
+    salary_min, salary_max = job.get("salary_min"), job.get("salary_max")
+    return {
+        "job_id": features.job_id,
+        "title": job.get("title"),
+        "company_name": features.company,
+        "location": job.get("location"),
+        "salary_min": float(salary_min) if salary_min is not None else None,
+        "salary_max": float(salary_max) if salary_max is not None else None,
+        "job_level": features.level,
+        "industry": job.get("industry"),
+        "is_remote": features.remote,
+        "url": job.get("url") or job.get("source_url"),
+        "posted_at": features.posted_at,
+    }
+
+
+class AlertPercolator:
+    """Streams ingested jobs through the alert index into per-alert hit buffers."""
+
+    def __init__(
+        self,
+        db: Database,
+        redis_client=None,
+        buffer_size: Optional[int] = None,
+        window_days: Optional[int] = None
+    ):
+        self.db = db
+        self.redis = redis_client
+        self.window_days = window_days or settings.job_alert_window_days
+        self.sync_interval = settings.job_alert_sync_interval
+
+        self.index = AlertIndex()
+        self.buffers = MatchStore(
+            redis_client,
+            top_n=buffer_size or settings.job_alert_buffer_size,
+            key_prefix="job_alerts",
+            score_field="posted_at"
+        )
+
+        self._queries_key = "job_alerts:queries"
+        self._version_key = "job_alerts:queries_version"
+        self._version: Optional[int] = None
+        self._last_sync = 0.0
+
+        self.stats = {
+            "jobs_percolated": 0,
+            "candidates_checked": 0,
+            "hits": 0,
+            "backfills": 0,
+            "errors": 0,
+            "percolate_seconds": 0.0,
+        }
+
+    def _oldest(self) -> float:
+        return time.time() - self.window_days * 86400
+
+    async def load(self):
+        """Build the index from active alerts in the database."""
+        try:
+            alerts = await self.db.get_active_job_alerts()
+        except Exception as e:
+            logger.warning(f"Could not load job alerts from the database: {e}")
+            alerts = None
+
+        if alerts is None:
+            await self._load_from_redis()
+        else:
+            alerts = [dict(alert) for alert in alerts]
+            for alert in alerts:
+                self.index.add(AlertQuery.compile(alert))
+            await self._seed_redis(alerts)
+
+        self._last_sync = time.monotonic()
+        logger.info(f"Job alert index loaded: {self.index.get_stats()}")
+
+    async def _get_version(self) -> Optional[int]:
+        if self.redis is None:
+            return None
+        version = await self.redis.get(self._version_key)
+        return int(version) if version is not None else 0
+
+    async def _seed_redis(self, alerts: List[Dict[str, Any]]):
+        """
+        Replace the shared query hash with the database snapshot.
+        
+        Other processes rebuild their index from the hash whenever the
+        version moves, so it has to hold every active alert, not only the
+        ones changed through add_alert.
+        """
+        if self.redis is None:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self._queries_key)
+        if alerts:
+            pipe.hset(self._queries_key, mapping={
+                str(alert["alert_id"]): json.dumps(alert, default=str) for alert in alerts
+            })
+        pipe.incr(self._version_key)
+        results = await pipe.execute()
+        self._version = int(results[-1])
+
+    async def _load_from_redis(self):
+        if self.redis is None:
+            return
+        index = AlertIndex()
+        for alert in (await self.redis.hgetall(self._queries_key)).values():
+            index.add(AlertQuery.compile(json.loads(alert)))
+        self.index = index
+        self._version = await self._get_version()
+
+    async def sync(self):
+        """Pick up alert changes made by other processes (throttled)."""
+        if self.redis is None or time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = time.monotonic()
+        if await self._get_version() != self._version:
+            await self._load_from_redis()
+
+    async def _publish(self, alert_id: str, alert: Optional[Dict[str, Any]]):
+        if self.redis is None:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        if alert is None:
+            pipe.hdel(self._queries_key, alert_id)
+        else:
+            pipe.hset(self._queries_key, alert_id, json.dumps(alert, default=str))
+        pipe.incr(self._version_key)
+        results = await pipe.execute()
+        self._version = int(results[-1])
+
+    async def add_alert(self, alert: Dict[str, Any]) -> bool:
+        """
+        Index a created or updated alert; inactive alerts are removed.
+
+        Returns whether the alert's criteria changed. Buffered hits of the
+        old criteria are dropped then, and the caller should backfill_alert.
+        """
+        alert = dict(alert)
+        if alert.get("status", "active") != "active":
+            await self.remove_alert(alert["alert_id"])
+            return False
+        query = AlertQuery.compile(alert)
+        changed = self.index.queries.get(query.alert_id) != query
+        self.index.add(query)
+        if changed:
+            await self.buffers.clear(query.alert_id)
+        await self._publish(query.alert_id, alert)
+        return changed
+
+    async def backfill_alert(self, alert_id: str, batch_size: int = 500) -> int:
+        """Rebuild one alert's buffer from active jobs inside the alert window."""
+        query = self.index.queries.get(str(alert_id))
+        if query is None:
+            await self.buffers.clear(str(alert_id))
+            return 0
+
+        oldest = self._oldest()
+        since = datetime.fromtimestamp(oldest, timezone.utc)
+        hits: Dict[str, Dict[str, Any]] = {}
+        after_id = None
+
+        while True:
+            jobs = await self.db.get_recent_jobs_for_matching(since, limit=batch_size, after_id=after_id)
+            if not jobs:
+                break
+            after_id = jobs[-1]["id"]
+
+            for job in jobs:
+                features = JobFeatures.from_job(dict(job))
+                if features.posted_at >= oldest and query.matches(features):
+                    hits[features.job_id] = build_alert_hit(features)
+
+            if len(jobs) < batch_size:
+                break
+
+        top = sorted(hits.values(), key=lambda hit: hit["posted_at"], reverse=True)[:self.buffers.top_n]
+        await self.buffers.replace(query.alert_id, top)
+
+        self.stats["backfills"] += 1
+        return len(top)
+
+    async def remove_alert(self, alert_id: str):
+        alert_id = str(alert_id)
+        self.index.remove(alert_id)
+        await self.buffers.clear(alert_id)
+        await self._publish(alert_id, None)
+
+    async def percolate(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        Match ingested jobs against every indexed alert and buffer the hits.
+
+        Returns the number of hits buffered. Failures are logged rather than
+        raised so alert delivery never blocks ingestion.
+        """
+        start = time.perf_counter()
+        oldest = self._oldest()
+        hits = 0
+
+        try:
+            await self.sync()
+
+            hits_by_alert: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for job in jobs:
+                if not job.get("id") or job.get("is_active") is False:
+                    continue
+                features = JobFeatures.from_job(job)
+                if features.posted_at < oldest:
+                    continue
+
+                candidates = self.index.candidates(features)
+                self.stats["candidates_checked"] += len(candidates)
+
+                hit = None
+                for alert_id in candidates:
+                    if self.index.queries[alert_id].matches(features):
+                        hit = hit or build_alert_hit(features)
+                        hits_by_alert[alert_id].append(hit)
+                        hits += 1
+
+            await self.buffers.offer_many(hits_by_alert)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Job alert percolation failed: {e}")
+            capture_processing_error(e, processing_stage="job_alert_percolation")
+            return 0
+
+        self.stats["jobs_percolated"] += len(jobs)
+        self.stats["hits"] += hits
+        self.stats["percolate_seconds"] += time.perf_counter() - start
+        return hits
+
+    async def read_hits(
+        self,
+        alert_ids: List[str],
+        limit: int = 20,
+        since: Optional[datetime] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Newest buffered hits per alert, posted since the cutoff (default: the alert window)."""
+        oldest = since.replace(tzinfo=since.tzinfo or timezone.utc).timestamp() if since else self._oldest()
+        return await self.buffers.top_many([str(alert_id) for alert_id in alert_ids], limit, oldest, oldest)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "index": self.index.get_stats()}
+
+
+_percolator: Optional[AlertPercolator] = None
+
+
+async def get_alert_percolator() -> AlertPercolator:
+    """Get the process-wide percolator, loading its index on first use."""
+    global _percolator
+    if _percolator is None:
+        db = await get_database()
+        cache = await get_cache_manager()
+        percolator = AlertPercolator(db, cache.redis_client)
+        await percolator.load()
+        _percolator = percolator
+    return _percolator
@@ -0,0 +1,390 @@
+"""
+ATS keyword scoring from the jobs corpus.
+
+Term statistics are built from stored job postings: every posting's title,
+description and required skills are tokenized into unigrams and bigrams,
+and its highest TF-IDF terms are counted against its role (normalized title)
+and its company's industry. Terms are interned to integer ids, so each
+group is a small int -> int map. New postings are loaded incrementally on a
+timer; a periodic full rebuild drops postings that left the corpus window.
+
+A target role's keyword profile is the terms most common in its postings,
+weighted by IDF. Profiles are memoized until the statistics change, so
+scoring a CV is one tokenization and a set lookup per profile term.
+"""
+
+import asyncio
+import math
+import time
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error
+from src.processors.auto_apply_matcher import tokenize
+from src.processors.market_rollups import normalize_role
+from src.utils.database import Database, get_database
+
+# Keywords in a role profile
+PROFILE_SIZE = 30
+
+# Memoised (role, industry) profiles; titles are user input, so the memo is an LRU
+PROFILE_CACHE_SIZE = 4096
+
+# Most role groups merged when a target title matches several stored roles
+MAX_MERGED_ROLES = 20
+
+# Group-level counts of 1 are dropped from groups at least this large after a rebuild
+PRUNE_MIN_POSTINGS = 20
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just may me might
+more most must my no nor not now of off on once only or other our ours out over own per please
+same shall she should so some such than that the their them then there these they this those
+through to too under until up upon us very via was we were what when where which while who whom
+why will with within without would you your yours
+ability able apply applicant applicants candidate candidates company role position job jobs
+opportunity opportunities looking join team work working based strong good excellent required
+requirements requirement responsibilities responsibility including include includes new well
+minimum least years year experience experienced successful ideal key duties will within per
+south africa african gauteng johannesburg cape town durban pretoria salary market related
+""".split())
+
+
+def _keyword_tokens(text: Optional[str]) -> List[Optional[str]]:
+    """Tokens with stop words and numbers replaced by None, so bigrams never span them."""
+    return [
+        token if token not in STOP_WORDS and len(token) > 1 and not token.isdigit() else None
+        for token in tokenize(text)
+    ]
+
+
+def extract_terms(text: Optional[str]) -> Counter:
+    """Term frequencies of the unigrams and adjacent-word bigrams in text."""
+    tokens = _keyword_tokens(text)
+    terms = Counter(token for token in tokens if token)
+    terms.update(
+        f"{first} {second}" for first, second in zip(tokens, tokens[1:]) if first and second
+    )
+    return terms
+
+
+@dataclass
+class TermGroup:
+    """Postings in one role or industry and how many of them contain each term."""
+    postings: int = 0
+    counts: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class KeywordProfile:
+    """The weighted keywords of a target role."""
+    target: str  # Role or industry the statistics came from; '' for the whole corpus
+    postings: int
+    keywords: List[Tuple[str, float, float]]  # (term, weight, share of postings containing it)
+
+
+@dataclass
+class KeywordReport:
+    """How well a CV covers a role's keyword profile."""
+    target: str
+    postings: int
+    coverage: float  # Weighted share of profile keywords present, 0-1
+    matched: List[str]
+    missing: List[Tuple[str, float, float]]
+
+
+class TermStatistics:
+    """Document frequencies and per-role / per-industry term counts of a job corpus."""
+
+    def __init__(self, terms_per_job: Optional[int] = None):
+        self.terms_per_job = terms_per_job or settings.ats_terms_per_job
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.document_frequency = array("I")
+        self.documents = 0
+        self.roles: Dict[str, TermGroup] = {}
+        self.industries: Dict[str, TermGroup] = {}
+        self.role_tokens: Dict[str, Set[str]] = {}  # Title token -> roles containing it
+        self._profiles: "OrderedDict[Tuple[str, str], Optional[KeywordProfile]]" = OrderedDict()
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+            self.document_frequency.append(0)
+        return term_id
+
+    def idf(self, term_id: int) -> float:
+        return math.log((1 + self.documents) / (1 + self.document_frequency[term_id])) + 1
+
+    def add_job(self, job: Dict[str, Any]):
+        """Count one posting's terms into the corpus, its role and its industry."""
+        skills = [" ".join(token for token in _keyword_tokens(skill) if token) for skill in job.get("skills_required") or []]
+        frequencies = extract_terms(f"{job.get('title') or ''}\n{job.get('description') or ''}")
+        frequencies.update(skill for skill in skills if skill)
+        if not frequencies:
+            return
+
+        self.documents += 1
+        term_ids = {self._term_id(term): tf for term, tf in frequencies.items()}
+        for term_id in term_ids:
+            self.document_frequency[term_id] += 1
+
+        # Only a posting's most distinctive terms are counted against its groups
+        top = sorted(term_ids, key=lambda t: term_ids[t] * self.idf(t), reverse=True)[:self.terms_per_job]
+        for term in skills:
+            if term and self.vocabulary[term] not in top:
+                top.append(self.vocabulary[term])
+
+        role = normalize_role(job.get("title"))
+        industry = normalize_role(job.get("industry"))
+        if role and role not in self.roles:
+            for token in _keyword_tokens(role):
+                if token:
+                    self.role_tokens.setdefault(token, set()).add(role)
+        for key, groups in ((role, self.roles), (industry, self.industries)):
+            if not key:
+                continue
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = TermGroup()
+            group.postings += 1
+            for term_id in top:
+                group.counts[term_id] = group.counts.get(term_id, 0) + 1
+
+        self._profiles.clear()
+
+    def add_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        added = 0
+        for job in jobs:
+            self.add_job(job)
+            added += 1
+        return added
+
+    def prune(self, min_postings: int = PRUNE_MIN_POSTINGS):
+        """Drop terms seen in only one posting of a large group; they never reach a profile."""
+        for groups in (self.roles, self.industries):
+            for group in groups.values():
+                if group.postings >= min_postings:
+                    group.counts = {term_id: count for term_id, count in group.counts.items() if count > 1}
+        self._profiles.clear()
+
+    def _role_groups(self, role: str) -> List[TermGroup]:
+        """Stored roles for a target title: the exact role, or roles containing all its words."""
+        if role in self.roles:
+            return [self.roles[role]]
+        tokens = [token for token in _keyword_tokens(role) if token]
+        if not tokens:
+            return []
+        candidates = set.intersection(*(self.role_tokens.get(token, set()) for token in tokens))
+        ranked = sorted(candidates, key=lambda r: self.roles[r].postings, reverse=True)
+        return [self.roles[r] for r in ranked[:MAX_MERGED_ROLES]]
+
+    def profile(self, job_title: Optional[str], industry: Optional[str] = None, min_postings: Optional[int] = None) -> Optional[KeywordProfile]:
+        """Keyword profile of a role, falling back to its industry and then the whole corpus."""
+        if not self.documents:
+            return None
+        role = normalize_role(job_title)
+        industry = normalize_role(industry)
+        key = (role, industry)
+        if key in self._profiles:
+            self._profiles.move_to_end(key)
+            return self._profiles[key]
+
+        min_postings = min_postings or settings.ats_min_role_postings
+        postings = 0
+        counts: Counter = Counter()
+        target = role
+        for group in self._role_groups(role) if role else []:
+            postings += group.postings
+            counts.update(group.counts)
+
+        if postings < min_postings and industry in self.industries:
+            group = self.industries[industry]
+            postings, counts, target = group.postings, Counter(group.counts), industry
+        elif postings < min_postings:
+            postings, target = self.documents, ""
+            counts = Counter(dict(enumerate(self.document_frequency)))
+
+        scored = []
+        for term_id, count in counts.items():
+            if count > 1 or postings < min_postings:
+                share = count / postings
+                scored.append((self.terms[term_id], share * self.idf(term_id), share))
+        scored.sort(key=lambda keyword: keyword[1], reverse=True)
+
+        profile = KeywordProfile(target=target, postings=postings, keywords=scored[:PROFILE_SIZE]) if scored else None
+        self._profiles[key] = profile
+        if len(self._profiles) > PROFILE_CACHE_SIZE:
+            self._profiles.popitem(last=False)
+        return profile
+
+    def score(self, cv_text: str, job_title: Optional[str], industry: Optional[str] = None) -> Optional[KeywordReport]:
+        """Compare a CV against a role's keyword profile."""
+        profile = self.profile(job_title, industry)
+        if profile is None:
+            return None
+
+        present = set(extract_terms(cv_text))
+        matched, missing = [], []
+        matched_weight = total_weight = 0.0
+        for keyword in profile.keywords:
+            total_weight += keyword[1]
+            if keyword[0] in present:
+                matched.append(keyword[0])
+                matched_weight += keyword[1]
+            else:
+                missing.append(keyword)
+
+        return KeywordReport(
+            target=profile.target,
+            postings=profile.postings,
+            coverage=matched_weight / total_weight if total_weight else 0.0,
+            matched=matched,
+            missing=missing
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "vocabulary": len(self.terms),
+            "roles": len(self.roles),
+            "industries": len(self.industries),
+            "group_entries": sum(len(g.counts) for groups in (self.roles, self.industries) for g in groups.values()),
+        }
+
+
+class ATSScorer:
+    """Keeps TermStatistics current from the jobs table and scores CVs against them."""
+
+    def __init__(
+        self,
+        db: Database,
+        corpus_days: Optional[int] = None,
+        refresh_interval: Optional[int] = None,
+        rebuild_hours: Optional[int] = None,
+        batch_size: int = 1000
+    ):
+        self.db = db
+        self.corpus_days = corpus_days or settings.ats_corpus_days
+        self.refresh_interval = refresh_interval or settings.ats_refresh_interval
+        self.rebuild_hours = rebuild_hours or settings.ats_rebuild_hours
+        self.batch_size = batch_size
+
+        self.statistics = TermStatistics()
+        self._cursor: Tuple[Optional[datetime], Optional[str]] = (None, None)
+        self._built_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            "rebuilds": 0,
+            "refreshes": 0,
+            "jobs_loaded": 0,
+            "errors": 0,
+            "rebuild_seconds": 0.0,
+        }
+
+    async def _fetch_new(self, cursor: Tuple[Optional[datetime], Optional[str]]):
+        """Yield batches of postings created after cursor, advancing it."""
+        since, after_id = cursor
+        while True:
+            rows = await self.db.get_jobs_for_ats_corpus(since, after_id, self.batch_size)
+            if not rows:
+                return
+            since, after_id = rows[-1]["created_at"], str(rows[-1]["id"])
+            yield rows, (since, after_id)
+            if len(rows) < self.batch_size:
+                return
+
+    async def rebuild(self) -> int:
+        """Build fresh statistics over the corpus window and swap them in."""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        statistics = TermStatistics()
+        cursor = (datetime.now(timezone.utc) - timedelta(days=self.corpus_days), None)
+        jobs = 0
+        async for rows, cursor in self._fetch_new(cursor):
+            # Tokenizing a full corpus is CPU-bound; the new statistics are not shared yet
+            jobs += await loop.run_in_executor(None, statistics.add_jobs, rows)
+        await loop.run_in_executor(None, statistics.prune)
+
+        self.statistics, self._cursor = statistics, cursor
+        self._built_at = time.monotonic()
+        self.stats["rebuilds"] += 1
+        self.stats["jobs_loaded"] += jobs
+        self.stats["rebuild_seconds"] += time.perf_counter() - started
+        logger.info(f"ATS term statistics rebuilt: {statistics.get_stats()}")
+        return jobs
+
+    async def refresh(self) -> int:
+        """Count postings stored since the last load into the live statistics."""
+        if self._built_at is None or time.monotonic() - self._built_at > self.rebuild_hours * 3600:
+            return await self.rebuild()
+
+        jobs = 0
+        async for rows, cursor in self._fetch_new(self._cursor):
+            jobs += self.statistics.add_jobs(rows)
+            self._cursor = cursor
+        self.stats["refreshes"] += 1
+        self.stats["jobs_loaded"] += jobs
+        return jobs
+
+    def score(self, cv_text: str, job_title: Optional[str], industry: Optional[str] = None) -> Optional[KeywordReport]:
+        return self.statistics.score(cv_text, job_title, industry)
+
+    def profile(self, job_title: Optional[str], industry: Optional[str] = None) -> Optional[KeywordProfile]:
+        return self.statistics.profile(job_title, industry)
+
+    async def start(self):
+        """Start loading postings in the background."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"ATS scorer started (refresh every {self.refresh_interval}s)")
+
+    async def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_forever(self):
+        while self._running:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"ATS term statistics refresh failed: {e}")
+                capture_processing_error(e, processing_stage="ats_term_statistics")
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, **self.statistics.get_stats()}
+
+
+_scorer: Optional[ATSScorer] = None
+
+
+async def get_ats_scorer() -> ATSScorer:
+    """Get the process-wide ATS scorer."""
+    global _scorer
+    if _scorer is None:
+        _scorer = ATSScorer(await get_database())
+    return _scorer
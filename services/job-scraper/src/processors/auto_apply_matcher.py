@@ -0,0 +1,814 @@
+"""
+Incremental matching engine for auto-applications.
+
+Each user's ApplicationPreferences are compiled once into a MatchPlan. Plans
+are held in an inverted index keyed by location, title and skill tokens, so
+an ingested job is scored only against the users it can plausibly match
+instead of every user re-scanning recent jobs on each request. Every user
+keeps a bounded top-N of their best matches in Redis (a sorted set plus a
+payload hash), which makes the /matches endpoint a read.
+"""
+
+import json
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error, add_scraping_breadcrumb
+from src.utils.cache import get_cache_manager
+from src.utils.database import Database, get_database
+
+# Phrases up to this many tokens are matched through a precomputed n-gram set
+MAX_PHRASE_TOKENS = 4
+
+# Posting key for users who accept remote jobs wherever they are located
+REMOTE_TERM = "@remote"
+
+LARGE_COMPANIES = ('google', 'microsoft', 'amazon', 'facebook', 'apple', 'shoprite', 'pick n pay', 'vodacom', 'mtn')
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Keeps a user's sorted set at top_n entries and drops the payloads it trims
+_TRIM_SCRIPT = """
+local removed = redis.call('ZRANGE', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+if #removed > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+    redis.call('HDEL', KEYS[2], unpack(removed))
+end
+return #removed
+"""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens; keeps terms like c++, c# and node.js intact."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def phrases(tokens: List[str]) -> Set[str]:
+    """All contiguous token runs up to MAX_PHRASE_TOKENS long."""
+    grams = set()
+    for n in range(1, MAX_PHRASE_TOKENS + 1):
+        for i in range(len(tokens) - n + 1):
+            grams.add(" ".join(tokens[i:i + n]))
+    return grams
+
+
+def contains_phrase(phrase: str, grams: Set[str], text: str) -> bool:
+    """Word-boundary phrase containment against a precomputed n-gram set."""
+    if phrase.count(" ") < MAX_PHRASE_TOKENS:
+        return phrase in grams
+    return f" {phrase} " in f" {text} "
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+def _to_timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return _to_timestamp(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _company_name(job: Dict[str, Any]) -> str:
+    company = job.get('company_name') or job.get('company')
+    if isinstance(company, dict):
+        company = company.get('name')
+    return company or 'Unknown'
+
+
+def _infer_company_size(company_name: str, description: str) -> str:
+    """Infer company size from job posting."""
+    if any(company in company_name for company in LARGE_COMPANIES):
+        return 'large'
+
+    if any(term in description for term in ['multinational', 'fortune', 'global leader', '1000+ employees']):
+        return 'large'
+    elif any(term in description for term in ['startup', 'young company', 'growing team', 'small team']):
+        return 'startup'
+    elif any(term in description for term in ['established company', 'medium-sized', '50-200 employees']):
+        return 'medium'
+
+    return 'medium'
+
+
+def get_recommendation(score: float) -> str:
+    """Get recommendation based on match score."""
+    if score >= 85:
+        return "apply"
+    elif score >= 70:
+        return "consider"
+    return "skip"
+
+
+def get_confidence_level(score: float) -> str:
+    """Get confidence level based on match score."""
+    if score >= 85:
+        return "high"
+    elif score >= 70:
+        return "medium"
+    return "low"
+
+
+@dataclass
+class JobFeatures:
+    """Per-job tokens and derived fields, computed once and shared by every candidate user."""
+    job: Dict[str, Any]
+    job_id: str
+    title_text: str
+    title_tokens: FrozenSet[str]
+    title_phrases: Set[str]
+    text: str
+    text_tokens: FrozenSet[str]
+    text_phrases: Set[str]
+    location_text: str
+    location_tokens: FrozenSet[str]
+    location_phrases: Set[str]
+    remote: bool
+    level: str
+    company: str
+    company_size: str
+    posted_at: float
+
+    @classmethod
+    def from_job(cls, job: Dict[str, Any]) -> "JobFeatures":
+        title_tokens = tokenize(job.get('title'))
+        description = job.get('description') or ''
+        skills = job.get('skills_required') or []
+        text_tokens = tokenize(" ".join([description, job.get('requirements') or '', " ".join(skills)]))
+        location_tokens = tokenize(job.get('location'))
+        description_lower = description.lower()
+        company = _company_name(job)
+
+        level = (job.get('job_level') or job.get('experience_level') or 'mid').lower()
+        if level.endswith('_level'):
+            level = level[:-len('_level')]
+
+        return cls(
+            job=job,
+            job_id=str(job['id']),
+            title_text=" ".join(title_tokens),
+            title_tokens=frozenset(title_tokens),
+            title_phrases=phrases(title_tokens),
+            text=" ".join(text_tokens),
+            text_tokens=frozenset(text_tokens),
+            text_phrases=phrases(text_tokens),
+            location_text=" ".join(location_tokens),
+            location_tokens=frozenset(location_tokens),
+            location_phrases=phrases(location_tokens),
+            remote='remote' in location_tokens or 'work from home' in description_lower
+                   or bool(job.get('remote_friendly')),
+            level=level,
+            company=company,
+            company_size=_infer_company_size(company.lower(), description_lower),
+            posted_at=_to_timestamp(job.get('posted_date') or job.get('created_at') or job.get('scraped_date'))
+        )
+
+
+@dataclass(frozen=True)
+class MatchPlan:
+    """A user's preferences compiled into normalized terms and filters."""
+    user_id: str
+    titles: Tuple[Tuple[str, ...], ...]
+    required_skills: Tuple[str, ...]
+    nice_skills: Tuple[str, ...]
+    locations: Tuple[str, ...]
+    remote_ok: bool
+    job_levels: FrozenSet[str]
+    salary_min: Optional[float]
+    salary_max: Optional[float]
+    company_sizes: FrozenSet[str]
+    avoid_keywords: Tuple[str, ...]
+    requires_terms: bool = field(default=True)
+
+    @classmethod
+    def compile(cls, user_id: str, preferences: Dict[str, Any], min_score: float) -> "MatchPlan":
+        titles = tuple(
+            tuple(tokens) for tokens in (tokenize(title) for title in preferences.get('job_titles') or [])
+            if tokens
+        )
+        required = tuple(p for p in map(normalize_phrase, preferences.get('skills_required') or []) if p)
+        nice = tuple(p for p in map(normalize_phrase, preferences.get('skills_nice_to_have') or []) if p)
+
+        # Best score reachable with no title or skill term in common, given the
+        # location filter passed; below min_score the user only needs to be
+        # considered for jobs that share a title or skill term.
+        title_floor = 0 if titles else 50
+        skills_floor = 0 if required or nice else 60
+        best_without_terms = title_floor * 0.3 + skills_floor * 0.25 + 15 + 15 + 10 + 5
+
+        return cls(
+            user_id=str(user_id),
+            titles=titles,
+            required_skills=required,
+            nice_skills=nice,
+            locations=tuple(p for p in map(normalize_phrase, preferences.get('preferred_locations') or []) if p),
+            remote_ok=preferences.get('remote_preference', 'hybrid') in ('remote', 'any'),
+            job_levels=frozenset(level.lower() for level in preferences.get('job_levels') or []),
+            salary_min=preferences.get('salary_min'),
+            salary_max=preferences.get('salary_max'),
+            company_sizes=frozenset(preferences.get('company_sizes') or []),
+            avoid_keywords=tuple(p for p in map(normalize_phrase, preferences.get('avoid_keywords') or []) if p),
+            requires_terms=best_without_terms < min_score
+        )
+
+    def location_terms(self) -> Set[str]:
+        terms = {location.split(" ", 1)[0] for location in self.locations}
+        if self.remote_ok:
+            terms.add(REMOTE_TERM)
+        return terms
+
+    def match_terms(self) -> Set[str]:
+        terms = {token for title in self.titles for token in title}
+        terms.update(skill.split(" ", 1)[0] for skill in self.required_skills + self.nice_skills)
+        return terms
+
+    def location_match(self, features: JobFeatures) -> bool:
+        for location in self.locations:
+            if contains_phrase(location, features.location_phrases, features.location_text):
+                return True
+        return self.remote_ok and features.remote
+
+    def title_match(self, features: JobFeatures) -> float:
+        if not self.titles:
+            return 50  # Neutral score if no preferences
+
+        best = 0.0
+        for title in self.titles:
+            phrase = " ".join(title)
+            if contains_phrase(phrase, features.title_phrases, features.title_text) or (
+                features.title_text and f" {features.title_text} " in f" {phrase} "
+            ):
+                return 100
+
+            title_set = set(title)
+            total = len(features.title_tokens | title_set)
+            if total:
+                best = max(best, len(features.title_tokens & title_set) / total * 100)
+        return best
+
+    def skills_match(self, features: JobFeatures) -> float:
+        if not self.required_skills and not self.nice_skills:
+            return 60  # Neutral score
+
+        required = sum(
+            1 for skill in self.required_skills
+            if contains_phrase(skill, features.text_phrases, features.text)
+        )
+        nice = sum(
+            1 for skill in self.nice_skills
+            if contains_phrase(skill, features.text_phrases, features.text)
+        )
+
+        # Weight required skills more heavily
+        return (required / (len(self.required_skills) or 1)) * 70 + (nice / (len(self.nice_skills) or 1)) * 30
+
+    def salary_match(self, job: Dict[str, Any]) -> Optional[bool]:
+        """Range overlap; None when the job has no salary."""
+        job_min = job.get('salary_min')
+        job_max = job.get('salary_max')
+        if not job_min and not job_max:
+            return None
+        if not self.salary_min and not self.salary_max:
+            return True
+
+        return not (
+            float(job_max or float('inf')) < (self.salary_min or 0)
+            or float(job_min or 0) > (self.salary_max or float('inf'))
+        )
+
+    def score(self, features: JobFeatures) -> Optional[Dict[str, Any]]:
+        """
+        Score a job for this user.
+
+        Returns a JobMatch-shaped dict, or None when the job fails a hard
+        filter (location, avoided keyword). Each component is computed once
+        and reused for both the score and the reported fields.
+        """
+        if not self.location_match(features):
+            return None
+        for keyword in self.avoid_keywords:
+            if contains_phrase(keyword, features.title_phrases, features.title_text):
+                return None
+
+        score = 0.0
+        reasons = []
+
+        title_score = self.title_match(features)
+        score += title_score * 0.3
+        if title_score > 70:
+            reasons.append(f"Strong title match ({title_score:.0f}%)")
+
+        skills_score = self.skills_match(features)
+        score += skills_score * 0.25
+        if skills_score > 60:
+            reasons.append(f"Good skills alignment ({skills_score:.0f}%)")
+
+        score += 100 * 0.15
+        reasons.append("Perfect location match")
+
+        experience_match = features.level in self.job_levels
+        score += (100 if experience_match else 30) * 0.15
+        if experience_match:
+            reasons.append("Experience level matches")
+
+        salary_match = self.salary_match(features.job)
+        if salary_match is True:
+            score += 10
+            reasons.append("Salary within range")
+        elif salary_match is False:
+            score += 3
+        else:
+            score += 7  # Unknown salary
+
+        if self.company_sizes:
+            if features.company_size in self.company_sizes:
+                score += 5
+                reasons.append(f"Preferred company size ({features.company_size})")
+        else:
+            score += 5  # No preference = full points
+
+        score = min(score, 100)
+        return {
+            "job_id": features.job_id,
+            "job_title": features.job.get('title') or '',
+            "company": features.company,
+            "location": features.job.get('location') or '',
+            "match_score": score,
+            "match_reasons": reasons,
+            "salary_match": salary_match,
+            "location_match": True,
+            "skills_match_score": skills_score,
+            "title_match_score": title_score,
+            "experience_match": experience_match,
+            "recommended_action": get_recommendation(score),
+            "confidence_level": get_confidence_level(score),
+            "custom_cover_letter_suggested": score > 85,
+            "posted_at": features.posted_at,
+        }
+
+
+class MatchIndex:
+    """Inverted index from location / title / skill terms to user plans."""
+
+    def __init__(self):
+        self.plans: Dict[str, MatchPlan] = {}
+        self._location_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._term_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._open_users: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.plans)
+
+    def add(self, plan: MatchPlan):
+        self.remove(plan.user_id)
+        self.plans[plan.user_id] = plan
+        for term in plan.location_terms():
+            self._location_postings[term].add(plan.user_id)
+        if plan.requires_terms:
+            for term in plan.match_terms():
+                self._term_postings[term].add(plan.user_id)
+        else:
+            self._open_users.add(plan.user_id)
+
+    def remove(self, user_id: str):
+        plan = self.plans.pop(user_id, None)
+        if plan is None:
+            return
+        for postings, terms in (
+            (self._location_postings, plan.location_terms()),
+            (self._term_postings, plan.match_terms()),
+        ):
+            for term in terms:
+                users = postings.get(term)
+                if users is not None:
+                    users.discard(user_id)
+                    if not users:
+                        del postings[term]
+        self._open_users.discard(user_id)
+
+    def candidates(self, features: JobFeatures) -> Set[str]:
+        """Users whose location filter can pass and who can reach the minimum score."""
+        located = set()
+        for term in features.location_tokens:
+            located.update(self._location_postings.get(term, ()))
+        if features.remote:
+            located.update(self._location_postings.get(REMOTE_TERM, ()))
+        if not located:
+            return located
+
+        reachable = set(self._open_users)
+        for term in features.title_tokens | features.text_tokens:
+            users = self._term_postings.get(term)
+            if users:
+                reachable.update(users)
+        return located & reachable
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self.plans),
+            "open_users": len(self._open_users),
+            "location_terms": len(self._location_postings),
+            "match_terms": len(self._term_postings),
+        }
+
+
+class MatchStore:
+    """
+    Bounded top-N entries per owner (a user, an alert), ranked by score_field.
+
+    Backed by a Redis sorted set plus payload hash, or process memory without Redis.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        top_n: int = 200,
+        key_prefix: str = "auto_apply",
+        score_field: str = "match_score"
+    ):
+        self.redis = redis_client
+        self.top_n = top_n
+        self.key_prefix = key_prefix
+        self.score_field = score_field
+        self._memory: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+
+    def _keys(self, owner_id: str) -> Tuple[str, str]:
+        return f"{self.key_prefix}:matches:{owner_id}", f"{self.key_prefix}:match_data:{owner_id}"
+
+    async def offer_many(self, matches_by_owner: Dict[str, List[Dict[str, Any]]]):
+        """Add entries for many owners in one round trip, trimming each to top_n."""
+        if not matches_by_owner:
+            return
+        if self.redis is None:
+            for owner_id, matches in matches_by_owner.items():
+                self._offer_memory(owner_id, matches)
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for owner_id, matches in matches_by_owner.items():
+            zkey, hkey = self._keys(owner_id)
+            pipe.zadd(zkey, {m["job_id"]: m[self.score_field] for m in matches})
+            pipe.hset(hkey, mapping={m["job_id"]: json.dumps(m) for m in matches})
+            pipe.eval(_TRIM_SCRIPT, 2, zkey, hkey, self.top_n)
+        await pipe.execute()
+
+    def _offer_memory(self, owner_id: str, matches: List[Dict[str, Any]]):
+        entries = self._memory[owner_id]
+        for match in matches:
+            entries[match["job_id"]] = match
+        overflow = len(entries) - self.top_n
+        if overflow > 0:
+            for job_id in sorted(entries, key=lambda j: entries[j][self.score_field])[:overflow]:
+                del entries[job_id]
+
+    async def replace(self, owner_id: str, matches: List[Dict[str, Any]]):
+        """Swap an owner's entries for a freshly computed set."""
+        await self.clear(owner_id)
+        if matches:
+            await self.offer_many({owner_id: matches})
+
+    async def clear(self, owner_id: str):
+        if self.redis is None:
+            self._memory.pop(owner_id, None)
+            return
+        await self.redis.delete(*self._keys(owner_id))
+
+    async def remove_job(self, owner_ids: Iterable[str], job_id: str):
+        owner_ids = list(owner_ids)
+        if self.redis is None:
+            for owner_id in owner_ids:
+                self._memory.get(owner_id, {}).pop(job_id, None)
+            return
+        if not owner_ids:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for owner_id in owner_ids:
+            zkey, hkey = self._keys(owner_id)
+            pipe.zrem(zkey, job_id)
+            pipe.hdel(hkey, job_id)
+        await pipe.execute()
+
+    async def top(self, owner_id: str, limit: int, min_score: float, oldest: float) -> List[Dict[str, Any]]:
+        """Best matches at or above min_score, dropping any posted before oldest."""
+        return (await self.top_many([owner_id], limit, min_score, oldest))[owner_id]
+
+    async def top_many(
+        self,
+        owner_ids: List[str],
+        limit: int,
+        min_score: float,
+        oldest: float
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """top() for many owners in two pipelined round trips."""
+        if self.redis is None:
+            results = {}
+            for owner_id in owner_ids:
+                entries = self._memory.get(owner_id, {})
+                expired = [job_id for job_id, m in entries.items() if m.get("posted_at", oldest) < oldest]
+                for job_id in expired:
+                    del entries[job_id]
+                ranked = sorted(entries.values(), key=lambda m: m[self.score_field], reverse=True)
+                results[owner_id] = [m for m in ranked if m[self.score_field] >= min_score][:limit]
+            return results
+
+        pipe = self.redis.pipeline(transaction=False)
+        for owner_id in owner_ids:
+            pipe.zrevrangebyscore(self._keys(owner_id)[0], "+inf", min_score)
+        ranked_ids = await pipe.execute()
+
+        pipe = self.redis.pipeline(transaction=False)
+        for owner_id, job_ids in zip(owner_ids, ranked_ids):
+            if job_ids:
+                pipe.hmget(self._keys(owner_id)[1], job_ids)
+        payload_lists = iter(await pipe.execute())
+
+        results = {}
+        cleanup = self.redis.pipeline(transaction=False)
+        needs_cleanup = False
+        for owner_id, job_ids in zip(owner_ids, ranked_ids):
+            matches, expired = [], []
+            if job_ids:
+                for job_id, payload in zip(job_ids, next(payload_lists)):
+                    if payload is None:
+                        expired.append(job_id)
+                        continue
+                    match = json.loads(payload)
+                    if match.get("posted_at", oldest) < oldest:
+                        expired.append(job_id)
+                    elif len(matches) < limit:
+                        matches.append(match)
+            if expired:
+                zkey, hkey = self._keys(owner_id)
+                cleanup.zrem(zkey, *expired)
+                cleanup.hdel(hkey, *expired)
+                needs_cleanup = True
+            results[owner_id] = matches
+
+        if needs_cleanup:
+            await cleanup.execute()
+        return results
+
+    async def count(self, owner_id: str, min_score: float) -> int:
+        if self.redis is None:
+            return sum(1 for m in self._memory.get(owner_id, {}).values() if m[self.score_field] >= min_score)
+        zkey, _ = self._keys(owner_id)
+        return await self.redis.zcount(zkey, min_score, "+inf")
+
+
+class AutoApplyMatcher:
+    """Keeps every user's top job matches current as jobs are ingested."""
+
+    def __init__(
+        self,
+        db: Database,
+        redis_client=None,
+        top_n: Optional[int] = None,
+        min_score: Optional[float] = None,
+        window_days: Optional[int] = None
+    ):
+        self.db = db
+        self.redis = redis_client
+        self.min_score = settings.auto_apply_min_score if min_score is None else min_score
+        self.window_days = window_days or settings.auto_apply_match_window_days
+        self.sync_interval = settings.auto_apply_sync_interval
+
+        self.index = MatchIndex()
+        self.store = MatchStore(redis_client, top_n=top_n or settings.auto_apply_top_n)
+
+        self._plans_key = "auto_apply:plans"
+        self._version_key = "auto_apply:plans_version"
+        self._version: Optional[int] = None
+        self._last_sync = 0.0
+
+        self.stats = {
+            "jobs_indexed": 0,
+            "candidates_scored": 0,
+            "matches_stored": 0,
+            "backfills": 0,
+            "errors": 0,
+            "index_seconds": 0.0,
+        }
+
+    def _oldest(self) -> float:
+        return time.time() - self.window_days * 86400
+
+    def has_user(self, user_id: str) -> bool:
+        return str(user_id) in self.index.plans
+
+    async def load(self):
+        """Build the index from stored user preferences."""
+        try:
+            users = await self.db.get_auto_application_preferences()
+        except Exception as e:
+            logger.warning(f"Could not load auto-application preferences from the database: {e}")
+            users = None
+
+        if users is None:
+            await self._load_from_redis()
+        else:
+            for user in users:
+                self.index.add(MatchPlan.compile(user["id"], user["preferences"], self.min_score))
+            await self._seed_redis({str(user["id"]): user["preferences"] for user in users})
+
+        self._last_sync = time.monotonic()
+        logger.info(f"Auto-apply match index loaded: {self.index.get_stats()}")
+
+    async def _get_version(self) -> Optional[int]:
+        if self.redis is None:
+            return None
+        version = await self.redis.get(self._version_key)
+        return int(version) if version is not None else 0
+
+    async def _seed_redis(self, preferences_by_user: Dict[str, Dict[str, Any]]):
+        """
+        Replace the shared plan hash with the database snapshot.
+        
+        Other processes rebuild their index from the hash whenever the
+        version moves, so it has to hold every user, not only the ones
+        changed through update_user.
+        """
+        if self.redis is None:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self._plans_key)
+        if preferences_by_user:
+            pipe.hset(self._plans_key, mapping={
+                user_id: json.dumps(preferences, default=str)
+                for user_id, preferences in preferences_by_user.items()
+            })
+        pipe.incr(self._version_key)
+        results = await pipe.execute()
+        self._version = int(results[-1])
+
+    async def _load_from_redis(self):
+        if self.redis is None:
+            return
+        index = MatchIndex()
+        stored = await self.redis.hgetall(self._plans_key)
+        for user_id, preferences in stored.items():
+            if isinstance(user_id, bytes):
+                user_id = user_id.decode()
+            index.add(MatchPlan.compile(user_id, json.loads(preferences), self.min_score))
+        self.index = index
+        self._version = await self._get_version()
+
+    async def sync(self):
+        """Pick up preference changes made by other processes (throttled)."""
+        if self.redis is None or time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = time.monotonic()
+        if await self._get_version() != self._version:
+            await self._load_from_redis()
+
+    async def update_user(self, user_id: str, preferences: Dict[str, Any]):
+        """Recompile a user's plan and publish it to other matcher processes."""
+        user_id = str(user_id)
+        self.index.add(MatchPlan.compile(user_id, preferences, self.min_score))
+        if self.redis is not None:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hset(self._plans_key, user_id, json.dumps(preferences, default=str))
+            pipe.incr(self._version_key)
+            results = await pipe.execute()
+            self._version = int(results[-1])
+
+    async def remove_user(self, user_id: str):
+        user_id = str(user_id)
+        self.index.remove(user_id)
+        await self.store.clear(user_id)
+        if self.redis is not None:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hdel(self._plans_key, user_id)
+            pipe.incr(self._version_key)
+            results = await pipe.execute()
+            self._version = int(results[-1])
+
+    async def index_job(self, job: Dict[str, Any]) -> int:
+        return await self.index_jobs([job])
+
+    async def index_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        Score newly ingested jobs against candidate users and update their top-N.
+
+        Inactive jobs are removed from the candidates' matches instead. Returns
+        the number of matches stored. Failures are logged rather than raised:
+        the match store is derived state that backfill_user can rebuild.
+        """
+        start = time.perf_counter()
+        oldest = self._oldest()
+        stored = 0
+
+        try:
+            await self.sync()
+
+            matches_by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for job in jobs:
+                if not job.get('id'):
+                    continue
+                features = JobFeatures.from_job(job)
+                candidates = self.index.candidates(features)
+
+                if job.get('is_active') is False:
+                    await self.store.remove_job(candidates, features.job_id)
+                    continue
+                if features.posted_at < oldest:
+                    continue
+
+                self.stats["candidates_scored"] += len(candidates)
+                for user_id in candidates:
+                    match = self.index.plans[user_id].score(features)
+                    if match is not None and match["match_score"] >= self.min_score:
+                        matches_by_user[user_id].append(match)
+                        stored += 1
+
+            await self.store.offer_many(matches_by_user)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Auto-apply match indexing failed: {e}")
+            capture_processing_error(e, processing_stage="auto_apply_matching")
+            return 0
+
+        self.stats["jobs_indexed"] += len(jobs)
+        self.stats["matches_stored"] += stored
+        self.stats["index_seconds"] += time.perf_counter() - start
+        return stored
+
+    async def backfill_user(self, user_id: str, batch_size: int = 500) -> int:
+        """Rebuild one user's matches from active jobs inside the match window."""
+        plan = self.index.plans.get(str(user_id))
+        if plan is None:
+            await self.store.clear(str(user_id))
+            return 0
+
+        since = datetime.now(timezone.utc) - timedelta(days=self.window_days)
+        best: Dict[str, Dict[str, Any]] = {}
+        after_id = None
+
+        while True:
+            jobs = await self.db.get_recent_jobs_for_matching(since, limit=batch_size, after_id=after_id)
+            if not jobs:
+                break
+            after_id = jobs[-1]["id"]
+
+            for job in jobs:
+                match = plan.score(JobFeatures.from_job(job))
+                if match is not None and match["match_score"] >= self.min_score:
+                    best[match["job_id"]] = match
+
+            if len(jobs) < batch_size:
+                break
+
+        top = sorted(best.values(), key=lambda m: m["match_score"], reverse=True)[:self.store.top_n]
+        await self.store.replace(plan.user_id, top)
+
+        self.stats["backfills"] += 1
+        add_scraping_breadcrumb("Auto-apply matches rebuilt", data={
+            "user_id": plan.user_id,
+            "matches": len(top)
+        })
+        return len(top)
+
+    async def get_matches(self, user_id: str, limit: int = 20, min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Read a user's best stored matches.
+
+        Only matches scoring at least the index's min_score are kept, so a
+        lower min_score here does not widen the result.
+        """
+        min_score = self.min_score if min_score is None else min_score
+        return await self.store.top(str(user_id), limit, min_score, self._oldest())
+
+    async def count_matches(self, user_id: str, min_score: Optional[float] = None) -> int:
+        min_score = self.min_score if min_score is None else min_score
+        return await self.store.count(str(user_id), min_score)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "index": self.index.get_stats()}
+
+
+_matcher: Optional[AutoApplyMatcher] = None
+
+
+async def get_auto_apply_matcher() -> AutoApplyMatcher:
+    """Get the process-wide matcher, loading its index on first use."""
+    global _matcher
+    if _matcher is None:
+        db = await get_database()
+        cache = await get_cache_manager()
+        matcher = AutoApplyMatcher(db, cache.redis_client)
+        await matcher.load()
+        _matcher = matcher
+    return _matcher
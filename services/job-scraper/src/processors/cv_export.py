@@ -0,0 +1,205 @@
+"""
+CV PDF export.
+
+ReportLab rendering is CPU-bound, so it runs in a pool of worker processes
+instead of on the API event loop. Each worker compiles the template styles
+once at start-up (src/utils/cv_pdf.py). Rendered PDFs are cached by a hash
+of the CV content and template: downloading an unchanged CV again skips
+rendering, and concurrent exports of the same content share one render.
+Large CVs are exported in the background; the caller gets a job id and a
+download URL to poll instead of holding the request open.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error
+from src.utils.cache import CacheManager, get_cache_manager
+from src.utils.cv_pdf import RENDERER_VERSION, render_cv_pdf, warm_templates
+
+CACHE_PREFIX = "cv_export"
+
+# Job fields returned to clients; user_id and content_hash stay server-side
+PUBLIC_JOB_FIELDS = ("job_id", "status", "download_url", "filename", "created_at", "completed_at", "error")
+
+
+class CVExportService:
+    """Renders CV PDFs in worker processes, with a content-addressed PDF cache and export jobs."""
+
+    def __init__(
+        self,
+        cache: CacheManager,
+        workers: Optional[int] = None,
+        cache_ttl: Optional[int] = None,
+        inline_max_chars: Optional[int] = None
+    ):
+        self.cache = cache
+        self.workers = workers or settings.cv_export_workers
+        self.cache_ttl = cache_ttl or settings.cv_export_cache_ttl
+        self.inline_max_chars = inline_max_chars or settings.cv_export_inline_max_chars
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._jobs: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "rendered": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "jobs_submitted": 0,
+            "jobs_failed": 0,
+            "render_seconds": 0.0,
+        }
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked: the API process has an event loop and threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_templates
+            )
+        return self._executor
+
+    @staticmethod
+    def content_hash(title: str, template: str, sections: List[Dict[str, Any]]) -> str:
+        """Cache key for a rendered CV: everything that affects the PDF, and the renderer version."""
+        payload = json.dumps(
+            {"title": title, "template": template, "sections": sections, "renderer": RENDERER_VERSION},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_large(self, sections: List[Dict[str, Any]]) -> bool:
+        """Whether a CV is big enough to export in the background."""
+        size = sum(len(json.dumps(section.get("content"), default=str)) for section in sections)
+        return size > self.inline_max_chars
+
+    async def get_cached(self, content_hash: str) -> Optional[bytes]:
+        pdf = await self.cache.get(f"pdf:{content_hash}", prefix=CACHE_PREFIX)
+        if isinstance(pdf, bytes):
+            self.stats["cache_hits"] += 1
+            return pdf
+        return None
+
+    async def render(self, content_hash: str, title: str, template: str, sections: List[Dict[str, Any]]) -> bytes:
+        """Render a CV in the worker pool and cache the PDF."""
+        pending = self._inflight.get(content_hash)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[content_hash] = future
+        try:
+            start = time.perf_counter()
+            pdf = await loop.run_in_executor(self._pool(), render_cv_pdf, title, template, sections)
+            self.stats["render_seconds"] += time.perf_counter() - start
+            self.stats["rendered"] += 1
+
+            await self.cache.set(f"pdf:{content_hash}", pdf, ttl=self.cache_ttl, prefix=CACHE_PREFIX)
+            future.set_result(pdf)
+            return pdf
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here, so no warning when nothing else was waiting
+            raise
+        finally:
+            del self._inflight[content_hash]
+
+    async def submit(
+        self,
+        user_id: str,
+        content_hash: str,
+        title: str,
+        template: str,
+        sections: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Start a background export and return its public job record."""
+        job_id = secrets.token_urlsafe(16)
+        job = {
+            "job_id": job_id,
+            "status": "pending",
+            "user_id": str(user_id),
+            "content_hash": content_hash,
+            "filename": f"{title}.pdf",
+            "download_url": f"{settings.api_prefix}/cv-builder/exports/{job_id}",
+            "created_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "error": None,
+        }
+        await self._save_job(job)
+
+        task = asyncio.create_task(self._run_job(job, title, template, sections))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        self.stats["jobs_submitted"] += 1
+        return self.public_job(job)
+
+    async def _run_job(self, job: Dict[str, Any], title: str, template: str, sections: List[Dict[str, Any]]):
+        try:
+            await self.render(job["content_hash"], title, template, sections)
+            job["status"] = "completed"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["jobs_failed"] += 1
+            logger.error(f"CV export {job['job_id']} failed: {e}")
+            capture_processing_error(e, processing_stage="cv_export")
+            job["status"] = "failed"
+            job["error"] = "PDF rendering failed"
+        job["completed_at"] = datetime.utcnow().isoformat()
+        await self._save_job(job)
+
+    async def _save_job(self, job: Dict[str, Any]):
+        await self.cache.set(f"job:{job['job_id']}", job, ttl=self.cache_ttl, prefix=CACHE_PREFIX)
+
+    async def get_job(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """A user's export job, or None if it does not exist or belongs to someone else."""
+        job = await self.cache.get(f"job:{job_id}", prefix=CACHE_PREFIX)
+        if not isinstance(job, dict) or job.get("user_id") != str(user_id):
+            return None
+        return job
+
+    @staticmethod
+    def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: job.get(field) for field in PUBLIC_JOB_FIELDS}
+
+    async def stop(self):
+        """Cancel running export jobs and shut the worker pool down."""
+        for task in list(self._jobs):
+            task.cancel()
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "workers": self.workers, "inflight": len(self._inflight), "jobs_running": len(self._jobs)}
+
+
+_service: Optional[CVExportService] = None
+
+
+async def get_cv_export_service() -> CVExportService:
+    """Get the process-wide CV export service."""
+    global _service
+    if _service is None:
+        _service = CVExportService(await get_cache_manager())
+    return _service
@@ -0,0 +1,470 @@
+"""
+Scheduled weekly job alert digests.
+
+Users with active alerts are read in keyset-paginated shards. Data that is
+the same for everyone (newly hiring companies, trending skills) is fetched
+once per cycle; each shard then reads all of its alerts' percolated hits in
+one Redis round trip and the profiles of every company those hits mention in
+one query. Digests are stored with one bulk insert per shard, rendered with
+templates compiled once per process and handed to the SMTP relay in batches.
+Scheduled cycles run under a per-slice Redis lock and are timed from the last
+completed cycle recorded in Redis, so restarts and extra workers don't resend.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.charset import Charset
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Tuple
+
+from jinja2 import DictLoader, Environment, Template, select_autoescape
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error, add_scraping_breadcrumb
+from src.processors.alert_percolator import AlertPercolator, get_alert_percolator
+from src.utils.cache import get_cache_manager, redis_lock
+from src.utils.database import Database, get_database
+from src.utils.mailer import BatchMailer
+
+# Shared market data is refetched for single-user digests once it is this old
+SHARED_DATA_TTL = 3600
+
+DIGEST_TEMPLATES = {
+    "digest.txt": """\
+Hi {{ user.first_name or "there" }},
+
+{{ digest.jobs_count }} new job{{ "s" if digest.jobs_count != 1 }} matched your alerts this week.
+
+{% for job in digest.top_matches %}
+- {{ job.title }} at {{ job.company_name }}{{ " (%s)" % job.location if job.location }}
+{% if job.salary_max %}
+  Up to R{{ "{:,.0f}".format(job.salary_max) }}
+{% endif %}
+{% if job.url %}
+  {{ job.url }}
+{% endif %}
+{% endfor %}
+{% if digest.salary_insights.average_salary %}
+
+Average advertised salary: R{{ "{:,.0f}".format(digest.salary_insights.average_salary) }}
+{% endif %}
+{% if digest.new_companies %}
+
+Newly hiring: {{ digest.new_companies | map(attribute="company_name") | join(", ") }}
+{% endif %}
+{% if digest.market_trends.trending_keywords %}
+Trending skills: {{ digest.market_trends.trending_keywords | join(", ") }}
+{% endif %}
+""",
+    "digest.html": """\
+<html>
+<body style="font-family: Arial, sans-serif">
+<p>Hi {{ user.first_name or "there" }},</p>
+<p><strong>{{ digest.jobs_count }}</strong> new job{{ "s" if digest.jobs_count != 1 }} matched your alerts this week.</p>
+<table cellpadding="6">
+{% for job in digest.top_matches %}
+<tr>
+<td>
+<a href="{{ job.url or '#' }}"><strong>{{ job.title }}</strong></a><br>
+{{ job.company_name }}{% if job.location %} &middot; {{ job.location }}{% endif %}
+{% if job.company and job.company.glassdoor_rating %} &middot; {{ job.company.glassdoor_rating }}&#9733;{% endif %}
+{% if job.salary_max %}<br>Up to R{{ "{:,.0f}".format(job.salary_max) }}{% endif %}
+</td>
+</tr>
+{% endfor %}
+</table>
+{% if digest.salary_insights.average_salary %}
+<p>Average advertised salary: R{{ "{:,.0f}".format(digest.salary_insights.average_salary) }}</p>
+{% endif %}
+{% if digest.new_companies %}
+<p>Newly hiring: {{ digest.new_companies | map(attribute="company_name") | join(", ") }}</p>
+{% endif %}
+{% if digest.market_trends.trending_keywords %}
+<p>Trending skills: {{ digest.market_trends.trending_keywords | join(", ") }}</p>
+{% endif %}
+</body>
+</html>
+""",
+}
+
+# 8bit bodies: relays accept them and they skip base64 encoding on every message
+BODY_CHARSET = Charset("utf-8")
+BODY_CHARSET.body_encoding = None
+
+# Templates are compiled on first use and kept by the environment's cache
+_template_env = Environment(
+    loader=DictLoader(DIGEST_TEMPLATES),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+
+
+def get_template(name: str) -> Template:
+    return _template_env.get_template(name)
+
+
+def calculate_salary_insights(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Salary summary of a digest's matched jobs."""
+    salaries = sorted(job["salary_max"] for job in jobs if job.get("salary_max"))
+    if not salaries:
+        return {"message": "No salary data available"}
+
+    return {
+        "average_salary": sum(salaries) / len(salaries),
+        "median_salary": salaries[len(salaries) // 2],
+        "salary_range": {"min": salaries[0], "max": salaries[-1]},
+        "total_jobs_with_salary": len(salaries)
+    }
+
+
+def analyze_market_trends(jobs: List[Dict[str, Any]], trending_skills: List[str]) -> Dict[str, Any]:
+    """Level, industry and remote mix of a digest's matched jobs."""
+    if not jobs:
+        return {"message": "Insufficient data for trend analysis"}
+
+    level_distribution: Dict[str, int] = {}
+    industry_distribution: Dict[str, int] = {}
+    remote = 0
+    for job in jobs:
+        level = job.get("job_level") or "unknown"
+        industry = job.get("industry") or "unknown"
+        level_distribution[level] = level_distribution.get(level, 0) + 1
+        industry_distribution[industry] = industry_distribution.get(industry, 0) + 1
+        remote += bool(job.get("is_remote"))
+
+    return {
+        "job_level_distribution": level_distribution,
+        "industry_distribution": industry_distribution,
+        "remote_percentage": remote / len(jobs) * 100,
+        "trending_keywords": trending_skills
+    }
+
+
+class DigestWorker:
+    """Builds, stores and emails weekly alert digests for every subscribed user."""
+
+    def __init__(
+        self,
+        db: Database,
+        percolator: AlertPercolator,
+        redis_client=None,
+        mailer: Optional[BatchMailer] = None,
+        shard_size: Optional[int] = None,
+        concurrent_shards: Optional[int] = None,
+        interval_hours: Optional[int] = None
+    ):
+        self.db = db
+        self.percolator = percolator
+        self.redis = redis_client
+        self.mailer = mailer or BatchMailer()
+        self.shard_size = shard_size or settings.digest_shard_size
+        self.concurrent_shards = concurrent_shards or settings.digest_concurrent_shards
+        self.interval = (interval_hours or settings.digest_interval_hours) * 3600
+        self.top_matches = settings.digest_top_matches
+        self.hits_per_alert = max(self.top_matches * 2, 20)
+        self.lock_ttl = settings.digest_lock_ttl
+
+        # Schedule state is kept per slice of users, so slices run independently
+        slice_name = f"{settings.digest_worker_index}of{settings.digest_worker_count}"
+        self._last_cycle_key = f"digest:last_cycle:{slice_name}"
+        self._lock_key = f"digest:cycle_lock:{slice_name}"
+        self._last_cycle_at: Optional[float] = None
+
+        self._shared: Optional[Dict[str, Any]] = None
+        self._shared_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            "cycles": 0,
+            "shards": 0,
+            "users": 0,
+            "digests": 0,
+            "emails_sent": 0,
+            "empty_digests": 0,
+            "errors": 0,
+            "skipped_cycles": 0,
+            "last_cycle_seconds": 0.0,
+            "digests_per_minute": 0.0,
+        }
+
+    async def _fetch_shared(self) -> Dict[str, Any]:
+        """Market data used by every digest in a cycle."""
+        new_companies, trending = await asyncio.gather(
+            self.db.get_newly_hiring_companies(limit=5),
+            self.db.get_trending_skills(since=datetime.utcnow() - timedelta(days=7), limit=5)
+        )
+        self._shared = {
+            "new_companies": [dict(company) for company in new_companies],
+            "trending_skills": [row["skill"] for row in trending],
+        }
+        self._shared_at = time.monotonic()
+        return self._shared
+
+    async def _get_shared(self) -> Dict[str, Any]:
+        if self._shared is None or time.monotonic() - self._shared_at > SHARED_DATA_TTL:
+            return await self._fetch_shared()
+        return self._shared
+
+    def build_digest(
+        self,
+        user: Dict[str, Any],
+        hits: Dict[str, List[Dict[str, Any]]],
+        shared: Dict[str, Any],
+        companies: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Assemble one user's digest from prefetched hits and shared data (no I/O)."""
+        alert_ids = [str(alert_id) for alert_id in user["alert_ids"]]
+        all_matches = [job for alert_id in alert_ids for job in hits.get(alert_id, [])]
+        unique_matches = list({job["job_id"]: job for job in all_matches}.values())
+
+        top_matches = sorted(unique_matches, key=lambda job: job.get("salary_max") or 0, reverse=True)
+        top_matches = [
+            {**job, "company": companies.get((job.get("company_name") or "").lower())}
+            for job in top_matches[:self.top_matches]
+        ]
+
+        return {
+            "digest_id": str(uuid.uuid4()),
+            "user_id": str(user["user_id"]),
+            "alert_ids": alert_ids,
+            "jobs_count": len(unique_matches),
+            "top_matches": top_matches,
+            "new_companies": shared["new_companies"],
+            "salary_insights": calculate_salary_insights(unique_matches),
+            "market_trends": analyze_market_trends(unique_matches, shared["trending_skills"]),
+            "generated_at": datetime.utcnow(),
+        }
+
+    def render_email(self, user: Dict[str, Any], digest: Dict[str, Any]) -> MIMEMultipart:
+        # email.mime (compat32) messages build and flatten several times faster than EmailMessage
+        context = {"user": user, "digest": digest}
+        message = MIMEMultipart("alternative")
+        message["To"] = user["email"]
+        message["Subject"] = f"{digest['jobs_count']} new jobs matching your alerts"
+        message.attach(MIMEText(get_template("digest.txt").render(context), "plain", BODY_CHARSET))
+        message.attach(MIMEText(get_template("digest.html").render(context), "html", BODY_CHARSET))
+        return message
+
+    def _render_emails(self, deliverable: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[MIMEMultipart]:
+        return [self.render_email(user, digest) for user, digest in deliverable]
+
+    async def _build_shard(self, users: List[Dict[str, Any]], shared: Dict[str, Any]) -> List[Dict[str, Any]]:
+        alert_ids = [str(alert_id) for user in users for alert_id in user["alert_ids"]]
+        hits = await self.percolator.read_hits(alert_ids, limit=self.hits_per_alert)
+
+        company_names = {
+            job["company_name"] for alert_hits in hits.values() for job in alert_hits if job.get("company_name")
+        }
+        companies = {
+            company["company_name"].lower(): dict(company)
+            for company in await self.db.get_companies_by_name(list(company_names))
+        }
+        return [self.build_digest(user, hits, shared, companies) for user in users]
+
+    async def process_shard(self, users: List[Dict[str, Any]], shared: Dict[str, Any]) -> int:
+        """Build, store and send one shard's digests; returns the number emailed."""
+        digests = await self._build_shard(users, shared)
+
+        deliverable = [
+            (user, digest) for user, digest in zip(users, digests)
+            if digest["jobs_count"] and user.get("email")
+        ]
+        self.stats["empty_digests"] += len(digests) - len(deliverable)
+        if not deliverable:
+            return 0
+
+        await self.db.bulk_insert_digests([digest for _, digest in deliverable])
+        # Render off the event loop so a large shard does not stall other tasks
+        loop = asyncio.get_running_loop()
+        messages = await loop.run_in_executor(None, self._render_emails, deliverable)
+        sent = await self.mailer.send(messages)
+
+        self.stats["shards"] += 1
+        self.stats["users"] += len(users)
+        self.stats["digests"] += len(deliverable)
+        self.stats["emails_sent"] += sent
+        return sent
+
+    async def run_cycle(
+        self,
+        shard_index: Optional[int] = None,
+        shard_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Send this week's digests to every subscribed user in this worker's slice.
+
+        The next shard's recipients are read while earlier shards are being
+        built and sent; at most concurrent_shards are in flight.
+        """
+        shard_index = settings.digest_worker_index if shard_index is None else shard_index
+        shard_count = shard_count or settings.digest_worker_count
+
+        start = time.perf_counter()
+        digests_before = self.stats["digests"]
+        shared = await self._fetch_shared()
+        slots = asyncio.Semaphore(self.concurrent_shards)
+        pending = set()
+
+        async def run_shard(users: List[Dict[str, Any]]):
+            try:
+                await self.process_shard(users, shared)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Digest shard of {len(users)} users failed: {e}")
+                capture_processing_error(e, processing_stage="job_alert_digest")
+            finally:
+                slots.release()
+
+        after_user_id = None
+        while True:
+            users = await self.db.get_digest_recipients(
+                limit=self.shard_size,
+                after_user_id=after_user_id,
+                shard_index=shard_index,
+                shard_count=shard_count
+            )
+            if not users:
+                break
+            after_user_id = users[-1]["user_id"]
+
+            await slots.acquire()
+            task = asyncio.create_task(run_shard(users))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+            if len(users) < self.shard_size:
+                break
+
+        if pending:
+            await asyncio.gather(*pending)
+
+        seconds = time.perf_counter() - start
+        digests = self.stats["digests"] - digests_before
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_seconds"] = seconds
+        self.stats["digests_per_minute"] = digests / seconds * 60 if seconds else 0.0
+
+        add_scraping_breadcrumb(
+            f"Sent {digests} job alert digests",
+            data={"digests": digests, "seconds": round(seconds, 1)}
+        )
+        logger.info(f"Digest cycle: {digests} digests in {seconds:.1f}s "
+                    f"({self.stats['digests_per_minute']:,.0f}/min)")
+        return self.get_stats()
+
+    async def _get_last_cycle_at(self) -> Optional[float]:
+        if self.redis is None:
+            return self._last_cycle_at
+        value = await self.redis.get(self._last_cycle_key)
+        return float(value) if value is not None else None
+
+    async def seconds_until_due(self) -> float:
+        """Seconds until the next cycle of this slice is due (<= 0 when overdue)."""
+        last_cycle_at = await self._get_last_cycle_at()
+        if last_cycle_at is None:
+            return 0.0
+        return last_cycle_at + self.interval - time.time()
+
+    async def run_due_cycle(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Run a cycle if one is due, holding this slice's Redis lock.
+
+        The lock (SET NX EX) keeps API workers and scheduled runs from
+        sending the same digests twice; the completion time is stored in
+        Redis, so restarts do not resend them. Returns None when the cycle
+        was skipped because it is not due or another process holds the lock.
+        """
+        if self.redis is None:
+            if not force and await self.seconds_until_due() > 0:
+                return None
+            stats = await self.run_cycle()
+            self._last_cycle_at = time.time()
+            return stats
+
+        async with redis_lock(self.redis, self._lock_key, self.lock_ttl) as acquired:
+            if not acquired:
+                self.stats["skipped_cycles"] += 1
+                logger.info("Digest cycle already running in another process")
+                return None
+            # Checked under the lock: another process may have just finished
+            if not force and await self.seconds_until_due() > 0:
+                return None
+            stats = await self.run_cycle()
+            await self.redis.set(self._last_cycle_key, str(time.time()))
+            return stats
+
+    async def build_user_digest(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Build (without storing or sending) one user's digest on demand."""
+        shared = await self._get_shared()
+        return (await self._build_shard([user], shared))[0]
+
+    async def send_digest(self, user: Dict[str, Any], digest: Dict[str, Any]) -> bool:
+        return await self.mailer.send([self.render_email(user, digest)]) == 1
+
+    async def start(self):
+        """Start the scheduled digest loop."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"Digest worker started (every {self.interval / 3600:g}h)")
+
+    async def stop(self):
+        """Stop the scheduled loop and release SMTP worker threads."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mailer.close()
+
+    async def _run_forever(self):
+        while self._running:
+            try:
+                delay = await self.seconds_until_due()
+                if delay <= 0:
+                    await self.run_due_cycle()
+                    delay = await self.seconds_until_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Digest cycle failed: {e}")
+                capture_processing_error(e, processing_stage="job_alert_digest")
+                delay = self.interval
+            # Re-check at least every lock_ttl: the process holding the lock may die
+            await asyncio.sleep(min(max(delay, 60), self.lock_ttl))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "mailer": self.mailer.get_stats()}
+
+
+_worker: Optional[DigestWorker] = None
+
+
+async def get_digest_worker() -> DigestWorker:
+    """Get the process-wide digest worker."""
+    global _worker
+    if _worker is None:
+        cache = await get_cache_manager()
+        _worker = DigestWorker(await get_database(), await get_alert_percolator(), cache.redis_client)
+    return _worker
+
+
+if __name__ == "__main__":
+    async def main():
+        worker = await get_digest_worker()
+        await worker.run_due_cycle(force=True)
+        worker.mailer.close()
+
+    asyncio.run(main())
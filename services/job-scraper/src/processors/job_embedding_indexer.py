@@ -0,0 +1,232 @@
+"""
+Background stage that keeps the pgvector job-embedding store populated.
+
+Newly stored jobs (and jobs embedded by an older model version) are claimed
+in batches with FOR UPDATE SKIP LOCKED, embedded with the local
+sentence-transformer model and written back with one bulk UPDATE per batch,
+so similarity search reads stored vectors instead of encoding on the request
+path. Every API worker runs an indexer; claims keep their batches disjoint.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error, add_scraping_breadcrumb
+from src.utils.database import Database
+
+# Keep ingest cost bounded on very long postings
+MAX_DESCRIPTION_CHARS = 4000
+
+
+def build_embedding_text(job: Dict[str, Any]) -> str:
+    """Text representation of a job used for its stored embedding."""
+    skills = job.get("skills_required") or []
+    parts = [
+        job.get("title") or "",
+        job.get("company") or "",
+        job.get("location") or "",
+        ", ".join(skills),
+        (job.get("description") or "")[:MAX_DESCRIPTION_CHARS],
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+class JobEmbeddingIndexer:
+    """Embed stored jobs in batches and persist the vectors to pgvector."""
+
+    def __init__(
+        self,
+        db: Database,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[int] = None
+    ):
+        self.db = db
+        self.model_name = model_name or settings.embedding_model
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.poll_interval = poll_interval or settings.embedding_backfill_interval
+        self.model_version = f"{self.model_name}@{settings.embedding_model_revision}"
+
+        self._model = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            "jobs_embedded": 0,
+            "batches": 0,
+            "passes": 0,
+            "errors": 0,
+            "embed_seconds": 0.0,
+            "write_seconds": 0.0,
+        }
+
+    def _load_model(self):
+        """Load the sentence-transformer model (blocking)."""
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(self.model_name, device="cpu")
+        dimension = model.get_sentence_embedding_dimension()
+        if dimension != settings.vector_dimension:
+            raise ValueError(
+                f"Embedding model {self.model_name} produces {dimension}-d vectors, "
+                f"but the jobs.embedding column is VECTOR({settings.vector_dimension})"
+            )
+        return model
+
+    async def _get_model(self):
+        if self._model is None:
+            loop = asyncio.get_running_loop()
+            self._model = await loop.run_in_executor(None, self._load_model)
+            logger.info(f"Job embedding model loaded: {self.model_version}")
+        return self._model
+
+    def _encode(self, model, texts: List[str]) -> np.ndarray:
+        return model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+
+    async def run_once(self) -> int:
+        """
+        Embed every job whose stored vector is missing or stale.
+
+        Encoding of one batch overlaps with the database write of the
+        previous one. Returns the number of jobs embedded in this pass.
+        """
+        model = await self._get_model()
+        loop = asyncio.get_running_loop()
+
+        embedded = 0
+        pending_write: Optional[asyncio.Task] = None
+
+        try:
+            while True:
+                # Rows of the batch still being written stay claimed, so this
+                # never picks them up again
+                jobs = await self.db.claim_jobs_needing_embeddings(
+                    self.model_version,
+                    limit=self.batch_size,
+                    lease_seconds=settings.embedding_claim_lease
+                )
+                if not jobs:
+                    break
+
+                start = time.perf_counter()
+                vectors = await loop.run_in_executor(
+                    None, self._encode, model, [build_embedding_text(job) for job in jobs]
+                )
+                self.stats["embed_seconds"] += time.perf_counter() - start
+
+                if pending_write is not None:
+                    embedded += await pending_write
+                pending_write = asyncio.create_task(
+                    self._write_batch([job["id"] for job in jobs], vectors)
+                )
+
+                if len(jobs) < self.batch_size:
+                    break
+
+            if pending_write is not None:
+                embedded += await pending_write
+                pending_write = None
+        finally:
+            if pending_write is not None and not pending_write.done():
+                pending_write.cancel()
+
+        self.stats["passes"] += 1
+        if embedded:
+            add_scraping_breadcrumb(
+                f"Embedded {embedded} jobs",
+                data={"model_version": self.model_version, "job_count": embedded}
+            )
+        return embedded
+
+    async def _write_batch(self, job_ids: List[str], vectors: np.ndarray) -> int:
+        start = time.perf_counter()
+        written = await self.db.bulk_update_job_embeddings(
+            job_ids, vectors.tolist(), self.model_version
+        )
+        self.stats["write_seconds"] += time.perf_counter() - start
+        self.stats["batches"] += 1
+        self.stats["jobs_embedded"] += written
+        return written
+
+    async def start(self):
+        """Start the background backfill loop."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"Job embedding indexer started ({self.model_version})")
+
+    async def stop(self):
+        """Stop the background loop."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_forever(self):
+        while self._running:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Job embedding backfill failed: {e}")
+                capture_processing_error(e, processing_stage="job_embedding_backfill")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Indexer throughput and store coverage for the current model version."""
+        coverage = await self.db.get_embedding_coverage(self.model_version)
+        return {
+            "model_version": self.model_version,
+            **self.stats,
+            **coverage,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embed stored jobs that have no current vector")
+    parser.add_argument("--resize-column", action="store_true",
+                        help="First change jobs.embedding to VECTOR(vector_dimension), dropping every stored vector")
+    args = parser.parse_args()
+
+    async def main():
+        db = Database()
+        await db.connect(check_embedding_dimension=False)
+        try:
+            dimension = await db.get_embedding_dimension()
+            if dimension != settings.vector_dimension:
+                if not args.resize_column:
+                    raise SystemExit(
+                        f"jobs.embedding is VECTOR({dimension}), vector_dimension is {settings.vector_dimension}; "
+                        f"pass --resize-column to migrate"
+                    )
+                dropped = await db.resize_embedding_column(settings.vector_dimension)
+                logger.warning(f"Resized jobs.embedding to VECTOR({settings.vector_dimension}), dropped {dropped} vectors")
+
+            indexer = JobEmbeddingIndexer(db)
+            embedded = await indexer.run_once()
+            logger.info(f"Embedded {embedded} jobs: {await indexer.get_stats()}")
+        finally:
+            await db.disconnect()
+
+    asyncio.run(main())
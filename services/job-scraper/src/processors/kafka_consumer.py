@@ -17,7 +17,12 @@ import numpy as np
 from src.config.settings import settings
 from src.utils.database import Database
 from src.utils.cache import CacheManager
+from src.utils.job_cache import JobDetailCache
+from src.utils.dedup_filter import ProcessedJobTracker
 from src.processors.job_enricher import JobEnricher
+from src.processors.auto_apply_matcher import AutoApplyMatcher
+from src.processors.alert_percolator import AlertPercolator
+from src.processors.market_rollups import MarketRollups
 from src.processors.sentiment_analyzer import SentimentAnalyzer
 from src.processors.market_predictor import MarketPredictor
 from src.api.websocket import ConnectionManager
@@ -33,19 +38,30 @@ class JobDataProcessor:
         self.sentiment_analyzer = SentimentAnalyzer()
         self.market_predictor = MarketPredictor()
         self.ws_manager = ConnectionManager()
+        self.matcher: Optional[AutoApplyMatcher] = None
+        self.alert_percolator: Optional[AlertPercolator] = None
+        self.market_rollups: Optional[MarketRollups] = None
+        self.job_cache = JobDetailCache(self.db, self.cache)
         
         # Kafka setup
         self.consumer = None
         self.producer = None
         
         # Processing state
-        self.processed_jobs = set()
+        self.processed_jobs = ProcessedJobTracker(
+            window_seconds=settings.dedup_window_hours * 3600,
+            bucket_seconds=settings.dedup_bucket_hours * 3600,
+            bucket_capacity=settings.dedup_bucket_capacity,
+            error_rate=settings.dedup_error_rate,
+            lru_size=settings.dedup_lru_size
+        )
         self.job_changes = {}
         self.processing_stats = {
             "total_processed": 0,
             "changes_detected": 0,
             "enrichments_completed": 0,
             "predictions_made": 0,
+            "duplicates_skipped": 0,
             "errors": 0
         }
     
@@ -54,6 +70,21 @@ class JobDataProcessor:
         await self.db.connect()
         await self.cache.connect()
         
+        # Restore processed-job filters so a restart doesn't reprocess the retention window
+        self.processed_jobs.redis_client = self.cache.redis_client
+        await self.processed_jobs.load()
+        
+        # Score ingested jobs against users' auto-application preferences
+        self.matcher = AutoApplyMatcher(self.db, self.cache.redis_client)
+        await self.matcher.load()
+        
+        # Route ingested jobs to matching job alerts' digest buffers
+        self.alert_percolator = AlertPercolator(self.db, self.cache.redis_client)
+        await self.alert_percolator.load()
+        
+        # Flag posting days whose market rollups need rebuilding
+        self.market_rollups = MarketRollups(self.db, self.cache.redis_client)
+        
         # Initialize Kafka consumer
         self.consumer = AIOKafkaConsumer(
             settings.kafka_topic_jobs,
@@ -88,10 +119,20 @@ class JobDataProcessor:
             await self.consumer.stop()
         if self.producer:
             await self.producer.stop()
+        await self.processed_jobs.persist(force=True)
         await self.db.disconnect()
         await self.cache.disconnect()
         
-        logger.info(f"Consumer stopped. Stats: {self.processing_stats}")
+        logger.info(f"Consumer stopped. Stats: {self.get_stats()}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get processing and duplicate-tracking statistics."""
+        return {
+            **self.processing_stats,
+            "dedup": self.processed_jobs.get_stats(),
+            "auto_apply_matching": self.matcher.get_stats() if self.matcher else {},
+            "alert_percolation": self.alert_percolator.get_stats() if self.alert_percolator else {}
+        }
     
     async def consume_messages(self):
         """Main message consumption loop."""
@@ -118,10 +159,11 @@ class JobDataProcessor:
         job_id = job_data.get('id')
         
         # Check for duplicates
-        if job_id in self.processed_jobs:
+        if self.processed_jobs.check_and_add(job_id):
+            self.processing_stats["duplicates_skipped"] += 1
             return
         
-        self.processed_jobs.add(job_id)
+        await self.processed_jobs.persist()
         self.processing_stats["total_processed"] += 1
         
         # Detect changes
@@ -144,26 +186,32 @@ class JobDataProcessor:
         # Store in database
         await self.db.upsert_job(enriched_data)
         
-        # Cache for quick access
-        await self.cache.set(
-            f"job:{job_id}",
-            enriched_data,
-            expire=3600
-        )
+        # Serve the stored row from the job detail cache
+        if enriched_data.get('id'):
+            await self.job_cache.refresh(enriched_data['id'])
+        
+        # Update auto-application matches for interested users
+        await self.matcher.index_job(enriched_data)
+        
+        # Buffer the job for every job alert it matches
+        await self.alert_percolator.percolate([enriched_data])
+        
+        # Rebuild this posting day's market rollups on the next refresh
+        await self.market_rollups.mark_dirty([enriched_data])
         
         # Send real-time updates
         await self.send_realtime_updates(enriched_data)
         
         # Publish enriched data for downstream processing
         await self.producer.send(
-            "enriched-jobs",
+            settings.kafka_topic_enriched_jobs,
             value=enriched_data
         )
     
     async def detect_changes(self, job_id: str, new_data: Dict[str, Any]) -> Dict[str, Any]:
         """Detect changes in job data."""
-        # Get previous version from database
-        old_data = await self.db.get_job_by_id(job_id)
+        # Get previous version (cached, or from the database)
+        old_data = await self.job_cache.get(job_id)
         if not old_data:
             return {}
         
@@ -221,10 +269,7 @@ class JobDataProcessor:
         """Enrich job data with additional information."""
         enriched = job_data.copy()
         
-        # Add vector embeddings for semantic search
-        if 'description' in enriched:
-            embeddings = await self.enricher.generate_embeddings(enriched['description'])
-            enriched['embedding'] = embeddings.tolist()
+        # Vector embeddings are written to the store in batches by JobEmbeddingIndexer
         
         # Extract additional features
         enriched['extracted_skills'] = await self.enricher.extract_skills(enriched)
@@ -0,0 +1,367 @@
+"""
+Materialized market-intelligence rollups.
+
+Job postings are aggregated per posting day into three tables: market
+cells keyed by (location, industry, level, company size, job type) holding
+counts, a company histogram, salary sums and t-digest salary sketches;
+salary cells keyed by normalized role for title-filtered benchmarks; and
+skill counts. Trend, benchmark and distribution endpoints sum and merge
+these cells instead of scanning the jobs table.
+
+A day's partition is rebuilt from the jobs table as a whole, so refreshes
+are idempotent: ingest marks the posting day dirty, and the refresh loop
+rebuilds dirty days (and today) on a schedule. Every API worker runs the
+loop, but each backfill and refresh runs under a Redis lock, so only one
+process does the work at a time.
+"""
+
+import asyncio
+import json
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.config.sentry import capture_processing_error, add_scraping_breadcrumb
+from src.utils.cache import get_cache_manager, redis_lock
+from src.utils.database import Database, get_database
+from src.utils.quantile_sketch import TDigest
+
+MAX_DIMENSION_CHARS = 200
+
+
+def _dimension(value: Any) -> str:
+    """Rollup dimension value; missing values are stored as ''."""
+    return " ".join(str(value or "").split())[:MAX_DIMENSION_CHARS]
+
+
+def normalize_role(title: Optional[str]) -> str:
+    """Lower-cased, whitespace-collapsed job title used as the role dimension."""
+    return _dimension(title).lower()
+
+
+def posting_day(job: Dict[str, Any]) -> date:
+    """UTC day a job belongs to (its posted date, falling back to now)."""
+    posted = job.get("posted_date") or job.get("created_at")
+    if isinstance(posted, str):
+        try:
+            posted = datetime.fromisoformat(posted.replace("Z", "+00:00"))
+        except ValueError:
+            posted = None
+    if isinstance(posted, datetime):
+        if posted.tzinfo is not None:
+            posted = posted.astimezone(timezone.utc)
+        return posted.date()
+    if isinstance(posted, date):
+        return posted
+    return datetime.now(timezone.utc).date()
+
+
+class SalaryStats:
+    """Salary sums and sketches for one rollup cell."""
+
+    __slots__ = ("compression", "max_sketch", "max_sum", "mid_sketch", "mid_sum", "floor", "ceiling")
+
+    def __init__(self, compression: float):
+        self.compression = compression
+        self.max_sketch: Optional[TDigest] = None
+        self.max_sum = 0.0
+        self.mid_sketch: Optional[TDigest] = None
+        self.mid_sum = 0.0
+        self.floor: Optional[float] = None
+        self.ceiling: Optional[float] = None
+
+    def add(self, salary_min: Any, salary_max: Any):
+        if salary_max is None:
+            return
+        salary_max = float(salary_max)
+        if self.max_sketch is None:
+            self.max_sketch = TDigest(self.compression)
+        self.max_sketch.add(salary_max)
+        self.max_sum += salary_max
+
+        if salary_min is not None:
+            salary_min = float(salary_min)
+            if self.mid_sketch is None:
+                self.mid_sketch = TDigest(self.compression)
+            mid = (salary_min + salary_max) / 2
+            self.mid_sketch.add(mid)
+            self.mid_sum += mid
+            self.floor = salary_min if self.floor is None else min(self.floor, salary_min)
+            self.ceiling = salary_max if self.ceiling is None else max(self.ceiling, salary_max)
+
+    def columns(self) -> Tuple:
+        """salary_max_count, _sum, _sketch, salary_mid_count, _sum, _sketch, salary_floor, salary_ceiling."""
+        max_sketch, mid_sketch = self.max_sketch, self.mid_sketch
+        return (
+            len(max_sketch) if max_sketch else 0, self.max_sum, max_sketch.to_bytes() if max_sketch else None,
+            len(mid_sketch) if mid_sketch else 0, self.mid_sum, mid_sketch.to_bytes() if mid_sketch else None,
+            self.floor, self.ceiling,
+        )
+
+
+class RollupCell:
+    """Counts, company histogram and salary stats for one market cell."""
+
+    __slots__ = ("job_count", "companies", "salary")
+
+    def __init__(self, compression: float):
+        self.job_count = 0
+        self.companies: Dict[str, int] = {}
+        self.salary = SalaryStats(compression)
+
+
+def build_rollups(
+    day: date,
+    jobs: Iterable[Dict[str, Any]],
+    compression: float = 100.0
+) -> Tuple[List[Tuple], List[Tuple], List[Tuple], int]:
+    """
+    Aggregate one day's jobs into rows for the rollup tables.
+
+    Returns (market cells, role salary cells, skill cells, job count).
+    Roles only appear in the salary table, and only for jobs with a salary,
+    so the market cube stays small enough for trend and distribution reads.
+    """
+    cells: Dict[Tuple[str, ...], RollupCell] = {}
+    roles: Dict[Tuple[str, ...], SalaryStats] = {}
+    skills: Dict[Tuple[str, ...], int] = {}
+    job_count = 0
+
+    for job in jobs:
+        job_count += 1
+        location = _dimension(job.get("location"))
+        industry = _dimension(job.get("industry"))
+        level = _dimension(job.get("experience_level"))
+        company_size = _dimension(job.get("size_range"))
+        salary_min, salary_max = job.get("salary_min"), job.get("salary_max")
+
+        key = (location, industry, level, company_size, _dimension(job.get("job_type")))
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = RollupCell(compression)
+        cell.job_count += 1
+        company = _dimension(job.get("company"))
+        if company:
+            cell.companies[company] = cell.companies.get(company, 0) + 1
+        cell.salary.add(salary_min, salary_max)
+
+        if salary_max is not None:
+            role_key = (normalize_role(job.get("title")), location, level, company_size)
+            stats = roles.get(role_key)
+            if stats is None:
+                stats = roles[role_key] = SalaryStats(compression)
+            stats.add(salary_min, salary_max)
+
+        for skill in {_dimension(skill).lower() for skill in job.get("skills_required") or []}:
+            if skill:
+                skill_key = (location, industry, level, skill)
+                skills[skill_key] = skills.get(skill_key, 0) + 1
+
+    cell_rows = [
+        (day, *key, cell.job_count, json.dumps(cell.companies), *cell.salary.columns())
+        for key, cell in cells.items()
+    ]
+    role_rows = [(day, *key, *stats.columns()) for key, stats in roles.items()]
+    skill_rows = [(day, *key, count) for key, count in skills.items()]
+    return cell_rows, role_rows, skill_rows, job_count
+
+
+class MarketRollups:
+    """Keeps the rollup tables current by rebuilding dirty day partitions."""
+
+    def __init__(
+        self,
+        db: Database,
+        redis_client=None,
+        refresh_interval: Optional[int] = None,
+        compression: Optional[float] = None
+    ):
+        self.db = db
+        self.redis = redis_client
+        self.refresh_interval = refresh_interval or settings.market_rollup_refresh_interval
+        self.compression = compression or settings.market_rollup_compression
+        self.lock_ttl = settings.market_rollup_lock_ttl
+
+        self._dirty_key = "market_rollups:dirty_days"
+        self._lock_key = "market_rollups:lock"
+        self._backfilled = False
+        self._dirty: Set[date] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            "days_refreshed": 0,
+            "jobs_rolled_up": 0,
+            "cells_written": 0,
+            "errors": 0,
+            "skipped_runs": 0,
+            "refresh_seconds": 0.0,
+        }
+
+    async def mark_dirty(self, jobs: List[Dict[str, Any]]):
+        """Record that jobs were stored or changed so their days are rebuilt on the next refresh."""
+        days = {posting_day(job).isoformat() for job in jobs}
+        if not days:
+            return
+        if self.redis is not None:
+            try:
+                await self.redis.sadd(self._dirty_key, *days)
+                return
+            except Exception as e:
+                logger.warning(f"Could not mark rollup days dirty in Redis: {e}")
+        self._dirty.update(date.fromisoformat(day) for day in days)
+
+    async def _take_dirty(self) -> Set[date]:
+        days, self._dirty = self._dirty, set()
+        if self.redis is not None:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.smembers(self._dirty_key)
+            pipe.delete(self._dirty_key)
+            members, _ = await pipe.execute()
+            days.update(date.fromisoformat(m.decode() if isinstance(m, bytes) else m) for m in members)
+        return days
+
+    async def refresh_day(self, day: date) -> int:
+        """Rebuild one day's rollup partition from the jobs table; returns the jobs rolled up."""
+        start = datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+        jobs = await self.db.get_jobs_for_rollup(start, start + timedelta(days=1))
+        cells, role_cells, skill_cells, job_count = build_rollups(day, jobs, self.compression)
+        await self.db.replace_market_rollups(day, cells, role_cells, skill_cells, job_count)
+
+        self.stats["days_refreshed"] += 1
+        self.stats["jobs_rolled_up"] += job_count
+        self.stats["cells_written"] += len(cells) + len(role_cells) + len(skill_cells)
+        return job_count
+
+    async def refresh(self, days: Optional[Iterable[date]] = None) -> int:
+        """Rebuild the given days, or the dirty days plus today."""
+        started = time.perf_counter()
+        if days is None:
+            days = await self._take_dirty()
+            days.add(datetime.now(timezone.utc).date())
+
+        jobs = 0
+        for day in sorted(days):
+            try:
+                jobs += await self.refresh_day(day)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._dirty.add(day)
+                logger.error(f"Market rollup refresh failed for {day}: {e}")
+                capture_processing_error(e, processing_stage="market_rollup_refresh")
+
+        self.stats["refresh_seconds"] += time.perf_counter() - started
+        return jobs
+
+    async def backfill(self, days: Optional[int] = None) -> int:
+        """Build any day in the backfill window that has never been rolled up."""
+        days = days or settings.market_rollup_backfill_days
+        today = datetime.now(timezone.utc).date()
+        window = {today - timedelta(days=i) for i in range(days)}
+        missing = window - set(await self.db.get_rollup_days(min(window)))
+        if not missing:
+            return 0
+
+        jobs = await self.refresh(missing)
+        add_scraping_breadcrumb(
+            f"Backfilled {len(missing)} market rollup days",
+            data={"days": len(missing), "jobs": jobs}
+        )
+        logger.info(f"Market rollups backfilled: {len(missing)} days, {jobs} jobs")
+        return jobs
+
+    async def start(self):
+        """Start the scheduled refresh loop (backfilling first)."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"Market rollups started (refresh every {self.refresh_interval}s)")
+
+    async def stop(self):
+        """Stop the refresh loop."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_scheduled(self):
+        """Backfill (once per process) and refresh."""
+        if not self._backfilled:
+            try:
+                await self.backfill()
+                self._backfilled = True
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Market rollup backfill failed: {e}")
+                capture_processing_error(e, processing_stage="market_rollup_backfill")
+        await self.refresh()
+
+    async def run_locked(self) -> bool:
+        """
+        Run a scheduled backfill and refresh unless another process holds the lock.
+
+        Returns whether this process did the work. Without Redis, dirty days
+        are tracked per process and the work always runs.
+        """
+        if self.redis is None:
+            await self._run_scheduled()
+            return True
+        async with redis_lock(self.redis, self._lock_key, self.lock_ttl) as acquired:
+            if not acquired:
+                self.stats["skipped_runs"] += 1
+                return False
+            await self._run_scheduled()
+            return True
+
+    async def _run_forever(self):
+        while self._running:
+            try:
+                await self.run_locked()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Market rollup refresh failed: {e}")
+                capture_processing_error(e, processing_stage="market_rollup_refresh")
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending_dirty_days": len(self._dirty)}
+
+
+_rollups: Optional[MarketRollups] = None
+
+
+async def get_market_rollups() -> MarketRollups:
+    """Get the process-wide rollup maintainer."""
+    global _rollups
+    if _rollups is None:
+        db = await get_database()
+        cache = await get_cache_manager()
+        _rollups = MarketRollups(db, cache.redis_client)
+    return _rollups
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild market intelligence rollups")
+    parser.add_argument("--days", type=int, default=settings.market_rollup_backfill_days,
+                        help="Rebuild this many most recent days")
+    args = parser.parse_args()
+
+    async def main():
+        rollups = await get_market_rollups()
+        today = datetime.now(timezone.utc).date()
+        jobs = await rollups.refresh(today - timedelta(days=i) for i in range(args.days))
+        logger.info(f"Rebuilt {args.days} days of market rollups ({jobs} jobs): {rollups.get_stats()}")
+
+    asyncio.run(main())
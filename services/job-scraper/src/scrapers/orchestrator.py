@@ -131,7 +131,10 @@ class ScraperOrchestrator:
             "tasks_failed": 0,
             "jobs_scraped": 0,
             "average_task_time": 0,
-            "domain_success_rates": {}
+            "domain_success_rates": {},
+            # Per-source task counters, so anomalies are judged against each
+            # source's own baseline as well as the global one
+            "sources": {}
         }
         
         # Control flags
@@ -472,6 +475,9 @@ class ScraperOrchestrator:
                     # Update metrics
                     self.metrics["tasks_completed"] += 1
                     self.metrics["jobs_scraped"] += len(result.get("jobs", []))
+                    source_metrics = self._source_counters(task.source)
+                    source_metrics["tasks_completed"] += 1
+                    source_metrics["jobs_scraped"] += len(result.get("jobs", []))
                     
                     # Send results to Kafka
                     await self._publish_results(task, result)
@@ -483,6 +489,7 @@ class ScraperOrchestrator:
                     task.retry_count += 1
                     
                     self.metrics["tasks_failed"] += 1
+                    self._source_counters(task.source)["tasks_failed"] += 1
                     
                     # Retry if under limit
                     if task.retry_count < task.max_retries:
@@ -495,6 +502,7 @@ class ScraperOrchestrator:
                 # Update task timing
                 duration = (datetime.utcnow() - start_time).total_seconds()
                 self._update_timing_metrics(duration)
+                self._source_counters(task.source)["total_task_time"] += duration
                 
                 # Mark task as completed
                 self.completed_tasks.add(task.id)
@@ -714,13 +722,17 @@ class ScraperOrchestrator:
                 # Collect recent metrics
                 metrics = {
                     "success_rate": self._calculate_success_rate(),
-                    "avg_response_time": self.metrics.get("average_task_time", 0),
+                    "response_time": self.metrics.get("average_task_time", 0),
                     "jobs_per_task": self._calculate_jobs_per_task(),
                     "error_rate": self._calculate_error_rate()
                 }
                 
-                # Check for anomalies
+                # Check for anomalies, globally and against each source's baseline
                 anomalies = await self.anomaly_detector.detect(metrics)
+                for source in list(self.metrics["sources"]):
+                    anomalies.extend(await self.anomaly_detector.detect(
+                        self._calculate_source_metrics(source), source=source
+                    ))
                 
                 if anomalies:
                     logger.warning(f"Anomalies detected: {anomalies}")
@@ -864,6 +876,29 @@ class ScraperOrchestrator:
             return 0
         return self.metrics["jobs_scraped"] / self.metrics["tasks_completed"]
     
+    def _source_counters(self, source: str) -> Dict[str, float]:
+        """Task counters for one source."""
+        if source not in self.metrics["sources"]:
+            self.metrics["sources"][source] = {
+                "tasks_completed": 0,
+                "tasks_failed": 0,
+                "jobs_scraped": 0,
+                "total_task_time": 0.0
+            }
+        return self.metrics["sources"][source]
+    
+    def _calculate_source_metrics(self, source: str) -> Dict[str, float]:
+        """The anomaly detection metrics for a single source."""
+        counters = self.metrics["sources"][source]
+        completed = counters["tasks_completed"]
+        total = completed + counters["tasks_failed"]
+        return {
+            "success_rate": completed / total if total else 1.0,
+            "response_time": counters["total_task_time"] / total if total else 0,
+            "jobs_per_task": counters["jobs_scraped"] / completed if completed else 0,
+            "error_rate": counters["tasks_failed"] / total if total else 0
+        }
+    
     def _calculate_error_rate(self) -> float:
         """Calculate error rate."""
         total = self.metrics["tasks_completed"] + self.metrics["tasks_failed"]
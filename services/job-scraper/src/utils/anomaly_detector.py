@@ -3,7 +3,8 @@ Anomaly detection utility for identifying unusual patterns in scraping behavior.
 """
 
 import asyncio
-import statistics
+import bisect
+import math
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -22,11 +23,236 @@ class Anomaly:
     suggested_actions: List[str]
 
 
+class EWMAStats:
+    """Exponentially weighted moving mean and variance."""
+    
+    __slots__ = ("alpha", "mean", "variance", "count")
+    
+    def __init__(self, alpha: float = 0.05):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+    
+    def update(self, value: float):
+        """Fold a new sample into the running estimates."""
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+    
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class MetricStream:
+    """
+    Sliding-window statistics for a single metric stream.
+    
+    Values live in a fixed-size ring buffer. Mean and variance are maintained
+    with Welford's algorithm (with removal of the evicted sample), trend with
+    running least-squares sums, and a sorted copy of the window gives the
+    median, and the MAD by selection over it without sorting deviations.
+    Per hour-of-day EWMA baselines capture daily seasonality. All updates
+    are O(1) apart from the O(window) sorted insert.
+    """
+    
+    def __init__(self, window_size: int, ewma_alpha: float = 0.05, seasonal_alpha: float = 0.1):
+        self.window_size = window_size
+        self._buffer: List[float] = [0.0] * window_size
+        self._head = 0  # Index of the oldest sample
+        self._sorted: List[float] = []
+        
+        # Welford accumulators over the window
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        
+        # Running regression sums; x is the sample index relative to _x_base
+        self._next_x = 0
+        self._x_base = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self._sum_xx = 0.0
+        self._sum_yy = 0.0
+        
+        self.ewma = EWMAStats(ewma_alpha)
+        self.seasonal = [EWMAStats(seasonal_alpha) for _ in range(24)]
+        
+        self.total_samples = 0
+        # Rebuild accumulators periodically to bound floating-point drift
+        self._recompute_every = max(window_size * 100, 10000)
+    
+    def push(self, value: float, hour: Optional[int] = None):
+        """Append a sample, evicting the oldest one when the window is full."""
+        value = float(value)
+        
+        if self.count == self.window_size:
+            self._remove_oldest()
+        
+        tail = (self._head + self.count) % self.window_size
+        self._buffer[tail] = value
+        self.count += 1
+        
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        
+        x = float(self._next_x - self._x_base)
+        self._next_x += 1
+        self._sum_x += x
+        self._sum_y += value
+        self._sum_xy += x * value
+        self._sum_xx += x * x
+        self._sum_yy += value * value
+        
+        bisect.insort(self._sorted, value)
+        
+        self.ewma.update(value)
+        if hour is not None:
+            self.seasonal[hour].update(value)
+        
+        self.total_samples += 1
+        if self.total_samples % self._recompute_every == 0:
+            self._recompute()
+    
+    def _remove_oldest(self):
+        old = self._buffer[self._head]
+        self._head = (self._head + 1) % self.window_size
+        
+        n = self.count
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+        else:
+            old_mean = self.mean
+            self.mean = (n * old_mean - old) / self.count
+            self._m2 = max(0.0, self._m2 - (old - old_mean) * (old - self.mean))
+        
+        # The evicted sample has the smallest x in the window
+        x = float(self._next_x - n - self._x_base)
+        self._sum_x -= x
+        self._sum_y -= old
+        self._sum_xy -= x * old
+        self._sum_xx -= x * x
+        self._sum_yy -= old * old
+        
+        del self._sorted[bisect.bisect_left(self._sorted, old)]
+    
+    def _recompute(self):
+        """Recompute all window accumulators exactly from the buffer."""
+        values = self.values()
+        n = len(values)
+        self._x_base = self._next_x - n
+        self.mean = sum(values) / n if n else 0.0
+        self._m2 = sum((v - self.mean) ** 2 for v in values)
+        self._sum_x = float(sum(range(n)))
+        self._sum_y = float(sum(values))
+        self._sum_xy = float(sum(i * v for i, v in enumerate(values)))
+        self._sum_xx = float(sum(i * i for i in range(n)))
+        self._sum_yy = float(sum(v * v for v in values))
+    
+    def values(self) -> List[float]:
+        """Window contents, oldest first."""
+        return [self._buffer[(self._head + i) % self.window_size] for i in range(self.count)]
+    
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation of the window."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+    
+    @property
+    def median(self) -> float:
+        if not self._sorted:
+            return 0.0
+        mid = len(self._sorted) // 2
+        if len(self._sorted) % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+    
+    @property
+    def mad(self) -> float:
+        """Median absolute deviation of the window."""
+        n = len(self._sorted)
+        if not n:
+            return 0.0
+        median = self.median
+        mid = n // 2
+        if n % 2:
+            return self._kth_deviation(median, mid)
+        return (self._kth_deviation(median, mid - 1) + self._kth_deviation(median, mid)) / 2
+    
+    def _kth_deviation(self, median: float, k: int) -> float:
+        """
+        k-th smallest |v - median| over the window (0-based), in O(log n).
+        
+        Split at the median, the deviations of the sorted window form two
+        ascending runs: median - v walking left and v - median walking right.
+        Binary search for how many of the k + 1 smallest come from the left.
+        """
+        values = self._sorted
+        split = bisect.bisect_left(values, median)
+        left_len, right_len = split, len(values) - split
+        
+        def left(i: int) -> float:
+            return median - values[split - 1 - i]
+        
+        def right(j: int) -> float:
+            return values[split + j] - median
+        
+        low, high = max(0, k + 1 - right_len), min(left_len, k + 1)
+        while low < high:
+            i = (low + high) // 2
+            if left(i) < right(k - i):
+                low = i + 1
+            else:
+                high = i
+        taken_left, taken_right = low, k + 1 - low
+        return max(
+            left(taken_left - 1) if taken_left else 0.0,
+            right(taken_right - 1) if taken_right else 0.0
+        )
+    
+    def regression(self) -> Tuple[float, float]:
+        """Least-squares slope and R² over the window."""
+        n = self.count
+        if n < 2:
+            return 0.0, 0.0
+        sxx = n * self._sum_xx - self._sum_x ** 2
+        sxy = n * self._sum_xy - self._sum_x * self._sum_y
+        syy = n * self._sum_yy - self._sum_y ** 2
+        if sxx <= 0:
+            return 0.0, 0.0
+        slope = sxy / sxx
+        r_squared = (sxy * sxy) / (sxx * syy) if syy > 1e-12 else 0.0
+        return slope, r_squared
+
+
 class AnomalyDetector:
     """ML-powered anomaly detection for scraping operations."""
     
-    def __init__(self):
-        self.metric_history: Dict[str, List[float]] = {}
+    def __init__(self, baseline_mode: str = "window"):
+        """
+        Initialize anomaly detector.
+        
+        Args:
+            baseline_mode: Baseline to score against - "window" (mean/stdev of
+                the sliding window), "robust" (median/MAD) or "seasonal"
+                (hour-of-day EWMA, falling back to the window until warmed up)
+        """
+        if baseline_mode not in ("window", "robust", "seasonal"):
+            raise ValueError(f"Unknown baseline mode: {baseline_mode}")
+        self.baseline_mode = baseline_mode
+        
+        # Streams keyed by (source, metric); source is None for global metrics
+        self.streams: Dict[Tuple[Optional[str], str], MetricStream] = {}
         self.baselines: Dict[str, Dict[str, float]] = {}
         self.detection_windows = {
             "success_rate": 50,  # Last 50 measurements
@@ -46,52 +272,82 @@ class AnomalyDetector:
         # Minimum samples required for detection
         self.min_samples = 10
     
-    async def detect(self, current_metrics: Dict[str, float]) -> List[Anomaly]:
-        """Detect anomalies in current metrics."""
+    async def detect(
+        self,
+        current_metrics: Dict[str, float],
+        source: Optional[str] = None,
+        timestamp: Optional[datetime] = None
+    ) -> List[Anomaly]:
+        """
+        Detect anomalies in current metrics.
+        
+        Args:
+            current_metrics: Metric name to value
+            source: Optional domain/source the metrics belong to; each source
+                gets independent streams and baselines
+            timestamp: Sample time used for seasonal baselines (default now)
+        """
         anomalies = []
+        hour = (timestamp or datetime.utcnow()).hour
         
         for metric_name, value in current_metrics.items():
-            if metric_name in self.detection_windows:
-                anomaly = await self._check_metric_anomaly(metric_name, value)
-                if anomaly:
-                    anomalies.append(anomaly)
+            anomaly = self.observe(metric_name, value, source=source, hour=hour)
+            if anomaly:
+                anomalies.append(anomaly)
         
         # Update baselines with new data
-        await self._update_baselines(current_metrics)
+        await self._update_baselines(current_metrics, source)
         
         return anomalies
     
-    async def _check_metric_anomaly(self, metric_name: str, value: float) -> Optional[Anomaly]:
-        """Check if a metric value is anomalous."""
-        # Initialize history if not exists
-        if metric_name not in self.metric_history:
-            self.metric_history[metric_name] = []
-        
-        history = self.metric_history[metric_name]
-        
-        # Add current value to history
-        history.append(value)
-        
-        # Maintain sliding window
-        window_size = self.detection_windows[metric_name]
-        if len(history) > window_size:
-            history.pop(0)
-        
-        # Need minimum samples for detection
-        if len(history) < self.min_samples:
+    def observe(
+        self,
+        metric_name: str,
+        value: float,
+        source: Optional[str] = None,
+        hour: Optional[int] = None
+    ) -> Optional[Anomaly]:
+        """
+        Score a single sample and add it to its stream.
+        
+        Synchronous O(1) hot path for high-rate per-domain streams; returns
+        None for metrics without a configured detection window.
+        """
+        if metric_name not in self.detection_windows:
             return None
         
-        # Calculate z-score
-        mean = statistics.mean(history[:-1])  # Exclude current value
-        if len(history) < 2:
+        stream = self._get_stream(metric_name, source)
+        anomaly = self._check_metric_anomaly(stream, metric_name, value, source, hour)
+        stream.push(value, hour)
+        return anomaly
+    
+    def _get_stream(self, metric_name: str, source: Optional[str] = None) -> MetricStream:
+        key = (source, metric_name)
+        stream = self.streams.get(key)
+        if stream is None:
+            stream = MetricStream(self.detection_windows[metric_name])
+            self.streams[key] = stream
+        return stream
+    
+    def _check_metric_anomaly(
+        self,
+        stream: MetricStream,
+        metric_name: str,
+        value: float,
+        source: Optional[str] = None,
+        hour: Optional[int] = None
+    ) -> Optional[Anomaly]:
+        """Check if a metric value is anomalous against the stream's prior samples."""
+        # Need minimum samples for detection (including the current value)
+        if stream.count + 1 < self.min_samples:
             return None
-            
-        stdev = statistics.stdev(history[:-1]) if len(history) > 2 else 0
         
-        if stdev == 0:
+        baseline, spread = self._baseline(stream, hour)
+        
+        if spread == 0:
             return None  # No variance, can't detect anomalies
         
-        z_score = abs(value - mean) / stdev
+        z_score = abs(value - baseline) / spread
         
         # Determine anomaly severity
         severity = None
@@ -105,10 +361,27 @@ class AnomalyDetector:
             severity = "low"
         
         if severity:
-            return self._create_anomaly(metric_name, value, mean, z_score, severity)
+            anomaly = self._create_anomaly(metric_name, value, baseline, z_score, severity)
+            anomaly.metrics["baseline_mode"] = self.baseline_mode
+            if source:
+                anomaly.metrics["source"] = source
+            return anomaly
         
         return None
     
+    def _baseline(self, stream: MetricStream, hour: Optional[int]) -> Tuple[float, float]:
+        """Return (center, spread) for the configured baseline mode."""
+        if self.baseline_mode == "robust":
+            # 1.4826 * MAD is a consistent estimator of stdev for normal data
+            return stream.median, 1.4826 * stream.mad
+        
+        if self.baseline_mode == "seasonal" and hour is not None:
+            seasonal = stream.seasonal[hour]
+            if seasonal.count >= self.min_samples:
+                return seasonal.mean, seasonal.stdev
+        
+        return stream.mean, stream.stdev
+    
     def _create_anomaly(
         self, 
         metric_name: str, 
@@ -217,61 +490,89 @@ class AnomalyDetector:
         
         return actions
     
-    async def _update_baselines(self, metrics: Dict[str, float]):
-        """Update baseline calculations with new metrics."""
-        for metric_name, value in metrics.items():
-            if metric_name in self.metric_history:
-                history = self.metric_history[metric_name]
-                
-                if len(history) >= self.min_samples:
-                    self.baselines[metric_name] = {
-                        "mean": statistics.mean(history),
-                        "median": statistics.median(history),
-                        "stdev": statistics.stdev(history) if len(history) > 1 else 0,
-                        "min": min(history),
-                        "max": max(history),
-                        "samples": len(history),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
+    async def _update_baselines(self, metrics: Dict[str, float], source: Optional[str] = None):
+        """Update baseline snapshots from the running stream statistics."""
+        for metric_name in metrics:
+            stream = self.streams.get((source, metric_name))
+            if stream is None or stream.count < self.min_samples:
+                continue
+            
+            key = f"{source}:{metric_name}" if source else metric_name
+            values = stream._sorted
+            self.baselines[key] = {
+                "mean": stream.mean,
+                "median": stream.median,
+                "stdev": stream.stdev,
+                "mad": stream.mad,
+                "ewma_mean": stream.ewma.mean,
+                "ewma_stdev": stream.ewma.stdev,
+                "min": values[0],
+                "max": values[-1],
+                "samples": stream.count,
+                "updated_at": datetime.utcnow().isoformat()
+            }
     
     def get_baselines(self) -> Dict[str, Dict[str, float]]:
         """Get current baseline statistics."""
         return self.baselines.copy()
     
-    def get_metric_history(self, metric_name: str) -> List[float]:
+    def get_seasonal_baseline(self, metric_name: str, source: Optional[str] = None) -> Dict[int, Dict[str, float]]:
+        """Get hour-of-day baselines for a metric stream."""
+        stream = self.streams.get((source, metric_name))
+        if stream is None:
+            return {}
+        return {
+            hour: {"mean": stats.mean, "stdev": stats.stdev, "samples": stats.count}
+            for hour, stats in enumerate(stream.seasonal)
+            if stats.count
+        }
+    
+    def get_metric_history(self, metric_name: str, source: Optional[str] = None) -> List[float]:
         """Get history for a specific metric."""
-        return self.metric_history.get(metric_name, []).copy()
+        stream = self.streams.get((source, metric_name))
+        return stream.values() if stream else []
     
-    async def reset_metric_history(self, metric_name: Optional[str] = None):
+    async def reset_metric_history(self, metric_name: Optional[str] = None, source: Optional[str] = None):
         """Reset metric history for specific metric or all metrics."""
         if metric_name:
-            self.metric_history[metric_name] = []
-            if metric_name in self.baselines:
-                del self.baselines[metric_name]
+            self.streams.pop((source, metric_name), None)
+            self.baselines.pop(f"{source}:{metric_name}" if source else metric_name, None)
         else:
-            self.metric_history.clear()
+            self.streams.clear()
             self.baselines.clear()
         
         logger.info(f"Reset metric history: {metric_name or 'all metrics'}")
     
-    def calculate_trend(self, metric_name: str, window_size: int = 20) -> Dict[str, Any]:
-        """Calculate trend for a specific metric."""
-        if metric_name not in self.metric_history:
+    def calculate_trend(
+        self,
+        metric_name: str,
+        window_size: int = 20,
+        source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate trend for a specific metric.
+        
+        Uses the stream's running regression when window_size covers the
+        whole window, otherwise fits the most recent window_size samples.
+        """
+        stream = self.streams.get((source, metric_name))
+        if stream is None:
             return {"trend": "unknown", "confidence": 0}
         
-        history = self.metric_history[metric_name]
-        if len(history) < window_size:
+        if stream.count < window_size:
             return {"trend": "insufficient_data", "confidence": 0}
         
-        recent_data = history[-window_size:]
-        
-        # Calculate linear trend using least squares
-        x = np.arange(len(recent_data))
-        y = np.array(recent_data)
-        
-        # Linear regression
-        n = len(x)
-        slope = (n * np.sum(x * y) - np.sum(x) * np.sum(y)) / (n * np.sum(x**2) - (np.sum(x))**2)
+        if window_size >= stream.count:
+            slope, r_squared = stream.regression()
+        else:
+            y = np.array(stream.values()[-window_size:])
+            x = np.arange(window_size)
+            n = window_size
+            sxx = n * np.sum(x * x) - np.sum(x) ** 2
+            sxy = n * np.sum(x * y) - np.sum(x) * np.sum(y)
+            syy = n * np.sum(y * y) - np.sum(y) ** 2
+            slope = float(sxy / sxx)
+            r_squared = float(sxy * sxy / (sxx * syy)) if syy > 1e-12 else 0.0
         
         # Determine trend direction
         if abs(slope) < 0.01:  # Threshold for "stable"
@@ -281,16 +582,10 @@ class AnomalyDetector:
         else:
             trend = "decreasing"
         
-        # Calculate confidence (R²)
-        y_mean = np.mean(y)
-        ss_res = np.sum((y - (slope * x + np.mean(y) - slope * np.mean(x)))**2)
-        ss_tot = np.sum((y - y_mean)**2)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-        
         return {
             "trend": trend,
             "slope": slope,
             "confidence": max(0, min(1, r_squared)),
-            "data_points": len(recent_data),
+            "data_points": min(window_size, stream.count),
             "calculated_at": datetime.utcnow().isoformat()
         }
@@ -5,7 +5,9 @@ Advanced cache manager with Redis support and intelligent caching strategies.
 import json
 import pickle
 import hashlib
-from typing import Any, Optional, List, Dict, Union
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, List, Dict, Union
 from datetime import datetime, timedelta
 import redis.asyncio as redis
 import asyncio
@@ -13,6 +15,14 @@ import asyncio
 from src.config.settings import settings
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 
+# Delete a lock only if the caller still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class CacheManager:
     """Redis-based cache manager with fallback to memory storage."""
@@ -325,6 +335,26 @@ class CacheManager:
             capture_api_error(e, endpoint="cache_get_multiple", method="INTERNAL")
             return {key: None for key in keys}
     
+    async def delete_multiple(self, keys: List[str], prefix: str = "scraper") -> int:
+        """Delete multiple cache values."""
+        if not keys:
+            return 0
+        
+        try:
+            if self.redis_client:
+                full_keys = [self._generate_key(key, prefix) for key in keys]
+                return await self.redis_client.delete(*full_keys)
+            else:
+                # Memory cache
+                deleted = 0
+                for key in keys:
+                    deleted += self.memory_cache.pop(self._generate_key(key, prefix), None) is not None
+                return deleted
+                
+        except Exception as e:
+            capture_api_error(e, endpoint="cache_delete_multiple", method="INTERNAL")
+            return 0
+    
     def _manage_memory_cache_size(self):
         """Manage memory cache size to prevent memory issues."""
         if len(self.memory_cache) >= self.max_memory_items:
@@ -463,3 +493,20 @@ def cache_key_generator(*args, **kwargs) -> str:
     # Create deterministic hash from arguments
     key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
     return hashlib.md5(key_data.encode()).hexdigest()
+
+
+@asynccontextmanager
+async def redis_lock(redis_client, key: str, ttl: int) -> AsyncIterator[bool]:
+    """
+    Hold a Redis lock (SET NX EX) for the body of the block.
+    
+    Yields whether the lock was acquired; the lock expires after ttl
+    seconds if its holder dies without releasing it.
+    """
+    token = uuid.uuid4().hex
+    acquired = bool(await redis_client.set(key, token, nx=True, ex=ttl))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
@@ -0,0 +1,142 @@
+"""
+CV PDF rendering.
+
+Runs inside the CV export worker processes (see src/processors/cv_export.py).
+Page layout and paragraph styles are compiled once per template and process
+and reused for every render; only the story is built per CV. Output is
+rendered in ReportLab's invariant mode, so the same CV and template always
+produce the same bytes.
+"""
+
+import io
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+# Bump when layout changes so cached PDFs from older renderers are not served
+RENDERER_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    """Layout parameters of one CVTemplate."""
+    font: str
+    bold_font: str
+    title_size: int
+    section_size: int
+    body_size: int
+    accent: str
+    title_alignment: int = TA_CENTER
+    margin: float = 0.75 * inch
+
+
+# Keyed by CVTemplate value
+TEMPLATE_SPECS: Dict[str, TemplateSpec] = {
+    "standard": TemplateSpec("Helvetica", "Helvetica-Bold", 24, 16, 10, "navy"),
+    "professional": TemplateSpec("Helvetica", "Helvetica-Bold", 22, 14, 10, "#1f4e79", TA_LEFT),
+    "executive": TemplateSpec("Times-Roman", "Times-Bold", 26, 15, 11, "#222222", margin=inch),
+    "creative": TemplateSpec("Helvetica", "Helvetica-Bold", 28, 16, 10, "#b03a2e", TA_LEFT),
+    "technical": TemplateSpec("Helvetica", "Courier-Bold", 22, 14, 10, "#145a32", TA_LEFT),
+}
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Styles built once per template and reused across renders."""
+    spec: TemplateSpec
+    title: ParagraphStyle
+    section: ParagraphStyle
+    body: ParagraphStyle
+
+
+@lru_cache(maxsize=None)
+def compiled_template(template: str) -> CompiledTemplate:
+    """Build the paragraph styles for a template; unknown templates use standard."""
+    spec = TEMPLATE_SPECS.get(template, TEMPLATE_SPECS["standard"])
+    styles = getSampleStyleSheet()
+    return CompiledTemplate(
+        spec=spec,
+        title=ParagraphStyle(
+            f"{template}-title",
+            parent=styles["Title"],
+            fontName=spec.bold_font,
+            fontSize=spec.title_size,
+            leading=spec.title_size * 1.2,
+            spaceAfter=30,
+            alignment=spec.title_alignment
+        ),
+        section=ParagraphStyle(
+            f"{template}-section",
+            parent=styles["Heading2"],
+            fontName=spec.bold_font,
+            fontSize=spec.section_size,
+            leading=spec.section_size * 1.2,
+            spaceAfter=12,
+            textColor=colors.toColor(spec.accent)
+        ),
+        body=ParagraphStyle(
+            f"{template}-body",
+            parent=styles["Normal"],
+            fontName=spec.font,
+            fontSize=spec.body_size,
+            leading=spec.body_size * 1.2
+        ),
+    )
+
+
+def warm_templates():
+    """Compile every template up front; used as the export pool's worker initializer."""
+    for template in TEMPLATE_SPECS:
+        compiled_template(template)
+
+
+def _section_text(content: Any) -> str:
+    if not isinstance(content, dict):
+        return ""
+    lines: List[str] = []
+    for value in content.values():
+        if isinstance(value, str):
+            lines.append(value)
+        elif isinstance(value, list):
+            lines.extend(str(item) for item in value)
+    return escape("\n".join(lines))
+
+
+def render_cv_pdf(title: str, template: str, sections: List[Dict[str, Any]]) -> bytes:
+    """Render a CV to PDF bytes. Sections are CVSection dicts."""
+    compiled = compiled_template(template)
+    margin = compiled.spec.margin
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin,
+        title=title,
+        invariant=1
+    )
+
+    story = [Paragraph(escape(title), compiled.title), Spacer(1, 0.2 * inch)]
+    for section in sorted(sections, key=lambda s: s.get("order", 0)):
+        if not section.get("is_visible", True):
+            continue
+        story.append(Paragraph(escape(section.get("title", "")), compiled.section))
+        text = _section_text(section.get("content"))
+        if text.strip():
+            story.append(Paragraph(text, compiled.body))
+            story.append(Spacer(1, 0.1 * inch))
+
+    doc.build(story)
+    return buffer.getvalue()
+
@@ -4,16 +4,48 @@ Advanced database manager with PostgreSQL, pgvector, and connection pooling.
 
 import asyncio
 import asyncpg
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import numpy as np
 import json
+import re
 from contextlib import asynccontextmanager
 from dataclasses import asdict
 
 from src.config.settings import settings
 from src.config.sentry import capture_api_error, add_scraping_breadcrumb
 from src.models.job_models import Job, JobFilter
+from src.utils.quantile_sketch import TDigest
+
+# Jobs are deactivated by cleanup_old_jobs after this many days, so rollup
+# reads that describe the active market cover this window
+ACTIVE_WINDOW_DAYS = 90
+
+# Columns of a job read for display. The embedding vector and the scraped
+# raw_data payload are large and only selected when a caller asks for them.
+JOB_DETAIL_COLUMNS = (
+    "id", "title", "company", "company_id", "location", "description", "url",
+    "salary_min", "salary_max", "job_type", "experience_level", "skills_required",
+    "remote_friendly", "is_active", "posted_date", "updated_date", "scraped_date",
+    "source", "created_at",
+)
+
+
+def job_columns(alias: Optional[str] = None, include_embedding: bool = False, include_raw_data: bool = False) -> str:
+    """SELECT list for job reads."""
+    columns = list(JOB_DETAIL_COLUMNS)
+    if include_embedding:
+        columns.append("embedding")
+    if include_raw_data:
+        columns.append("raw_data")
+    return ", ".join(f"{alias}.{column}" if alias else column for column in columns)
+
+
+JOB_SEARCH_ORDER = {
+    "relevance": "posted_date DESC, salary_max DESC NULLS LAST",
+    "date": "posted_date DESC",
+    "salary": "salary_max DESC NULLS LAST"
+}
 
 
 class Database:
@@ -22,9 +54,29 @@ class Database:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
         self._initialized = False
+        # Called with the ids of jobs whose stored rows changed (see add_jobs_changed_listener)
+        self._jobs_changed_listeners: List[Callable[[List[str]], Awaitable[Any]]] = []
     
-    async def connect(self):
-        """Initialize database connection pool."""
+    def add_jobs_changed_listener(self, listener: Callable[[List[str]], Awaitable[Any]]):
+        """Register a coroutine called with job ids after their rows are updated or deleted."""
+        self._jobs_changed_listeners.append(listener)
+    
+    async def _jobs_changed(self, job_ids: List[str]):
+        if not job_ids:
+            return
+        for listener in self._jobs_changed_listeners:
+            try:
+                await listener(job_ids)
+            except Exception as e:
+                capture_api_error(e, endpoint="jobs_changed_listener", method="INTERNAL")
+    
+    async def connect(self, check_embedding_dimension: bool = True):
+        """
+        Initialize database connection pool.
+        
+        Refuses to start when the stored embedding column does not match
+        settings.vector_dimension; see resize_embedding_column.
+        """
         if self._initialized:
             return
         
@@ -48,6 +100,8 @@ class Database:
             
             # Initialize database schema
             await self._initialize_schema()
+            if check_embedding_dimension:
+                await self._check_embedding_dimension()
             
             self._initialized = True
             add_scraping_breadcrumb("Database connection pool initialized")
@@ -63,6 +117,43 @@ class Database:
             self._initialized = False
             add_scraping_breadcrumb("Database connection pool closed")
     
+    async def get_embedding_dimension(self) -> Optional[int]:
+        """Dimension of the jobs.embedding column."""
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("""
+                SELECT atttypmod FROM pg_attribute
+                WHERE attrelid = 'jobs'::regclass AND attname = 'embedding'
+            """)
+    
+    async def _check_embedding_dimension(self):
+        dimension = await self.get_embedding_dimension()
+        if dimension != settings.vector_dimension:
+            await self.pool.close()
+            raise RuntimeError(
+                f"jobs.embedding is VECTOR({dimension}) but vector_dimension is {settings.vector_dimension}. "
+                f"Run `python -m src.processors.job_embedding_indexer --resize-column` to migrate "
+                f"(this drops every stored vector), or configure the existing dimension."
+            )
+    
+    async def resize_embedding_column(self, dimension: int) -> int:
+        """
+        Change jobs.embedding to VECTOR(dimension).
+        
+        Vectors of another dimension cannot be cast, so every stored vector is
+        dropped and its job left for the embedding indexer to re-embed.
+        Returns the number of vectors dropped.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                dropped = await conn.fetchval("SELECT COUNT(*) FROM jobs WHERE embedding IS NOT NULL")
+                await conn.execute("DROP INDEX IF EXISTS idx_jobs_embedding")
+                await conn.execute(f"ALTER TABLE jobs ALTER COLUMN embedding TYPE VECTOR({int(dimension)}) USING NULL")
+                await conn.execute("UPDATE jobs SET embedding_model = NULL, embedding_updated_at = NULL")
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_jobs_embedding ON jobs USING ivfflat (embedding vector_cosine_ops)"
+                )
+        return dropped
+    
     def _parse_database_url(self, url: str) -> Dict[str, Any]:
         """Parse PostgreSQL connection URL."""
         # Simple URL parsing - in production use urllib.parse
@@ -110,7 +201,7 @@ class Database:
         """Initialize database schema and tables."""
         async with self.pool.acquire() as conn:
             # Create jobs table
-            await conn.execute("""
+            await conn.execute(f"""
                 CREATE TABLE IF NOT EXISTS jobs (
                     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
                     title TEXT NOT NULL,
@@ -126,7 +217,7 @@ class Database:
                     skills_required TEXT[],
                     remote_friendly BOOLEAN DEFAULT false,
                     is_active BOOLEAN DEFAULT true,
-                    embedding VECTOR(768),
+                    embedding VECTOR({settings.vector_dimension}),
                     posted_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
                     updated_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
                     scraped_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -136,6 +227,11 @@ class Database:
                 )
             """)
             
+            # Embedding provenance, so vectors are only recomputed when the model changes
+            await conn.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding_model TEXT")
+            await conn.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding_updated_at TIMESTAMP WITH TIME ZONE")
+            await conn.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding_claimed_at TIMESTAMP WITH TIME ZONE")
+            
             # Create companies table
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS companies (
@@ -175,18 +271,80 @@ class Database:
                 )
             """)
             
+            # Market intelligence rollups, one partition per posting day
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_market_rollups (
+                    day DATE NOT NULL,
+                    location TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    company_size TEXT NOT NULL,
+                    job_type TEXT NOT NULL,
+                    job_count INTEGER NOT NULL,
+                    companies JSONB NOT NULL,
+                    salary_max_count INTEGER NOT NULL,
+                    salary_max_sum DOUBLE PRECISION NOT NULL,
+                    salary_max_sketch BYTEA,
+                    salary_mid_count INTEGER NOT NULL,
+                    salary_mid_sum DOUBLE PRECISION NOT NULL,
+                    salary_mid_sketch BYTEA,
+                    salary_floor DOUBLE PRECISION,
+                    salary_ceiling DOUBLE PRECISION,
+                    PRIMARY KEY (day, location, industry, level, company_size, job_type)
+                )
+            """)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_role_salary_rollups (
+                    day DATE NOT NULL,
+                    role TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    company_size TEXT NOT NULL,
+                    salary_max_count INTEGER NOT NULL,
+                    salary_max_sum DOUBLE PRECISION NOT NULL,
+                    salary_max_sketch BYTEA,
+                    salary_mid_count INTEGER NOT NULL,
+                    salary_mid_sum DOUBLE PRECISION NOT NULL,
+                    salary_mid_sketch BYTEA,
+                    salary_floor DOUBLE PRECISION,
+                    salary_ceiling DOUBLE PRECISION,
+                    PRIMARY KEY (day, role, location, level, company_size)
+                )
+            """)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_skill_rollups (
+                    day DATE NOT NULL,
+                    location TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    job_count INTEGER NOT NULL,
+                    PRIMARY KEY (day, location, industry, level, skill)
+                )
+            """)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_rollup_days (
+                    day DATE PRIMARY KEY,
+                    job_count INTEGER NOT NULL,
+                    refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             # Create indexes
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_posted_date ON jobs(posted_date)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs(is_active)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_embedding ON jobs USING ivfflat (embedding vector_cosine_ops)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_embedding_model ON jobs(embedding_model, id) WHERE is_active = true")
             
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_industry ON companies(industry)")
             
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_query ON search_analytics(query)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_created_at ON search_analytics(created_at)")
+            
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_skill_rollups_day_skill ON job_skill_rollups(day, skill)")
     
     @asynccontextmanager
     async def acquire_connection(self):
@@ -208,6 +366,13 @@ class Database:
             rows = await conn.fetch(query, *args)
             return [dict(row) for row in rows]
     
+    async def iterate(self, query: str, *args, prefetch: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Stream rows as dictionaries through a cursor, prefetch rows at a time."""
+        async with self.acquire_connection() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(query, *args, prefetch=prefetch):
+                    yield dict(row)
+    
     async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
         """Fetch single row as dictionary."""
         async with self.acquire_connection() as conn:
@@ -251,12 +416,29 @@ class Database:
             
             return Job(**dict(row))
     
-    async def get_job_by_id(self, job_id: str) -> Optional[Job]:
+    async def get_job_by_id(
+        self,
+        job_id: str,
+        include_embedding: bool = False,
+        include_raw_data: bool = False
+    ) -> Optional[Job]:
         """Get job by ID."""
-        query = "SELECT * FROM jobs WHERE id = $1"
+        query = f"SELECT {job_columns(None, include_embedding, include_raw_data)} FROM jobs WHERE id = $1"
         row = await self.fetchrow(query, job_id)
         return Job(**row) if row else None
     
+    async def get_jobs_by_ids(
+        self,
+        job_ids: List[str],
+        include_embedding: bool = False,
+        include_raw_data: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get job rows for a set of job IDs in one query (in no particular order)."""
+        if not job_ids:
+            return []
+        query = f"SELECT {job_columns(None, include_embedding, include_raw_data)} FROM jobs WHERE id = ANY($1::uuid[])"
+        return await self.fetch(query, list(set(job_ids)))
+    
     async def update_job(self, job_id: str, updates: Dict[str, Any]) -> Job:
         """Update job information."""
         # Build dynamic update query
@@ -282,22 +464,18 @@ class Database:
         """
         
         row = await self.fetchrow(query, *values)
+        await self._jobs_changed([str(job_id)])
         return Job(**row) if row else None
     
     async def delete_job(self, job_id: str) -> bool:
         """Delete job posting."""
         query = "DELETE FROM jobs WHERE id = $1"
         result = await self.execute(query, job_id)
+        await self._jobs_changed([str(job_id)])
         return "DELETE 1" in result
     
-    async def search_jobs(
-        self,
-        filters: JobFilter,
-        limit: int = 50,
-        offset: int = 0,
-        sort_by: str = "relevance"
-    ) -> Tuple[List[Job], int]:
-        """Search jobs with advanced filtering."""
+    def _job_search_conditions(self, filters: JobFilter) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions and parameters for a job search."""
         where_conditions = ["is_active = true"]
         params = []
         param_count = 1
@@ -328,12 +506,22 @@ class Database:
             params.append(filters.job_type)
             param_count += 1
         
+        if filters.job_types:
+            where_conditions.append(f"job_type = ANY(${param_count})")
+            params.append(filters.job_types)
+            param_count += 1
+        
         # Experience level filter
         if filters.experience_level:
             where_conditions.append(f"experience_level = ${param_count}")
             params.append(filters.experience_level)
             param_count += 1
         
+        if filters.experience_levels:
+            where_conditions.append(f"experience_level = ANY(${param_count})")
+            params.append(filters.experience_levels)
+            param_count += 1
+        
         # Salary range filter
         if filters.salary_range and filters.salary_range[0]:
             where_conditions.append(f"salary_min >= ${param_count}")
@@ -361,13 +549,19 @@ class Database:
             params.append(filters.posted_since)
             param_count += 1
         
-        # Build ORDER BY clause
-        order_clauses = {
-            "relevance": "posted_date DESC, salary_max DESC NULLS LAST",
-            "date": "posted_date DESC",
-            "salary": "salary_max DESC NULLS LAST"
-        }
-        order_by = order_clauses.get(sort_by, order_clauses["relevance"])
+        return where_conditions, params
+    
+    async def search_jobs(
+        self,
+        filters: JobFilter,
+        limit: int = 50,
+        offset: int = 0,
+        sort_by: str = "relevance"
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Search jobs with advanced filtering. Rows are returned as stored, without model validation."""
+        where_conditions, params = self._job_search_conditions(filters)
+        param_count = len(params) + 1
+        order_by = JOB_SEARCH_ORDER.get(sort_by, JOB_SEARCH_ORDER["relevance"])
         
         # Count query
         count_query = f"""
@@ -379,7 +573,7 @@ class Database:
         
         # Main query
         main_query = f"""
-            SELECT * FROM jobs 
+            SELECT {job_columns()} FROM jobs 
             WHERE {' AND '.join(where_conditions)}
             ORDER BY {order_by}
             LIMIT ${param_count} OFFSET ${param_count + 1}
@@ -388,8 +582,79 @@ class Database:
         params.extend([limit, offset])
         rows = await self.fetch(main_query, *params)
         
-        jobs = [Job(**row) for row in rows]
-        return jobs, total_count
+        return rows, total_count
+    
+    async def count_jobs(self, filters: JobFilter) -> int:
+        """Number of jobs matching a search."""
+        where_conditions, params = self._job_search_conditions(filters)
+        return await self.fetchval(
+            f"SELECT COUNT(*) FROM jobs WHERE {' AND '.join(where_conditions)}", *params
+        )
+    
+    async def iter_search_jobs(
+        self,
+        filters: JobFilter,
+        limit: int = 50,
+        offset: int = 0,
+        sort_by: str = "relevance",
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Rows of a job search, read through a server-side cursor in batches."""
+        where_conditions, params = self._job_search_conditions(filters)
+        param_count = len(params) + 1
+        order_by = JOB_SEARCH_ORDER.get(sort_by, JOB_SEARCH_ORDER["relevance"])
+        query = f"""
+            SELECT {job_columns()} FROM jobs 
+            WHERE {' AND '.join(where_conditions)}
+            ORDER BY {order_by}
+            LIMIT ${param_count} OFFSET ${param_count + 1}
+        """
+        async for row in self.iterate(query, *params, limit, offset, prefetch=batch_size):
+            yield row
+    
+    async def find_similar_job_ids(
+        self,
+        job_id: str,
+        limit: int = 10
+    ) -> List[str]:
+        """IDs of the jobs most similar to a stored job, nearest first."""
+        query = """
+            SELECT j.id
+            FROM jobs j, (
+                SELECT embedding, embedding_model FROM jobs WHERE id = $1
+            ) base
+            WHERE j.is_active = true
+              AND j.embedding IS NOT NULL
+              AND j.embedding_model = base.embedding_model
+              AND j.id != $1
+            ORDER BY j.embedding <=> base.embedding
+            LIMIT $2
+        """
+        
+        rows = await self.fetch(query, job_id, limit)
+        return [str(row["id"]) for row in rows]
+    
+    async def find_similar_jobs_by_id(
+        self,
+        job_id: str,
+        limit: int = 10
+    ) -> List[Job]:
+        """Find jobs similar to a stored job using its precomputed embedding."""
+        query = f"""
+            SELECT {job_columns("j")}, 1 - (j.embedding <=> base.embedding) as similarity
+            FROM jobs j, (
+                SELECT embedding, embedding_model FROM jobs WHERE id = $1
+            ) base
+            WHERE j.is_active = true
+              AND j.embedding IS NOT NULL
+              AND j.embedding_model = base.embedding_model
+              AND j.id != $1
+            ORDER BY j.embedding <=> base.embedding
+            LIMIT $2
+        """
+        
+        rows = await self.fetch(query, job_id, limit)
+        return [Job(**{k: v for k, v in row.items() if k != "similarity"}) for row in rows]
     
     async def find_similar_jobs(
         self,
@@ -406,7 +671,7 @@ class Database:
             params.append(exclude_job_id)
         
         query = f"""
-            SELECT *, 1 - (embedding <=> $1) as similarity
+            SELECT {job_columns()}, 1 - (embedding <=> $1) as similarity
             FROM jobs 
             WHERE {where_clause}
             ORDER BY embedding <=> $1
@@ -421,20 +686,17 @@ class Database:
         since: datetime,
         limit: int = 20
     ) -> List[Dict[str, Any]]:
-        """Get trending skills from recent job postings."""
+        """Get trending skills from recent job postings (day granularity, from the skill rollups)."""
         query = """
-            SELECT skill, COUNT(*) as frequency
-            FROM (
-                SELECT unnest(skills_required) as skill
-                FROM jobs 
-                WHERE posted_date >= $1 AND is_active = true
-            ) skills
+            SELECT skill, SUM(job_count)::int as frequency
+            FROM job_skill_rollups
+            WHERE day >= $1::date
             GROUP BY skill
             ORDER BY frequency DESC
             LIMIT $2
         """
         
-        rows = await self.fetch(query, since, limit)
+        rows = await self.fetch(query, since.date(), limit)
         return [{"skill": row["skill"], "frequency": row["frequency"]} for row in rows]
     
     async def get_salary_insights(
@@ -443,13 +705,13 @@ class Database:
         location: Optional[str] = None,
         experience_level: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get salary insights and benchmarking data."""
-        where_conditions = ["is_active = true", "salary_min IS NOT NULL", "salary_max IS NOT NULL"]
-        params = []
-        param_count = 1
+        """Get salary insights and benchmarking data for active postings, from the market rollups."""
+        where_conditions = ["day >= $1", "salary_mid_count > 0"]
+        params: List[Any] = [(datetime.utcnow() - timedelta(days=ACTIVE_WINDOW_DAYS)).date()]
+        param_count = 2
         
         if title:
-            where_conditions.append(f"title ILIKE ${param_count}")
+            where_conditions.append(f"role ILIKE ${param_count}")
             params.append(f"%{title}%")
             param_count += 1
         
@@ -459,27 +721,183 @@ class Database:
             param_count += 1
         
         if experience_level:
-            where_conditions.append(f"experience_level = ${param_count}")
+            where_conditions.append(f"level = ${param_count}")
             params.append(experience_level)
             param_count += 1
         
+        # Title filters need the per-role table; the market cube is much smaller otherwise
         query = f"""
-            SELECT 
-                AVG((salary_min + salary_max) / 2) as avg_salary,
-                MIN(salary_min) as min_salary,
-                MAX(salary_max) as max_salary,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY (salary_min + salary_max) / 2) as median_salary,
-                PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY (salary_min + salary_max) / 2) as p25_salary,
-                PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY (salary_min + salary_max) / 2) as p75_salary,
-                COUNT(*) as sample_size
-            FROM jobs
+            SELECT salary_mid_count, salary_mid_sum, salary_mid_sketch, salary_floor, salary_ceiling
+            FROM {'job_role_salary_rollups' if title else 'job_market_rollups'}
             WHERE {' AND '.join(where_conditions)}
         """
         
-        result = await self.fetchrow(query, *params)
-        return dict(result) if result else {}
+        rows = await self.fetch(query, *params)
+        sample_size = sum(row["salary_mid_count"] for row in rows)
+        if not sample_size:
+            return {
+                "avg_salary": None, "min_salary": None, "max_salary": None, "median_salary": None,
+                "p25_salary": None, "p75_salary": None, "sample_size": 0
+            }
+        
+        sketch = TDigest.merge_serialized(row["salary_mid_sketch"] for row in rows)
+        return {
+            "avg_salary": sum(row["salary_mid_sum"] for row in rows) / sample_size,
+            "min_salary": min(row["salary_floor"] for row in rows),
+            "max_salary": max(row["salary_ceiling"] for row in rows),
+            "median_salary": sketch.quantile(0.5),
+            "p25_salary": sketch.quantile(0.25),
+            "p75_salary": sketch.quantile(0.75),
+            "sample_size": sample_size
+        }
+    
+    async def get_industry_trends(
+        self,
+        location: str,
+        since: datetime,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Job count, average salary and hiring companies per industry, from the market rollups."""
+        query = """
+            WITH cells AS (
+                SELECT industry, job_count, salary_max_count, salary_max_sum, companies
+                FROM job_market_rollups
+                WHERE location ILIKE $1 AND day >= $2::date
+            )
+            SELECT NULLIF(industry, '') as industry,
+                   SUM(job_count)::int as job_count,
+                   SUM(salary_max_sum) / NULLIF(SUM(salary_max_count), 0) as avg_salary,
+                   (
+                       SELECT COUNT(DISTINCT company)
+                       FROM cells c2, jsonb_object_keys(c2.companies) company
+                       WHERE c2.industry = cells.industry
+                   ) as company_count
+            FROM cells
+            GROUP BY industry
+            ORDER BY job_count DESC
+            LIMIT $3
+        """
+        return await self.fetch(query, f"%{location}%", since.date(), limit)
+    
+    async def get_salary_benchmarks(
+        self,
+        role: str,
+        location: str,
+        experience_level: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Advertised maximum salary percentiles for a role, from the market rollups."""
+        benchmarks = await self.get_salary_benchmarks_batch([(role, location, experience_level)], since)
+        return benchmarks[0]
+    
+    async def get_salary_benchmarks_batch(
+        self,
+        keys: List[Tuple[str, str, Optional[str]]],
+        since: Optional[datetime] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Salary benchmarks for many (role, location, experience level) keys in one query.
+        
+        Returns one entry per key, in order; None where the rollups hold no salaries.
+        """
+        if not keys:
+            return []
+        since = since or datetime.utcnow() - timedelta(days=ACTIVE_WINDOW_DAYS)
+        query = """
+            SELECT k.idx, r.level, r.company_size, r.salary_max_count, r.salary_max_sum, r.salary_max_sketch
+            FROM unnest($1::text[], $2::text[], $3::text[]) WITH ORDINALITY AS k(role, location, level, idx)
+            JOIN job_role_salary_rollups r
+              ON r.role ILIKE k.role AND r.location ILIKE k.location
+             AND (k.level IS NULL OR r.level = k.level)
+            WHERE r.day >= $4::date AND r.salary_max_count > 0
+        """
+        rows = await self.fetch(
+            query,
+            [f"%{role}%" for role, _, _ in keys],
+            [f"%{location}%" for _, location, _ in keys],
+            [level or None for _, _, level in keys],
+            since.date()
+        )
+        
+        rows_by_key: Dict[int, List[Any]] = {}
+        for row in rows:
+            rows_by_key.setdefault(row["idx"] - 1, []).append(row)
+        return [self._summarize_salary_rows(rows_by_key.get(i, [])) for i in range(len(keys))]
+    
+    @staticmethod
+    def _summarize_salary_rows(rows: List[Any]) -> Optional[Dict[str, Any]]:
+        """Merge role salary rollup rows into percentiles and per-level/per-size averages."""
+        sample_size = sum(row["salary_max_count"] for row in rows)
+        if not sample_size:
+            return None
+        
+        def group_by(column: str) -> Dict[str, Dict[str, Any]]:
+            totals: Dict[str, List[float]] = {}
+            for row in rows:
+                total = totals.setdefault(row[column] or "unknown", [0.0, 0])
+                total[0] += row["salary_max_sum"]
+                total[1] += row["salary_max_count"]
+            return {key: {"average": total / count, "count": count} for key, (total, count) in totals.items()}
+        
+        sketch = TDigest.merge_serialized(row["salary_max_sketch"] for row in rows)
+        return {
+            "sample_size": sample_size,
+            "percentiles": {
+                "p25": sketch.quantile(0.25),
+                "p50": sketch.quantile(0.5),
+                "p75": sketch.quantile(0.75),
+                "p90": sketch.quantile(0.9)
+            },
+            "average": sum(row["salary_max_sum"] for row in rows) / sample_size,
+            "by_experience": group_by("level"),
+            "by_company_size": group_by("company_size")
+        }
+    
+    async def get_location_demand(
+        self,
+        locations: List[str],
+        window_days: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Posting volume for many locations in one query, from the market rollups.
+        
+        Compares the last window_days with the window before it; returns one row
+        per location, in order.
+        """
+        if not locations:
+            return []
+        today = datetime.utcnow().date()
+        recent_since = today - timedelta(days=window_days)
+        query = """
+            SELECT k.idx,
+                   COALESCE(SUM(r.job_count) FILTER (WHERE r.day >= $2), 0) as recent_jobs,
+                   COALESCE(SUM(r.job_count) FILTER (WHERE r.day < $2), 0) as previous_jobs,
+                   SUM(r.salary_max_sum) FILTER (WHERE r.day >= $2)
+                       / NULLIF(SUM(r.salary_max_count) FILTER (WHERE r.day >= $2), 0) as average_salary_max
+            FROM unnest($1::text[]) WITH ORDINALITY AS k(location, idx)
+            LEFT JOIN job_market_rollups r ON r.location = k.location AND r.day >= $3
+            GROUP BY k.idx
+            ORDER BY k.idx
+        """
+        rows = await self.fetch(query, locations, recent_since, recent_since - timedelta(days=window_days))
+        return [
+            {
+                "location": locations[row["idx"] - 1],
+                "recent_jobs": row["recent_jobs"],
+                "previous_jobs": row["previous_jobs"],
+                "average_salary_max": row["average_salary_max"]
+            }
+            for row in rows
+        ]
     
     # Company-specific methods
+    async def get_companies_by_ids(self, company_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get company profiles for a set of company IDs in one query."""
+        if not company_ids:
+            return []
+        query = "SELECT * FROM companies WHERE id = ANY($1::uuid[])"
+        return await self.fetch(query, list(set(company_ids)))
+    
     async def search_companies(
         self,
         query: Optional[str] = None,
@@ -590,6 +1008,10 @@ class Database:
             ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
             ON CONFLICT (url) DO UPDATE SET
                 updated_date = CURRENT_TIMESTAMP,
+                embedding_model = CASE
+                    WHEN jobs.description IS DISTINCT FROM EXCLUDED.description THEN NULL
+                    ELSE jobs.embedding_model
+                END,
                 description = EXCLUDED.description,
                 salary_min = EXCLUDED.salary_min,
                 salary_max = EXCLUDED.salary_max
@@ -598,6 +1020,12 @@ class Database:
         async with self.acquire_connection() as conn:
             async with conn.transaction():
                 await conn.executemany(insert_query, job_records)
+                # Conflicting URLs updated existing rows
+                stored = await conn.fetch(
+                    "SELECT id FROM jobs WHERE url = ANY($1::text[])",
+                    [record[4] for record in job_records]
+                )
+        await self._jobs_changed([str(row["id"]) for row in stored])
         
         add_scraping_breadcrumb(
             f"Bulk inserted {len(jobs)} jobs",
@@ -611,6 +1039,236 @@ class Database:
         query = "UPDATE jobs SET embedding = $1 WHERE id = $2"
         await self.execute(query, embedding, job_id)
     
+    async def claim_jobs_needing_embeddings(
+        self,
+        model_version: str,
+        limit: int = 64,
+        lease_seconds: int = 300
+    ) -> List[Dict[str, Any]]:
+        """
+        Claim active jobs with no embedding, or one from a different model version.
+        
+        Rows are picked with FOR UPDATE SKIP LOCKED and leased for
+        lease_seconds, so indexers in several API workers embed disjoint
+        batches. A claim that is never written back expires with its lease.
+        """
+        query = """
+            UPDATE jobs j
+            SET embedding_claimed_at = CURRENT_TIMESTAMP
+            FROM (
+                SELECT id FROM jobs
+                WHERE is_active = true
+                  AND embedding_model IS DISTINCT FROM $1
+                  AND (embedding_claimed_at IS NULL
+                       OR embedding_claimed_at < CURRENT_TIMESTAMP - make_interval(secs => $3))
+                ORDER BY id
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            ) claimed
+            WHERE j.id = claimed.id
+            RETURNING j.id, j.title, j.company, j.location, j.description, j.skills_required
+        """
+        return await self.fetch(query, model_version, limit, float(lease_seconds))
+    
+    async def bulk_update_job_embeddings(
+        self,
+        job_ids: List[str],
+        embeddings: List[List[float]],
+        model_version: str
+    ) -> int:
+        """Write a batch of job embeddings in a single statement."""
+        if not job_ids:
+            return 0
+        
+        # pgvector text literals avoid depending on a registered vector codec
+        vectors = ["[" + ",".join(f"{x:.7g}" for x in embedding) + "]" for embedding in embeddings]
+        query = """
+            UPDATE jobs j
+            SET embedding = v.embedding::vector,
+                embedding_model = $3,
+                embedding_updated_at = CURRENT_TIMESTAMP,
+                embedding_claimed_at = NULL
+            FROM unnest($1::uuid[], $2::text[]) AS v(id, embedding)
+            WHERE j.id = v.id
+        """
+        result = await self.execute(query, job_ids, vectors, model_version)
+        
+        match = re.search(r'UPDATE (\d+)', result)
+        return int(match.group(1)) if match else 0
+    
+    async def get_embedding_coverage(self, model_version: str) -> Dict[str, Any]:
+        """Count active jobs embedded with the current model version."""
+        query = """
+            SELECT
+                COUNT(*) as active_jobs,
+                COUNT(*) FILTER (WHERE embedding_model = $1) as embedded_jobs
+            FROM jobs
+            WHERE is_active = true
+        """
+        row = await self.fetchrow(query, model_version)
+        return dict(row) if row else {"active_jobs": 0, "embedded_jobs": 0}
+
+    async def get_recent_jobs_for_matching(
+        self,
+        since: datetime,
+        limit: int = 500,
+        after_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get active jobs created since a cutoff, keyset-paginated by id."""
+        query = """
+            SELECT id, title, company, location, description, skills_required,
+                   salary_min, salary_max, experience_level, remote_friendly,
+                   is_active, url, posted_date, created_at
+            FROM jobs
+            WHERE is_active = true
+              AND created_at >= $1
+              AND ($3::uuid IS NULL OR id > $3::uuid)
+            ORDER BY id
+            LIMIT $2
+        """
+        return await self.fetch(query, since, limit, after_id)
+
+    async def get_jobs_for_ats_corpus(
+        self,
+        since: datetime,
+        after_id: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Get job text and industry created after (since, after_id), keyset-paginated by (created_at, id)."""
+        query = """
+            SELECT j.id, j.title, j.description, j.skills_required, c.industry, j.created_at
+            FROM jobs j
+            LEFT JOIN companies c ON c.id = j.company_id
+            WHERE (j.created_at, j.id) > ($1, COALESCE($2::uuid, '00000000-0000-0000-0000-000000000000'::uuid))
+            ORDER BY j.created_at, j.id
+            LIMIT $3
+        """
+        return await self.fetch(query, since, after_id, limit)
+
+    async def get_active_job_alerts(self) -> List[Dict[str, Any]]:
+        """Get every active job alert's criteria."""
+        query = """
+            SELECT alert_id, user_id, keywords, location, remote_ok, salary_min,
+                   salary_max, job_level, exclude_companies, status
+            FROM job_alerts
+            WHERE status = 'active'
+        """
+        return await self.fetch(query)
+
+    async def get_auto_application_preferences(self) -> List[Dict[str, Any]]:
+        """Get every user's auto-application preferences."""
+        rows = await self.fetch("SELECT id, preferences FROM users WHERE preferences IS NOT NULL")
+
+        users = []
+        for row in rows:
+            preferences = row["preferences"]
+            if isinstance(preferences, str):
+                preferences = json.loads(preferences)
+            auto_applications = (preferences or {}).get("auto_applications")
+            if isinstance(auto_applications, str):
+                auto_applications = json.loads(auto_applications)
+            if auto_applications:
+                users.append({"id": str(row["id"]), "preferences": auto_applications})
+        return users
+
+    async def get_digest_recipients(
+        self,
+        limit: int = 500,
+        after_user_id: Optional[str] = None,
+        shard_index: int = 0,
+        shard_count: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Get users with active alerts who receive the weekly digest, keyset-paginated by user id.
+
+        shard_index/shard_count split users between worker processes by a
+        stable hash of the user id.
+        """
+        query = """
+            SELECT u.id AS user_id, u.email, u.first_name,
+                   array_agg(a.alert_id::text ORDER BY a.alert_id) AS alert_ids
+            FROM users u
+            JOIN job_alerts a ON a.user_id = u.id AND a.status = 'active'
+            WHERE COALESCE(u.email_preferences->>'weekly_digest', 'true') <> 'false'
+              AND ($2::text IS NULL OR u.id::text > $2::text)
+              AND abs(hashtext(u.id::text)) % $4 = $3
+            GROUP BY u.id, u.email, u.first_name
+            ORDER BY u.id::text
+            LIMIT $1
+        """
+        rows = await self.fetch(query, limit, after_user_id, shard_index, shard_count)
+        return [{**row, "user_id": str(row["user_id"])} for row in rows]
+
+    async def get_companies_by_name(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Get company profiles for a set of company names (case-insensitive) in one query."""
+        if not names:
+            return []
+        query = """
+            SELECT company_id, company_name, industry, size, website, glassdoor_rating, description
+            FROM companies
+            WHERE lower(company_name) = ANY($1::text[])
+        """
+        return await self.fetch(query, list({name.lower() for name in names}))
+
+    async def get_newly_hiring_companies(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get companies hiring this week that had no openings in the previous quarter."""
+        query = """
+            SELECT c.company_id, c.company_name, c.industry, c.size,
+                   COUNT(j.job_id) as new_openings
+            FROM companies c
+            JOIN jobs j ON c.company_id = j.company_id
+            WHERE j.created_at >= NOW() - INTERVAL '7 days'
+            AND c.company_id NOT IN (
+                SELECT DISTINCT company_id FROM jobs j2
+                WHERE j2.created_at < NOW() - INTERVAL '30 days'
+                AND j2.created_at >= NOW() - INTERVAL '90 days'
+                AND company_id IS NOT NULL
+            )
+            GROUP BY c.company_id, c.company_name, c.industry, c.size
+            ORDER BY new_openings DESC
+            LIMIT $1
+        """
+        return await self.fetch(query, limit)
+
+    async def bulk_insert_digests(self, digests: List[Dict[str, Any]]) -> int:
+        """Store a shard's generated digests and bump their alerts' sent counters."""
+        if not digests:
+            return 0
+
+        records = [
+            (
+                digest["digest_id"], digest["user_id"], digest["alert_ids"], digest["jobs_count"],
+                json.dumps(digest["top_matches"], default=str),
+                json.dumps(digest["new_companies"], default=str),
+                json.dumps(digest["salary_insights"], default=str),
+                json.dumps(digest["market_trends"], default=str),
+                digest["generated_at"]
+            )
+            for digest in digests
+        ]
+        alert_ids = [alert_id for digest in digests for alert_id in digest["alert_ids"]]
+
+        async with self.acquire_connection() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    INSERT INTO job_alert_digests
+                    (digest_id, user_id, alert_ids, jobs_count, top_matches,
+                     new_companies, salary_insights, market_trends, generated_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                    """,
+                    records
+                )
+                await conn.execute(
+                    """
+                    UPDATE job_alerts
+                    SET last_sent = CURRENT_TIMESTAMP, total_sent = total_sent + 1
+                    WHERE alert_id::text = ANY($1::text[])
+                    """,
+                    alert_ids
+                )
+        return len(records)
+
     async def get_database_stats(self) -> Dict[str, Any]:
         """Get comprehensive database statistics."""
         queries = {
@@ -643,14 +1301,12 @@ class Database:
             UPDATE jobs 
             SET is_active = false, updated_date = CURRENT_TIMESTAMP
             WHERE posted_date < $1 AND is_active = true
+            RETURNING id
         """
         
-        result = await self.execute(query, cutoff_date)
-        
-        # Extract number from result string like "UPDATE 42"
-        import re
-        match = re.search(r'UPDATE (\d+)', result)
-        updated_count = int(match.group(1)) if match else 0
+        rows = await self.fetch(query, cutoff_date)
+        updated_count = len(rows)
+        await self._jobs_changed([str(row["id"]) for row in rows])
         
         add_scraping_breadcrumb(
             f"Cleaned up {updated_count} old jobs",
@@ -660,44 +1316,45 @@ class Database:
         return updated_count
     
     async def get_job_distribution(self) -> Dict[str, Any]:
-        """Get job distribution analytics."""
+        """Get job distribution analytics for active postings, from the market rollups."""
         distribution_queries = {
             "by_location": """
-                SELECT location, COUNT(*) as count
-                FROM jobs 
-                WHERE is_active = true AND location IS NOT NULL
+                SELECT location, SUM(job_count)::int as count
+                FROM job_market_rollups
+                WHERE day >= $1 AND location <> ''
                 GROUP BY location
                 ORDER BY count DESC
                 LIMIT 10
             """,
             "by_company": """
-                SELECT company, COUNT(*) as count
-                FROM jobs 
-                WHERE is_active = true
+                SELECT company, SUM(openings::int)::int as count
+                FROM job_market_rollups, jsonb_each_text(companies) AS c(company, openings)
+                WHERE day >= $1
                 GROUP BY company
                 ORDER BY count DESC
                 LIMIT 10
             """,
             "by_job_type": """
-                SELECT job_type, COUNT(*) as count
-                FROM jobs 
-                WHERE is_active = true
+                SELECT NULLIF(job_type, '') as job_type, SUM(job_count)::int as count
+                FROM job_market_rollups
+                WHERE day >= $1
                 GROUP BY job_type
                 ORDER BY count DESC
             """,
             "by_experience_level": """
-                SELECT experience_level, COUNT(*) as count
-                FROM jobs 
-                WHERE is_active = true
-                GROUP BY experience_level
+                SELECT NULLIF(level, '') as experience_level, SUM(job_count)::int as count
+                FROM job_market_rollups
+                WHERE day >= $1
+                GROUP BY level
                 ORDER BY count DESC
             """
         }
         
+        since = (datetime.utcnow() - timedelta(days=ACTIVE_WINDOW_DAYS)).date()
         distribution = {}
         for key, query in distribution_queries.items():
             try:
-                rows = await self.fetch(query)
+                rows = await self.fetch(query, since)
                 distribution[key] = [dict(row) for row in rows]
             except Exception as e:
                 capture_api_error(e, endpoint=f"distribution_{key}", method="DB")
@@ -705,6 +1362,76 @@ class Database:
         
         return distribution
 
+    async def get_jobs_for_rollup(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Get the rollup dimensions and measures of jobs posted in [start, end)."""
+        query = """
+            SELECT j.location, c.industry, j.experience_level, c.size_range, j.job_type,
+                   j.title, j.company, j.salary_min, j.salary_max, j.skills_required
+            FROM jobs j
+            LEFT JOIN companies c ON c.id = j.company_id
+            WHERE j.posted_date >= $1 AND j.posted_date < $2
+        """
+        return await self.fetch(query, start, end)
+
+    async def replace_market_rollups(
+        self,
+        day,
+        cells: List[Tuple],
+        role_cells: List[Tuple],
+        skill_cells: List[Tuple],
+        job_count: int
+    ):
+        """Atomically replace one day's rollup partitions."""
+        async with self.acquire_connection() as conn:
+            async with conn.transaction():
+                for table in ("job_market_rollups", "job_role_salary_rollups", "job_skill_rollups"):
+                    await conn.execute(f"DELETE FROM {table} WHERE day = $1", day)
+                if cells:
+                    await conn.executemany(
+                        """
+                        INSERT INTO job_market_rollups (
+                            day, location, industry, level, company_size, job_type,
+                            job_count, companies, salary_max_count, salary_max_sum, salary_max_sketch,
+                            salary_mid_count, salary_mid_sum, salary_mid_sketch, salary_floor, salary_ceiling
+                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
+                        """,
+                        cells
+                    )
+                if role_cells:
+                    await conn.executemany(
+                        """
+                        INSERT INTO job_role_salary_rollups (
+                            day, role, location, level, company_size,
+                            salary_max_count, salary_max_sum, salary_max_sketch,
+                            salary_mid_count, salary_mid_sum, salary_mid_sketch, salary_floor, salary_ceiling
+                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+                        """,
+                        role_cells
+                    )
+                if skill_cells:
+                    await conn.executemany(
+                        """
+                        INSERT INTO job_skill_rollups (day, location, industry, level, skill, job_count)
+                        VALUES ($1, $2, $3, $4, $5, $6)
+                        """,
+                        skill_cells
+                    )
+                await conn.execute(
+                    """
+                    INSERT INTO job_rollup_days (day, job_count, refreshed_at)
+                    VALUES ($1, $2, CURRENT_TIMESTAMP)
+                    ON CONFLICT (day) DO UPDATE SET
+                        job_count = EXCLUDED.job_count,
+                        refreshed_at = EXCLUDED.refreshed_at
+                    """,
+                    day, job_count
+                )
+
+    async def get_rollup_days(self, since) -> List[Any]:
+        """Days whose rollup partitions have been built since a date."""
+        rows = await self.fetch("SELECT day FROM job_rollup_days WHERE day >= $1", since)
+        return [row["day"] for row in rows]
+
 
 class CacheManager:
     """Redis-based caching layer."""
@@ -0,0 +1,309 @@
+"""
+Bounded duplicate tracking for streaming job processing.
+
+Combines a small exact LRU with time-bucketed Bloom filters so memory stays
+flat regardless of stream volume, and snapshots the filters to Redis so the
+seen-set survives restarts.
+"""
+
+import math
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Initialize Bloom filter.
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false positive rate at capacity
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.bits_set = 0
+
+    def _positions(self, item: str):
+        """Yield the bit positions for an item."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Add an item. Returns True if it was not already (probably) present."""
+        added = False
+        for pos in self._positions(item):
+            byte_index, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte_index] & mask:
+                self.bits[byte_index] |= mask
+                self.bits_set += 1
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def fill_ratio(self) -> float:
+        """Fraction of bits currently set."""
+        return self.bits_set / self.num_bits
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated false positive rate from the current fill ratio."""
+        return self.fill_ratio ** self.num_hashes
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the bit array in bytes."""
+        return len(self.bits)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the bit array."""
+        return bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacity: int, error_rate: float) -> "BloomFilter":
+        """Restore a filter created with the same capacity and error rate."""
+        bloom = cls(capacity, error_rate)
+        if len(data) != len(bloom.bits):
+            raise ValueError("Serialized filter size does not match configuration")
+        bloom.bits = bytearray(data)
+        bloom.bits_set = sum(bin(byte).count('1') for byte in bloom.bits)
+        # Approximate item count from the fill ratio (Swamidass & Baldi)
+        if bloom.bits_set < bloom.num_bits:
+            bloom.count = int(
+                -bloom.num_bits / bloom.num_hashes
+                * math.log(1 - bloom.bits_set / bloom.num_bits)
+            )
+        else:
+            bloom.count = capacity
+        return bloom
+
+
+class ProcessedJobTracker:
+    """
+    Time-bucketed probabilistic set of processed job ids.
+
+    Ids are written to the Bloom filter of the current time bucket; buckets
+    older than the window are dropped. An exact LRU in front answers repeat
+    lookups for recently seen ids without touching the filters.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 7 * 24 * 3600,
+        bucket_seconds: int = 6 * 3600,
+        bucket_capacity: int = 100000,
+        error_rate: float = 0.001,
+        lru_size: int = 10000,
+        redis_client: Optional[Any] = None,
+        key_prefix: str = "dedup:processed_jobs",
+        persist_interval: int = 60
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            window_seconds: How long an id is remembered
+            bucket_seconds: Width of each Bloom filter bucket
+            bucket_capacity: Expected ids per bucket
+            error_rate: Target false positive rate per bucket
+            lru_size: Number of ids kept in the exact LRU
+            redis_client: Optional async Redis client for persistence
+            key_prefix: Redis key prefix for bucket snapshots
+            persist_interval: Minimum seconds between Redis snapshots
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.bucket_capacity = bucket_capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.persist_interval = persist_interval
+
+        self.num_buckets = max(1, math.ceil(window_seconds / bucket_seconds))
+        self._buckets: "OrderedDict[int, BloomFilter]" = OrderedDict()
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._dirty_buckets: set = set()
+        self._last_persist = time.monotonic()
+
+        # Metrics
+        self.lookups = 0
+        self.lru_hits = 0
+        self.bloom_hits = 0
+        self.additions = 0
+        self.buckets_expired = 0
+
+    def _bucket_id(self, now: Optional[float] = None) -> int:
+        return int((now if now is not None else time.time()) // self.bucket_seconds)
+
+    def _current_bucket(self) -> Tuple[int, BloomFilter]:
+        """Return the active bucket, rotating out expired ones."""
+        bucket_id = self._bucket_id()
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = BloomFilter(self.bucket_capacity, self.error_rate)
+            self._buckets[bucket_id] = bucket
+            self._expire_buckets(bucket_id)
+        return bucket_id, bucket
+
+    def _expire_buckets(self, current_id: int):
+        oldest_allowed = current_id - self.num_buckets + 1
+        while self._buckets:
+            bucket_id = next(iter(self._buckets))
+            if bucket_id >= oldest_allowed:
+                break
+            del self._buckets[bucket_id]
+            self._dirty_buckets.discard(bucket_id)
+            self.buckets_expired += 1
+
+    def __contains__(self, job_id: Any) -> bool:
+        key = str(job_id)
+        self.lookups += 1
+
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.lru_hits += 1
+            return True
+
+        oldest_allowed = self._bucket_id() - self.num_buckets + 1
+        for bucket_id, bucket in reversed(self._buckets.items()):
+            if bucket_id < oldest_allowed:
+                break
+            if key in bucket:
+                self.bloom_hits += 1
+                return True
+        return False
+
+    def add(self, job_id: Any):
+        """Record a job id as processed."""
+        key = str(job_id)
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+        bucket_id, bucket = self._current_bucket()
+        if bucket.add(key):
+            self._dirty_buckets.add(bucket_id)
+        self.additions += 1
+
+    def check_and_add(self, job_id: Any) -> bool:
+        """Return True if the id was already seen, otherwise record it."""
+        if job_id in self:
+            return True
+        self.add(job_id)
+        return False
+
+    def _redis_key(self, bucket_id: int) -> str:
+        return f"{self.key_prefix}:{self.bucket_seconds}:{bucket_id}"
+
+    async def load(self):
+        """Restore bucket snapshots from Redis."""
+        if not self.redis_client:
+            return
+
+        current_id = self._bucket_id()
+        bucket_ids = list(range(current_id - self.num_buckets + 1, current_id + 1))
+        try:
+            snapshots = await self.redis_client.mget([self._redis_key(b) for b in bucket_ids])
+        except Exception as e:
+            logger.warning(f"Could not load processed-job filters from Redis: {e}")
+            return
+
+        restored = 0
+        for bucket_id, data in zip(bucket_ids, snapshots):
+            if not data:
+                continue
+            try:
+                self._buckets[bucket_id] = BloomFilter.from_bytes(
+                    data, self.bucket_capacity, self.error_rate
+                )
+                restored += 1
+            except ValueError as e:
+                logger.warning(f"Discarding processed-job filter {bucket_id}: {e}")
+
+        self._buckets = OrderedDict(sorted(self._buckets.items()))
+        logger.info(f"Restored {restored} processed-job filter buckets from Redis")
+
+    async def persist(self, force: bool = False):
+        """Snapshot modified buckets to Redis, at most once per persist_interval."""
+        if not self.redis_client or not self._dirty_buckets:
+            return
+        if not force and time.monotonic() - self._last_persist < self.persist_interval:
+            return
+
+        current_id = self._bucket_id()
+        try:
+            pipe = self.redis_client.pipeline()
+            for bucket_id in self._dirty_buckets:
+                bucket = self._buckets.get(bucket_id)
+                if bucket is None:
+                    continue
+                remaining_buckets = bucket_id - current_id + self.num_buckets
+                ttl = max(1, remaining_buckets * self.bucket_seconds)
+                pipe.setex(self._redis_key(bucket_id), ttl, bucket.to_bytes())
+            await pipe.execute()
+            self._dirty_buckets.clear()
+        except Exception as e:
+            logger.warning(f"Could not persist processed-job filters to Redis: {e}")
+        finally:
+            self._last_persist = time.monotonic()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory used by filters and the LRU."""
+        # ~100 bytes per LRU entry for the str object and dict slot
+        return sum(b.memory_bytes for b in self._buckets.values()) + len(self._lru) * 100
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated probability that an unseen id is reported as seen."""
+        miss_probability = 1.0
+        for bucket in self._buckets.values():
+            miss_probability *= 1.0 - bucket.false_positive_rate
+        return 1.0 - miss_probability
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracker statistics."""
+        return {
+            "buckets": len(self._buckets),
+            "max_buckets": self.num_buckets,
+            "bucket_seconds": self.bucket_seconds,
+            "approx_items": sum(b.count for b in self._buckets.values()),
+            "lru_size": len(self._lru),
+            "memory_bytes": self.memory_bytes,
+            "estimated_false_positive_rate": self.false_positive_rate,
+            "max_bucket_fill_ratio": max(
+                (b.fill_ratio for b in self._buckets.values()), default=0.0
+            ),
+            "lookups": self.lookups,
+            "lru_hits": self.lru_hits,
+            "bloom_hits": self.bloom_hits,
+            "additions": self.additions,
+            "buckets_expired": self.buckets_expired,
+            "persistent": self.redis_client is not None
+        }
@@ -0,0 +1,140 @@
+"""
+Cache-aside read path for job details.
+
+Job detail rows (every column except the embedding and raw_data, see
+JOB_DETAIL_COLUMNS) are read through the shared cache. Misses for any number
+of jobs are fetched with one get_jobs_by_ids query, and concurrent misses for
+the same job share one in-flight query. Every Database write path that changes
+stored job rows reports the ids, which drops their entries; the ingest
+pipeline then re-reads each job it stores, so the cache only ever holds rows
+in the shape get_jobs_by_ids returns.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.config.settings import settings
+from src.utils.cache import CacheManager, get_cache_manager
+from src.utils.database import Database, get_database
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "job_detail"
+
+
+class JobDetailCache:
+    """Job detail rows by id, through the shared cache."""
+
+    def __init__(self, db: Database, cache: CacheManager, ttl: Optional[int] = None):
+        self.db = db
+        self.cache = cache
+        self.ttl = ttl or settings.job_detail_cache_ttl
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        db.add_jobs_changed_listener(self.invalidate_many)
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "db_queries": 0,
+            "writes": 0,
+            "invalidations": 0,
+        }
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([job_id]))[0]
+
+    async def get_many(self, job_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        """Rows for job_ids in the same order; None for jobs that do not exist."""
+        job_ids = [str(job_id) for job_id in job_ids]
+        unique = list(dict.fromkeys(job_ids))
+        if not unique:
+            return []
+
+        cached = await self.cache.get_multiple(unique, prefix=CACHE_PREFIX)
+        found = {job_id: cached[job_id] for job_id in unique if cached.get(job_id) is not None}
+        self.stats["hits"] += len(found)
+
+        missing = [job_id for job_id in unique if job_id not in found]
+        if missing:
+            found.update(await self._load(missing))
+        return [found.get(job_id) for job_id in job_ids]
+
+    async def _load(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        waiting = {job_id: self._inflight[job_id] for job_id in job_ids if job_id in self._inflight}
+        to_fetch = [job_id for job_id in job_ids if job_id not in waiting]
+        self.stats["coalesced"] += len(waiting)
+        self.stats["misses"] += len(to_fetch)
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        if to_fetch:
+            rows = await self._fetch(to_fetch)
+        for job_id, pending in waiting.items():
+            row = (await asyncio.shield(pending)).get(job_id)
+            if row is not None:
+                rows[job_id] = row
+        return rows
+
+    async def _fetch(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        for job_id in job_ids:
+            self._inflight[job_id] = future
+        try:
+            self.stats["db_queries"] += 1
+            rows = {str(row["id"]): row for row in await self.db.get_jobs_by_ids(job_ids)}
+            # A put or invalidate during the query takes the job out of
+            # _inflight; its row may be stale, so it is returned but not cached
+            fresh = {job_id: row for job_id, row in rows.items() if self._inflight.get(job_id) is future}
+            if fresh:
+                await self.cache.set_multiple(fresh, ttl=self.ttl, prefix=CACHE_PREFIX)
+            future.set_result(rows)
+            return rows
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here, so no warning when nothing else was waiting
+            raise
+        finally:
+            for job_id in job_ids:
+                if self._inflight.get(job_id) is future:
+                    del self._inflight[job_id]
+
+    async def refresh(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Re-read a job just stored by the ingest pipeline into the cache."""
+        job_id = str(job_id)
+        # A fetch already in flight may have read the row before the write
+        self._inflight.pop(job_id, None)
+        row = (await self._fetch([job_id])).get(job_id)
+        if row is not None:
+            self.stats["writes"] += 1
+        return row
+
+    async def invalidate(self, job_id: str):
+        """Drop a job after it is updated or deleted."""
+        await self.invalidate_many([job_id])
+
+    async def invalidate_many(self, job_ids: Iterable[str]):
+        job_ids = [str(job_id) for job_id in job_ids]
+        for job_id in job_ids:
+            self._inflight.pop(job_id, None)
+        await self.cache.delete_multiple(job_ids, prefix=CACHE_PREFIX)
+        self.stats["invalidations"] += len(job_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0}
+
+
+_job_cache: Optional[JobDetailCache] = None
+
+
+async def get_job_detail_cache() -> JobDetailCache:
+    """Get the process-wide job detail cache."""
+    global _job_cache
+    if _job_cache is None:
+        _job_cache = JobDetailCache(await get_database(), await get_cache_manager())
+    return _job_cache
@@ -0,0 +1,112 @@
+"""
+Batched SMTP delivery.
+
+Messages are handed over in batches, each sent over a single SMTP
+connection in a worker thread, so a digest run pays one connect/EHLO/login
+per batch instead of one per email. Point it at a local relay (Postfix,
+MailHog, or `python -m aiosmtpd -n`) and let that relay handle delivery.
+"""
+
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BatchMailer:
+    """Sends email messages to an SMTP relay, one connection per batch."""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        sender: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_connections: int = 4,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        timeout: float = 30.0
+    ):
+        self.host = host or settings.digest_smtp_host
+        self.port = port or settings.digest_smtp_port
+        self.sender = sender or settings.digest_sender
+        self.batch_size = batch_size or settings.digest_email_batch_size
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="smtp")
+        self.stats = {"sent": 0, "failed": 0, "batches": 0, "send_seconds": 0.0}
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _send_blocking(self, messages: List[Message]) -> int:
+        sent = 0
+        smtp = self._connect()
+        try:
+            for message in messages:
+                if "From" not in message:
+                    message["From"] = self.sender
+                try:
+                    smtp.send_message(message)
+                    sent += 1
+                except smtplib.SMTPServerDisconnected:
+                    # Relay dropped the connection mid-batch; reconnect once and retry
+                    smtp = self._connect()
+                    smtp.send_message(message)
+                    sent += 1
+                except smtplib.SMTPRecipientsRefused as e:
+                    logger.warning(f"Digest email refused for {message['To']}: {e.recipients}")
+        finally:
+            try:
+                smtp.quit()
+            except smtplib.SMTPException:
+                smtp.close()
+        return sent
+
+    async def send(self, messages: List[Message]) -> int:
+        """Send messages in batches of batch_size; batches run concurrently up to max_connections."""
+        if not messages:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        batches = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._send_blocking, batch) for batch in batches),
+            return_exceptions=True
+        )
+
+        sent = 0
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send batch of {len(batch)} emails: {result}")
+                self.stats["failed"] += len(batch)
+            else:
+                sent += result
+                self.stats["failed"] += len(batch) - result
+        self.stats["sent"] += sent
+        self.stats["batches"] += len(batches)
+        self.stats["send_seconds"] += time.perf_counter() - start
+        return sent
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -16,6 +16,8 @@ import pickle
 import hashlib
 from pathlib import Path
 
+from .model_residency import get_residency_manager, measure_model_bytes
+
 logger = logging.getLogger(__name__)
 
 class ModelCacheManager:
@@ -32,7 +34,8 @@ class ModelCacheManager:
         
         Args:
             cache_dir: Directory for disk cache
-            max_memory_gb: Maximum memory usage in GB
+            max_memory_gb: Unused; the in-memory budget is the process-wide
+                ModelResidencyManager's (MODEL_MEMORY_BUDGET_MB)
             max_disk_cache_gb: Maximum disk cache size in GB
         """
         self.cache_dir = Path(cache_dir)
@@ -55,6 +58,9 @@ class ModelCacheManager:
         self.model_pool: Dict[str, Any] = {}
         self.model_refs: Dict[str, int] = {}
         
+        # Process-wide memory budget shared with ModelPreloader
+        self.residency = get_residency_manager()
+        
         self._clean_disk_cache()
         
     def _get_cache_key(self, model_id: str, model_version: str = "latest") -> str:
@@ -62,33 +68,8 @@ class ModelCacheManager:
         return f"{model_id}_{model_version}"
         
     def _get_model_size(self, model: Any) -> int:
-        """Estimate model size in bytes"""
-        try:
-            # For PyTorch models
-            if hasattr(model, 'state_dict'):
-                param_size = sum(
-                    p.nelement() * p.element_size() 
-                    for p in model.parameters()
-                )
-                buffer_size = sum(
-                    b.nelement() * b.element_size() 
-                    for b in model.buffers()
-                )
-                return param_size + buffer_size
-            
-            # For transformers pipelines
-            if hasattr(model, 'model'):
-                return self._get_model_size(model.model)
-                
-            # Fallback: estimate using pickle
-            import io
-            buffer = io.BytesIO()
-            pickle.dump(model, buffer)
-            return buffer.tell()
-            
-        except Exception as e:
-            logger.warning(f"Could not estimate model size: {str(e)}")
-            return 1024 * 1024 * 100  # Default 100MB
+        """Model size in bytes (parameters and buffers)"""
+        return measure_model_bytes(model)
             
     def _get_current_memory_usage(self) -> int:
         """Get current cache memory usage in bytes"""
@@ -98,58 +79,43 @@ class ModelCacheManager:
                 for key in self.memory_cache
             )
             
-    def _evict_lru_model(self):
-        """Evict least recently used model from memory"""
+    def _evict_model(self, cache_key: str):
+        """Release a model the residency manager evicted, spilling it to disk"""
         with self.cache_lock:
-            if not self.memory_cache:
+            cache_entry = self.memory_cache.get(cache_key)
+            if cache_entry is None:
                 return
                 
-            # Find LRU model
-            lru_key = next(iter(self.memory_cache))
-            
-            # Check if model is in use
-            if self.model_refs.get(lru_key, 0) > 0:
-                # Find next available model
-                for key in self.memory_cache:
-                    if self.model_refs.get(key, 0) == 0:
-                        lru_key = key
-                        break
-                else:
-                    logger.warning("All models are in use, cannot evict")
-                    return
-                    
-            logger.info(f"Evicting model {lru_key} from memory cache")
+            logger.info(f"Evicting model {cache_key} from memory cache")
             
             # Save to disk cache before evicting
-            self._save_to_disk(lru_key, self.memory_cache[lru_key])
+            self._save_to_disk(cache_key, cache_entry)
             
             # Remove from memory
-            del self.memory_cache[lru_key]
-            if lru_key in self.model_pool:
-                del self.model_pool[lru_key]
-                
-            # Force garbage collection
-            import gc
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+            del self.memory_cache[cache_key]
+            self.model_pool.pop(cache_key, None)
                 
     def _ensure_memory_available(self, required_bytes: int):
-        """Ensure enough memory is available for a new model"""
-        current_usage = self._get_current_memory_usage()
-        
-        while current_usage + required_bytes > self.max_memory_bytes:
-            if not self.memory_cache:
-                break
-            self._evict_lru_model()
-            current_usage = self._get_current_memory_usage()
+        """Ensure the shared model budget has room for a new model"""
+        self.residency.make_room(required_bytes)
+            
+    def _admit(self, cache_key: str, model_size: int, load_seconds: float = 0.0):
+        """Count a cached model against the shared budget"""
+        self.residency.admit(
+            cache_key,
+            size_bytes=model_size,
+            load_seconds=load_seconds,
+            owner="ModelCacheManager",
+            on_evict=self._evict_model
+        )
             
     def cache_model(self, 
                    model_id: str, 
                    model: Any,
                    tokenizer: Any = None,
                    model_version: str = "latest",
-                   metadata: Dict[str, Any] = None) -> str:
+                   metadata: Dict[str, Any] = None,
+                   load_seconds: float = 0.0) -> str:
         """
         Cache a model in memory and optionally disk
         
@@ -159,6 +125,7 @@ class ModelCacheManager:
             tokenizer: Optional tokenizer to cache with model
             model_version: Model version
             metadata: Additional metadata to store
+            load_seconds: How long the model took to load (its eviction cost)
             
         Returns:
             Cache key for the model
@@ -170,9 +137,6 @@ class ModelCacheManager:
             model_size = self._get_model_size(model)
             self.model_sizes[cache_key] = model_size
             
-            # Ensure memory available
-            self._ensure_memory_available(model_size)
-            
             # Create cache entry
             cache_entry = {
                 "model": model,
@@ -197,6 +161,9 @@ class ModelCacheManager:
             self.model_access_count[cache_key] = 0
             self.model_last_access[cache_key] = time.time()
             
+            # Account for it in the shared budget; may evict other models
+            self._admit(cache_key, model_size, load_seconds)
+            
             logger.info(f"Cached model {cache_key} ({model_size / 1024 / 1024:.1f} MB)")
             
         return cache_key
@@ -237,6 +204,7 @@ class ModelCacheManager:
                     if cache_entry is None and load_func:
                         # Load model using provided function
                         logger.info(f"Loading model {cache_key} using load function")
+                        load_start = time.time()
                         model_data = load_func(model_id, model_version)
                         
                         if isinstance(model_data, tuple):
@@ -249,7 +217,8 @@ class ModelCacheManager:
                             model_id, 
                             model, 
                             tokenizer, 
-                            model_version
+                            model_version,
+                            load_seconds=time.time() - load_start
                         )
                         
                         cache_entry = self.memory_cache[cache_key]
@@ -259,6 +228,7 @@ class ModelCacheManager:
                         
                 # Update access metadata
                 self.model_refs[cache_key] = self.model_refs.get(cache_key, 0) + 1
+                self.residency.retain(cache_key)
                 self.model_access_count[cache_key] += 1
                 self.model_last_access[cache_key] = time.time()
                 
@@ -272,6 +242,7 @@ class ModelCacheManager:
             with self.cache_lock:
                 if cache_key in self.model_refs:
                     self.model_refs[cache_key] = max(0, self.model_refs[cache_key] - 1)
+                    self.residency.release(cache_key)
                     
     def _save_to_disk(self, cache_key: str, cache_entry: Dict[str, Any]):
         """Save model to disk cache"""
@@ -346,10 +317,10 @@ class ModelCacheManager:
             
             # Add back to memory cache
             model_size = self._get_model_size(cache_entry["model"])
-            self._ensure_memory_available(model_size)
             
             self.memory_cache[cache_key] = cache_entry
             self.model_sizes[cache_key] = model_size
+            self._admit(cache_key, model_size)
             
             return cache_entry
             
@@ -389,7 +360,8 @@ class ModelCacheManager:
             stats = {
                 "memory_cache_size": len(self.memory_cache),
                 "memory_usage_mb": memory_usage / 1024 / 1024,
-                "memory_usage_percent": (memory_usage / self.max_memory_bytes) * 100,
+                "memory_usage_percent": (memory_usage / self.residency.budget_bytes) * 100,
+                "residency": self.residency.get_stats(),
                 "models_in_use": sum(1 for refs in self.model_refs.values() if refs > 0),
                 "total_access_count": sum(self.model_access_count.values()),
                 "cached_models": []
@@ -414,6 +386,8 @@ class ModelCacheManager:
                 logger.warning("Cannot clear cache: models are in use")
                 return False
                 
+            for cache_key in self.memory_cache:
+                self.residency.forget(cache_key)
             self.memory_cache.clear()
             self.model_pool.clear()
             self.model_refs.clear()
@@ -7,7 +7,8 @@ import os
 import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Set
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Set
 from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 import threading
@@ -21,6 +22,8 @@ from transformers import (
     pipeline
 )
 
+from .model_residency import get_residency_manager
+
 logger = logging.getLogger(__name__)
 
 class ModelPreloader:
@@ -34,7 +37,8 @@ class ModelPreloader:
         Initialize model preloader
         
         Args:
-            max_memory_usage: Maximum percentage of system memory to use (0-1)
+            max_memory_usage: Unused; memory is budgeted by the process-wide
+                ModelResidencyManager (MODEL_MEMORY_BUDGET_MB)
         """
         self.models: Dict[str, Any] = {}
         self.tokenizers: Dict[str, Any] = {}
@@ -45,6 +49,8 @@ class ModelPreloader:
         self.last_access: Dict[str, float] = {}
         self.loading_locks: Dict[str, threading.Lock] = {}
         self.max_memory_usage = max_memory_usage
+        self.model_sizes: Dict[str, int] = {}
+        self.residency = get_residency_manager()
         self.executor = ThreadPoolExecutor(max_workers=4)
         self._initialize_model_configs()
         
@@ -138,6 +144,7 @@ class ModelPreloader:
         if model_id in self.pipelines:
             self.access_counts[model_id] = self.access_counts.get(model_id, 0) + 1
             self.last_access[model_id] = time.time()
+            self.residency.touch(self._residency_key(model_id))
             return self.pipelines[model_id]
         
         # Acquire lock for this model
@@ -149,10 +156,6 @@ class ModelPreloader:
             if model_id in self.pipelines:
                 return self.pipelines[model_id]
             
-            # Check memory before loading
-            if not self._check_memory_availability():
-                self._evict_least_used_model()
-            
             config = self.model_configs.get(model_id, {})
             if not config:
                 logger.error(f"No configuration found for model: {model_id}")
@@ -161,6 +164,9 @@ class ModelPreloader:
             model_name = config["model_name"]
             task = config["task"]
             
+            # Make room using the size measured on a previous load, if any
+            self.residency.make_room(self.model_sizes.get(model_id, 0))
+            
             logger.info(f"Loading model: {model_id} ({model_name})")
             start_time = time.time()
             
@@ -186,6 +192,17 @@ class ModelPreloader:
                 self.access_counts[model_id] = 1
                 self.last_access[model_id] = time.time()
                 
+                # Count it against the shared budget; critical models are pinned
+                resident = self.residency.admit(
+                    self._residency_key(model_id),
+                    pipe,
+                    load_seconds=self.load_times[model_id],
+                    owner="ModelPreloader",
+                    on_evict=self._drop_model,
+                    pinned=config.get("priority", 3) == 1 and config.get("preload", False)
+                )
+                self.model_sizes[model_id] = resident.size_bytes
+                
                 logger.info(f"Model {model_id} loaded in {self.load_times[model_id]:.2f} seconds")
                 return pipe
                 
@@ -193,38 +210,22 @@ class ModelPreloader:
                 logger.error(f"Error loading model {model_id}: {str(e)}")
                 return None
                 
-    def _check_memory_availability(self) -> bool:
-        """Check if there's enough memory to load a new model"""
-        memory = psutil.virtual_memory()
-        return memory.percent < (self.max_memory_usage * 100)
-        
-    def _evict_least_used_model(self):
-        """Evict the least recently used model to free memory"""
-        if not self.pipelines:
-            return
-            
-        # Find least recently used model
-        lru_model_id = min(self.last_access, key=self.last_access.get)
+    @staticmethod
+    def _residency_key(model_id: str) -> str:
+        return f"preloader:{model_id}"
         
-        logger.info(f"Evicting model {lru_model_id} to free memory")
+    def _drop_model(self, residency_key: str):
+        """Release a pipeline the residency manager evicted"""
+        model_id = residency_key.split(":", 1)[1]
+        logger.info(f"Evicting model {model_id} to free memory")
         
-        # Remove from caches
-        if lru_model_id in self.pipelines:
-            del self.pipelines[lru_model_id]
-        if lru_model_id in self.models:
-            del self.models[lru_model_id]
-        if lru_model_id in self.tokenizers:
-            del self.tokenizers[lru_model_id]
-            
-        # Force garbage collection
-        import gc
-        gc.collect()
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        self.pipelines.pop(model_id, None)
+        self.models.pop(model_id, None)
+        self.tokenizers.pop(model_id, None)
             
     def get_model(self, model_id: str) -> Optional[Any]:
         """
-        Get a model, loading it if necessary
+        Get a model, loading it if necessary (see use_model for inference)
         
         Args:
             model_id: Identifier for the model
@@ -234,6 +235,37 @@ class ModelPreloader:
         """
         return self.load_model(model_id)
         
+    @contextmanager
+    def use_model(self, model_id: str) -> Iterator[Optional[Any]]:
+        """
+        Get a model and hold it resident while the block runs
+        
+        get_model only records an access, so a model returned by it can be
+        evicted mid-inference; use this around inference instead.
+        
+        Args:
+            model_id: Identifier for the model
+            
+        Yields:
+            Model pipeline or None
+        """
+        residency_key = self._residency_key(model_id)
+        while True:
+            pipe = self.load_model(model_id)
+            if pipe is None:
+                break
+            self.residency.retain(residency_key)
+            if self.pipelines.get(model_id) is pipe:
+                break
+            # Evicted between loading and retaining; load it again
+            self.residency.release(residency_key)
+        
+        try:
+            yield pipe
+        finally:
+            if pipe is not None:
+                self.residency.release(residency_key)
+        
     def preload_critical_models(self):
         """Synchronously preload critical models during startup"""
         critical_models = [
@@ -251,6 +283,7 @@ class ModelPreloader:
             "loaded_models": list(self.pipelines.keys()),
             "total_models": len(self.model_configs),
             "memory_usage": psutil.virtual_memory().percent,
+            "residency": self.residency.get_stats(),
             "load_times": self.load_times,
             "access_counts": self.access_counts,
             "model_details": []
@@ -269,6 +302,8 @@ class ModelPreloader:
     def cleanup(self):
         """Cleanup resources"""
         self.executor.shutdown(wait=True)
+        for model_id in self.pipelines:
+            self.residency.forget(self._residency_key(model_id))
         self.pipelines.clear()
         self.models.clear()
         self.tokenizers.clear()
@@ -0,0 +1,196 @@
+"""
+Mergeable quantile sketches for salary aggregates.
+
+A t-digest (Dunning & Ertl) keeps a bounded number of weighted centroids
+regardless of how many values it has seen, with the finest resolution at
+the tails. Digests for separate rollup cells can be merged and queried for
+any percentile, so salary percentiles over arbitrary slices are computed
+from stored sketches instead of re-sorting the raw rows.
+"""
+
+import math
+import struct
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+_HEADER = struct.Struct("<dddI")
+
+
+class TDigest:
+    """t-digest using the k1 (arcsine) scale function, compressed with numpy."""
+
+    def __init__(self, compression: float = 100.0):
+        """
+        Initialize the digest.
+
+        Args:
+            compression: Roughly the number of centroids kept; higher is more accurate
+        """
+        if compression < 10:
+            raise ValueError("compression must be at least 10")
+
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._values: List[float] = []
+        self._buffer_limit = int(compression * 5)
+
+    def __len__(self) -> int:
+        return int(self.total)
+
+    def add(self, value: float):
+        """Add a value."""
+        value = float(value)
+        if math.isnan(value):
+            return
+        self._values.append(value)
+        self.total += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._values) >= self._buffer_limit:
+            self._compress()
+
+    def add_many(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest's centroids into this one."""
+        if not other.total:
+            return
+        other._compress()
+        self._compress(other.means, other.weights)
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @classmethod
+    def merge_all(cls, digests: Iterable["TDigest"], compression: Optional[float] = None) -> "TDigest":
+        """Merge many digests with a single compression pass."""
+        digests = [digest for digest in digests if digest.total]
+        merged = cls(compression or (digests[0].compression if digests else 100.0))
+        if not digests:
+            return merged
+        for digest in digests:
+            digest._compress()
+        merged.total = sum(digest.total for digest in digests)
+        merged.min = min(digest.min for digest in digests)
+        merged.max = max(digest.max for digest in digests)
+        merged._compress(
+            np.concatenate([digest.means for digest in digests]),
+            np.concatenate([digest.weights for digest in digests])
+        )
+        return merged
+
+    @classmethod
+    def merge_serialized(cls, blobs: Iterable[Optional[bytes]], compression: Optional[float] = None) -> "TDigest":
+        """Merge digests written by to_bytes without restoring each one (None entries are skipped)."""
+        blobs = [blob for blob in blobs if blob]
+        headers = [_HEADER.unpack_from(blob) for blob in blobs]
+        merged = cls(compression or (headers[0][0] if headers else 100.0))
+        if not blobs:
+            return merged
+        centroids = np.frombuffer(b"".join(blob[_HEADER.size:] for blob in blobs), dtype="<f8").reshape(-1, 2)
+        merged.min = min(header[1] for header in headers)
+        merged.max = max(header[2] for header in headers)
+        merged.total = float(centroids[:, 1].sum())
+        merged._compress(centroids[:, 0], centroids[:, 1])
+        return merged
+
+    def _compress(self, means: Optional[np.ndarray] = None, weights: Optional[np.ndarray] = None):
+        """
+        Fold buffered values (and any extra centroids) into the centroid list.
+
+        Centroids are sorted and grouped by the integer part of their k1 scale
+        value, so each output centroid spans at most one unit of k: narrow at
+        the tails, wide around the median.
+        """
+        if means is None and not len(self.means) and len(self._values) <= self.compression / 2:
+            # Too few values to share a k unit: each stays its own centroid
+            if self._values:
+                self.means = np.sort(self._values)
+                self.weights = np.ones(len(self._values))
+                self._values = []
+            return
+
+        parts_m, parts_w = [self.means], [self.weights]
+        if self._values:
+            parts_m.append(np.asarray(self._values))
+            parts_w.append(np.ones(len(self._values)))
+            self._values = []
+        if means is not None:
+            parts_m.append(means)
+            parts_w.append(weights)
+        if len(parts_m) == 1:
+            return
+
+        all_means = np.concatenate(parts_m)
+        all_weights = np.concatenate(parts_w)
+        order = np.argsort(all_means, kind="stable")
+        all_means, all_weights = all_means[order], all_weights[order]
+
+        cumulative = np.cumsum(all_weights)
+        total = cumulative[-1]
+        q = (cumulative - all_weights / 2) / total
+        k = np.floor(self.compression / math.pi * np.arcsin(2 * q - 1))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(k)) + 1))
+
+        weights = np.add.reduceat(all_weights, starts)
+        self.means = np.add.reduceat(all_means * all_weights, starts) / weights
+        self.weights = weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0-1), interpolating between centroid centres."""
+        if not self.total:
+            return None
+        self._compress()
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return float(means[0])
+        if len(means) == self.total:
+            # Every centroid is a single value: interpolate exactly, as PERCENTILE_CONT does
+            return float(np.interp(q * (len(means) - 1), np.arange(len(means)), means))
+
+        target = q * self.total
+        # Left tail: between the minimum and the first centroid's centre
+        if target < weights[0] / 2:
+            return float(self.min + (means[0] - self.min) * target / (weights[0] / 2))
+
+        # Cumulative weight at each centroid centre
+        centres = np.cumsum(weights) - weights / 2
+        if target <= centres[-1]:
+            return float(np.interp(target, centres, means))
+
+        # Right tail: between the last centroid's centre and the maximum
+        remaining = weights[-1] / 2
+        return float(means[-1] + (self.max - means[-1]) * min(1.0, (target - centres[-1]) / remaining))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the compressed centroids."""
+        self._compress()
+        centroids = np.column_stack((self.means, self.weights)).astype("<f8")
+        return _HEADER.pack(self.compression, self.min, self.max, len(self.means)) + centroids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        """Restore a digest written by to_bytes."""
+        compression, minimum, maximum, n = _HEADER.unpack_from(data)
+        centroids = np.frombuffer(data, dtype="<f8", count=n * 2, offset=_HEADER.size)
+
+        digest = cls(compression)
+        digest.means = centroids[0::2]
+        digest.weights = centroids[1::2]
+        digest.total = float(digest.weights.sum())
+        digest.min, digest.max = minimum, maximum
+        return digest
@@ -4,10 +4,12 @@ Automatically adjusts rate limits based on response patterns.
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Deque
+from typing import Any, Dict, List, Optional, Deque, Tuple
 from datetime import datetime, timedelta
 import math
 
@@ -56,10 +58,50 @@ class DomainStats:
         return (len(self.request_times) / time_span) * 60
 
 
+@dataclass
+class DomainSchedule:
+    """GCRA state and priority-ordered waiters for a domain."""
+    tat: float = 0.0  # Theoretical arrival time of the next conforming request
+    last_start: float = 0.0  # Start time of the most recently granted slot
+    waiters: List[Tuple[int, int, float, asyncio.Future]] = field(default_factory=list)
+    dispatcher: Optional[asyncio.Task] = None
+
+
+# Atomic GCRA reservation shared by all scraper processes. Uses the Redis
+# server clock so processes with skewed clocks still agree on the schedule.
+GCRA_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local emission_interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local spacing = tonumber(ARGV[3])
+local window = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tat', 'last')
+local tat = tonumber(state[1]) or now
+local last = tonumber(state[2]) or 0
+
+local start = math.max(now, last + spacing, tat - tolerance)
+tat = math.max(tat, start) + emission_interval
+
+redis.call('HSET', KEYS[1], 'tat', tostring(tat), 'last', tostring(start))
+redis.call('PEXPIRE', KEYS[1], math.ceil((tat - now + window) * 1000))
+return tostring(start - now)
+"""
+
+
 class AdaptiveRateLimiter:
     """Adaptive rate limiter that adjusts based on server responses."""
     
-    def __init__(self):
+    def __init__(self, redis_client: Optional[Any] = None):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            redis_client: Optional async Redis client holding shared per-domain
+                budgets. If omitted and settings.rate_limit_shared_state is
+                enabled, a client is created from settings.redis_url.
+        """
         self.domain_stats: Dict[str, DomainStats] = defaultdict(DomainStats)
         self.global_stats = DomainStats()
         
@@ -74,43 +116,147 @@ class AdaptiveRateLimiter:
         self.success_reward_factor = 0.9
         self.failure_penalty_factor = 1.2
         
-        # Rate limit windows
+        # Rate limit windows (enforced as a GCRA budget of limit per window_size)
         self.windows: Dict[str, Dict[str, any]] = defaultdict(lambda: {
-            'requests': deque(maxlen=1000),
             'limit': settings.rate_limit_per_domain,
             'window_size': settings.rate_limit_window
         })
         
-        # Lock for thread safety
-        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Per-domain schedules; slot reservation is synchronous so no lock is
+        # held while callers sleep
+        self.schedules: Dict[str, DomainSchedule] = defaultdict(DomainSchedule)
+        self._waiter_sequence = itertools.count()
+        
+        # Optional shared state across scraper processes
+        self.redis_client = redis_client
+        self._use_redis = redis_client is not None or settings.rate_limit_shared_state
+        self._reserve_script = None
+        self.redis_key_prefix = "ratelimit:domain"
     
     async def wait(self, domain: str, priority: int = 5) -> None:
-        """Wait before making a request to a domain."""
-        async with self._locks[domain]:
-            stats = self.domain_stats[domain]
-            
-            # Calculate adaptive delay
-            delay = self._calculate_delay(domain, stats)
-            
-            # Apply priority (1-10, where 1 is highest priority)
-            delay *= (priority / 5.0)
-            
-            # Ensure minimum time between requests
-            time_since_last = time.time() - stats.last_request_time
-            if time_since_last < delay:
-                wait_time = delay - time_since_last
-                logger.debug(f"Rate limiting {domain}: waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-            
-            # Record request time
-            current_time = time.time()
-            stats.request_times.append(current_time)
-            stats.last_request_time = current_time
-            stats.requests_made += 1
-            
-            # Update global stats
-            self.global_stats.requests_made += 1
-            self.global_stats.request_times.append(current_time)
+        """
+        Wait before making a request to a domain.
+        
+        Requests are released one slot at a time; when several callers are
+        queued for a domain, lower priority values (1 is highest) go first.
+        """
+        stats = self.domain_stats[domain]
+        
+        # Calculate adaptive delay
+        delay = self._calculate_delay(domain, stats)
+        
+        # Apply priority (1-10, where 1 is highest priority)
+        delay *= (priority / 5.0)
+        
+        schedule = self.schedules[domain]
+        
+        # Fast path: nobody queued and a slot is free right now
+        if not self._use_redis and not schedule.waiters and schedule.dispatcher is None:
+            now = time.time()
+            if self._next_local_slot(domain, schedule, delay, now) <= now:
+                self._reserve_local(domain, schedule, delay, now)
+                self._record_request(stats, now)
+                return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(schedule.waiters, (priority, next(self._waiter_sequence), delay, future))
+        if schedule.dispatcher is None:
+            schedule.dispatcher = asyncio.create_task(self._dispatch(domain, schedule))
+        
+        await future
+        self._record_request(stats, time.time())
+    
+    async def _dispatch(self, domain: str, schedule: DomainSchedule) -> None:
+        """Release queued waiters for a domain one slot at a time, by priority."""
+        try:
+            while schedule.waiters:
+                spacing = schedule.waiters[0][2]
+                start = await self._reserve(domain, schedule, spacing)
+                
+                wait_time = start - time.time()
+                if wait_time > 0:
+                    logger.debug(f"Rate limiting {domain}: waiting {wait_time:.2f}s")
+                    await asyncio.sleep(wait_time)
+                
+                # Hand the slot to the highest-priority waiter still waiting
+                while schedule.waiters:
+                    _, _, _, future = heapq.heappop(schedule.waiters)
+                    if not future.done():
+                        future.set_result(None)
+                        break
+        except asyncio.CancelledError:
+            # Nothing will release the queued callers any more; cancel them too
+            for _, _, _, future in schedule.waiters:
+                future.cancel()
+            schedule.waiters.clear()
+            raise
+        except Exception as e:
+            logger.error(f"Rate limiter dispatcher for {domain} failed: {e}")
+            for _, _, _, future in schedule.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            schedule.waiters.clear()
+        finally:
+            schedule.dispatcher = None
+    
+    def _gcra_params(self, domain: str) -> Tuple[float, float, float]:
+        """Return (emission interval, burst tolerance, window) for a domain."""
+        window = self.windows[domain]
+        limit = max(1, window['limit'])
+        emission_interval = window['window_size'] / limit
+        return emission_interval, emission_interval * (limit - 1), window['window_size']
+    
+    def _next_local_slot(self, domain: str, schedule: DomainSchedule, spacing: float, now: float) -> float:
+        """Earliest start time that honours both the GCRA budget and spacing."""
+        _, tolerance, _ = self._gcra_params(domain)
+        return max(now, schedule.last_start + spacing, schedule.tat - tolerance)
+    
+    def _reserve_local(self, domain: str, schedule: DomainSchedule, spacing: float, now: float) -> float:
+        """Reserve the next slot in O(1) and return its start time."""
+        emission_interval, _, _ = self._gcra_params(domain)
+        start = self._next_local_slot(domain, schedule, spacing, now)
+        schedule.tat = max(schedule.tat, start) + emission_interval
+        schedule.last_start = start
+        return start
+    
+    async def _reserve(self, domain: str, schedule: DomainSchedule, spacing: float) -> float:
+        """Reserve a slot, in Redis when shared state is enabled."""
+        if self._use_redis:
+            try:
+                return await self._reserve_shared(domain, spacing)
+            except Exception as e:
+                logger.warning(f"Shared rate limit unavailable for {domain}, using local budget: {e}")
+        return self._reserve_local(domain, schedule, spacing, time.time())
+    
+    async def _reserve_shared(self, domain: str, spacing: float) -> float:
+        """Atomically reserve a slot in the Redis-backed per-domain budget."""
+        if self._reserve_script is None:
+            if self.redis_client is None:
+                import redis.asyncio as redis
+                self.redis_client = redis.from_url(
+                    settings.redis_url,
+                    password=settings.redis_password,
+                    decode_responses=True,
+                    socket_connect_timeout=5
+                )
+            self._reserve_script = self.redis_client.register_script(GCRA_RESERVE_SCRIPT)
+        
+        emission_interval, tolerance, window = self._gcra_params(domain)
+        delay = await self._reserve_script(
+            keys=[f"{self.redis_key_prefix}:{domain}"],
+            args=[emission_interval, tolerance, spacing, window]
+        )
+        return time.time() + float(delay)
+    
+    def _record_request(self, stats: DomainStats, current_time: float) -> None:
+        """Record a granted request."""
+        stats.request_times.append(current_time)
+        stats.last_request_time = current_time
+        stats.requests_made += 1
+        
+        # Update global stats
+        self.global_stats.requests_made += 1
+        self.global_stats.request_times.append(current_time)
     
     def record_success(self, domain: str, response_time: Optional[float] = None) -> None:
         """Record a successful request."""
@@ -153,7 +299,12 @@ class AdaptiveRateLimiter:
                 stats.current_delay = min(stats.current_delay, self.max_delay)
     
     def _calculate_delay(self, domain: str, stats: DomainStats) -> float:
-        """Calculate adaptive delay for a domain."""
+        """
+        Calculate adaptive spacing between requests for a domain.
+        
+        The per-window request budget is enforced separately by the GCRA
+        reservation, so this is O(1) and has no side effects.
+        """
         if not settings.adaptive_rate_limiting:
             return self.initial_delay
         
@@ -183,27 +334,6 @@ class AdaptiveRateLimiter:
                 block_factor = math.exp(-time_since_block / 300) * 2
                 delay *= (1 + block_factor)
         
-        # Apply rate limiting window
-        window = self.windows[domain]
-        current_time = time.time()
-        
-        # Remove old requests from window
-        window['requests'] = deque(
-            [t for t in window['requests'] if current_time - t < window['window_size']],
-            maxlen=1000
-        )
-        
-        # Check if at rate limit
-        if len(window['requests']) >= window['limit']:
-            # Calculate how long to wait
-            oldest_request = window['requests'][0]
-            wait_until = oldest_request + window['window_size']
-            additional_wait = max(0, wait_until - current_time)
-            delay = max(delay, additional_wait + 0.1)
-        
-        # Record request in window
-        window['requests'].append(current_time)
-        
         # Ensure within bounds
         delay = max(self.min_delay, min(delay, self.max_delay))
         
@@ -225,7 +355,8 @@ class AdaptiveRateLimiter:
                 'success_rate': stats.success_rate,
                 'current_delay': stats.current_delay,
                 'avg_response_time': stats.avg_response_time,
-                'requests_per_minute': stats.requests_per_minute
+                'requests_per_minute': stats.requests_per_minute,
+                'queued_waiters': len(self.schedules[domain].waiters) if domain in self.schedules else 0
             }
         
         # Return global stats
@@ -237,6 +368,7 @@ class AdaptiveRateLimiter:
             'total_blocked': self.global_stats.blocked_requests,
             'global_success_rate': self.global_stats.success_rate,
             'global_avg_response_time': self.global_stats.avg_response_time,
+            'shared_state': self._use_redis,
             'domain_stats': {
                 domain: self.get_stats(domain)
                 for domain in self.domain_stats.keys()
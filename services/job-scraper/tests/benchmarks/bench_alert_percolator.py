@@ -0,0 +1,194 @@
+"""
+Benchmark for the job alert percolator.
+
+Builds synthetic alerts and jobs, then compares streaming jobs through the
+AlertIndex with evaluating every alert against every job (the work a
+per-alert scan does, without the database round trips). Also checks that
+both find the same hits, and times end-to-end AlertPercolator.percolate
+into the in-memory buffers (or Redis with --redis).
+
+Usage:
+    python tests/benchmarks/bench_alert_percolator.py [--alerts N] [--jobs N] [--redis]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.settings import settings
+from src.processors.alert_percolator import AlertIndex, AlertPercolator, AlertQuery
+from src.processors.auto_apply_matcher import JobFeatures
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "node.js", "django", "flask",
+    "sql", "postgresql", "mongodb", "aws", "azure", "gcp", "docker", "kubernetes", "terraform",
+    "excel", "sap", "salesforce", "tableau", "power bi", "machine learning", "data analysis",
+    "project management", "agile", "scrum", "accounting", "payroll", "bookkeeping", "ifrs",
+    "nursing", "teaching", "sales", "marketing", "seo", "copywriting", "customer service",
+    "logistics", "procurement", "autocad", "solidworks", "welding", "electrical", "plumbing",
+]
+ROLES = [
+    "developer", "engineer", "analyst", "manager", "accountant", "consultant", "administrator",
+    "designer", "technician", "specialist", "coordinator", "officer", "lead", "architect",
+]
+SENIORITY = ["junior", "senior", "principal", "head of", "assistant", ""]
+LOCATIONS = [
+    "Johannesburg", "Cape Town", "Durban", "Pretoria", "Port Elizabeth", "Bloemfontein",
+    "East London", "Polokwane", "Nelspruit", "Kimberley", "Stellenbosch", "Sandton",
+    "Centurion", "Midrand", "Rustenburg", "George", "Pietermaritzburg", "Umhlanga",
+]
+LEVELS = ["entry", "mid", "senior", "executive"]
+COMPANIES = [f"Company {i}" for i in range(500)]
+FILLER = (
+    "we are looking for a motivated team player to join our growing business the successful "
+    "candidate will work closely with stakeholders and deliver high quality results"
+).split()
+
+
+def make_keyword(rng: random.Random) -> str:
+    """A saved-search term: usually a role phrase such as "python developer"."""
+    if rng.random() < 0.6:
+        return f"{rng.choice(SKILLS)} {rng.choice(ROLES)}"
+    return rng.choice(SKILLS)
+
+
+def make_alerts(n: int, rng: random.Random):
+    alerts = []
+    for i in range(n):
+        keywords = [] if rng.random() < 0.02 else [make_keyword(rng) for _ in range(rng.randint(1, 2))]
+        alerts.append({
+            "alert_id": f"alert-{i}",
+            "user_id": f"user-{i // 3}",
+            "keywords": keywords,
+            "location": rng.choice(LOCATIONS) if rng.random() < 0.8 else None,
+            "remote_ok": rng.random() < 0.15,
+            "salary_min": rng.choice([None, None, 20000, 35000, 50000]),
+            "salary_max": None,
+            "job_level": rng.choice([None, None, *LEVELS]),
+            "exclude_companies": rng.sample(COMPANIES, 2) if rng.random() < 0.1 else [],
+            "status": "active",
+        })
+    return alerts
+
+
+def make_jobs(n: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    jobs = []
+    for i in range(n):
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        words = FILLER * 2 + [w for skill in skills for w in skill.split()]
+        rng.shuffle(words)
+        location = rng.choice(LOCATIONS)
+        salary = rng.choice([None, 15000, 25000, 40000, 60000, 90000])
+        jobs.append({
+            "id": f"job-{i}",
+            "title": f"{rng.choice(SENIORITY)} {rng.choice(SKILLS)} {rng.choice(ROLES)}".strip(),
+            "company": rng.choice(COMPANIES),
+            "location": f"Remote, {location}" if rng.random() < 0.1 else f"{location}, South Africa",
+            "description": " ".join(words),
+            "skills_required": skills,
+            "salary_min": salary,
+            "salary_max": salary * 1.3 if salary else None,
+            "experience_level": f"{rng.choice(LEVELS)}_level",
+            "created_at": now,
+        })
+    return jobs
+
+
+def report(name: str, seconds: float, count: int, unit: str):
+    print(f"{name:<44}{seconds * 1000:>10.1f} ms  {count / seconds:>14,.0f} {unit}/s", flush=True)
+
+
+async def bench_end_to_end(alerts, jobs, use_redis: bool, batch_size: int):
+    redis_client = None
+    if use_redis:
+        import redis.asyncio as redis
+        redis_client = redis.from_url(settings.redis_url, password=settings.redis_password)
+        await redis_client.ping()
+
+    percolator = AlertPercolator(db=None, redis_client=redis_client)
+    for alert in alerts:
+        percolator.index.add(AlertQuery.compile(alert))
+
+    start = time.perf_counter()
+    for i in range(0, len(jobs), batch_size):
+        await percolator.percolate(jobs[i:i + batch_size])
+    seconds = time.perf_counter() - start
+    report(f"percolate + buffer ({'redis' if use_redis else 'memory'})", seconds, len(jobs), "jobs")
+
+    start = time.perf_counter()
+    user_alerts = [alert["alert_id"] for alert in alerts[:50]]
+    for _ in range(100):
+        await percolator.read_hits(user_alerts, limit=20)
+    report("digest read (50 alerts)", time.perf_counter() - start, 100, "digests")
+    print(f"stats: {percolator.get_stats()}")
+
+    if redis_client is not None:
+        for alert_id in [alert["alert_id"] for alert in alerts]:
+            await percolator.buffers.clear(alert_id)
+        await redis_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job alert percolator")
+    parser.add_argument("--alerts", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--scan-alerts", type=int, default=5000,
+                        help="Alerts evaluated by the full scan baseline; extrapolated to --alerts")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--redis", action="store_true", help="Buffer hits in settings.redis_url")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    alerts = make_alerts(args.alerts, rng)
+    jobs = make_jobs(args.jobs, rng)
+
+    start = time.perf_counter()
+    features = [JobFeatures.from_job(job) for job in jobs]
+    report("job feature extraction", time.perf_counter() - start, len(jobs), "jobs")
+
+    start = time.perf_counter()
+    index = AlertIndex()
+    queries = [AlertQuery.compile(alert) for alert in alerts]
+    for query in queries:
+        index.add(query)
+    report("index build", time.perf_counter() - start, len(alerts), "alerts")
+    print(f"index: {index.get_stats()}")
+
+    start = time.perf_counter()
+    candidates = hits = 0
+    percolated = []
+    for job in features:
+        candidate_ids = index.candidates(job)
+        matched = {alert_id for alert_id in candidate_ids if index.queries[alert_id].matches(job)}
+        candidates += len(candidate_ids)
+        hits += len(matched)
+        percolated.append(matched)
+    percolate_seconds = time.perf_counter() - start
+    report("percolate (index lookup + verify)", percolate_seconds, len(jobs), "jobs")
+    print(f"  {candidates / len(jobs):,.1f} candidate alerts/job, {hits / len(jobs):,.1f} hits/job")
+
+    sample = queries[:args.scan_alerts]
+    start = time.perf_counter()
+    scanned = [{q.alert_id for q in sample if q.matches(job)} for job in features]
+    scan_seconds = (time.perf_counter() - start) * len(queries) / len(sample)
+    print(f"{'full scan (every alert x every job)':<44}{scan_seconds * 1000:>10.1f} ms  "
+          f"{len(jobs) / scan_seconds:>14,.0f} jobs/s  (extrapolated from {len(sample)} alerts)")
+    print(f"  speedup: {scan_seconds / percolate_seconds:,.1f}x")
+
+    sample_ids = {q.alert_id for q in sample}
+    mismatches = sum(1 for found, expected in zip(percolated, scanned) if (found & sample_ids) != expected)
+    print(f"  jobs whose hits differ from the full scan: {mismatches}")
+
+    asyncio.run(bench_end_to_end(alerts, jobs, args.redis, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark for ATS keyword scoring.
+
+Builds TermStatistics from a synthetic corpus of job postings in which each
+role and industry has its own vocabulary, mixed with shared filler and
+boilerplate. Reports build throughput and size, incremental update cost,
+and CV scoring latency with cold and memoized role profiles. As a sanity
+check on the statistics it also reports how many of the top missing keywords
+suggested for a CV actually belong to the target role's vocabulary.
+
+Usage:
+    python tests/benchmarks/bench_ats_scorer.py [--jobs N] [--cvs N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.processors.ats_scorer import TermStatistics
+
+ROLES = {
+    "Python Developer": ("python django flask rest apis postgresql docker kubernetes aws git "
+                         "unit testing microservices celery redis linux ci/cd"),
+    "Financial Accountant": ("ifrs reconciliations general ledger month-end audit vat sars "
+                             "pastel sage budgeting variance analysis accruals payroll tax"),
+    "Registered Nurse": ("patient care sanc ward medication administration icu theatre "
+                         "clinical assessment wound care infection control triage"),
+    "Sales Representative": ("sales targets pipeline crm prospecting negotiation b2b "
+                             "account management cold calling quotations closing deals"),
+    "Data Analyst": ("sql power bi tableau excel dashboards reporting statistics python "
+                     "data modelling etl kpis stakeholders visualisation"),
+    "Project Manager": ("pmp prince2 agile scrum stakeholder management risk register "
+                        "budgets timelines scope governance msp milestones"),
+}
+INDUSTRIES = {
+    "Technology": "cloud saas product software digital",
+    "Finance": "banking investment insurance compliance regulatory",
+    "Healthcare": "hospital clinic healthcare medical private",
+    "Retail": "retail stores customers merchandising fmcg",
+}
+FILLER = ("communication teamwork deadlines office fast-paced environment motivated detail "
+          "oriented reliable drivers licence matric degree diploma benefits medical aid "
+          "pension growth career development hybrid onsite").split()
+BOILERPLATE = "we are looking for a strong candidate to join our team with the ability to work".split()
+SENIORITY = ["", "Senior ", "Junior ", "Lead "]
+
+
+def make_job(rng: random.Random):
+    role = rng.choice(list(ROLES))
+    industry = rng.choice(list(INDUSTRIES))
+    vocabulary = ROLES[role].split()
+    words = (rng.sample(vocabulary, k=rng.randint(6, len(vocabulary)))
+             + rng.choices(INDUSTRIES[industry].split(), k=4)
+             + rng.choices(FILLER, k=40) + BOILERPLATE * 3)
+    rng.shuffle(words)
+    return {
+        "title": rng.choice(SENIORITY) + role,
+        "description": " ".join(words),
+        "skills_required": rng.sample(vocabulary, k=3),
+        "industry": industry,
+    }
+
+
+def make_cv(role: str, rng: random.Random) -> str:
+    vocabulary = ROLES[role].split()
+    return " ".join(rng.sample(vocabulary, k=len(vocabulary) // 2) + rng.choices(FILLER, k=120))
+
+
+def build(jobs) -> TermStatistics:
+    terms = TermStatistics(terms_per_job=40)
+    terms.add_jobs(jobs)
+    terms.prune()
+    return terms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ATS keyword scoring")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--cvs", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    jobs = [make_job(rng) for _ in range(args.jobs)]
+
+    start = time.perf_counter()
+    terms = build(jobs)
+    elapsed = time.perf_counter() - start
+    print(f"build          {args.jobs / elapsed:>10,.0f} jobs/s  ({elapsed:.2f}s) {terms.get_stats()}")
+
+    tracemalloc.start()
+    traced = build(jobs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    print(f"memory         {size / 1024 / 1024:>10.1f} MB")
+
+    new_jobs = [make_job(rng) for _ in range(1000)]
+    start = time.perf_counter()
+    terms.add_jobs(new_jobs)
+    print(f"incremental    {(time.perf_counter() - start) / len(new_jobs) * 1e6:>10.0f} us/job")
+
+    roles = list(ROLES)
+    cvs = [(role, make_cv(role, rng)) for role in (rng.choice(roles) for _ in range(args.cvs))]
+    for label in ("cold profiles", "warm profiles"):
+        if label == "cold profiles":
+            terms._profiles.clear()
+        latencies, precision = [], []
+        for role, cv in cvs:
+            if label == "cold profiles":
+                terms._profiles.clear()
+            started = time.perf_counter()
+            report = terms.score(cv, f"Senior {role}", None)
+            latencies.append(time.perf_counter() - started)
+            top = [keyword for keyword, _, _ in report.missing[:10]]
+            relevant = set(ROLES[role].split()) | set(role.lower().split())
+            precision.append(sum(all(word in relevant for word in keyword.split()) for keyword in top) / max(len(top), 1))
+        latencies.sort()
+        print(f"score, {label}  p50 {statistics.median(latencies) * 1000:.3f} ms  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms  "
+              f"missing keywords from role vocabulary {statistics.mean(precision):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Microbenchmarks for the authentication path.
+
+Compares full JWT verification with verified-token cache hits, and the
+per-tier feature bitset lookup with the list scan it replaced.
+
+Usage:
+    python tests/benchmarks/bench_auth.py [--iterations N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.middleware.auth import (
+    JWTAuth, TierFeatures, UserTier, AuthenticatedUser, verified_token_cache
+)
+
+
+def report(name: str, seconds: float, iterations: int):
+    print(f"{name:<40}{seconds / iterations * 1e6:>10.2f} us/op")
+
+
+def list_scan_has_feature(tier: str, feature: str) -> bool:
+    """Previous TierFeatures.has_feature implementation."""
+    features = TierFeatures.TIER_FEATURES.get(tier, {}).get("features", [])
+    return "all" in features or feature in features
+
+
+def main(iterations: int):
+    token = JWTAuth.create_access_token(
+        {"user_id": "bench-user", "tier": UserTier.EXECUTIVE},
+        expires_delta=timedelta(hours=1)
+    )
+
+    print(f"{'benchmark':<40}{'time':>16}")
+
+    seconds = timeit.timeit(lambda: JWTAuth.decode_token(token), number=iterations)
+    report("decode_token (signature verify)", seconds, iterations)
+
+    def uncached():
+        verified_token_cache.clear()
+        return JWTAuth.authenticate(token)
+
+    seconds = timeit.timeit(uncached, number=iterations)
+    report("authenticate, cache miss", seconds, iterations)
+
+    JWTAuth.authenticate(token)
+    seconds = timeit.timeit(lambda: JWTAuth.authenticate(token), number=iterations)
+    report("authenticate, cache hit", seconds, iterations)
+
+    feature = "reference_management"
+    seconds = timeit.timeit(
+        lambda: list_scan_has_feature(UserTier.EXECUTIVE, feature), number=iterations
+    )
+    report("has_feature, list scan", seconds, iterations)
+
+    seconds = timeit.timeit(
+        lambda: TierFeatures.has_feature(UserTier.EXECUTIVE, feature), number=iterations
+    )
+    report("has_feature, tier bitset", seconds, iterations)
+
+    user = AuthenticatedUser(user_id="bench-user", tier=UserTier.EXECUTIVE)
+    seconds = timeit.timeit(lambda: user.has_feature(feature), number=iterations)
+    report("AuthenticatedUser.has_feature", seconds, iterations)
+
+    print(f"\ncache stats: {verified_token_cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.iterations)
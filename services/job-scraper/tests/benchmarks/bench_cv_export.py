@@ -0,0 +1,141 @@
+"""
+Benchmark for concurrent CV PDF exports.
+
+Fires a burst of concurrent exports of distinct synthetic CVs, three ways:
+rendering inline on the event loop (as the export route used to), through
+CVExportService's process pool, and again through the service once the PDFs
+are cached. Alongside export latency it reports the longest event-loop
+stall seen by a heartbeat task, which is what every other request on the
+worker waits behind. The cache is the in-memory CacheManager fallback.
+
+Usage:
+    python tests/benchmarks/bench_cv_export.py [--exports N] [--sections N] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.processors.cv_export import CVExportService
+from src.utils.cache import CacheManager
+from src.utils.cv_pdf import TEMPLATE_SPECS, render_cv_pdf
+
+WORDS = ("led delivered platform team python data migration reporting stakeholders budget "
+         "compliance customers pipeline analytics strategy improved reduced launched").split()
+
+
+def make_cv(i: int, sections: int, rng: random.Random):
+    return (
+        f"Candidate {i}",
+        rng.choice(list(TEMPLATE_SPECS)),
+        [{
+            "section_type": "experience",
+            "title": f"Role {n}",
+            "content": {
+                "summary": " ".join(rng.choices(WORDS, k=60)),
+                "highlights": [" ".join(rng.choices(WORDS, k=12)) for _ in range(5)],
+            },
+            "order": n,
+            "is_visible": True,
+        } for n in range(sections)]
+    )
+
+
+class Heartbeat:
+    """Measures how late a 5 ms timer fires, i.e. how long the event loop was blocked."""
+
+    def __init__(self):
+        self.max_stall = 0.0
+        self._task = None
+
+    async def _beat(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            self.max_stall = max(self.max_stall, time.perf_counter() - start - 0.005)
+
+    def __enter__(self):
+        self.max_stall = 0.0
+        self._task = asyncio.ensure_future(self._beat())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def run(label: str, cvs, export):
+    latencies = []
+
+    async def timed(cv):
+        await export(cv)
+        # From the start of the burst: all exports are requested at once
+        latencies.append(time.perf_counter() - start)
+
+    with Heartbeat() as heartbeat:
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(cv) for cv in cvs))
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.01)  # Let the heartbeat record the last stall
+
+    latencies.sort()
+    print(f"{label:<24}{len(cvs) / elapsed:>10.1f} exports/s"
+          f"{statistics.median(latencies) * 1000:>10.1f} ms p50"
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:>10.1f} ms p99"
+          f"{heartbeat.max_stall * 1000:>10.1f} ms max loop stall", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent CV PDF exports")
+    parser.add_argument("--exports", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cvs = [make_cv(i, args.sections, rng) for i in range(args.exports)]
+
+    cache = CacheManager()
+    cache._initialized = True
+    cache.max_memory_items = args.exports * 2
+    service = CVExportService(cache, workers=args.workers)
+
+    async def inline(cv):
+        render_cv_pdf(*cv)
+
+    async def pooled(cv):
+        content_hash = service.content_hash(*cv)
+        if await service.get_cached(content_hash) is None:
+            await service.render(content_hash, *cv)
+
+    # Start the worker processes outside the measurement
+    await asyncio.gather(*(service.render(f"warmup-{i}", *cvs[0]) for i in range(args.workers)))
+    print(f"{args.exports} exports of {args.sections}-section CVs, {args.workers} render processes")
+
+    await run("inline on event loop", cvs, inline)
+    await run("process pool, cold", cvs, pooled)
+    await run("process pool, cached", cvs, pooled)
+
+    large = make_cv(args.exports, args.sections * 10, rng)
+    content_hash = service.content_hash(*large)
+    start = time.perf_counter()
+    job = await service.submit("bench-user", content_hash, *large)
+    accepted = time.perf_counter() - start
+    while (await service.get_job(job["job_id"], "bench-user"))["status"] == "pending":
+        await asyncio.sleep(0.01)
+    print(f"background export       accepted in {accepted * 1000:.1f} ms, "
+          f"ready after {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(await service.get_cached(content_hash)):,} bytes)")
+
+    await service.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,265 @@
+"""
+Benchmark for the weekly digest worker.
+
+Fills percolator buffers with synthetic alert hits, then sends every user's
+digest to a local SMTP sink two ways: the per-user path (shared queries and
+company lookups repeated per user, templates compiled per render, one SMTP
+connection per email) and DigestWorker.run_cycle. Database calls go to an
+in-memory data source with a configurable round-trip latency. Reports
+digests/minute for both.
+
+Usage:
+    python tests/benchmarks/bench_digest_worker.py [--users N] [--db-latency-ms N] [--redis]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import smtplib
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from jinja2 import Environment
+
+from src.config.settings import settings
+from src.processors.alert_percolator import AlertPercolator, build_alert_hit
+from src.processors.auto_apply_matcher import JobFeatures
+from src.processors.digest_worker import DIGEST_TEMPLATES, DigestWorker
+from src.utils.mailer import BatchMailer
+
+COMPANIES = [f"Company {i}" for i in range(500)]
+TITLES = ["python developer", "data analyst", "accountant", "project manager", "nurse", "sales consultant"]
+LOCATIONS = ["Johannesburg", "Cape Town", "Durban", "Pretoria", "Sandton", "Centurion"]
+
+
+class SmtpSink:
+    """Minimal SMTP server that accepts and discards mail, in its own process."""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = None
+        self._received = multiprocessing.Value("i", 0)
+        self._connections = multiprocessing.Value("i", 0)
+        self._port = multiprocessing.Value("i", 0)
+        self._ready = multiprocessing.Event()
+        self._process = multiprocessing.Process(target=self._run, daemon=True)
+
+    @property
+    def received(self) -> int:
+        return self._received.value
+
+    @property
+    def connections(self) -> int:
+        return self._connections.value
+
+    def start(self):
+        self._process.start()
+        self._ready.wait()
+        self.port = self._port.value
+
+    def _run(self):
+        async def serve():
+            server = await asyncio.start_server(self._handle, self.host, 0)
+            self._port.value = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await server.serve_forever()
+        asyncio.run(serve())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        with self._connections.get_lock():
+            self._connections.value += 1
+        writer.write(b"220 sink ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif command == b"DATA":
+                writer.write(b"354 end with .\r\n")
+                await writer.drain()
+                await reader.readuntil(b"\r\n.\r\n")
+                with self._received.get_lock():
+                    self._received.value += 1
+                writer.write(b"250 queued\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+
+class BenchDatabase:
+    """In-memory stand-in for the Database digest queries, with per-call latency."""
+
+    def __init__(self, users, latency: float):
+        self.users = users
+        self.latency = latency
+        self.calls = 0
+        self.stored = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def get_digest_recipients(self, limit=500, after_user_id=None, shard_index=0, shard_count=1):
+        await self._round_trip()
+        rows = [u for u in self.users if after_user_id is None or u["user_id"] > after_user_id]
+        return rows[:limit]
+
+    async def get_companies_by_name(self, names):
+        await self._round_trip()
+        return [{"company_name": name, "industry": "Technology", "glassdoor_rating": 4.1} for name in names]
+
+    async def get_newly_hiring_companies(self, limit=5):
+        await self._round_trip()
+        return [{"company_id": str(i), "company_name": COMPANIES[i], "new_openings": 10 - i} for i in range(limit)]
+
+    async def get_trending_skills(self, since, limit=20):
+        await self._round_trip()
+        return [{"skill": skill, "frequency": 100} for skill in ["python", "sql", "excel", "aws", "sales"][:limit]]
+
+    async def bulk_insert_digests(self, digests):
+        await self._round_trip()
+        self.stored += len(digests)
+        return len(digests)
+
+
+def make_data(n_users: int, alerts_per_user: int, hits_per_alert: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    users, hits = [], {}
+    for u in range(n_users):
+        alert_ids = [f"alert-{u}-{a}" for a in range(alerts_per_user)]
+        users.append({
+            "user_id": f"user-{u:08d}",
+            "email": f"user{u}@example.co.za",
+            "first_name": f"User{u}",
+            "alert_ids": alert_ids,
+        })
+        for alert_id in alert_ids:
+            alert_hits = []
+            for _ in range(hits_per_alert):
+                salary = rng.choice([None, 25000, 40000, 60000, 90000])
+                job = {
+                    "id": f"job-{rng.randrange(200000)}",
+                    "title": rng.choice(TITLES),
+                    "company": rng.choice(COMPANIES),
+                    "location": f"{rng.choice(LOCATIONS)}, South Africa",
+                    "description": "",
+                    "salary_min": salary,
+                    "salary_max": salary * 1.3 if salary else None,
+                    "created_at": now,
+                }
+                alert_hits.append(build_alert_hit(JobFeatures.from_job(job)))
+            hits[alert_id] = alert_hits
+    return users, hits
+
+
+async def per_user_baseline(worker: DigestWorker, db: BenchDatabase, users, sink: SmtpSink) -> int:
+    """The pre-worker shape: every user pays for shared queries, lookups, compiles and a connection."""
+    sent = 0
+    for user in users:
+        worker._shared = None
+        shared = await worker._get_shared()
+        hits = await worker.percolator.read_hits(user["alert_ids"], limit=worker.hits_per_alert)
+        companies = {}
+        for name in {job["company_name"] for alert_hits in hits.values() for job in alert_hits}:
+            for company in await db.get_companies_by_name([name]):
+                companies[name.lower()] = company
+        digest = worker.build_digest(user, hits, shared, companies)
+        if not digest["jobs_count"]:
+            continue
+        await db.bulk_insert_digests([digest])
+
+        env = Environment(trim_blocks=True, lstrip_blocks=True, autoescape=False)
+        text = env.from_string(DIGEST_TEMPLATES["digest.txt"]).render(user=user, digest=digest)
+        html = env.from_string(DIGEST_TEMPLATES["digest.html"]).render(user=user, digest=digest)
+
+        def send():
+            with smtplib.SMTP(sink.host, sink.port) as smtp:
+                smtp.sendmail(settings.digest_sender, [user["email"]],
+                              f"Subject: digest\r\n\r\n{text}\r\n{html}".encode())
+        await asyncio.get_running_loop().run_in_executor(None, send)
+        sent += 1
+    return sent
+
+
+def report(name: str, seconds: float, digests: int, extra: str = ""):
+    print(f"{name:<34}{seconds:>9.2f} s  {digests / seconds * 60:>12,.0f} digests/min  {extra}", flush=True)
+
+
+async def run(args):
+    rng = random.Random(42)
+    users, hits = make_data(args.users, args.alerts_per_user, args.hits_per_alert, rng)
+
+    sink = SmtpSink()
+    sink.start()
+
+    redis_client = None
+    if args.redis:
+        import redis.asyncio as redis
+        redis_client = redis.from_url(settings.redis_url, password=settings.redis_password)
+        await redis_client.ping()
+
+    percolator = AlertPercolator(db=None, redis_client=redis_client)
+    await percolator.buffers.offer_many(hits)
+
+    latency = args.db_latency_ms / 1000
+    baseline_users = users[:args.baseline_users]
+    db = BenchDatabase(baseline_users, latency)
+    mailer = BatchMailer(host=sink.host, port=sink.port, batch_size=args.email_batch_size)
+    worker = DigestWorker(db, percolator, mailer=mailer, shard_size=args.shard_size)
+
+    start = time.perf_counter()
+    sent = await per_user_baseline(worker, db, baseline_users, sink)
+    report("per-user baseline", time.perf_counter() - start, sent,
+           f"({len(baseline_users)} users, {db.calls} db calls)")
+
+    db = BenchDatabase(users, latency)
+    worker.db = db
+    connections_before = sink.connections
+    stats = await worker.run_cycle(shard_index=0, shard_count=1)
+    report("DigestWorker.run_cycle", stats["last_cycle_seconds"], stats["digests"],
+           f"({len(users)} users, {db.calls} db calls, "
+           f"{sink.connections - connections_before} smtp connections)")
+    print(f"stats: {stats}")
+    print(f"sink received {sink.received} emails")
+
+    mailer.close()
+    sink.stop()
+    if redis_client is not None:
+        for alert_id in hits:
+            await percolator.buffers.clear(alert_id)
+        await redis_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the weekly digest worker")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--baseline-users", type=int, default=500,
+                        help="Users sent through the per-user baseline")
+    parser.add_argument("--alerts-per-user", type=int, default=3)
+    parser.add_argument("--hits-per-alert", type=int, default=15)
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--email-batch-size", type=int, default=100)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--redis", action="store_true", help="Read hits from settings.redis_url")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark for the GraphQL DataLoaders.
+
+Resolves company, salary insight and market data fields for a page of jobs
+the way the schema's field resolvers run them (concurrently, one call per
+job per field), two ways: a direct database call per object and through
+GraphQLLoaders. Database calls go to an in-memory data source with a
+configurable round-trip latency, limited to the connection pool size as
+asyncpg would. The shared cache is the in-memory CacheManager fallback
+unless --redis is given. Reports database calls and latency per page, cold
+and with a warm shared cache.
+
+Usage:
+    python tests/benchmarks/bench_graphql_loaders.py [--jobs N] [--pages N] [--db-latency-ms N] [--pool-size N] [--redis]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api.graphql.loaders import GraphQLLoaders, salary_key
+from src.config.settings import settings
+from src.utils.cache import CacheManager
+
+TITLES = ["Python Developer", "Data Analyst", "Accountant", "Project Manager", "Registered Nurse", "Sales Consultant"]
+LOCATIONS = ["Johannesburg, Gauteng", "Cape Town, Western Cape", "Durban, KwaZulu-Natal", "Pretoria, Gauteng"]
+LEVELS = ["entry_level", "mid_level", "senior_level"]
+
+
+class BenchDatabase:
+    """In-memory stand-in for the Database lookups behind the loaders, with per-call latency."""
+
+    def __init__(self, companies, latency: float, pool_size: int):
+        self.companies = {str(company["id"]): company for company in companies}
+        self.latency = latency
+        self.pool = asyncio.Semaphore(pool_size)
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        async with self.pool:
+            await asyncio.sleep(self.latency)
+
+    async def get_companies_by_ids(self, company_ids):
+        await self._round_trip()
+        return [self.companies[company_id] for company_id in set(company_ids) if company_id in self.companies]
+
+    async def get_company_by_id(self, company_id):
+        await self._round_trip()
+        return self.companies.get(company_id)
+
+    async def get_salary_benchmarks_batch(self, keys, since=None):
+        await self._round_trip()
+        return [
+            {"sample_size": 40, "average": 52000.0,
+             "percentiles": {"p25": 41000.0, "p50": 50000.0, "p75": 61000.0, "p90": 75000.0}}
+            for _ in keys
+        ]
+
+    async def get_salary_benchmarks(self, role, location, experience_level=None, since=None):
+        return (await self.get_salary_benchmarks_batch([(role, location, experience_level)]))[0]
+
+    async def get_location_demand(self, locations, window_days=30):
+        await self._round_trip()
+        return [{"location": location, "recent_jobs": 120, "previous_jobs": 100, "average_salary_max": 52000.0}
+                for location in locations]
+
+
+def make_page(companies, size: int, rng: random.Random):
+    return [{
+        "company_id": str(rng.choice(companies)["id"]),
+        "title": rng.choice(TITLES),
+        "location": rng.choice(LOCATIONS),
+        "experience_level": rng.choice(LEVELS),
+    } for _ in range(size)]
+
+
+async def resolve_per_object(db: BenchDatabase, page):
+    """One database call per job and field, as the resolvers did without loaders."""
+    async def resolve(job):
+        return await asyncio.gather(
+            db.get_company_by_id(job["company_id"]),
+            db.get_salary_benchmarks(job["title"], job["location"], job["experience_level"]),
+            db.get_location_demand([job["location"]]),
+        )
+    return await asyncio.gather(*(resolve(job) for job in page))
+
+
+async def resolve_with_loaders(db: BenchDatabase, cache: CacheManager, page):
+    loaders = GraphQLLoaders(db, cache)
+
+    async def resolve(job):
+        return await asyncio.gather(
+            loaders.company.load(job["company_id"]),
+            loaders.salary_benchmark.load(salary_key(job["title"], job["location"], job["experience_level"])),
+            loaders.market_data.load(job["location"]),
+        )
+    return await asyncio.gather(*(resolve(job) for job in page))
+
+
+async def run(label: str, db: BenchDatabase, pages, resolve):
+    db.calls = 0
+    latencies = []
+    for page in pages:
+        start = time.perf_counter()
+        await resolve(page)
+        latencies.append(time.perf_counter() - start)
+    print(f"{label:<34}{db.calls / len(pages):>10.1f} DB calls/page"
+          f"{statistics.median(latencies) * 1000:>10.1f} ms p50"
+          f"{max(latencies) * 1000:>10.1f} ms max", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark GraphQL DataLoaders")
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs per page")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=settings.database_pool_size)
+    parser.add_argument("--redis", action="store_true", help="Use Redis for the shared cache")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    companies = [{"id": uuid.uuid4(), "name": f"Company {i}", "industry": "Technology"} for i in range(200)]
+    pages = [make_page(companies, args.jobs, rng) for _ in range(args.pages)]
+    db = BenchDatabase(companies, args.db_latency_ms / 1000, args.pool_size)
+
+    cache = CacheManager()
+    if args.redis:
+        await cache.connect()
+        await cache.delete_pattern("graphql:*")
+    else:
+        cache._initialized = True
+
+    await run("per-object resolvers", db, pages, lambda page: resolve_per_object(db, page))
+    await run("loaders, cold shared cache", db, pages[:1], lambda page: resolve_with_loaders(db, cache, page))
+    await run("loaders, warm shared cache", db, pages, lambda page: resolve_with_loaders(db, cache, page))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
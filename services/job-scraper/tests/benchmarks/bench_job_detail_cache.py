@@ -0,0 +1,199 @@
+"""
+Benchmark for the job detail read path.
+
+Replays concurrent job-detail requests with Zipf-distributed job popularity
+(a few hot jobs, a long tail) against an in-memory stand-in for the jobs
+table. Each query pays a fixed round trip, limited to the connection pool
+size, plus a real pickle round trip of the selected columns as a proxy for
+transferring and decoding them, so SELECT * pays for the 768-dim embedding
+and raw_data. Compares reading from Postgres on every request, the previous
+route cache (full rows, no coalescing) and JobDetailCache, with a share of
+jobs invalidated by updates during the run. Also times similar-jobs list
+pages read job by job versus with one get_many. The cache is the in-memory
+CacheManager fallback unless --redis is given.
+
+Usage:
+    python tests/benchmarks/bench_job_detail_cache.py [--jobs N] [--requests N] [--concurrency N] [--db-latency-ms N] [--redis]
+"""
+
+import argparse
+import asyncio
+import os
+import pickle
+import random
+import sys
+import time
+import uuid
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.settings import settings
+from src.utils.cache import CacheManager
+from src.utils.database import JOB_DETAIL_COLUMNS
+from src.utils.job_cache import JobDetailCache
+
+
+class BenchDatabase:
+    """In-memory jobs table with per-query latency and column transfer cost."""
+
+    def __init__(self, rows, latency: float, pool_size: int):
+        self.rows = {row["id"]: row for row in rows}
+        self.latency = latency
+        self.pool = asyncio.Semaphore(pool_size)
+        self.queries = 0
+
+    async def _select(self, job_ids, columns):
+        self.queries += 1
+        async with self.pool:
+            await asyncio.sleep(self.latency)
+            selected = [{c: self.rows[i][c] for c in columns} for i in job_ids if i in self.rows]
+            return pickle.loads(pickle.dumps(selected))
+
+    async def get_job_row(self, job_id):
+        """SELECT * FROM jobs WHERE id = $1"""
+        rows = await self._select([job_id], list(self.rows[job_id]) if job_id in self.rows else [])
+        return rows[0] if rows else None
+
+    async def get_jobs_by_ids(self, job_ids, include_embedding=False, include_raw_data=False):
+        return await self._select(set(job_ids), JOB_DETAIL_COLUMNS)
+
+    def add_jobs_changed_listener(self, listener):
+        pass
+
+
+def make_row(rng: random.Random):
+    return {
+        "id": str(uuid.uuid4()),
+        "title": rng.choice(["Python Developer", "Accountant", "Registered Nurse", "Sales Manager"]),
+        "company": f"Company {rng.randrange(1000)}",
+        "company_id": str(uuid.uuid4()),
+        "location": rng.choice(["Johannesburg", "Cape Town", "Durban"]),
+        "description": " ".join(rng.choices(["build", "lead", "manage", "support", "develop", "team"], k=300)),
+        "url": f"https://example.com/jobs/{rng.randrange(10 ** 9)}",
+        "salary_min": 30000.0,
+        "salary_max": 60000.0,
+        "job_type": "full_time",
+        "experience_level": "mid_level",
+        "skills_required": ["python", "sql", "communication"],
+        "remote_friendly": False,
+        "is_active": True,
+        "posted_date": "2026-10-01T08:00:00+00:00",
+        "updated_date": "2026-10-01T08:00:00+00:00",
+        "scraped_date": "2026-10-01T08:00:00+00:00",
+        "source": "serpapi",
+        "created_at": "2026-10-01T08:00:00+00:00",
+        "embedding": [rng.random() for _ in range(768)],
+        "raw_data": {"html": "<div>" + "x" * 6000 + "</div>", "meta": {"source": "serpapi"}},
+        "embedding_model": "all-MiniLM-L6-v2",
+        "embedding_updated_at": "2026-10-01T08:00:00+00:00",
+    }
+
+
+def zipf_requests(job_ids, count: int, rng: random.Random, s: float = 1.1):
+    weights = [1 / (rank + 1) ** s for rank in range(len(job_ids))]
+    return rng.choices(job_ids, weights=weights, k=count)
+
+
+def percentile(values, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def replay(label: str, db: BenchDatabase, requests, concurrency: int, read, updates=None):
+    db.queries = 0
+    latencies = []
+    queue = list(reversed(requests))
+
+    async def client():
+        while queue:
+            job_id = queue.pop()
+            start = time.perf_counter()
+            await read(job_id)
+            latencies.append(time.perf_counter() - start)
+            if updates is not None and job_id in updates:
+                await updates.pop(job_id)()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{label:<34}{len(requests) / elapsed:>9,.0f} req/s"
+          f"{percentile(latencies, 0.5) * 1000:>8.2f} ms p50"
+          f"{percentile(latencies, 0.99) * 1000:>8.2f} ms p99"
+          f"{percentile(latencies, 0.999) * 1000:>8.2f} ms p99.9"
+          f"{db.queries:>8,} DB queries", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job detail read path")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--pool-size", type=int, default=settings.database_pool_size)
+    parser.add_argument("--redis", action="store_true", help="Use Redis for the shared cache")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = [make_row(rng) for _ in range(args.jobs)]
+    job_ids = [row["id"] for row in rows]
+    requests = zipf_requests(job_ids, args.requests, rng)
+    db = BenchDatabase(rows, args.db_latency_ms / 1000, args.pool_size)
+
+    async def new_cache():
+        cache = CacheManager()
+        cache.max_memory_items = args.jobs * 2
+        if args.redis:
+            await cache.connect()
+            await cache.delete_pattern("*", prefix="job_detail")
+            await cache.delete_pattern("bench_job:*")
+        else:
+            cache._initialized = True
+        return cache
+
+    print(f"{args.jobs:,} jobs, {args.requests:,} Zipf requests, {args.concurrency} concurrent clients, "
+          f"{args.db_latency_ms} ms DB round trip, {'redis' if args.redis else 'memory'} cache")
+
+    await replay("SELECT * every request", db, requests, args.concurrency, db.get_job_row)
+    await replay("projected every request", db, requests, args.concurrency,
+                 lambda job_id: db.get_jobs_by_ids([job_id]))
+
+    # 2% of jobs are updated mid-run and must be re-read
+    updated = rng.sample(job_ids, len(job_ids) // 50)
+
+    cache = await new_cache()
+
+    async def route_cache(job_id):
+        """The previous route: full rows cached per job, no coalescing."""
+        row = await cache.get(f"bench_job:{job_id}")
+        if row is None:
+            row = await db.get_job_row(job_id)
+            await cache.set(f"bench_job:{job_id}", row, ttl=600)
+        return row
+
+    await replay("route cache, full rows", db, requests, args.concurrency, route_cache,
+                 {job_id: (lambda j=job_id: cache.delete(f"bench_job:{j}")) for job_id in updated})
+
+    job_cache = JobDetailCache(db, await new_cache())
+    await replay("JobDetailCache", db, requests, args.concurrency, job_cache.get,
+                 {job_id: (lambda j=job_id: job_cache.invalidate(j)) for job_id in updated})
+    print(f"  {job_cache.get_stats()}")
+
+    pages = [rng.sample(job_ids, 20) for _ in range(500)]
+    for label, read_page in (
+        ("list page, one read per job", lambda page: asyncio.gather(*(route_cache(j) for j in page))),
+        ("list page, get_many", job_cache.get_many),
+    ):
+        db.queries = 0
+        latencies = []
+        for page in pages:
+            start = time.perf_counter()
+            await read_page(page)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"{label:<34}{percentile(latencies, 0.5) * 1000:>18.2f} ms p50"
+              f"{percentile(latencies, 0.99) * 1000:>8.2f} ms p99{'':>17}{db.queries:>8,} DB queries")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
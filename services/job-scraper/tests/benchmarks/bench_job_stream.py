@@ -0,0 +1,123 @@
+"""
+Benchmark for the GraphQL job stream fan-out.
+
+Registers many subscriptions drawn from a small set of filters (as real
+clients mostly subscribe to a handful of locations and levels), plus a few
+subscribers that never read. It then publishes synthetic jobs into
+JobStream at a steady rate and reports the publish cost per job, delivery
+latency for subscribers that keep up, and what happened to the stalled
+ones. Kafka is not involved; jobs are published in-process as the consumer
+loop would.
+
+Usage:
+    python tests/benchmarks/bench_job_stream.py [--subscribers N] [--jobs N] [--rate N] [--stalled N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api.job_stream import JobStream, SlowConsumerError
+from src.api.websocket import SubscriptionFilter
+
+LOCATIONS = ["Johannesburg", "Cape Town", "Durban", "Pretoria", "Sandton", "Centurion"]
+LEVELS = ["entry_level", "mid_level", "senior_level", "executive"]
+KEYWORDS = [None, ["python"], ["accountant"], ["nurse"], ["manager"]]
+TITLES = ["Python Developer", "Senior Accountant", "Registered Nurse", "Project Manager", "Data Analyst"]
+
+
+def make_filters(rng: random.Random):
+    return SubscriptionFilter(
+        keywords=rng.choice(KEYWORDS),
+        location=rng.choice(LOCATIONS + [None]),
+        experience_level=rng.choice(LEVELS + [None]),
+    )
+
+
+async def consume(stream: JobStream, filters: SubscriptionFilter, latencies: list):
+    async with contextlib.aclosing(stream.subscribe(filters)) as jobs:
+        async for job in jobs:
+            latencies.append(time.perf_counter() - job["published_at"])
+
+
+async def stall(stream: JobStream, outcome: dict):
+    """Subscribe, read one job, then stop reading."""
+    iterator = stream.subscribe(SubscriptionFilter())
+    await iterator.__anext__()
+    await asyncio.sleep(stream.slow_consumer_seconds * 3)
+    try:
+        while True:
+            await iterator.__anext__()
+    except SlowConsumerError:
+        outcome["evicted"] += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GraphQL job stream fan-out")
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200, help="Jobs published per second")
+    parser.add_argument("--stalled", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    stream = JobStream(queue_size=100, slow_consumer_seconds=0.5)
+    stream._ensure_started = lambda: None  # Published in-process; no Kafka consumer
+
+    latencies = []
+    tasks = [
+        asyncio.create_task(consume(stream, make_filters(rng), latencies))
+        for _ in range(args.subscribers)
+    ]
+    outcome = {"evicted": 0}
+    stalled = [asyncio.create_task(stall(stream, outcome)) for _ in range(args.stalled)]
+    await asyncio.sleep(0)
+    print(f"{stream.get_stats()['subscribers']:,} subscriptions over "
+          f"{stream.get_stats()['distinct_filters']} distinct filters ({args.stalled} stalled)")
+
+    jobs = [{
+        "id": str(i),
+        "title": rng.choice(TITLES),
+        "company": f"Company {rng.randrange(500)}",
+        "description": "",
+        "location": rng.choice(LOCATIONS),
+        "experience_level": rng.choice(LEVELS),
+        "job_type": "full_time",
+    } for i in range(args.jobs)]
+
+    publish_seconds = 0.0
+    start = time.perf_counter()
+    for i, job in enumerate(jobs):
+        # Pace publishing like a live topic; subscribers run while we wait
+        await asyncio.sleep(max(0.0, start + i / args.rate - time.perf_counter()))
+        job["published_at"] = time.perf_counter()
+        stream.publish(job)
+        publish_seconds += time.perf_counter() - job["published_at"]
+    await asyncio.sleep(stream.slow_consumer_seconds)
+    stream.publish({**jobs[0], "published_at": time.perf_counter()})
+    await asyncio.gather(*stalled)
+
+    stats = stream.get_stats()
+    latencies.sort()
+    print(f"publish (filter + enqueue)  {publish_seconds / args.jobs * 1000:.2f} ms/job "
+          f"({args.jobs / publish_seconds:,.0f} jobs/s max)")
+    print(f"deliveries                  {stats['jobs_delivered']:,} delivered, {stats['jobs_dropped']:,} dropped")
+    print(f"delivery latency            p50 {statistics.median(latencies) * 1000:.1f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    print(f"stalled subscribers evicted {outcome['evicted']}/{args.stalled}")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,203 @@
+"""
+Benchmark for JSON response rendering.
+
+Serves a page of synthetic job rows with long descriptions through small
+in-process FastAPI apps, called directly over ASGI so only the framework and
+encoding work is measured. Compares the previous path (response_model
+validation, jsonable_encoder and the stdlib encoder), ORJSONResponse as the
+app default, and trusted rows handed to ORJSONResponse directly, then the
+cost and size of gzip and brotli compression. Finally renders a large result
+set in one piece and as an NDJSON stream, reporting time to first byte and
+peak memory.
+
+Usage:
+    python tests/benchmarks/bench_json_responses.py [--page-size N] [--requests N] [--large N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.api.responses import ORJSONResponse, stream_ndjson
+from src.middleware.compression import CompressionMiddleware
+
+# Descriptions draw from a Zipf-weighted vocabulary, so they compress about
+# like real postings rather than like a handful of repeated words
+_vocabulary_rng = random.Random(7)
+WORDS = ["".join(_vocabulary_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_vocabulary_rng.randint(2, 10)))
+         for _ in range(5000)]
+WORD_WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+
+
+class JobRow(BaseModel):
+    """The shape of a job detail row, as a response_model would declare it."""
+    id: str
+    title: str
+    company: str
+    company_id: Optional[str] = None
+    location: Optional[str] = None
+    description: str
+    url: str
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    job_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    skills_required: List[str] = []
+    remote_friendly: bool = False
+    is_active: bool = True
+    posted_date: Optional[datetime] = None
+    updated_date: Optional[datetime] = None
+    scraped_date: Optional[datetime] = None
+    source: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+def make_row(rng: random.Random):
+    posted = datetime(2026, 10, 1) - timedelta(hours=rng.randrange(2000))
+    return {
+        "id": str(uuid.uuid4()),
+        "title": rng.choice(["Python Developer", "Accountant", "Registered Nurse", "Sales Manager"]),
+        "company": f"Company {rng.randrange(1000)}",
+        "company_id": str(uuid.uuid4()),
+        "location": rng.choice(["Johannesburg", "Cape Town", "Durban"]),
+        "description": " ".join(rng.choices(WORDS, WORD_WEIGHTS, k=rng.randint(300, 900))),
+        "url": f"https://example.com/jobs/{rng.randrange(10 ** 9)}",
+        "salary_min": float(rng.randrange(20, 60) * 1000),
+        "salary_max": float(rng.randrange(60, 120) * 1000),
+        "job_type": "full_time",
+        "experience_level": "mid_level",
+        "skills_required": rng.sample(WORDS[:200], k=5),
+        "remote_friendly": rng.random() < 0.3,
+        "is_active": True,
+        "posted_date": posted,
+        "updated_date": posted,
+        "scraped_date": posted,
+        "source": "serpapi",
+        "created_at": posted,
+    }
+
+
+def build_apps(rows, large_rows):
+    previous = FastAPI(default_response_class=JSONResponse)
+    previous.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    @previous.get("/jobs", response_model=List[JobRow])
+    async def previous_jobs():
+        return rows
+
+    default = FastAPI(default_response_class=ORJSONResponse)
+
+    @default.get("/jobs", response_model=List[JobRow])
+    async def default_jobs():
+        return rows
+
+    trusted = FastAPI(default_response_class=ORJSONResponse)
+    trusted.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+    @trusted.get("/jobs", response_model=List[JobRow])
+    async def trusted_jobs():
+        return ORJSONResponse(rows)
+
+    @trusted.get("/large")
+    async def large():
+        return ORJSONResponse(large_rows)
+
+    @trusted.get("/large.ndjson")
+    async def large_ndjson():
+        return stream_ndjson(large_rows)
+
+    return previous, default, trusted
+
+
+async def call(app, path: str, accept_encoding: str = ""):
+    """One GET over ASGI: (seconds to first body byte, total seconds, body bytes)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    size = 0
+    first_byte = None
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # The client stays connected; starlette listens for a disconnect
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size, first_byte
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(message["body"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first_byte, time.perf_counter() - start, size
+
+
+async def measure(label: str, app, path: str, requests: int, accept_encoding: str = ""):
+    for _ in range(5):
+        await call(app, path, accept_encoding)
+    latencies = []
+    for _ in range(requests):
+        _, elapsed, size = await call(app, path, accept_encoding)
+        latencies.append(elapsed)
+    latencies.sort()
+    print(f"{label:<36}{latencies[len(latencies) // 2] * 1000:>8.2f} ms p50"
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:>8.2f} ms p99"
+          f"{size / 1024:>10.1f} KB", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response rendering")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--large", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = [make_row(rng) for _ in range(args.page_size)]
+    large_rows = [make_row(rng) for _ in range(args.large)]
+    previous, default, trusted = build_apps(rows, large_rows)
+
+    print(f"{args.page_size}-job page, {args.requests} requests")
+    await measure("response_model + json", previous, "/jobs", args.requests)
+    await measure("response_model + orjson", default, "/jobs", args.requests)
+    await measure("trusted rows + orjson", trusted, "/jobs", args.requests)
+    await measure("response_model + json, gzip", previous, "/jobs", args.requests, "gzip")
+    await measure("trusted rows + orjson, gzip", trusted, "/jobs", args.requests, "gzip")
+    await measure("trusted rows + orjson, brotli", trusted, "/jobs", args.requests, "gzip, br")
+
+    print(f"{args.large:,}-job result set, brotli")
+    for label, path in (("one piece", "/large"), ("ndjson stream", "/large.ndjson")):
+        tracemalloc.start()
+        first_byte, elapsed, size = await call(trusted, path, "br")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<36}{first_byte * 1000:>8.1f} ms to first byte{elapsed * 1000:>8.0f} ms total"
+              f"{size / 1024:>10.1f} KB{peak / 1024 / 1024:>8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
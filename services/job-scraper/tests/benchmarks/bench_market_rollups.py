@@ -0,0 +1,188 @@
+"""
+Benchmark for market-intelligence rollups.
+
+Generates a month of skewed synthetic postings, builds the per-day rollup cells with
+build_rollups, then answers the salary benchmark and industry trend queries
+two ways: aggregating the raw job rows (the work the request-time SQL did)
+and summing/merging the matching rollup cells (the work the rollup reads
+do). The database is not involved; both sides filter in Python, so the
+comparison is rows touched and per-row cost. Also reports how far the
+t-digest percentiles are from exact ones.
+
+Usage:
+    python tests/benchmarks/bench_market_rollups.py [--jobs N] [--days N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from src.processors.market_rollups import build_rollups, posting_day
+from src.utils.quantile_sketch import TDigest
+
+ROLES = [
+    "python developer", "java developer", "data analyst", "data scientist", "accountant",
+    "financial manager", "project manager", "sales consultant", "registered nurse", "teacher",
+    "software engineer", "devops engineer", "marketing coordinator", "hr officer", "bookkeeper",
+]
+SENIORITY = ["", "", "junior ", "senior ", "lead "]
+LOCATIONS = [
+    "Johannesburg, Gauteng", "Cape Town, Western Cape", "Durban, KwaZulu-Natal", "Pretoria, Gauteng",
+    "Sandton, Gauteng", "Centurion, Gauteng", "Stellenbosch, Western Cape", "Remote",
+]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Education", "Retail", "Mining", None]
+LEVELS = ["entry_level", "mid_level", "senior_level", "executive"]
+SIZES = ["startup", "small", "medium", "large", "enterprise", None]
+JOB_TYPES = ["full_time", "contract", "part_time"]
+SKILLS = ["python", "sql", "excel", "aws", "sap", "react", "java", "communication", "leadership", "ifrs"]
+COMPANIES = [f"Company {i}" for i in range(2000)]
+
+# Columns of job_market_rollups and job_role_salary_rollups rows, as produced by build_rollups
+(DAY, LOCATION, INDUSTRY, LEVEL, SIZE, JOB_TYPE, JOB_COUNT, COMPANIES_JSON, MAX_COUNT, MAX_SUM) = range(10)
+(R_DAY, R_ROLE, R_LOCATION, R_LEVEL, R_SIZE, R_MAX_COUNT, R_MAX_SUM, R_MAX_SKETCH) = range(8)
+
+
+def skewed(rng: random.Random, values):
+    """Pick with Zipf-like weights: a few values dominate, as in real postings."""
+    return rng.choices(values, weights=[1 / (i + 1) for i in range(len(values))])[0]
+
+
+def make_jobs(n: int, days: int, rng: random.Random):
+    today = date.today()
+    jobs = []
+    for _ in range(n):
+        salary = round(rng.lognormvariate(10.3, 0.45), -2) if rng.random() < 0.6 else None
+        jobs.append({
+            "posted_date": today - timedelta(days=rng.randrange(days)),
+            "title": f"{rng.choice(SENIORITY)}{skewed(rng, ROLES)}".title(),
+            "company": skewed(rng, COMPANIES),
+            "location": skewed(rng, LOCATIONS),
+            "industry": skewed(rng, INDUSTRIES),
+            "experience_level": skewed(rng, LEVELS),
+            "size_range": skewed(rng, SIZES),
+            "job_type": skewed(rng, JOB_TYPES),
+            "salary_min": salary * 0.8 if salary else None,
+            "salary_max": salary,
+            "skills_required": rng.sample(SKILLS, 3),
+        })
+    return jobs
+
+
+def report(name: str, seconds: float, count: int, unit: str):
+    print(f"{name:<46}{seconds * 1000:>10.1f} ms  {count / seconds:>12,.0f} {unit}/s", flush=True)
+
+
+def raw_salary_benchmark(jobs, role: str, location: str, since: date):
+    salaries = sorted(
+        float(job["salary_max"]) for job in jobs
+        if job["salary_max"] is not None and job["posted_date"] >= since
+        and role in job["title"].lower() and location in job["location"].lower()
+    )
+    return {q: float(np.percentile(salaries, q * 100)) for q in (0.25, 0.5, 0.75, 0.9)}, len(salaries)
+
+
+def rollup_salary_benchmark(role_cells, role: str, location: str, since: date):
+    matching = [
+        cell for cell in role_cells
+        if cell[R_DAY] >= since and role in cell[R_ROLE] and location in cell[R_LOCATION].lower()
+    ]
+    sketch = TDigest.merge_serialized(cell[R_MAX_SKETCH] for cell in matching)
+    return {q: sketch.quantile(q) for q in (0.25, 0.5, 0.75, 0.9)}, sum(cell[R_MAX_COUNT] for cell in matching)
+
+
+def raw_industry_trends(jobs, location: str, since: date):
+    counts, salaries = defaultdict(int), defaultdict(list)
+    for job in jobs:
+        if job["posted_date"] >= since and location in job["location"].lower():
+            counts[job["industry"]] += 1
+            if job["salary_max"] is not None:
+                salaries[job["industry"]].append(float(job["salary_max"]))
+    return {k: (v, statistics.fmean(salaries[k]) if salaries[k] else None) for k, v in counts.items()}
+
+
+def rollup_industry_trends(cells, location: str, since: date):
+    totals = defaultdict(lambda: [0, 0.0, 0])
+    for cell in cells:
+        if cell[DAY] >= since and location in cell[LOCATION].lower():
+            total = totals[cell[INDUSTRY] or None]
+            total[0] += cell[JOB_COUNT]
+            total[1] += cell[MAX_SUM]
+            total[2] += cell[MAX_COUNT]
+    return {k: (n, s / c if c else None) for k, (n, s, c) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark market-intelligence rollups")
+    parser.add_argument("--jobs", type=int, default=500000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    jobs = make_jobs(args.jobs, args.days, rng)
+
+    by_day = defaultdict(list)
+    for job in jobs:
+        by_day[posting_day(job)].append(job)
+
+    start = time.perf_counter()
+    cells, role_cells, skill_cells = [], [], []
+    for day, day_jobs in by_day.items():
+        day_cells, day_roles, day_skills, _ = build_rollups(day, day_jobs)
+        cells.extend(day_cells)
+        role_cells.extend(day_roles)
+        skill_cells.extend(day_skills)
+    report("build rollups (all days)", time.perf_counter() - start, len(jobs), "jobs")
+    sketch_bytes = sum(len(value) for row in cells + role_cells for value in row if isinstance(value, bytes))
+    print(f"  {len(jobs):,} jobs -> {len(cells):,} market cells, {len(role_cells):,} role salary cells, "
+          f"{len(skill_cells):,} skill cells ({sketch_bytes / 1e6:.1f} MB of sketches)")
+
+    start = time.perf_counter()
+    day_jobs = max(by_day.values(), key=len)
+    build_rollups(date.today(), day_jobs)
+    report("refresh one day partition", time.perf_counter() - start, len(day_jobs), "jobs")
+
+    since = date.today() - timedelta(days=90)
+    queries = [(rng.choice(["developer", "engineer", "analyst", "manager", "nurse"]),
+                rng.choice(["gauteng", "cape town", "durban", ""])) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    raw = [raw_salary_benchmark(jobs, role, location, since) for role, location in queries]
+    raw_seconds = time.perf_counter() - start
+    report("salary benchmark, raw rows", raw_seconds, len(queries), "queries")
+
+    start = time.perf_counter()
+    rolled = [rollup_salary_benchmark(role_cells, role, location, since) for role, location in queries]
+    rollup_seconds = time.perf_counter() - start
+    report("salary benchmark, rollup cells + sketch merge", rollup_seconds, len(queries), "queries")
+    print(f"  speedup: {raw_seconds / rollup_seconds:,.1f}x")
+
+    errors = [abs(r[0][q] / e[0][q] - 1) for r, e in zip(rolled, raw) for q in e[0]]
+    assert all(r[1] == e[1] for r, e in zip(rolled, raw)), "sample sizes differ"
+    print(f"  percentile error vs exact: mean {statistics.fmean(errors):.3%}, max {max(errors):.3%}")
+
+    start = time.perf_counter()
+    raw = [raw_industry_trends(jobs, location, since) for _, location in queries]
+    raw_seconds = time.perf_counter() - start
+    report("industry trends, raw rows", raw_seconds, len(queries), "queries")
+
+    start = time.perf_counter()
+    rolled = [rollup_industry_trends(cells, location, since) for _, location in queries]
+    rollup_seconds = time.perf_counter() - start
+    report("industry trends, rollup cells", rollup_seconds, len(queries), "queries")
+    print(f"  speedup: {raw_seconds / rollup_seconds:,.1f}x")
+    assert all({k: v[0] for k, v in r.items()} == {k: v[0] for k, v in e.items()} for r, e in zip(rolled, raw))
+
+
+if __name__ == "__main__":
+    main()
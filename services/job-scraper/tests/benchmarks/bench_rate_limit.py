@@ -0,0 +1,119 @@
+"""
+Load benchmark for RateLimitMiddleware overhead.
+
+Drives a minimal FastAPI app in-process and compares per-request latency
+with and without the rate limiting middleware for each algorithm. Redis
+modes run only when settings.redis_url is reachable.
+
+Usage:
+    python tests/benchmarks/bench_rate_limit.py [--requests N] [--concurrency C]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from fastapi import FastAPI
+
+from src.config.settings import settings
+from src.middleware.rate_limit import RateLimitMiddleware
+
+
+def build_app(algorithm: Optional[str], use_redis: bool) -> FastAPI:
+    """Build a trivial app, optionally wrapped in the rate limit middleware."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if algorithm:
+        settings.api_rate_limit_algorithm = algorithm
+        if not use_redis:
+            settings.redis_url = "redis://127.0.0.1:1/0"  # Unreachable - forces the token bucket
+        app.add_middleware(RateLimitMiddleware)
+    return app
+
+
+async def run_load(app: FastAPI, total: int, concurrency: int) -> List[float]:
+    """Issue requests from many anonymous clients and return latencies in ms."""
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up (middleware initialization, script loading)
+        await client.get("/ping", headers={"X-Real-IP": "10.0.0.0"})
+
+        async def one(i: int):
+            # Spread over many client IPs so most requests are allowed
+            headers = {"X-Real-IP": f"10.0.{i % 250}.{i % 200}"}
+            async with semaphore:
+                start = time.perf_counter()
+                await client.get("/ping", headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50": statistics.median(ordered),
+        "p99": ordered[int(len(ordered) * 0.99) - 1],
+        "mean": statistics.mean(ordered),
+    }
+
+
+async def redis_available() -> bool:
+    import redis.asyncio as redis
+    try:
+        client = redis.from_url(settings.redis_url, password=settings.redis_password, socket_connect_timeout=1)
+        await client.ping()
+        await client.close()
+        return True
+    except Exception:
+        return False
+
+
+async def main(total: int, concurrency: int):
+    original_redis_url = settings.redis_url
+    scenarios = [("baseline (no middleware)", None, False)]
+    if await redis_available():
+        scenarios += [
+            ("redis gcra", "gcra", True),
+            ("redis sliding_window", "sliding_window", True),
+        ]
+    else:
+        print(f"Redis not reachable at {settings.redis_url}; skipping Redis scenarios")
+    scenarios.append(("memory token bucket", "gcra", False))
+
+    results = {}
+    for name, algorithm, use_redis in scenarios:
+        settings.redis_url = original_redis_url
+        app = build_app(algorithm, use_redis)
+        results[name] = summarize(await run_load(app, total, concurrency))
+
+    baseline = results["baseline (no middleware)"]
+    print(f"\n{'scenario':<28}{'p50 ms':>10}{'p99 ms':>10}{'p99 overhead':>15}")
+    for name, summary in results.items():
+        overhead = summary["p99"] - baseline["p99"]
+        print(f"{name:<28}{summary['p50']:>10.3f}{summary['p99']:>10.3f}{overhead:>15.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
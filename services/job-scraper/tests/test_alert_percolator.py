@@ -0,0 +1,135 @@
+"""
+Tests for the job alert index and its cross-process resync.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import fakeredis
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processors.alert_percolator import AlertIndex, AlertPercolator, AlertQuery
+from src.processors.auto_apply_matcher import JobFeatures
+
+ALERTS = [
+    {"alert_id": "python-cpt", "user_id": "u1", "keywords": ["python"], "location": "Cape Town"},
+    {"alert_id": "nurse", "user_id": "u2", "keywords": ["registered nurse"]},
+    {"alert_id": "remote", "user_id": "u3", "keywords": ["django"], "location": "Durban", "remote_ok": True},
+    {"alert_id": "well-paid", "user_id": "u4", "salary_min": Decimal("50000")},
+]
+
+
+def _job(**overrides):
+    job = {
+        "id": "job-1",
+        "title": "Python Developer",
+        "company": "Acme",
+        "location": "Cape Town",
+        "description": "Build APIs with Python and Django.",
+        "salary_min": 40000,
+        "posted_date": time.time(),
+    }
+    job.update(overrides)
+    return job
+
+
+class _AlertDatabase:
+    def __init__(self, alerts, jobs=()):
+        self.alerts = alerts
+        self.jobs = sorted(jobs, key=lambda job: job["id"])
+
+    async def get_active_job_alerts(self):
+        return self.alerts
+
+    async def get_recent_jobs_for_matching(self, since, limit=500, after_id=None):
+        return [job for job in self.jobs if after_id is None or job["id"] > after_id][:limit]
+
+
+def _index():
+    index = AlertIndex()
+    for alert in ALERTS:
+        index.add(AlertQuery.compile(alert))
+    return index
+
+
+def test_percolate_matches_full_criteria():
+    index = _index()
+
+    assert index.percolate(JobFeatures.from_job(_job())) == ["python-cpt"]
+    assert set(index.percolate(JobFeatures.from_job(_job(location="Remote", salary_min=60000)))) == {
+        "remote", "well-paid"
+    }
+    assert index.percolate(JobFeatures.from_job(_job(
+        title="Registered Nurse", description="Ward work.", location="Durban"
+    ))) == ["nurse"]
+
+
+def test_candidates_skip_alerts_without_a_shared_term():
+    index = _index()
+    features = JobFeatures.from_job(_job(title="Accountant", description="Ledgers.", location="Pretoria"))
+
+    # Only the alert with no keyword or location anchor is always a candidate
+    assert index.candidates(features) == {"well-paid"}
+
+    index.remove("well-paid")
+    assert index.candidates(features) == set()
+    assert index.get_stats()["match_all_alerts"] == 0
+
+
+def test_resync_keeps_database_loaded_alerts():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        first = AlertPercolator(_AlertDatabase(ALERTS), fakeredis.FakeAsyncRedis(server=server))
+        second = AlertPercolator(_AlertDatabase(ALERTS), fakeredis.FakeAsyncRedis(server=server))
+        await first.load()
+        await second.load()
+        second.sync_interval = 0
+
+        await first.add_alert({"alert_id": "sales", "user_id": "u5", "keywords": ["sales"]})
+        await second.sync()
+        after_add = set(second.index.queries)
+
+        await first.remove_alert("nurse")
+        await second.sync()
+        return after_add, second.index
+
+    after_add, index = asyncio.run(run())
+    assert after_add == {"python-cpt", "nurse", "remote", "well-paid", "sales"}
+    assert set(index.queries) == {"python-cpt", "remote", "well-paid", "sales"}
+    # Criteria survive the JSON round trip through Redis
+    assert "well-paid" in index.percolate(JobFeatures.from_job(_job(salary_min=60000)))
+
+
+def test_changed_criteria_drop_old_hits_and_backfill():
+    jobs = [
+        _job(id="job-1"),
+        _job(id="job-2", title="Registered Nurse", description="Ward work."),
+        _job(id="job-3", title="Python Engineer", posted_date=datetime.now(timezone.utc) - timedelta(days=60)),
+    ]
+
+    async def run():
+        percolator = AlertPercolator(_AlertDatabase([], jobs))
+        await percolator.load()
+
+        alert = {"alert_id": "a1", "user_id": "u1", "keywords": ["python"]}
+        assert await percolator.add_alert(alert)
+        created = await percolator.backfill_alert("a1", batch_size=2)
+        unchanged = await percolator.add_alert(alert)
+
+        assert await percolator.add_alert({**alert, "keywords": ["registered nurse"]})
+        cleared = await percolator.read_hits(["a1"])
+        await percolator.backfill_alert("a1")
+        return created, unchanged, cleared, await percolator.read_hits(["a1"])
+
+    created, unchanged, cleared, hits = asyncio.run(run())
+    # Jobs posted before the alert window are left out
+    assert created == 1 and unchanged is False
+    assert cleared == {"a1": []}
+    assert [hit["job_id"] for hit in hits["a1"]] == ["job-2"]
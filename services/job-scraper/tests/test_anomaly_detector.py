@@ -0,0 +1,51 @@
+"""
+Tests for the streaming statistics behind AnomalyDetector.
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.anomaly_detector import AnomalyDetector, MetricStream
+
+
+def _reference_mad(values):
+    median = statistics.median(values)
+    return statistics.median(abs(v - median) for v in values)
+
+
+def test_window_statistics_match_recomputation():
+    rng = random.Random(3)
+    for window in (1, 2, 7, 50):
+        stream = MetricStream(window)
+        for _ in range(300):
+            # Repeated values exercise ties around the median
+            stream.push(rng.choice([rng.gauss(10, 3), float(rng.randint(0, 4))]))
+            values = stream.values()
+            assert stream.median == statistics.median(values)
+            assert abs(stream.mad - _reference_mad(values)) < 1e-9
+            assert abs(stream.mean - statistics.fmean(values)) < 1e-6
+
+
+def test_sources_keep_independent_baselines():
+    detector = AnomalyDetector()
+
+    async def feed():
+        for i in range(30):
+            await detector.detect({"jobs_per_task": 100.0 + i % 3}, source="serpapi")
+            await detector.detect({"jobs_per_task": 2.0 + i % 3}, source="company")
+        # Normal for serpapi, far outside the company baseline
+        return (
+            await detector.detect({"jobs_per_task": 101.0}, source="serpapi"),
+            await detector.detect({"jobs_per_task": 101.0}, source="company"),
+        )
+
+    serpapi, company = asyncio.run(feed())
+    assert serpapi == []
+    assert company and company[0].metrics["source"] == "company"
+    assert detector.get_metric_history("jobs_per_task") == []
@@ -0,0 +1,93 @@
+"""
+Tests for the TF-IDF keyword profiles behind ATS scoring.
+"""
+
+import os
+import sys
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processors import ats_scorer
+from src.processors.ats_scorer import TermStatistics, extract_terms
+
+# Boilerplate shared by every posting, so its document frequency is highest
+FILLER = "Fast paced environment, office hours."
+
+
+def _corpus():
+    jobs = []
+    for _ in range(30):
+        jobs.append({
+            "title": "Python Developer",
+            "industry": "Technology",
+            "description": f"{FILLER} Building Django APIs on PostgreSQL, shipped with Docker.",
+            "skills_required": ["Python", "Django"],
+        })
+        jobs.append({
+            "title": "Registered Nurse",
+            "industry": "Healthcare",
+            "description": f"{FILLER} Patient care in the ICU ward; medication administration.",
+            "skills_required": ["Patient Care"],
+        })
+    # One posting mentions a rare term, which must not outrank the role's common terms
+    jobs[0]["description"] += " Kubernetes."
+    return jobs
+
+
+def _statistics():
+    statistics = TermStatistics(terms_per_job=40)
+    statistics.add_jobs(_corpus())
+    return statistics
+
+
+def test_extract_terms_skips_stop_words_in_bigrams():
+    terms = extract_terms("Experience with Python and Django REST")
+
+    assert terms["python"] == 1 and terms["django rest"] == 1
+    assert "with python" not in terms and "python django" not in terms
+
+
+def test_role_profile_ranks_distinctive_terms_above_shared_ones():
+    profile = _statistics().profile("Python Developer", min_postings=10)
+    weights = {term: weight for term, weight, _ in profile.keywords}
+
+    assert profile.target == "python developer" and profile.postings == 30
+    assert {"django", "postgresql", "docker"} <= set(weights)
+    # Filler appears in every posting, so its IDF is lower than the role's terms
+    assert weights["django"] > weights["office"] and weights["docker"] > weights["fast paced"]
+    # Counted in one posting of the role only, so it is left out of the profile
+    assert "kubernetes" not in weights
+    assert not {"patient", "icu", "medication"} & set(weights)
+
+
+def test_cv_scores_rank_the_matching_role_first():
+    statistics = _statistics()
+    cv = "Backend developer: Python, Django and PostgreSQL APIs, deployed with Docker."
+
+    developer = statistics.score(cv, "Python Developer")
+    nurse = statistics.score(cv, "Registered Nurse")
+
+    assert developer.coverage > 0.25 and nurse.coverage == 0
+    assert {"python", "django", "postgresql", "docker"} <= set(developer.matched)
+    assert "patient care" in [keyword[0] for keyword in nurse.missing]
+
+
+def test_unknown_role_falls_back_to_industry_then_corpus():
+    statistics = _statistics()
+
+    assert statistics.profile("Theatre Sister", "Healthcare", min_postings=10).target == "healthcare"
+    assert statistics.profile("Astronaut", min_postings=10).target == ""
+
+
+def test_profile_memo_evicts_least_recently_used_titles(monkeypatch):
+    monkeypatch.setattr(ats_scorer, "PROFILE_CACHE_SIZE", 2)
+    statistics = _statistics()
+
+    nurse = statistics.profile("Registered Nurse")
+    statistics.profile("Python Developer")
+    assert statistics.profile("Registered Nurse") is nurse  # Hit, now most recent
+    statistics.profile("Astronaut")
+
+    assert list(statistics._profiles) == [("registered nurse", ""), ("astronaut", "")]
+    assert statistics.profile("Registered Nurse") is nurse
@@ -0,0 +1,97 @@
+"""
+Tests for the verified-token cache and tier feature bitsets.
+"""
+
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.middleware import auth
+from src.middleware.auth import AuthenticatedUser, JWTAuth, TierFeatures, UserTier, VerifiedTokenCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(auth.time, "time", lambda: now[0])
+    return now
+
+
+def _user(user_id="u1", tier=UserTier.BASIC):
+    return AuthenticatedUser(user_id=user_id, tier=tier)
+
+
+def test_entries_expire_at_the_token_exp_or_max_ttl(clock):
+    cache = VerifiedTokenCache(max_size=10, max_ttl=300)
+    cache.set("short", _user(), exp=clock[0] + 60)
+    cache.set("long", _user(), exp=clock[0] + 3600)
+    cache.set("expired", _user(), exp=clock[0] - 1)
+
+    assert cache.get("expired") is None
+    clock[0] += 61
+    assert cache.get("short") is None
+    assert cache.get("long") is not None
+    clock[0] += 240
+    assert cache.get("long") is None  # Capped at max_ttl
+    assert cache.get_stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = VerifiedTokenCache(max_size=2, max_ttl=300)
+    cache.set("a", _user("a"), exp=None)
+    cache.set("b", _user("b"), exp=None)
+    cache.get("a")
+    cache.set("c", _user("c"), exp=None)
+
+    assert cache.get("b") is None
+    assert cache.get("a").user_id == "a" and cache.get("c").user_id == "c"
+
+
+def test_revoked_tokens_are_evicted_until_they_expire(clock):
+    cache = VerifiedTokenCache(max_size=10, max_ttl=300)
+    cache.set("token", _user(), exp=clock[0] + 3600)
+
+    cache.revoke("token", exp=clock[0] + 3600)
+    assert cache.get("token") is None and cache.is_revoked("token")
+    cache.set("token", _user(), exp=clock[0] + 3600)
+    assert cache.get("token") is None
+
+    clock[0] += 3600
+    assert not cache.is_revoked("token")
+
+
+def test_authenticate_rejects_a_revoked_token(monkeypatch):
+    monkeypatch.setattr(auth, "verified_token_cache", VerifiedTokenCache(max_size=10, max_ttl=300))
+    token = JWTAuth.create_access_token({"user_id": "u1", "tier": UserTier.PROFESSIONAL}, timedelta(hours=1))
+
+    assert JWTAuth.authenticate(token).user_id == "u1"
+    assert JWTAuth.authenticate(token) is auth.verified_token_cache.get(token)  # Served from the cache
+
+    JWTAuth.revoke_token(token)
+    with pytest.raises(HTTPException) as error:
+        JWTAuth.authenticate(token)
+    assert error.value.status_code == 401
+
+
+def test_feature_bitsets_match_the_tier_feature_lists():
+    for tier, config in TierFeatures.TIER_FEATURES.items():
+        if "all" in config["features"]:
+            continue
+        for feature in TierFeatures.FEATURE_BITS:
+            expected = feature in config["features"]
+            assert TierFeatures.has_feature(tier, feature) is expected
+            assert _user(tier=tier).has_feature(feature) is expected
+
+    assert TierFeatures.has_feature(UserTier.PROFESSIONAL, "ai_insights")
+    assert not TierFeatures.has_feature(UserTier.BASIC, "ai_insights")
+    # Admin ("all") has every feature, including ones no tier lists yet
+    assert TierFeatures.has_feature(UserTier.ADMIN, "market_intelligence")
+    assert TierFeatures.has_feature(UserTier.ADMIN, "not_yet_defined")
+    assert not TierFeatures.has_feature(UserTier.ENTERPRISE, "not_yet_defined")
+    assert not TierFeatures.has_feature("unknown-tier", "basic_search")
@@ -0,0 +1,115 @@
+"""
+Tests for the auto-apply match index and its cross-process resync.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import fakeredis
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processors.auto_apply_matcher import AutoApplyMatcher, JobFeatures, MatchIndex, MatchPlan
+
+PYTHON_DEV = {
+    "job_titles": ["Python Developer"],
+    "skills_required": ["python", "django"],
+    "preferred_locations": ["Cape Town"],
+    "remote_preference": "hybrid",
+    "job_levels": ["mid"],
+}
+NURSE = {
+    "job_titles": ["Registered Nurse"],
+    "skills_required": ["patient care"],
+    "preferred_locations": ["Durban"],
+}
+REMOTE_DEV = {
+    "job_titles": ["Python Developer"],
+    "skills_required": ["python"],
+    "preferred_locations": ["Johannesburg"],
+    "remote_preference": "remote",
+}
+
+
+def _job(**overrides):
+    job = {
+        "id": "job-1",
+        "title": "Senior Python Developer",
+        "company": "Acme",
+        "location": "Cape Town, Western Cape",
+        "description": "Build APIs with Python and Django.",
+        "experience_level": "mid_level",
+        "posted_date": time.time(),
+    }
+    job.update(overrides)
+    return job
+
+
+class _PreferencesDatabase:
+    def __init__(self, users):
+        self.users = users
+
+    async def get_auto_application_preferences(self):
+        return self.users
+
+
+def _index(min_score=60.0):
+    index = MatchIndex()
+    for user_id, preferences in (("dev", PYTHON_DEV), ("nurse", NURSE), ("remote", REMOTE_DEV)):
+        index.add(MatchPlan.compile(user_id, preferences, min_score))
+    return index
+
+
+def test_candidates_filter_on_location_and_terms():
+    index = _index()
+
+    assert index.candidates(JobFeatures.from_job(_job())) == {"dev"}
+    assert index.candidates(JobFeatures.from_job(_job(location="Remote"))) == {"remote"}
+    assert index.candidates(JobFeatures.from_job(_job(title="Accountant", description="Ledgers."))) == set()
+
+    index.remove("dev")
+    assert index.candidates(JobFeatures.from_job(_job())) == set()
+    assert index.get_stats()["users"] == 2
+
+
+def test_scores_rank_the_closer_match_higher():
+    plan = MatchPlan.compile("dev", PYTHON_DEV, 60.0)
+
+    exact = plan.score(JobFeatures.from_job(_job(title="Python Developer")))
+    partial = plan.score(JobFeatures.from_job(_job(title="Developer", description="Build APIs with Python.")))
+    elsewhere = plan.score(JobFeatures.from_job(_job(location="Durban")))
+
+    assert exact["match_score"] > partial["match_score"]
+    assert exact["title_match_score"] == 100 and exact["experience_match"]
+    assert elsewhere is None
+
+
+def test_resync_keeps_database_loaded_users():
+    users = [
+        {"id": "dev", "preferences": PYTHON_DEV},
+        {"id": "nurse", "preferences": NURSE},
+        {"id": "remote", "preferences": REMOTE_DEV},
+    ]
+    server = fakeredis.FakeServer()
+
+    async def run():
+        first = AutoApplyMatcher(_PreferencesDatabase(users), fakeredis.FakeAsyncRedis(server=server))
+        second = AutoApplyMatcher(_PreferencesDatabase(users), fakeredis.FakeAsyncRedis(server=server))
+        await first.load()
+        await second.load()
+        second.sync_interval = 0
+
+        await first.update_user("designer", {"job_titles": ["Designer"], "preferred_locations": ["Durban"]})
+        await second.sync()
+        after_update = set(second.index.plans)
+
+        await first.remove_user("nurse")
+        await second.sync()
+        return after_update, set(second.index.plans)
+
+    after_update, after_remove = asyncio.run(run())
+    assert after_update == {"dev", "nurse", "remote", "designer"}
+    assert after_remove == {"dev", "remote", "designer"}
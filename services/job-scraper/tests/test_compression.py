@@ -0,0 +1,152 @@
+"""
+Tests for Accept-Encoding negotiation in CompressionMiddleware.
+"""
+
+import asyncio
+import gzip
+import os
+import sys
+import zlib
+
+import brotli
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+
+from src.middleware import compression
+from src.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = b'{"title": "Python Developer", "location": "Cape Town"}' * 100
+CHUNKS = [b'{"id": %d, "title": "Registered Nurse"}\n' % i * 50 for i in range(3)]
+
+
+def _app(minimum_size=500):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/json")
+    async def json_body():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/empty")
+    async def empty():
+        return Response(status_code=204)
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for chunk in CHUNKS:
+                yield chunk
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def _get(app, path, accept_encoding):
+    """One GET over ASGI: (status, headers, body chunks)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # The client stays connected; starlette listens for a disconnect
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], headers, [m["body"] for m in messages[1:] if m.get("body")]
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("*;q=0.5, gzip;q=0.8", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_encoding_follows_q_values(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "HAS_BROTLI", False)
+    assert negotiate_encoding("br, gzip;q=0.1") == "gzip"
+    assert negotiate_encoding("br") is None
+
+
+@pytest.mark.parametrize("accept_encoding, decompress", [
+    ("gzip", gzip.decompress),
+    ("gzip, br", brotli.decompress),
+])
+def test_bodies_are_compressed_with_the_negotiated_encoding(accept_encoding, decompress):
+    status, headers, chunks = _get(_app(), "/json", accept_encoding)
+
+    body = b"".join(chunks)
+    assert status == 200
+    assert headers["content-encoding"] == accept_encoding.split(", ")[-1]
+    assert headers["content-length"] == str(len(body)) and "Accept-Encoding" in headers["vary"]
+    assert decompress(body) == BODY
+
+
+def test_small_and_unaccepted_bodies_pass_through():
+    for path, accept_encoding, body in (("/small", "gzip, br", b'{"ok": true}'), ("/json", "identity", BODY)):
+        _, headers, chunks = _get(_app(), path, accept_encoding)
+        assert "content-encoding" not in headers
+        assert b"".join(chunks) == body
+
+
+def test_no_content_responses_pass_through():
+    status, headers, chunks = _get(_app(minimum_size=0), "/empty", "gzip, br")
+
+    assert status == 204
+    assert "content-encoding" not in headers and chunks == []
+
+
+def test_encoded_responses_are_not_compressed_twice():
+    _, headers, chunks = _get(_app(), "/encoded", "br")
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(b"".join(chunks)) == BODY
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "br"])
+def test_streamed_responses_are_flushed_chunk_by_chunk(accept_encoding):
+    _, headers, chunks = _get(_app(), "/stream", accept_encoding)
+
+    assert headers["content-encoding"] == accept_encoding and "content-length" not in headers
+    if accept_encoding == "br":
+        decompressor = brotli.Decompressor()
+        decompress = decompressor.process
+    else:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decompress = decompressor.decompress
+    decoded = [decompress(chunk) for chunk in chunks]
+    # Each chunk decodes on arrival, before the stream ends
+    assert decoded[:len(CHUNKS)] == CHUNKS and b"".join(decoded) == b"".join(CHUNKS)
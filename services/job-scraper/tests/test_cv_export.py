@@ -0,0 +1,106 @@
+"""
+Tests for the CV export cache, render coalescing and background export jobs.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processors import cv_export
+from src.processors.cv_export import CVExportService
+from src.utils.cache import CacheManager
+
+SECTIONS = [{"type": "experience", "title": "Experience", "content": {"items": ["Python Developer at Acme"]}}]
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Calls to the PDF renderer; a call fails when the title is 'broken'."""
+    calls = []
+    lock = threading.Lock()
+
+    def render(title, template, sections):
+        with lock:
+            calls.append(title)
+        time.sleep(0.05)
+        if title == "broken":
+            raise ValueError("bad section")
+        return f"%PDF {title}".encode()
+
+    monkeypatch.setattr(cv_export, "render_cv_pdf", render)
+    return calls
+
+
+def _service():
+    cache = CacheManager()
+    cache._initialized = True  # In-memory fallback, no Redis
+    service = CVExportService(cache, workers=4)
+    # Threads in place of spawned processes, so the patched renderer is used
+    service._executor = ThreadPoolExecutor(max_workers=4)
+    return service
+
+
+def test_content_hash_covers_everything_that_changes_the_pdf():
+    digest = CVExportService.content_hash("CV", "modern", SECTIONS)
+
+    assert digest == CVExportService.content_hash("CV", "modern", [dict(SECTIONS[0])])
+    assert digest != CVExportService.content_hash("CV", "classic", SECTIONS)
+    assert digest != CVExportService.content_hash("CV", "modern", SECTIONS + SECTIONS)
+
+
+def test_concurrent_identical_exports_render_once_then_hit_the_cache(renders):
+    service = _service()
+    digest = service.content_hash("CV", "modern", SECTIONS)
+
+    async def run():
+        assert await service.get_cached(digest) is None
+        pdfs = await asyncio.gather(*(service.render(digest, "CV", "modern", SECTIONS) for _ in range(5)))
+        return pdfs, await service.get_cached(digest)
+
+    pdfs, cached = asyncio.run(run())
+    assert renders == ["CV"]
+    assert set(pdfs) == {b"%PDF CV"} and cached == b"%PDF CV"
+    assert service.stats["coalesced"] == 4 and service.stats["cache_hits"] == 1
+    assert service.get_stats()["inflight"] == 0
+
+
+def test_background_export_job_lifecycle(renders):
+    service = _service()
+    digest = service.content_hash("CV", "modern", SECTIONS)
+
+    async def run():
+        job = await service.submit("user-1", digest, "CV", "modern", SECTIONS)
+        pending = dict(await service.get_job(job["job_id"], "user-1"))
+        other_user = await service.get_job(job["job_id"], "user-2")
+        await asyncio.gather(*service._jobs)
+        return job, pending, other_user, await service.get_job(job["job_id"], "user-1")
+
+    job, pending, other_user, done = asyncio.run(run())
+    assert set(job) == set(cv_export.PUBLIC_JOB_FIELDS)
+    assert job["status"] == "pending"
+    assert job["download_url"].endswith(f"/cv-builder/exports/{job['job_id']}")
+    assert pending["status"] == "pending" and other_user is None
+    assert done["status"] == "completed" and done["completed_at"] and done["content_hash"] == digest
+
+
+def test_failed_render_marks_the_job_failed(renders):
+    service = _service()
+    digest = service.content_hash("broken", "modern", SECTIONS)
+
+    async def run():
+        job = await service.submit("user-1", digest, "broken", "modern", SECTIONS)
+        await asyncio.gather(*service._jobs)
+        return await service.get_job(job["job_id"], "user-1"), await service.get_cached(digest)
+
+    job, cached = asyncio.run(run())
+    assert job["status"] == "failed" and job["error"] == "PDF rendering failed"
+    assert cached is None
+    assert service.stats["jobs_failed"] == 1 and service.get_stats()["inflight"] == 0
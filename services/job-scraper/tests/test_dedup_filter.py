@@ -0,0 +1,62 @@
+"""
+Tests for the Bloom filter backed processed-job tracker.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import dedup_filter
+from src.utils.dedup_filter import BloomFilter, ProcessedJobTracker
+
+
+@pytest.mark.parametrize("error_rate", [0.01, 0.001])
+def test_bloom_false_positive_rate_stays_within_bound(error_rate):
+    bloom = BloomFilter(capacity=20000, error_rate=error_rate)
+    for i in range(20000):
+        bloom.add(f"job-{i}")
+
+    assert all(f"job-{i}" in bloom for i in range(20000))  # No false negatives
+
+    probes = 200000
+    false_positives = sum(f"unseen-{i}" in bloom for i in range(probes))
+    # Measured rate at capacity within 1.5x of the target (several sigma of slack)
+    assert false_positives / probes <= error_rate * 1.5
+    assert bloom.false_positive_rate == pytest.approx(error_rate, rel=0.5)
+
+
+def test_bloom_round_trips_through_bytes():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(500):
+        bloom.add(str(i))
+
+    restored = BloomFilter.from_bytes(bloom.to_bytes(), 1000, 0.01)
+
+    assert all(str(i) in restored for i in range(500))
+    assert restored.bits_set == bloom.bits_set
+    assert restored.count == pytest.approx(500, rel=0.05)
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(bloom.to_bytes(), 2000, 0.01)
+
+
+def test_tracker_forgets_ids_after_the_window(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(dedup_filter.time, "time", lambda: now[0])
+    tracker = ProcessedJobTracker(window_seconds=300, bucket_seconds=100, bucket_capacity=1000, lru_size=0)
+
+    assert tracker.check_and_add("job-1") is False
+    assert tracker.check_and_add("job-1") is True
+
+    now[0] += 200
+    tracker.add("job-2")
+    assert "job-1" in tracker
+
+    now[0] += 200
+    tracker.add("job-3")
+    assert "job-1" not in tracker
+    assert "job-2" in tracker and "job-3" in tracker
+    assert tracker.get_stats()["buckets"] <= tracker.num_buckets
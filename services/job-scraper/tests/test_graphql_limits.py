@@ -0,0 +1,111 @@
+"""
+Tests for the GraphQL query cost limit.
+"""
+
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+import strawberry
+from graphql import OperationDefinitionNode, parse
+from strawberry.extensions import QueryDepthLimiter
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.graphql.limits import FIELD_COSTS, QueryCostCalculator, QueryCostLimiter
+
+resolved: List[str] = []
+
+
+@strawberry.type
+class Company:
+    name: str
+
+
+@strawberry.type
+class JobListing:
+    title: str
+
+    @strawberry.field
+    def company(self) -> Optional[Company]:
+        resolved.append("company")
+        return Company(name="Acme")
+
+
+@strawberry.input
+class JobSearchInput:
+    query: str = ""
+    per_page: int = 20
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def search_jobs(self, input: JobSearchInput) -> List[JobListing]:
+        resolved.append("searchJobs")
+        return [JobListing(title="Python Developer")] * input.per_page
+
+
+def _schema(max_cost=None, max_depth=10):
+    return strawberry.Schema(query=Query, extensions=[
+        QueryDepthLimiter(max_depth=max_depth),
+        lambda execution_context: QueryCostLimiter(execution_context=execution_context, max_cost=max_cost),
+    ])
+
+
+def _cost(query, variables=None):
+    document = parse(query)
+    calculator = QueryCostCalculator(_schema()._schema, document, variables)
+    operation = next(d for d in document.definitions if isinstance(d, OperationDefinitionNode))
+    return calculator.operation_cost(operation)
+
+
+# Per job: title 1 + company (1 + its extra cost + name 1)
+JOB_COST = 1 + 1 + FIELD_COSTS["JobListing.company"] + 1
+SEARCH_COST = 1 + FIELD_COSTS["Query.searchJobs"]
+
+
+def test_cost_multiplies_selections_by_page_size():
+    assert _cost("{ searchJobs(input: {perPage: 5}) { title company { name } } }") == SEARCH_COST + 5 * JOB_COST
+    # The default page size applies when the query does not set one
+    assert _cost("{ searchJobs(input: {}) { title } }") == SEARCH_COST + 20 * 1
+    # Page sizes come from variables too, capped at the maximum page size
+    query = "query Q($n: Int!) { searchJobs(input: {perPage: $n}) { title } }"
+    assert _cost(query, {"n": 7}) == SEARCH_COST + 7
+    assert _cost(query, {"n": 10_000}) == SEARCH_COST + 100
+
+
+def test_fragments_count_like_inline_selections():
+    inline = "{ searchJobs(input: {perPage: 3}) { title company { name } } }"
+    spread = """
+        { searchJobs(input: {perPage: 3}) { ...Job } }
+        fragment Job on JobListing { title ... on JobListing { company { name } } }
+    """
+    assert _cost(spread) == _cost(inline)
+
+
+def test_costly_queries_are_rejected_before_resolvers_run():
+    query = "{ searchJobs(input: {perPage: 50}) { title company { name } } }"
+    cost = SEARCH_COST + 50 * JOB_COST
+
+    resolved.clear()
+    rejected = asyncio.run(_schema(max_cost=cost - 1).execute(query))
+    assert resolved == []
+    assert rejected.data is None
+    assert rejected.errors[0].extensions == {"code": "QUERY_TOO_COSTLY", "cost": cost, "max_cost": cost - 1}
+
+    allowed = asyncio.run(_schema(max_cost=cost).execute(query))
+    assert allowed.errors is None and len(allowed.data["searchJobs"]) == 50
+    assert resolved.count("company") == 50
+
+
+def test_depth_limit_applies_alongside_cost():
+    query = "{ searchJobs(input: {perPage: 1}) { company { name } } }"
+
+    resolved.clear()
+    result = asyncio.run(_schema(max_depth=1).execute(query))
+    assert result.errors and "exceeds maximum operation depth" in result.errors[0].message
+    assert resolved == []
+    assert asyncio.run(_schema(max_depth=2).execute(query)).errors is None
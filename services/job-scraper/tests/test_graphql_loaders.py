@@ -0,0 +1,93 @@
+"""
+Tests for the request-scoped GraphQL DataLoaders and their shared cache.
+"""
+
+import asyncio
+import os
+import sys
+
+import fakeredis
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.graphql.loaders import GraphQLLoaders, salary_key
+from src.utils.cache import CacheManager
+
+
+class _LoaderDatabase:
+    """Records each batched call; salary data exists only for Cape Town."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_companies_by_ids(self, company_ids):
+        self.calls.append(("companies", sorted(company_ids)))
+        return [{"id": company_id, "name": f"Company {company_id}"} for company_id in company_ids]
+
+    async def get_salary_benchmarks_batch(self, keys):
+        self.calls.append(("salary", sorted(keys, key=str)))
+        return [{"average": 50000.0} if location == "Cape Town" else None for _, location, _ in keys]
+
+    async def get_location_demand(self, locations):
+        self.calls.append(("demand", sorted(locations)))
+        return [{"location": location, "recent_jobs": 10} for location in locations]
+
+
+def _redis_cache():
+    cache = CacheManager()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    cache._initialized = True
+    return cache
+
+
+def _resolve_page(loaders, jobs):
+    """Resolve the company and salary fields of a page the way the schema does: concurrently, per job."""
+    async def resolve(job):
+        return await asyncio.gather(
+            loaders.company.load(job["company_id"]),
+            loaders.salary_benchmark.load(salary_key(job["title"], job["location"], None)),
+            loaders.market_data.load(job["location"]),
+        )
+    return asyncio.gather(*(resolve(job) for job in jobs))
+
+
+JOBS = [
+    {"company_id": "c1", "title": "Python  Developer", "location": "Cape Town"},
+    {"company_id": "c2", "title": "python developer", "location": "Cape Town"},
+    {"company_id": "c1", "title": "Accountant", "location": "Durban"},
+]
+
+
+def test_loads_in_one_tick_share_one_query_per_loader():
+    db = _LoaderDatabase()
+
+    async def run():
+        return await _resolve_page(GraphQLLoaders(db, _redis_cache()), JOBS)
+
+    results = asyncio.run(run())
+    assert sorted(db.calls, key=str) == [
+        ("companies", ["c1", "c2"]),
+        ("demand", ["Cape Town", "Durban"]),
+        # Equivalent titles normalize to one key
+        ("salary", [("accountant", "Durban", None), ("python developer", "Cape Town", None)]),
+    ]
+    assert [company["name"] for company, _, _ in results] == ["Company c1", "Company c2", "Company c1"]
+    assert [salary for _, salary, _ in results] == [{"average": 50000.0}, {"average": 50000.0}, None]
+
+
+def test_shared_cache_remembers_missing_data():
+    db = _LoaderDatabase()
+    cache = _redis_cache()
+
+    async def run():
+        await _resolve_page(GraphQLLoaders(db, cache), JOBS)
+        db.calls.clear()
+        # A later request, with fresh loaders, reuses the shared entries
+        return await _resolve_page(GraphQLLoaders(db, cache), JOBS)
+
+    results = asyncio.run(run())
+    # Companies are only memoized per request; salary and demand come from Redis,
+    # including the Durban benchmark that had no data (cached as the _EMPTY sentinel)
+    assert db.calls == [("companies", ["c1", "c2"])]
+    assert [salary for _, salary, _ in results] == [{"average": 50000.0}, {"average": 50000.0}, None]
@@ -0,0 +1,95 @@
+"""
+Tests for the cache-aside job detail read path.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.cache import CacheManager
+from src.utils.database import JOB_DETAIL_COLUMNS
+from src.utils.job_cache import JobDetailCache
+
+
+class _JobsDatabase:
+    """Jobs table that records each get_jobs_by_ids call."""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.queries = []
+        self.listeners = []
+
+    def add_jobs_changed_listener(self, listener):
+        self.listeners.append(listener)
+
+    async def get_jobs_by_ids(self, job_ids):
+        self.queries.append(sorted(job_ids))
+        await asyncio.sleep(0.01)
+        return [{column: self.rows[i].get(column) for column in JOB_DETAIL_COLUMNS} for i in job_ids if i in self.rows]
+
+    async def update(self, job_id, **values):
+        self.rows[job_id].update(values)
+        for listener in self.listeners:
+            await listener([job_id])
+
+
+def _job_cache(job_ids):
+    cache = CacheManager()
+    cache._initialized = True  # In-memory fallback, no Redis
+    db = _JobsDatabase([{"id": job_id, "title": f"Job {job_id}"} for job_id in job_ids])
+    return JobDetailCache(db, cache, ttl=60), db
+
+
+def test_concurrent_misses_share_one_query():
+    job_cache, db = _job_cache(["a", "b", "c"])
+
+    async def run():
+        first = await asyncio.gather(*(job_cache.get(job_id) for job_id in ["a", "a", "b", "a", "b", "missing"]))
+        second = await job_cache.get_many(["a", "b", "c", "a"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [row and row["title"] for row in first] == ["Job a", "Job a", "Job b", "Job a", "Job b", None]
+    assert [row["title"] for row in second] == ["Job a", "Job b", "Job c", "Job a"]
+    # One query per distinct job in the burst, then one for the single remaining miss
+    assert sorted(db.queries) == [["a"], ["b"], ["c"], ["missing"]]
+    assert job_cache.stats["coalesced"] == 3 and job_cache.stats["hits"] == 2
+
+
+def test_database_updates_invalidate_entries():
+    job_cache, db = _job_cache(["a"])
+
+    async def run():
+        await job_cache.get("a")
+        await db.update("a", title="Renamed")
+        return await job_cache.get("a")
+
+    assert asyncio.run(run())["title"] == "Renamed"
+    assert len(db.queries) == 2
+
+
+def test_update_during_a_fetch_is_not_cached_stale():
+    job_cache, db = _job_cache(["a"])
+
+    async def run():
+        reader = asyncio.create_task(job_cache.get("a"))
+        await asyncio.sleep(0)  # The read is now waiting on the database
+        await db.update("a", title="Renamed")
+        await reader
+        return await job_cache.get("a")
+
+    assert asyncio.run(run())["title"] == "Renamed"
+
+
+def test_refresh_caches_the_stored_row_shape():
+    job_cache, db = _job_cache(["a"])
+
+    async def run():
+        await job_cache.refresh("a")
+        return await job_cache.cache.get("a", prefix="job_detail")
+
+    row = asyncio.run(run())
+    assert set(row) == set(JOB_DETAIL_COLUMNS) and row["title"] == "Job a"
@@ -0,0 +1,85 @@
+"""
+Tests for the bounded, filtered fan-out behind GraphQL job subscriptions.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api import job_stream
+from src.api.job_stream import JobStream, JobStreamSubscriber, SlowConsumerError
+from src.api.websocket import SubscriptionFilter
+
+
+def _stream(queue_size=2, slow_consumer_seconds=5.0):
+    stream = JobStream(topic="jobs", queue_size=queue_size, slow_consumer_seconds=slow_consumer_seconds)
+    stream._ensure_started = lambda: None  # Jobs are published directly, not read from Kafka
+    return stream
+
+
+def _job(job_id, **fields):
+    return {"id": job_id, "title": "Python Developer", "job_type": "full_time",
+            "experience_level": "mid_level", **fields}
+
+
+def test_full_queue_drops_the_oldest_job():
+    subscriber = JobStreamSubscriber(queue_size=2)
+    for i in range(4):
+        assert subscriber.offer(i, now=0.0, slow_after=5.0)
+
+    assert [subscriber.queue.get_nowait() for _ in range(2)] == [2, 3]
+    assert subscriber.dropped == 2
+
+    # Draining resets the slow-consumer clock
+    assert subscriber.offer(4, now=100.0, slow_after=5.0) and subscriber.full_since is None
+
+
+def test_subscriber_full_for_too_long_is_evicted(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(job_stream.time, "monotonic", lambda: clock[0])
+    stream = _stream(queue_size=2, slow_consumer_seconds=5.0)
+
+    async def run():
+        jobs = stream.subscribe(SubscriptionFilter())
+        first = asyncio.ensure_future(jobs.__anext__())
+        await asyncio.sleep(0)  # Registered and waiting
+
+        stream.publish(_job("a"))
+        assert (await first)["id"] == "a"
+
+        # The subscriber stops reading; its queue is full from 2s, overflowing past 5s at 8s
+        for second in range(9):
+            clock[0] = float(second)
+            stream.publish(_job(f"b{second}"))
+        with pytest.raises(SlowConsumerError):
+            await jobs.__anext__()
+
+    asyncio.run(run())
+    assert stream.stats["subscribers_evicted"] == 1
+    assert stream.stats["jobs_dropped"] > 0
+    assert stream.get_stats()["subscribers"] == 0
+
+
+def test_any_of_job_type_and_level_filters():
+    filters = SubscriptionFilter(job_types=["contract", "part_time"], experience_levels=["senior_level"])
+    stream = _stream(queue_size=10)
+
+    async def run():
+        matching = stream.subscribe(filters)
+        same = stream.subscribe(SubscriptionFilter(job_types=["contract", "part_time"],
+                                                   experience_levels=["senior_level"]))
+        waiting = [asyncio.ensure_future(matching.__anext__()), asyncio.ensure_future(same.__anext__())]
+        await asyncio.sleep(0)
+        assert stream.get_stats()["distinct_filters"] == 1
+
+        assert stream.publish(_job("full-time-senior", experience_level="senior_level")) == 0
+        assert stream.publish(_job("contract-mid", job_type="contract")) == 0
+        assert stream.publish(_job("contract-senior", job_type="contract", experience_level="senior_level")) == 2
+        return [job["id"] for job in await asyncio.gather(*waiting)]
+
+    assert asyncio.run(run()) == ["contract-senior", "contract-senior"]
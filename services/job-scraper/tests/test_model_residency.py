@@ -0,0 +1,95 @@
+"""
+Tests for GreedyDual-Size eviction in ModelResidencyManager.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import model_residency
+from src.utils.model_residency import MB, ModelResidencyManager
+
+GB = 1024 * MB
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    """Free system memory seen by the manager, in bytes."""
+    state = SimpleNamespace(available=64 * GB)
+    monkeypatch.setattr(
+        model_residency.psutil, "virtual_memory",
+        lambda: SimpleNamespace(total=128 * GB, available=state.available, percent=50.0)
+    )
+    return state
+
+
+def _manager(budget_mb=1000, min_free_mb=100):
+    evicted = []
+    manager = ModelResidencyManager(budget_bytes=budget_mb * MB, min_free_bytes=min_free_mb * MB)
+
+    def admit(key, size_mb, load_seconds, **kwargs):
+        manager.admit(key, size_bytes=size_mb * MB, load_seconds=load_seconds, on_evict=evicted.append, **kwargs)
+
+    return manager, admit, evicted
+
+
+def test_evicts_lowest_reload_cost_per_byte_first(memory):
+    manager, admit, evicted = _manager()
+    admit("cheap", 400, load_seconds=1)     # 0.0025 s/MB
+    admit("costly", 400, load_seconds=40)   # 0.1 s/MB
+    admit("small", 100, load_seconds=1)     # 0.01 s/MB
+
+    admit("new", 300, load_seconds=5)
+
+    assert evicted == ["cheap"]
+    assert manager.resident_bytes == 800 * MB
+
+    admit("newer", 300, load_seconds=1)
+    assert evicted == ["cheap", "small"]
+    assert {m["key"] for m in manager.get_stats()["models"]} == {"costly", "new", "newer"}
+
+    # Eviction raises the inflation floor to the victim's priority, which
+    # accesses then add to, so untouched residents age relative to used ones
+    assert manager._inflation == pytest.approx(1 / 100)
+    manager.touch("costly")
+    stats = {m["key"]: m["priority"] for m in manager.get_stats()["models"]}
+    assert stats["costly"] == pytest.approx(1 / 100 + 40 / 400)
+
+
+def test_pinned_and_in_use_models_are_never_evicted(memory):
+    manager, admit, evicted = _manager()
+    admit("pinned", 400, load_seconds=0, pinned=True)
+    admit("busy", 400, load_seconds=0)
+    admit("idle", 200, load_seconds=100)
+
+    with manager.in_use("busy"):
+        admit("new", 200, load_seconds=1)
+        assert evicted == ["idle"]
+
+        # Nothing left to evict: admitted over budget rather than dropping a model in use
+        admit("extra", 200, load_seconds=1)
+        assert "busy" not in evicted and "pinned" not in evicted
+        assert manager.evict("busy") is False
+
+    assert manager.evict("pinned") is False
+    assert manager.evict("busy") is True
+
+
+def test_min_free_memory_floor_forces_eviction(memory):
+    manager, admit, evicted = _manager(budget_mb=10_000, min_free_mb=1000)
+    admit("a", 300, load_seconds=1)
+    admit("b", 300, load_seconds=5)
+
+    # Well within the budget, but the machine is short of free memory
+    memory.available = 800 * MB
+    assert manager.enforce() is True
+    assert evicted == ["a"]
+
+    memory.available = 500 * MB
+    assert manager.make_room(0) is False
+    assert evicted == ["a", "b"]
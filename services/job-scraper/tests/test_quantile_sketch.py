@@ -0,0 +1,73 @@
+"""
+Tests for the t-digest behind market salary percentiles.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.quantile_sketch import TDigest
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _salaries(rng, n):
+    # Right-skewed, like advertised salaries
+    return [rng.lognormvariate(10.5, 0.6) for _ in range(n)]
+
+
+def _rank_error(values, estimate, q):
+    """Distance in quantile space between the estimate and q."""
+    return abs(np.searchsorted(values, estimate) / len(values) - q)
+
+
+def test_quantiles_are_accurate():
+    rng = random.Random(11)
+    values = _salaries(rng, 50000)
+    digest = TDigest(compression=100)
+    digest.add_many(values)
+
+    ordered = np.sort(values)
+    for q in QUANTILES:
+        # Tighter at the tails, where t-digest keeps small centroids
+        assert _rank_error(ordered, digest.quantile(q), q) <= (0.002 if q in (0.01, 0.99) else 0.01)
+    assert len(digest) == 50000
+    assert digest.quantile(0.0) == pytest.approx(min(values))
+    assert digest.quantile(1.0) == pytest.approx(max(values))
+
+
+def test_merged_digests_match_one_digest_of_all_values():
+    rng = random.Random(5)
+    parts = [_salaries(rng, rng.randint(50, 5000)) for _ in range(40)]
+    digests = []
+    for part in parts:
+        digest = TDigest(compression=100)
+        digest.add_many(part)
+        digests.append(digest)
+
+    merged = TDigest.merge_all(digests)
+    ordered = np.sort([value for part in parts for value in part])
+
+    assert len(merged) == len(ordered)
+    for q in QUANTILES:
+        assert _rank_error(ordered, merged.quantile(q), q) <= 0.01
+
+
+def test_serialized_digests_merge_and_skip_missing_blobs():
+    rng = random.Random(2)
+    first, second = TDigest(), TDigest()
+    first.add_many(_salaries(rng, 1000))
+    second.add_many(_salaries(rng, 1000))
+
+    merged = TDigest.merge_serialized([first.to_bytes(), None, second.to_bytes()])
+    direct = TDigest.merge_all([first, second])
+
+    assert len(merged) == 2000
+    assert merged.quantile(0.5) == pytest.approx(direct.quantile(0.5))
+    assert TDigest.merge_serialized([]).quantile(0.5) is None
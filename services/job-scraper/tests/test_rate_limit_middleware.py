@@ -0,0 +1,103 @@
+"""
+Tests for the API rate limiter: GCRA and sliding-window scripts, and the
+in-process token bucket fallback.
+"""
+
+import asyncio
+import os
+import sys
+
+import fakeredis
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.middleware.rate_limit import GCRA_SCRIPT, SLIDING_WINDOW_SCRIPT, RateLimiter, TokenBucket
+
+
+def _redis_limiter(algorithm: str) -> RateLimiter:
+    limiter = RateLimiter(algorithm=algorithm)
+    limiter.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    limiter._gcra_script = limiter.redis_client.register_script(GCRA_SCRIPT)
+    limiter._sliding_window_script = limiter.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+    return limiter
+
+
+@pytest.mark.parametrize("algorithm", RateLimiter.ALGORITHMS)
+def test_redis_limit_allows_limit_then_rejects(algorithm):
+    limiter = _redis_limiter(algorithm)
+
+    async def run():
+        return [await limiter.is_allowed("rate_limit:test", limit=5, window=60) for _ in range(7)]
+
+    results = asyncio.run(run())
+    assert [allowed for allowed, _ in results] == [True] * 5 + [False] * 2
+    assert [meta["remaining"] for _, meta in results[:5]] == [4, 3, 2, 1, 0]
+    # GCRA frees one slot per emission interval (60 / 5), the log frees the oldest entry
+    assert 1 <= results[-1][1]["retry_after"] <= 60
+
+
+def test_redis_limits_are_per_key():
+    limiter = _redis_limiter("gcra")
+
+    async def run():
+        for _ in range(3):
+            await limiter.is_allowed("rate_limit:a", limit=3, window=60)
+        return (
+            await limiter.is_allowed("rate_limit:a", limit=3, window=60),
+            await limiter.is_allowed("rate_limit:b", limit=3, window=60),
+        )
+
+    (a_allowed, _), (b_allowed, _) = asyncio.run(run())
+    assert not a_allowed and b_allowed
+
+
+def test_token_bucket_refills_at_the_window_rate():
+    bucket = TokenBucket(capacity=4, window=8, now=0.0)
+
+    assert [bucket.consume(0.0) for _ in range(5)] == [True] * 4 + [False]
+    assert bucket.retry_after() == pytest.approx(2.0)
+    assert not bucket.consume(1.9)
+    assert bucket.consume(2.0)
+    assert not bucket.is_full(2.0)
+    assert bucket.is_full(10.0) and bucket.tokens == 4
+
+
+def test_memory_fallback_enforces_the_limit():
+    limiter = RateLimiter(algorithm="gcra")
+
+    async def run():
+        allowed = [
+            (await limiter._check_memory_limit("k", 3, 30, 100.0))[0] for _ in range(4)
+        ]
+        later, _ = await limiter._check_memory_limit("k", 3, 30, 110.0)
+        return allowed, later
+
+    allowed, later = asyncio.run(run())
+    assert allowed == [True, True, True, False]
+    assert later  # One token back after window / limit seconds
+
+
+def test_algorithms_do_not_share_redis_keys():
+    gcra = _redis_limiter("gcra")
+    sliding_window = _redis_limiter("sliding_window")
+    sliding_window.redis_client = gcra.redis_client
+    sliding_window._sliding_window_script = gcra.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def run():
+        # A string TAT and a ZSET under one key would fail with WRONGTYPE
+        results = [
+            await gcra.is_allowed("rl:ip:10.0.0.1", limit=3, window=60),
+            await sliding_window.is_allowed("rl:ip:10.0.0.1", limit=3, window=60),
+        ]
+        stats = [
+            await gcra.get_usage_stats("rl:ip:10.0.0.1", window=60, limit=3),
+            await sliding_window.get_usage_stats("rl:ip:10.0.0.1", window=60, limit=3),
+        ]
+        return results, stats, sorted(await gcra.redis_client.keys("*"))
+
+    results, stats, keys = asyncio.run(run())
+    assert [allowed for allowed, _ in results] == [True, True]
+    assert [s["current_count"] for s in stats] == [1, 1]
+    assert keys == ["gcra:rl:ip:10.0.0.1", "swl:rl:ip:10.0.0.1"]
@@ -0,0 +1,62 @@
+"""
+Tests for the per-domain GCRA budgets in AdaptiveRateLimiter.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.rate_limiter import AdaptiveRateLimiter, DomainSchedule
+
+
+def _local_limiter(limit: int, window: int) -> AdaptiveRateLimiter:
+    limiter = AdaptiveRateLimiter()
+    limiter._use_redis = False
+    limiter.adjust_limits("example.com", limit, window)
+    return limiter
+
+
+def test_gcra_allows_a_burst_then_the_sustained_rate():
+    limiter = _local_limiter(limit=5, window=10)
+    schedule = DomainSchedule()
+
+    starts = [limiter._reserve_local("example.com", schedule, 0.0, now=0.0) for _ in range(20)]
+
+    # A burst of `limit`, then one slot per emission interval (window / limit)
+    assert starts[:5] == [0.0] * 5
+    assert starts[5:] == pytest.approx([2.0 * k for k in range(1, 16)])
+    for t in (0.0, 5.0, 10.0, 29.0):
+        assert sum(start <= t for start in starts) <= 5 + t / 2.0
+
+
+def test_gcra_honours_minimum_spacing():
+    limiter = _local_limiter(limit=100, window=1)
+    schedule = DomainSchedule()
+
+    starts = [limiter._reserve_local("example.com", schedule, 0.5, now=10.0) for _ in range(4)]
+
+    assert starts == pytest.approx([10.0, 10.5, 11.0, 11.5])
+
+
+def test_cancelled_dispatcher_releases_queued_waiters():
+    async def run():
+        limiter = _local_limiter(limit=1, window=60)
+        await limiter.wait("example.com", priority=1)  # Takes the only slot
+        waiters = [asyncio.create_task(limiter.wait("example.com", priority=1)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        dispatcher = limiter.schedules["example.com"].dispatcher
+        assert dispatcher is not None and len(limiter.schedules["example.com"].waiters) == 3
+        dispatcher.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=1)
+        return results, limiter.schedules["example.com"]
+
+    results, schedule = asyncio.run(run())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert schedule.waiters == [] and schedule.dispatcher is None